@@ -0,0 +1,40 @@
+"""add unique key on repositories (user_id, github_repo_id)
+
+同步仓库时按 (user_id, github_repo_id) 批量 INSERT ... ON DUPLICATE KEY UPDATE，
+需要该唯一键。创建前先删除重复行（保留id最小的一行）。
+
+Revision ID: 3f1c2a7b9d01
+Revises: 
+Create Date: 2026-10-18 17:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a7b9d01'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        DELETE r1 FROM repositories r1
+        JOIN repositories r2
+          ON r1.user_id = r2.user_id
+         AND r1.github_repo_id = r2.github_repo_id
+         AND r1.id > r2.id
+        """
+    )
+    op.create_unique_constraint(
+        'uq_repositories_user_repo',
+        'repositories',
+        ['user_id', 'github_repo_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_repositories_user_repo', 'repositories', type_='unique')
@@ -0,0 +1,61 @@
+"""add unique key on language_stats (user_id, language)
+
+写入提交时按 (user_id, language) 批量累加语言计数，需要该唯一键。
+创建前先删除重复行，再从 commit_details 重建已有用户的语言计数。
+
+Revision ID: 8a4d6e2c1b73
+Revises: 3f1c2a7b9d01
+Create Date: 2026-10-18 18:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a4d6e2c1b73'
+down_revision = '3f1c2a7b9d01'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        DELETE l1 FROM language_stats l1
+        JOIN language_stats l2
+          ON l1.user_id = l2.user_id
+         AND l1.language = l2.language
+         AND l1.id > l2.id
+        """
+    )
+    op.create_unique_constraint(
+        'uq_language_stats_user_language',
+        'language_stats',
+        ['user_id', 'language']
+    )
+    # 之前没有写入过language_stats，从已有提交重建计数
+    op.execute(
+        """
+        INSERT INTO language_stats
+            (user_id, language, total_commits, total_additions, total_deletions,
+             total_files, first_used_at, last_used_at)
+        SELECT user_id, primary_language, COUNT(*), COALESCE(SUM(additions), 0),
+               COALESCE(SUM(deletions), 0), COALESCE(SUM(files_changed), 0),
+               MIN(commit_date), MAX(commit_date)
+        FROM commit_details
+        WHERE primary_language IS NOT NULL AND primary_language <> ''
+        GROUP BY user_id, primary_language
+        ON DUPLICATE KEY UPDATE
+            total_commits = VALUES(total_commits),
+            total_additions = VALUES(total_additions),
+            total_deletions = VALUES(total_deletions),
+            total_files = VALUES(total_files),
+            first_used_at = VALUES(first_used_at),
+            last_used_at = VALUES(last_used_at)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_language_stats_user_language', 'language_stats', type_='unique')
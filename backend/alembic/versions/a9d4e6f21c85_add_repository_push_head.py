@@ -0,0 +1,32 @@
+"""add repository push head sha
+
+推送事件（push webhook）写入新提交后记录默认分支的HEAD，下一次推送的before
+与之相同时说明没有遗漏推送，可以直接推进同步水位；按GitHub仓库ID查找仓库需要索引。
+
+Revision ID: a9d4e6f21c85
+Revises: f3a8c2d61b47
+Create Date: 2026-10-18 23:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9d4e6f21c85'
+down_revision = 'f3a8c2d61b47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'repositories',
+        sa.Column('push_head_sha', sa.String(40), nullable=True, comment='最近处理的推送事件之后的默认分支HEAD')
+    )
+    op.create_index('ix_repositories_github_repo_id', 'repositories', ['github_repo_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_repositories_github_repo_id', table_name='repositories')
+    op.drop_column('repositories', 'push_head_sha')
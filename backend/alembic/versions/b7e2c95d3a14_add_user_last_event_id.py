@@ -0,0 +1,30 @@
+"""add user last event id
+
+增量同步前先检查用户事件流：记录上次同步时事件流中最新的事件ID，
+之后的事件即为上次同步以来的变化（没有新事件时整次同步直接结束）。
+
+Revision ID: b7e2c95d3a14
+Revises: a9d4e6f21c85
+Create Date: 2026-10-18 23:30:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2c95d3a14'
+down_revision = 'a9d4e6f21c85'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'users',
+        sa.Column('last_event_id', sa.String(32), nullable=True, comment='上次同步时事件流中最新的事件ID')
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'last_event_id')
@@ -0,0 +1,33 @@
+"""add user aggregate synced at
+
+仅聚合统计同步从仓库统计接口写入 daily_stats 和用户累计值，记录写入时间；
+之后的提交详情同步更新统计时据此从 commit_details 完整重算，避免累计值重复计算。
+
+Revision ID: c4f81a7be260
+Revises: b7e2c95d3a14
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4f81a7be260'
+down_revision = 'b7e2c95d3a14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'users',
+        sa.Column(
+            'aggregate_synced_at', sa.TIMESTAMP(), nullable=True,
+            comment='统计数据来自仓库聚合统计的时间（提交详情同步后清除）'
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'aggregate_synced_at')
@@ -0,0 +1,36 @@
+"""add per-repository sync watermarks
+
+增量同步按仓库记录水位：GitHub的pushed_at/updated_at、已同步的最新提交时间和SHA，
+以及上次同步完成时的pushed_at。已有仓库以last_commit_at作为初始提交时间水位。
+
+Revision ID: c52e9f0a4d18
+Revises: 8a4d6e2c1b73
+Create Date: 2026-10-18 19:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c52e9f0a4d18'
+down_revision = '8a4d6e2c1b73'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('repositories', sa.Column('pushed_at', sa.TIMESTAMP(), nullable=True, comment='GitHub最后推送时间'))
+    op.add_column('repositories', sa.Column('github_updated_at', sa.TIMESTAMP(), nullable=True, comment='GitHub最后更新时间'))
+    op.add_column('repositories', sa.Column('last_synced_commit_at', sa.TIMESTAMP(), nullable=True, comment='已同步的最新提交时间'))
+    op.add_column('repositories', sa.Column('last_synced_sha', sa.String(40), nullable=True, comment='已同步的最新提交SHA'))
+    op.add_column('repositories', sa.Column('synced_pushed_at', sa.TIMESTAMP(), nullable=True, comment='上次同步完成时的pushed_at'))
+    op.execute("UPDATE repositories SET last_synced_commit_at = last_commit_at")
+
+
+def downgrade() -> None:
+    op.drop_column('repositories', 'synced_pushed_at')
+    op.drop_column('repositories', 'last_synced_sha')
+    op.drop_column('repositories', 'last_synced_commit_at')
+    op.drop_column('repositories', 'github_updated_at')
+    op.drop_column('repositories', 'pushed_at')
@@ -0,0 +1,35 @@
+"""add commit_details enriched flag
+
+两阶段同步先从提交列表写入提交（不含增删行数、文件数和语言），标记为未补全，
+后台补全任务按 (user_id, enriched) 查找并获取提交详情；已有的提交都已补全。
+
+Revision ID: d2a7f9c04e18
+Revises: c4f81a7be260
+Create Date: 2026-10-19 06:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a7f9c04e18'
+down_revision = 'c4f81a7be260'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'commit_details',
+        sa.Column(
+            'enriched', sa.Boolean(), nullable=False, server_default=sa.true(),
+            comment='是否已获取提交详情'
+        )
+    )
+    op.create_index('ix_commit_details_user_enriched', 'commit_details', ['user_id', 'enriched'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_commit_details_user_enriched', table_name='commit_details')
+    op.drop_column('commit_details', 'enriched')
@@ -0,0 +1,82 @@
+"""add sync runs with per-repository checkpoints
+
+记录每次用户数据同步的状态和每个仓库的分页游标，进程中断或被限流后
+下一次同步从检查点继续，已完成的仓库不再重新下载。
+
+Revision ID: e7b3a91f5c26
+Revises: c52e9f0a4d18
+Create Date: 2026-10-18 21:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b3a91f5c26'
+down_revision = 'c52e9f0a4d18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sync_runs',
+        sa.Column('id', sa.BigInteger(), primary_key=True, autoincrement=True, comment='同步运行ID'),
+        sa.Column('user_id', sa.BigInteger(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, comment='用户ID'),
+        sa.Column('incremental', sa.Boolean(), nullable=True, comment='是否增量同步'),
+        sa.Column('sync_strategy', sa.String(20), nullable=False, comment='提交同步策略（rest/graphql）'),
+        sa.Column('max_commits_per_repo', sa.Integer(), nullable=True, comment='每个仓库最大同步提交数'),
+        sa.Column(
+            'status',
+            sa.Enum('running', 'completed', 'failed', 'abandoned', name='sync_run_status_enum'),
+            nullable=False,
+            comment='运行状态'
+        ),
+        sa.Column('total_repos', sa.Integer(), nullable=True, comment='需要同步的仓库数'),
+        sa.Column('completed_repos', sa.Integer(), nullable=True, comment='已完成的仓库数'),
+        sa.Column('failed_repos', sa.Integer(), nullable=True, comment='失败的仓库数'),
+        sa.Column('total_commits', sa.Integer(), nullable=True, comment='新增提交数'),
+        sa.Column('resume_count', sa.Integer(), nullable=True, comment='从检查点继续的次数'),
+        sa.Column('started_at', sa.TIMESTAMP(), server_default=sa.func.current_timestamp(), comment='开始时间'),
+        sa.Column('finished_at', sa.TIMESTAMP(), nullable=True, comment='结束时间'),
+        sa.Column(
+            'updated_at',
+            sa.TIMESTAMP(),
+            server_default=sa.text('CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'),
+            comment='更新时间'
+        ),
+    )
+    op.create_index('ix_sync_runs_user_id', 'sync_runs', ['user_id'])
+    op.create_index('ix_sync_runs_status', 'sync_runs', ['status'])
+
+    op.create_table(
+        'sync_run_repos',
+        sa.Column('id', sa.BigInteger(), primary_key=True, autoincrement=True, comment='检查点ID'),
+        sa.Column('run_id', sa.BigInteger(), sa.ForeignKey('sync_runs.id', ondelete='CASCADE'), nullable=False, comment='同步运行ID'),
+        sa.Column('repo_id', sa.BigInteger(), sa.ForeignKey('repositories.id', ondelete='CASCADE'), nullable=False, comment='仓库ID'),
+        sa.Column(
+            'status',
+            sa.Enum('pending', 'completed', 'failed', name='sync_run_repo_status_enum'),
+            nullable=False,
+            comment='仓库同步状态'
+        ),
+        sa.Column('since', sa.String(32), nullable=True, comment='提交起始时间（ISO 8601）'),
+        sa.Column('cursor', sa.String(255), nullable=True, comment='下一页游标（REST为页码，GraphQL为endCursor）'),
+        sa.Column('commits_listed', sa.Integer(), nullable=True, comment='游标之前已列出的提交数'),
+        sa.Column('commits_synced', sa.Integer(), nullable=True, comment='已写入的新提交数'),
+        sa.Column('error', sa.TEXT(), nullable=True, comment='失败原因'),
+        sa.Column(
+            'updated_at',
+            sa.TIMESTAMP(),
+            server_default=sa.text('CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'),
+            comment='更新时间'
+        ),
+        sa.UniqueConstraint('run_id', 'repo_id', name='uq_sync_run_repos_run_repo'),
+    )
+    op.create_index('ix_sync_run_repos_run_id', 'sync_run_repos', ['run_id'])
+
+
+def downgrade() -> None:
+    op.drop_table('sync_run_repos')
+    op.drop_table('sync_runs')
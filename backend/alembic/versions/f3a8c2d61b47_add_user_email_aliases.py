@@ -0,0 +1,42 @@
+"""add user email aliases and sync run author filter
+
+记录用户提交时使用的邮箱别名，同步时按登录名和这些邮箱过滤提交列表，
+只获取用户自己的提交详情。同步运行记录作者过滤条件的指纹，
+过滤条件变化后分页游标失效，不再从旧运行的检查点继续。
+
+Revision ID: f3a8c2d61b47
+Revises: e7b3a91f5c26
+Create Date: 2026-10-18 22:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a8c2d61b47'
+down_revision = 'e7b3a91f5c26'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'user_email_aliases',
+        sa.Column('id', sa.BigInteger(), primary_key=True, autoincrement=True, comment='别名ID'),
+        sa.Column('user_id', sa.BigInteger(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, comment='用户ID'),
+        sa.Column('email', sa.String(255), nullable=False, comment='提交作者邮箱'),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.func.current_timestamp(), comment='创建时间'),
+        sa.UniqueConstraint('user_id', 'email', name='uq_user_email_aliases_user_email'),
+    )
+    op.create_index('ix_user_email_aliases_user_id', 'user_email_aliases', ['user_id'])
+
+    op.add_column(
+        'sync_runs',
+        sa.Column('author_filter', sa.String(40), nullable=True, comment='提交作者过滤条件的指纹（为空表示不过滤）')
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('sync_runs', 'author_filter')
+    op.drop_table('user_email_aliases')
@@ -2,7 +2,7 @@
 API v1 路由聚合
 """
 from fastapi import APIRouter
-from app.api.v1 import dashboard, scheduler, sync
+from app.api.v1 import dashboard, scheduler, sync, webhooks
 
 api_router = APIRouter()
 
@@ -25,4 +25,11 @@ api_router.include_router(
     sync.router,
     prefix="/sync",
     tags=["数据同步"]
-)
\ No newline at end of file
+)
+
+# 注册Webhook路由
+api_router.include_router(
+    webhooks.router,
+    prefix="/webhooks",
+    tags=["GitHub Webhook"]
+)
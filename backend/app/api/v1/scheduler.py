@@ -14,9 +14,9 @@ router = APIRouter()
 class JobCreate(BaseModel):
     """创建任务请求"""
     username: str
-    schedule_type: str = "daily"  # daily, hourly
-    hour: Optional[int] = 2  # 仅用于daily
-    minute: Optional[int] = 0  # 仅用于daily
+    schedule_type: str = "daily"  # daily, hourly, backfill（每日低峰期回填完整历史）
+    hour: Optional[int] = 2  # 仅用于daily、backfill
+    minute: Optional[int] = 0  # 仅用于daily、backfill
 
 
 class JobResponse(BaseModel):
@@ -34,9 +34,9 @@ async def create_job(job: JobCreate):
     
     **参数:**
     - username: GitHub用户名
-    - schedule_type: 调度类型 (daily/hourly)
-    - hour: 执行时间（小时，仅daily模式）
-    - minute: 执行时间（分钟，仅daily模式）
+    - schedule_type: 调度类型 (daily/hourly/backfill，backfill按时间窗口回填完整历史，只使用部分每小时配额)
+    - hour: 执行时间（小时，仅daily、backfill模式）
+    - minute: 执行时间（分钟，仅daily、backfill模式）
     """
     try:
         if job.schedule_type == "daily":
@@ -55,8 +55,20 @@ async def create_job(job: JobCreate):
                 "message": f"已创建每小时同步任务: {job.username}",
                 "schedule": "每小时一次"
             }
+        elif job.schedule_type == "backfill":
+            scheduler_service.add_backfill_job(
+                username=job.username,
+                hour=job.hour,
+                minute=job.minute
+            )
+            return {
+                "message": f"已创建历史回填任务: {job.username}",
+                "schedule": f"每天 {job.hour:02d}:{job.minute:02d}"
+            }
         else:
             raise HTTPException(status_code=400, detail="无效的调度类型")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
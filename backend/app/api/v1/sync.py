@@ -3,19 +3,26 @@
 实现GitHub数据同步功能
 """
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
 import logging
+from typing import List, Dict, Any
 import sys
 import os
 
 # 添加scripts目录到路径以导入统计脚本
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..', 'scripts'))
 
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal, get_db
+from app.models.user import User
 from app.core.config import settings
-from app.services.data_sync_service import DataSyncService
-from app.services.github_client import GitHubClient
+from app.services.data_sync_service import DataSyncService, SYNC_STRATEGIES
+from app.services.repo_stats_sync_service import RepoStatsSyncService
+from app.services.commit_enricher import CommitEnricher
+from app.services.client_registry import github_client_registry
+from app.services.sync_job_manager import SyncJob, sync_job_manager
+from app.services.user_email_alias_service import UserEmailAliasService
 
 # 导入统计更新函数
 try:
@@ -39,7 +46,12 @@ class SyncRequest(BaseModel):
     user_id: int = Field(..., description="用户ID", ge=1)
     username: str = Field(..., description="GitHub用户名", min_length=1)
     github_token: str | None = Field(None, description="GitHub个人访问令牌（可选）")
-    sync_mode: str | None = Field(None, description="同步模式: full(全量) / incremental(增量) / auto(自动，默认)")
+    sync_mode: str | None = Field(
+        None,
+        description="同步模式: full(全量) / incremental(增量) / auto(自动，默认) / "
+                    "aggregate(仅聚合统计，按仓库统计接口填充每周汇总，不获取提交详情；已有提交详情的用户不执行)"
+    )
+    sync_strategy: str | None = Field(None, description="提交同步策略: rest / graphql / git（默认使用配置SYNC_STRATEGY）")
 
 
 class SyncResponse(BaseModel):
@@ -52,22 +64,249 @@ class SyncResponse(BaseModel):
     commits_synced: int = Field(..., description="同步的提交数量")
     total_additions: int = Field(default=0, description="总新增代码行数")
     total_deletions: int = Field(default=0, description="总删除代码行数")
-    sync_mode: str = Field(..., description="实际执行的同步模式: full / incremental")
+    sync_mode: str = Field(..., description="实际执行的同步模式: full / incremental / aggregate")
     since: str | None = Field(None, description="增量同步起始时间")
+    failed_repos: List[Dict[str, str]] = Field(default_factory=list, description="同步失败的仓库及错误信息")
+    sync_run_id: int | None = Field(None, description="同步运行ID（有失败的仓库时下次同步从其检查点继续）")
+    resumed: bool = Field(default=False, description="是否从上次中断的同步运行继续")
+    enrich_job_id: str | None = Field(
+        None, description="两阶段同步时补全提交详情（增删行数和语言）的后台任务ID"
+    )
+
+
+class SyncJobCreatedResponse(BaseModel):
+    """同步任务提交响应模型"""
+    job_id: str = Field(..., description="同步任务ID")
+    status: str = Field(..., description="任务状态: queued / running / succeeded / failed / cancelled")
+    created: bool = Field(..., description="是否新建任务（该用户已有未结束的任务时返回已有任务）")
+    status_url: str = Field(..., description="查询任务状态的地址")
+    events_url: str = Field(..., description="订阅任务进度事件（SSE）的地址")
+
+
+class SyncJobStatusResponse(BaseModel):
+    """同步任务状态响应模型"""
+    job_id: str = Field(..., description="同步任务ID")
+    status: str = Field(..., description="任务状态: queued / running / succeeded / failed / cancelled")
+    stage: str | None = Field(None, description="当前阶段: user / repositories / commits / statistics / enrich")
+    params: Dict[str, Any] = Field(default_factory=dict, description="任务参数")
+    created_at: str = Field(..., description="提交时间")
+    started_at: str | None = Field(None, description="开始运行时间")
+    finished_at: str | None = Field(None, description="结束时间")
+    elapsed_seconds: float = Field(default=0, description="运行耗时（秒）")
+    total_repos: int = Field(default=0, description="仓库总数")
+    pending_repos: int = Field(default=0, description="需要同步提交的仓库数")
+    skipped_repos: int = Field(default=0, description="跳过的仓库数（没有新推送或本次运行中已完成）")
+    completed_repos: int = Field(default=0, description="已完成的仓库数")
+    failed_repos: List[Dict[str, str]] = Field(default_factory=list, description="同步失败的仓库及错误信息")
+    commits_synced: int = Field(default=0, description="已写入的新提交数")
+    commits_per_second: float = Field(default=0, description="提交写入吞吐量（个/秒）")
+    error: str | None = Field(None, description="任务失败原因")
+    result: SyncResponse | Dict[str, Any] | None = Field(
+        None, description="任务结果（任务成功后提供；推送事件任务为推送处理结果）"
+    )
+
+
+class EmailAliasRequest(BaseModel):
+    """添加邮箱别名请求模型"""
+    email: str = Field(..., description="提交作者邮箱（如未添加到GitHub账号的工作邮箱）", min_length=3, max_length=255)
+
+
+class EmailAliasResponse(BaseModel):
+    """邮箱别名响应模型"""
+    id: int = Field(..., description="别名ID")
+    user_id: int = Field(..., description="用户ID")
+    email: str = Field(..., description="提交作者邮箱")
+    created_at: str | None = Field(None, description="创建时间")
+
+
+def _resolve_incremental(sync_mode: str | None) -> bool:
+    """
+    根据同步模式确定是否增量同步
+
+    Args:
+        sync_mode: full / incremental / auto（默认）
+
+    Returns:
+        是否增量同步
+    """
+    sync_mode = sync_mode or "auto"
+    if sync_mode == "full":
+        logger.info("用户指定全量同步模式")
+        return False
+    if sync_mode == "incremental":
+        logger.info("用户指定增量同步模式")
+    else:  # auto
+        logger.info("自动同步模式（默认增量）")
+    return True
+
+
+async def _run_sync_job(job: SyncJob, request: SyncRequest) -> Dict[str, Any]:
+    """
+    执行一次同步任务：同步GitHub数据后更新统计数据
+
+    任务使用自己的数据库会话，不占用HTTP请求的会话和worker。
+
+    Args:
+        job: 同步任务（作为进度回调）
+        request: 同步请求
+
+    Returns:
+        同步结果（SyncResponse字段）
+    """
+    logger.info(f"开始同步GitHub数据: user_id={request.user_id}, username={request.username}")
+
+    # 使用请求中的token或配置文件中的Token池（GITHUB_TOKENS + GITHUB_TOKEN）
+    if request.github_token:
+        logger.info("使用用户提供的GitHub Token")
+    else:
+        logger.info("使用系统配置的GitHub Token池")
+
+    # 获取共享连接池上的GitHub客户端（同一Token复用连接和配额记录）
+    github_client = github_client_registry.get_client(request.github_token)
+
+    async with AsyncSessionLocal() as db:
+        # 创建数据同步服务，进度写入任务状态
+        sync_service = DataSyncService(
+            db, github_client, sync_strategy=request.sync_strategy, progress_callback=job.record
+        )
+
+        # 执行数据同步
+        if request.sync_mode == "aggregate":
+            sync_result = await RepoStatsSyncService(sync_service).sync_user_stats(request.username)
+        else:
+            sync_result = await sync_service.sync_user_data(
+                username=request.username,
+                max_commits_per_repo=100,  # 每个仓库最多同步100个提交
+                incremental=_resolve_incremental(request.sync_mode)
+            )
+
+        two_phase = sync_service.two_phase
+
+    logger.info(f"GitHub数据同步完成: {sync_result}")
+
+    if sync_result['sync_mode'] == "aggregate":
+        # daily_stats和累计值已由仓库统计写入，不再从commit_details更新
+        if sync_result['skipped_reason']:
+            return _to_sync_response(sync_result, f"未执行聚合统计同步: {sync_result['skipped_reason']}")
+        return _to_sync_response(sync_result, "聚合统计同步成功")
+
+    # 同步完成后自动更新统计数据
+    # 单用户应用：始终使用请求中的user_id（固定为1）进行统计更新
+    # 而不是sync_result中的user_id（可能是数据库自动分配的2等其他值）
+    user_id = request.user_id
+    job.record('stage', {'stage': 'statistics'})
+
+    try:
+        logger.info(f"开始更新用户 {user_id} 的统计数据...")
+
+        # 更新用户统计
+        await update_user_statistics(user_id)
+        logger.info(f"用户统计数据更新完成")
+
+        # 更新每日统计
+        await update_daily_stats(user_id)
+        logger.info(f"每日统计数据更新完成")
+
+    except Exception as stats_error:
+        # 统计更新失败不影响同步结果
+        logger.error(f"统计数据更新失败: {stats_error}", exc_info=True)
+
+    if not two_phase:
+        return _to_sync_response(sync_result, "数据同步成功")
+
+    # 两阶段同步：提交已可用于仪表盘，增删行数和语言在后台补全
+    enrich_job, _ = sync_job_manager.submit(
+        ('enrich', request.username.lower()),
+        {'user_id': request.user_id, 'username': request.username, 'sync_mode': 'enrich'},
+        lambda enrich_job: _run_enrich_job(enrich_job, request, sync_result['user_id'])
+    )
+    return _to_sync_response(sync_result, "数据同步成功，提交详情在后台补全", enrich_job_id=enrich_job.id)
+
+
+async def _run_enrich_job(job: SyncJob, request: SyncRequest, sync_user_id: int) -> Dict[str, Any]:
+    """
+    执行一次提交详情补全任务：补全两阶段同步写入的提交后重建每日统计
+
+    Args:
+        job: 补全任务（作为进度回调）
+        request: 触发补全的同步请求
+        sync_user_id: 提交所属的用户ID（同步结果中的user_id）
+
+    Returns:
+        补全结果（CommitEnricher.enrich_user的返回值）
+    """
+    github_client = github_client_registry.get_client(request.github_token)
+
+    async with AsyncSessionLocal() as db:
+        user = await db.get(User, sync_user_id)
+        if user is None:
+            raise ValueError(f"用户不存在: {sync_user_id}")
+        sync_service = DataSyncService(db, github_client, sync_strategy='rest', progress_callback=job.record)
+        result = await CommitEnricher(sync_service).enrich_user(user)
+
+    if result['enriched']:
+        job.record('stage', {'stage': 'statistics'})
+        try:
+            # 每日统计的增删行数来自commit_details，补全后重建
+            await update_daily_stats(request.user_id)
+        except Exception as stats_error:
+            logger.error(f"每日统计更新失败: {stats_error}", exc_info=True)
+
+    return result
+
+
+def _to_sync_response(
+    sync_result: Dict[str, Any],
+    message: str,
+    enrich_job_id: str | None = None
+) -> Dict[str, Any]:
+    """
+    将同步结果转换为SyncResponse字段
+
+    Args:
+        sync_result: sync_user_data或sync_user_stats的返回值
+        message: 响应消息
+        enrich_job_id: 两阶段同步时补全提交详情的任务ID
+
+    Returns:
+        SyncResponse字段
+    """
+    return SyncResponse(
+        success=True,
+        message=message,
+        username=sync_result['username'],
+        user_id=sync_result['user_id'],
+        repos_synced=sync_result['total_repos_synced'],
+        commits_synced=sync_result['total_commits_synced'],
+        total_additions=sync_result.get('total_additions', 0),
+        total_deletions=sync_result.get('total_deletions', 0),
+        sync_mode=sync_result.get('sync_mode', 'unknown'),
+        since=sync_result.get('since'),
+        failed_repos=sync_result.get('failed_repos', []),
+        sync_run_id=sync_result.get('sync_run_id'),
+        resumed=sync_result.get('resumed', False),
+        enrich_job_id=enrich_job_id
+    ).model_dump()
+
+
+def _get_job(job_id: str) -> SyncJob:
+    """获取同步任务，不存在时返回404"""
+    job = sync_job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"同步任务不存在或已过期: {job_id}")
+    return job
 
 
 @router.post(
     "/github",
-    response_model=SyncResponse,
+    response_model=SyncJobCreatedResponse,
+    status_code=202,
     summary="一键同步GitHub数据",
-    description="触发完整的GitHub数据同步流程，包括用户信息、仓库列表和提交历史"
+    description="提交后台同步任务（用户信息、仓库列表和提交历史，完成后更新统计数据），立即返回任务ID"
 )
-async def sync_github_data(
-    request: SyncRequest,
-    db: AsyncSession = Depends(get_db)
-) -> SyncResponse:
+async def sync_github_data(request: SyncRequest) -> SyncJobCreatedResponse:
     """
-    一键同步GitHub数据
+    一键同步GitHub数据（后台任务）
     
     **功能:**
     - 同步用户基本信息
@@ -78,88 +317,146 @@ async def sync_github_data(
     **参数:**
     - user_id: 用户ID
     - username: GitHub用户名
+    - sync_mode: aggregate时每个仓库只请求一次统计接口，填充每周汇总和用户累计值，不获取提交详情
     
     **返回:**
-    - 同步结果统计信息
+    - 任务ID以及查询状态、订阅进度的地址（HTTP 202）
     
     **注意:**
-    - 同步过程可能需要较长时间（取决于仓库数量）
+    - 同步在后台执行，可能需要较长时间（取决于仓库数量）
+    - 同一用户已有未结束的同步任务时返回该任务，不重复同步
     - 受GitHub API速率限制约束
     """
+    if request.sync_strategy and request.sync_strategy not in SYNC_STRATEGIES:
+        raise HTTPException(status_code=400, detail=f"不支持的同步策略: {request.sync_strategy}")
+
+    params = {
+        'user_id': request.user_id,
+        'username': request.username,
+        'sync_mode': request.sync_mode or 'auto',
+        'sync_strategy': request.sync_strategy or settings.SYNC_STRATEGY
+    }
+    job, created = sync_job_manager.submit(
+        request.username.lower(),
+        params,
+        lambda job: _run_sync_job(job, request)
+    )
+    if not created:
+        logger.info(f"用户 {request.username} 已有未结束的同步任务: {job.id}")
+
+    return SyncJobCreatedResponse(
+        job_id=job.id,
+        status=job.status,
+        created=created,
+        status_url=f"{settings.API_V1_STR}/sync/jobs/{job.id}",
+        events_url=f"{settings.API_V1_STR}/sync/jobs/{job.id}/events"
+    )
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=SyncJobStatusResponse,
+    summary="查询同步任务状态",
+    description="返回同步任务的状态、仓库和提交计数、吞吐量、失败的仓库以及最终结果"
+)
+async def get_sync_job(job_id: str) -> SyncJobStatusResponse:
+    """
+    查询同步任务状态
+
+    **参数:**
+    - job_id: 提交同步时返回的任务ID
+
+    **返回:**
+    - 任务状态和进度；任务成功后result中包含同步结果
+    """
+    return SyncJobStatusResponse(**_get_job(job_id).to_dict())
+
+
+@router.get(
+    "/jobs/{job_id}/events",
+    summary="订阅同步任务进度",
+    description="以服务器推送事件（text/event-stream）推送同步任务进度，任务结束时发送done事件"
+)
+async def stream_sync_job_events(job_id: str) -> StreamingResponse:
+    """
+    订阅同步任务进度（SSE）
+
+    **事件:**
+    - progress: 任务状态变化（数据与查询任务状态的响应相同）
+    - done: 任务结束（成功、失败或取消），之后连接关闭
+    """
+    job = _get_job(job_id)
+    return StreamingResponse(
+        job.events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get(
+    "/users/{user_id}/email-aliases",
+    response_model=List[EmailAliasResponse],
+    summary="获取提交邮箱别名",
+    description="同步时只获取GitHub登录名和这些邮箱作为作者的提交"
+)
+async def list_email_aliases(
+    user_id: int,
+    db: AsyncSession = Depends(get_db)
+) -> List[EmailAliasResponse]:
+    """
+    获取用户的提交邮箱别名
+
+    **参数:**
+    - user_id: 用户ID
+    """
+    aliases = await UserEmailAliasService(db).list_aliases(user_id)
+    return [EmailAliasResponse(**alias.to_dict()) for alias in aliases]
+
+
+@router.post(
+    "/users/{user_id}/email-aliases",
+    response_model=EmailAliasResponse,
+    summary="添加提交邮箱别名",
+    description="添加未关联到GitHub账号的提交作者邮箱，下次同步时这些提交也会被获取"
+)
+async def add_email_alias(
+    user_id: int,
+    request: EmailAliasRequest,
+    db: AsyncSession = Depends(get_db)
+) -> EmailAliasResponse:
+    """
+    添加提交邮箱别名
+
+    **参数:**
+    - user_id: 用户ID
+    - email: 提交作者邮箱
+
+    **注意:**
+    - 已同步的仓库只从同步水位之后获取，别名之前的历史提交需要一次全量同步
+    """
     try:
-        logger.info(f"开始同步GitHub数据: user_id={request.user_id}, username={request.username}")
-        
-        # 使用请求中的token或配置文件中的默认token
-        token = request.github_token or settings.GITHUB_TOKEN
-        if request.github_token:
-            logger.info("使用用户提供的GitHub Token")
-        else:
-            logger.info("使用系统配置的GitHub Token")
-        
-        # 创建GitHub客户端
-        github_client = GitHubClient(token)
-        
-        # 创建数据同步服务
-        sync_service = DataSyncService(db, github_client)
-        
-        # 确定同步模式
-        sync_mode = request.sync_mode or "auto"
-        
-        if sync_mode == "full":
-            incremental = False
-            logger.info("用户指定全量同步模式")
-        elif sync_mode == "incremental":
-            incremental = True
-            logger.info("用户指定增量同步模式")
-        else:  # auto
-            incremental = True  # 默认自动增量
-            logger.info("自动同步模式（默认增量）")
-        
-        # 执行数据同步
-        sync_result = await sync_service.sync_user_data(
-            username=request.username,
-            max_commits_per_repo=100,  # 每个仓库最多同步100个提交
-            incremental=incremental
-        )
-        
-        logger.info(f"GitHub数据同步完成: {sync_result}")
-        
-        # 同步完成后自动更新统计数据
-        # 单用户应用：始终使用请求中的user_id（固定为1）进行统计更新
-        # 而不是sync_result中的user_id（可能是数据库自动分配的2等其他值）
-        user_id = request.user_id
-        
-        try:
-            logger.info(f"开始更新用户 {user_id} 的统计数据...")
-            
-            # 更新用户统计
-            await update_user_statistics(user_id)
-            logger.info(f"用户统计数据更新完成")
-            
-            # 更新每日统计
-            await update_daily_stats(user_id)
-            logger.info(f"每日统计数据更新完成")
-            
-        except Exception as stats_error:
-            # 统计更新失败不影响同步结果
-            logger.error(f"统计数据更新失败: {stats_error}", exc_info=True)
-        
-        return SyncResponse(
-            success=True,
-            message="数据同步成功",
-            username=sync_result['username'],
-            user_id=sync_result['user_id'],
-            repos_synced=sync_result['total_repos_synced'],
-            commits_synced=sync_result['total_commits_synced'],
-            total_additions=sync_result.get('total_additions', 0),
-            total_deletions=sync_result.get('total_deletions', 0),
-            sync_mode=sync_result.get('sync_mode', 'unknown'),
-            since=sync_result.get('since')
-        )
-        
-    except Exception as e:
-        logger.error(f"同步GitHub数据失败: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=500,
-            detail=f"同步失败: {str(e)}"
-        )
\ No newline at end of file
+        alias = await UserEmailAliasService(db).add_alias(user_id, request.email)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return EmailAliasResponse(**alias.to_dict())
+
+
+@router.delete(
+    "/users/{user_id}/email-aliases/{alias_id}",
+    summary="删除提交邮箱别名"
+)
+async def remove_email_alias(
+    user_id: int,
+    alias_id: int,
+    db: AsyncSession = Depends(get_db)
+) -> Dict[str, str]:
+    """
+    删除提交邮箱别名（已同步的提交保留）
+
+    **参数:**
+    - user_id: 用户ID
+    - alias_id: 别名ID
+    """
+    if not await UserEmailAliasService(db).remove_alias(user_id, alias_id):
+        raise HTTPException(status_code=404, detail=f"邮箱别名不存在: {alias_id}")
+    return {"message": "邮箱别名已删除"}
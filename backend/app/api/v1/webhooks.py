@@ -0,0 +1,144 @@
+"""
+GitHub Webhook API路由
+接收推送事件，只同步本次推送的提交，取代按小时或按天的轮询同步
+"""
+from fastapi import APIRouter, HTTPException, Header, Request
+from pydantic import BaseModel, Field
+import hashlib
+import hmac
+import json
+import logging
+from typing import Any, Dict
+
+from app.core.database import AsyncSessionLocal
+from app.core.config import settings
+from app.services.client_registry import github_client_registry
+from app.services.data_sync_service import DataSyncService
+from app.services.push_event_service import PushEvent, PushEventService
+from app.services.sync_job_manager import SyncJob, sync_job_manager
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+class WebhookResponse(BaseModel):
+    """Webhook响应模型"""
+    accepted: bool = Field(..., description="是否接受处理（其他事件和非默认分支的推送被忽略）")
+    event: str = Field(..., description="事件类型（X-GitHub-Event）")
+    message: str = Field(..., description="响应消息")
+    job_id: str | None = Field(None, description="处理推送的后台任务ID")
+    status_url: str | None = Field(None, description="查询任务状态的地址")
+
+
+def verify_signature(secret: str, body: bytes, signature: str | None) -> bool:
+    """
+    校验Webhook请求签名
+
+    Args:
+        secret: Webhook密钥
+        body: 原始请求体
+        signature: X-Hub-Signature-256请求头（sha256=十六进制HMAC）
+
+    Returns:
+        签名有效时返回True
+    """
+    if not signature or not signature.startswith("sha256="):
+        return False
+    expected = "sha256=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+async def _run_push_job(job: SyncJob, event: PushEvent) -> Dict[str, Any]:
+    """
+    处理一次推送事件（后台任务，使用自己的数据库会话）
+
+    Args:
+        job: 后台任务（作为进度回调）
+        event: 推送事件
+
+    Returns:
+        处理结果
+    """
+    job.record('stage', {'stage': 'commits'})
+    github_client = github_client_registry.get_client()
+    async with AsyncSessionLocal() as db:
+        sync_service = DataSyncService(
+            db, github_client, sync_strategy='rest', use_pipeline=False, progress_callback=job.record
+        )
+        return await PushEventService(sync_service).ingest(event)
+
+
+@router.post(
+    "/github",
+    response_model=WebhookResponse,
+    status_code=202,
+    summary="接收GitHub Webhook",
+    description="校验签名后接受push事件，在后台只获取本次推送的提交详情并写入数据库"
+)
+async def receive_github_webhook(
+    request: Request,
+    x_github_event: str | None = Header(None, description="事件类型"),
+    x_hub_signature_256: str | None = Header(None, description="请求体的HMAC-SHA256签名"),
+    x_github_delivery: str | None = Header(None, description="投递ID")
+) -> WebhookResponse:
+    """
+    接收GitHub Webhook
+
+    **支持的事件:**
+    - push: 推送到默认分支时获取推送中的提交详情（后台任务），其他分支忽略
+    - ping: 添加Webhook时的测试事件
+
+    **返回:**
+    - HTTP 202；接受的推送事件返回任务ID，可通过 /sync/jobs/{job_id} 查询处理结果
+
+    **注意:**
+    - 需要配置GITHUB_WEBHOOK_SECRET（与Webhook设置中的Secret一致），签名无效时返回401
+    - 同一推送重复投递时返回同一任务，已写入的提交不会重复获取
+    """
+    if not settings.GITHUB_WEBHOOK_SECRET:
+        raise HTTPException(status_code=503, detail="未配置GITHUB_WEBHOOK_SECRET")
+
+    body = await request.body()
+    if not verify_signature(settings.GITHUB_WEBHOOK_SECRET, body, x_hub_signature_256):
+        logger.warning(f"Webhook签名无效: delivery={x_github_delivery}")
+        raise HTTPException(status_code=401, detail="签名无效")
+
+    event_name = x_github_event or "unknown"
+    if event_name == "ping":
+        return WebhookResponse(accepted=True, event=event_name, message="pong")
+    if event_name != "push":
+        return WebhookResponse(accepted=False, event=event_name, message=f"忽略事件: {event_name}")
+
+    try:
+        event = PushEvent(json.loads(body))
+    except (ValueError, AttributeError) as e:
+        raise HTTPException(status_code=400, detail=f"无效的推送事件: {e}")
+
+    if event.deleted or not event.is_default_branch:
+        return WebhookResponse(
+            accepted=False, event=event_name, message=f"忽略非默认分支的推送: {event.ref}"
+        )
+
+    params = {
+        'event': 'push',
+        'delivery': x_github_delivery,
+        'repo_name': event.repo_name,
+        'ref': event.ref,
+        'after': event.after,
+        'commits': len(event.commits)
+    }
+    job, created = sync_job_manager.submit(
+        ('push', event.github_repo_id, event.after),
+        params,
+        lambda job: _run_push_job(job, event)
+    )
+    logger.info(f"收到推送事件 {event.repo_name}@{event.after[:7]}（{len(event.commits)} 个提交）: 任务 {job.id}")
+
+    return WebhookResponse(
+        accepted=True,
+        event=event_name,
+        message="推送事件已接受" if created else "推送事件正在处理",
+        job_id=job.id,
+        status_url=f"{settings.API_V1_STR}/sync/jobs/{job.id}"
+    )
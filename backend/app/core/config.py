@@ -41,6 +41,217 @@ class Settings(BaseSettings):
         default="",
         description="GitHub Personal Access Token"
     )
+    GITHUB_TOKENS: str = Field(
+        default="",
+        description="额外的GitHub Token（逗号分隔），与GITHUB_TOKEN组成Token池，按剩余配额分配请求"
+    )
+    GITHUB_WEBHOOK_SECRET: str = Field(
+        default="",
+        description="GitHub Webhook密钥（校验X-Hub-Signature-256），为空时拒绝所有Webhook请求"
+    )
+    
+    # 条件请求缓存配置（ETag / If-None-Match）
+    GITHUB_CACHE_BACKEND: str = Field(
+        default="memory",
+        description="响应缓存后端: memory(内存LRU) / sqlite(持久化) / none(禁用)"
+    )
+    GITHUB_CACHE_PATH: str = Field(
+        default=".cache/github_responses.sqlite3",
+        description="sqlite缓存后端的数据库文件路径"
+    )
+    GITHUB_CACHE_MAX_ENTRIES: int = Field(
+        default=2048,
+        ge=1,
+        description="响应缓存最大条目数"
+    )
+    
+    # 提交详情本地存储（按SHA缓存不可变的提交详情）
+    COMMIT_STORE_ENABLED: bool = Field(
+        default=True,
+        description="是否启用提交详情本地存储"
+    )
+    COMMIT_STORE_PATH: str = Field(
+        default=".cache/commit_store",
+        description="提交详情存储根目录"
+    )
+    
+    # GitHub共享连接池配置
+    GITHUB_HTTP2: bool = Field(
+        default=True,
+        description="是否启用HTTP/2（需安装h2，未安装时自动使用HTTP/1.1）"
+    )
+    GITHUB_MAX_CONNECTIONS: int = Field(
+        default=20,
+        ge=1,
+        description="共享连接池最大连接数"
+    )
+    GITHUB_MAX_KEEPALIVE_CONNECTIONS: int = Field(
+        default=10,
+        ge=0,
+        description="共享连接池最大keep-alive空闲连接数"
+    )
+    GITHUB_KEEPALIVE_EXPIRY: float = Field(
+        default=30.0,
+        ge=0,
+        description="keep-alive空闲连接保留时间（秒）"
+    )
+    
+    # 数据同步配置
+    GITHUB_PAGE_CONCURRENCY: int = Field(
+        default=4,
+        ge=1,
+        description="分页列表并发请求的最大页数"
+    )
+    GITHUB_MAX_CONCURRENT_REQUESTS: int = Field(
+        default=16,
+        ge=1,
+        description="同时进行中的GitHub请求上限（所有客户端和同时同步的仓库共用）"
+    )
+    SYNC_REPO_CONCURRENCY: int = Field(
+        default=4,
+        ge=1,
+        description="同时同步的仓库数（每个仓库使用独立的数据库会话）"
+    )
+    SYNC_RESUME_MAX_AGE_HOURS: int = Field(
+        default=72,
+        ge=0,
+        description="中断的同步运行在开始后多少小时内可以从检查点继续（0表示总是重新开始）"
+    )
+    SYNC_RUN_RETENTION_DAYS: int = Field(
+        default=30,
+        ge=0,
+        description="已结束的同步运行及其检查点保留的天数（0表示永久保留）"
+    )
+    SYNC_DETAIL_CONCURRENCY: int = Field(
+        default=8,
+        ge=1,
+        description="并发获取提交详情的最大请求数"
+    )
+    SYNC_STRATEGY: str = Field(
+        default="rest",
+        description="提交同步策略: rest(逐个获取提交详情) / graphql(批量获取提交历史) / git(从本地Git镜像读取)"
+    )
+    GIT_MIRROR_PATH: str = Field(
+        default=".cache/git_mirrors",
+        description="git同步策略的本地裸仓库镜像目录"
+    )
+    GIT_MIRROR_URL_TEMPLATE: str = Field(
+        default="https://github.com/{owner}/{repo}.git",
+        description="克隆镜像的地址模板（{owner}、{repo}占位）"
+    )
+    GIT_MIRROR_TIMEOUT: int = Field(
+        default=600,
+        description="单次克隆或拉取镜像的超时时间（秒）"
+    )
+    SYNC_AUTHOR_FILTER: bool = Field(
+        default=True,
+        description="是否只同步用户自己的提交（按GitHub登录名和用户的邮箱别名过滤提交列表）"
+    )
+    SYNC_EVENTS_PRECHECK: bool = Field(
+        default=True,
+        description="增量同步前先检查用户事件流（条件请求）：没有新推送时直接结束，有推送时只同步这些仓库"
+                    "（事件流只包含用户自己的推送，仅在SYNC_AUTHOR_FILTER启用时生效）"
+    )
+    SYNC_STATS_POLL_INTERVAL: float = Field(
+        default=2.0,
+        ge=0,
+        description="仅聚合统计同步时，GitHub仍在计算仓库统计（202）后重新请求的间隔（秒）"
+    )
+    SYNC_STATS_POLL_TIMEOUT: float = Field(
+        default=60.0,
+        ge=0,
+        description="等待GitHub计算仓库统计的最长时间（秒），超时的仓库留到下次同步"
+    )
+    SYNC_TWO_PHASE: bool = Field(
+        default=False,
+        description="两阶段同步（仅rest策略）：先从提交列表写入提交，增删行数、文件数和语言由后台补全任务获取"
+    )
+    SYNC_ENRICH_BATCH_SIZE: int = Field(
+        default=100,
+        ge=1,
+        description="后台补全任务每批获取详情并写入的提交数"
+    )
+    SYNC_ENRICH_MIN_REMAINING: int = Field(
+        default=1000,
+        ge=0,
+        description="后台补全任务为交互式同步保留的REST配额：剩余配额不超过该值时暂停，留到下次同步继续"
+    )
+    SYNC_ENRICH_MAX_COMMITS: int = Field(
+        default=2000,
+        ge=1,
+        description="一次后台补全任务最多补全的提交数（其余留到下次同步，避免长时间占用任务并发数）"
+    )
+    SYNC_BACKFILL_CONCURRENCY: int = Field(
+        default=4,
+        ge=1,
+        description="历史回填同时获取的时间窗口数"
+    )
+    SYNC_BACKFILL_WINDOW_COMMITS: int = Field(
+        default=1000,
+        ge=100,
+        description="历史回填每个时间窗口的目标提交数：按已列出提交的时间密度切分窗口"
+    )
+    SYNC_BACKFILL_MIN_WINDOW_HOURS: float = Field(
+        default=1.0,
+        gt=0,
+        description="历史回填时间窗口的最小长度（小时），提交更密集时不再继续切分"
+    )
+    SYNC_BACKFILL_RATE_SHARE: float = Field(
+        default=0.5,
+        gt=0,
+        le=1,
+        description="历史回填可以使用的每小时配额比例：剩余配额低于其余部分时等待配额重置，留给交互式同步"
+    )
+    SYNC_GRAPHQL_DETECT_LANGUAGES: bool = Field(
+        default=False,
+        description="graphql策略下是否额外调用REST接口获取文件列表以识别语言"
+    )
+    SYNC_PIPELINE_ENABLED: bool = Field(
+        default=True,
+        description="是否使用流水线同步（列表、详情获取、解析、写入各阶段通过有界队列并行）"
+    )
+    SYNC_PIPELINE_PARSE_CONCURRENCY: int = Field(
+        default=1,
+        ge=1,
+        description="流水线中解析提交详情的worker数"
+    )
+    SYNC_PIPELINE_BATCH_SIZE: int = Field(
+        default=100,
+        ge=1,
+        description="流水线写入阶段每批写入的最大提交数"
+    )
+    SYNC_PIPELINE_FLUSH_INTERVAL: float = Field(
+        default=0.2,
+        ge=0,
+        description="流水线写入阶段取到第一个提交后最多等待多少秒再写入（攒批）"
+    )
+    SYNC_PIPELINE_QUEUE_SIZE: int = Field(
+        default=200,
+        ge=1,
+        description="流水线各阶段之间队列的容量（队列满时上游等待，形成背压）"
+    )
+    
+    # 后台同步任务配置
+    SYNC_JOB_MAX_CONCURRENT: int = Field(
+        default=2,
+        ge=1,
+        description="同时运行的后台同步任务数（超出的任务排队）"
+    )
+    SYNC_JOB_RETENTION_SECONDS: int = Field(
+        default=3600,
+        ge=0,
+        description="结束的同步任务保留多少秒供查询"
+    )
+    SYNC_JOB_EVENT_INTERVAL: float = Field(
+        default=0.5,
+        ge=0,
+        description="同步任务进度事件（SSE）两次推送的最小间隔（秒）"
+    )
+    SYNC_JOB_EVENT_HEARTBEAT: float = Field(
+        default=15.0,
+        gt=0,
+        description="同步任务进度事件（SSE）空闲时发送心跳的间隔（秒）"
+    )
     
     # JWT密钥
     SECRET_KEY: str = Field(
@@ -4,7 +4,9 @@
 """
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.pool import NullPool
-from typing import AsyncGenerator
+from sqlalchemy import insert, func
+from sqlalchemy.dialects import mysql, sqlite, postgresql
+from typing import AsyncGenerator, Dict, Any, List, Optional
 import logging
 
 from .config import settings
@@ -76,6 +78,92 @@ async def close_db():
     logger.info("数据库连接已关闭")
 
 
+def insert_ignore(model, session: AsyncSession):
+    """
+    构造忽略唯一键冲突的批量INSERT语句
+    
+    MySQL使用INSERT IGNORE，SQLite和PostgreSQL使用ON CONFLICT DO NOTHING，
+    其他数据库退化为普通INSERT。
+    
+    Args:
+        model: ORM模型类
+        session: 数据库会话（用于判断数据库方言）
+        
+    Returns:
+        INSERT语句，调用 .values(rows) 后执行
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == 'mysql':
+        return mysql.insert(model).prefix_with('IGNORE')
+    if dialect == 'sqlite':
+        return sqlite.insert(model).on_conflict_do_nothing()
+    if dialect == 'postgresql':
+        return postgresql.insert(model).on_conflict_do_nothing()
+    return insert(model)
+
+
+def upsert(
+    model,
+    session: AsyncSession,
+    rows: List[Dict[str, Any]],
+    key_columns: List[str],
+    update_columns: Optional[List[str]] = None,
+    extra_updates: Optional[Dict[str, Any]] = None,
+    merge_columns: Optional[Dict[str, str]] = None
+):
+    """
+    构造批量新增或更新（upsert）语句
+    
+    MySQL使用INSERT ... ON DUPLICATE KEY UPDATE（依赖key_columns上的唯一键），
+    SQLite和PostgreSQL使用ON CONFLICT (key_columns) DO UPDATE。
+    
+    Args:
+        model: ORM模型类
+        session: 数据库会话（用于判断数据库方言）
+        rows: 待写入的行
+        key_columns: 唯一键列
+        update_columns: 冲突时用新行的值覆盖的列
+        extra_updates: 冲突时额外更新的列和SQL表达式（如 updated_at=func.current_timestamp()）
+        merge_columns: 冲突时与现有值合并的列：add(累加) / min(取较小值) / max(取较大值)，
+            现有值为NULL时取新值
+        
+    Returns:
+        可执行的INSERT语句
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == 'mysql':
+        stmt = mysql.insert(model).values(rows)
+        new = stmt.inserted
+    elif dialect in ('sqlite', 'postgresql'):
+        module = sqlite if dialect == 'sqlite' else postgresql
+        stmt = module.insert(model).values(rows)
+        new = stmt.excluded
+    else:
+        raise NotImplementedError(f"不支持的数据库方言: {dialect}")
+    
+    values = {column: new[column] for column in update_columns or []}
+    values.update(extra_updates or {})
+    
+    # SQLite的多参数min/max等价于LEAST/GREATEST
+    least = func.min if dialect == 'sqlite' else func.least
+    greatest = func.max if dialect == 'sqlite' else func.greatest
+    table = model.__table__
+    for column, how in (merge_columns or {}).items():
+        current, incoming = table.c[column], new[column]
+        if how == 'add':
+            values[column] = func.coalesce(current, 0) + incoming
+        elif how == 'min':
+            values[column] = func.coalesce(least(current, incoming), incoming)
+        elif how == 'max':
+            values[column] = func.coalesce(greatest(current, incoming), incoming)
+        else:
+            raise ValueError(f"不支持的合并方式: {how}")
+    
+    if dialect == 'mysql':
+        return stmt.on_duplicate_key_update(values)
+    return stmt.on_conflict_do_update(index_elements=key_columns, set_=values)
+
+
 # 数据库健康检查
 async def check_db_health() -> bool:
     """
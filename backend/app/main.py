@@ -10,6 +10,8 @@ from app.api.v1 import api_router
 from app.core.config import settings
 from app.core.database import init_db, close_db, check_db_health
 from app.services.scheduler_service import scheduler_service
+from app.services.client_registry import github_client_registry
+from app.services.sync_job_manager import sync_job_manager
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -18,6 +20,9 @@ async def lifespan(app: FastAPI):
     print("正在初始化数据库连接...")
     # await init_db()  # 注释掉自动创建表，使用SQL脚本初始化
     
+    print("正在创建GitHub连接池...")
+    github_client_registry.start()
+    
     print("正在启动定时任务调度器...")
     scheduler_service.start()
     
@@ -29,6 +34,12 @@ async def lifespan(app: FastAPI):
     print("正在关闭定时任务调度器...")
     scheduler_service.shutdown()
     
+    print("正在取消未完成的同步任务...")
+    await sync_job_manager.shutdown()
+    
+    print("正在关闭GitHub连接池...")
+    await github_client_registry.close()
+    
     print("正在关闭数据库连接...")
     await close_db()
     
@@ -81,10 +92,12 @@ async def health_check():
         "services": {
             "database": db_status,
             "scheduler": scheduler_status,
-            "cache": "not_configured"  # Redis待集成
+            "cache": "not_configured",  # Redis待集成
+            "github_client": "ok" if github_client_registry.started else "stopped"
         },
         "scheduler": {
             "running": scheduler_service.scheduler.running,
             "job_count": len(scheduler_service.scheduler.get_jobs())
-        }
+        },
+        "github_client": github_client_registry.stats()
     }
\ No newline at end of file
@@ -10,6 +10,8 @@ from .commit_detail import CommitDetail
 from .language_stat import LanguageStat
 from .milestone import MilestoneAchievement
 from .coding_goal import CodingGoal
+from .sync_run import SyncRun, SyncRunRepo
+from .user_email_alias import UserEmailAlias
 
 # 导出所有模型
 __all__ = [
@@ -21,4 +23,7 @@ __all__ = [
     'LanguageStat',
     'MilestoneAchievement',
     'CodingGoal',
+    'SyncRun',
+    'SyncRunRepo',
+    'UserEmailAlias',
 ]
\ No newline at end of file
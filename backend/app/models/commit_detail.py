@@ -1,7 +1,7 @@
 """
 提交详情数据模型 - SQLAlchemy ORM
 """
-from sqlalchemy import Column, BigInteger, String, Integer, TIMESTAMP, TEXT, ForeignKey, func, SMALLINT
+from sqlalchemy import Column, BigInteger, String, Integer, Boolean, TIMESTAMP, TEXT, ForeignKey, Index, func, SMALLINT, true
 from sqlalchemy.orm import relationship
 
 from .base import Base
@@ -11,6 +11,10 @@ class CommitDetail(Base):
     """提交详细信息表"""
     
     __tablename__ = 'commit_details'
+    __table_args__ = (
+        # 后台补全任务按用户查找尚未补全的提交
+        Index('ix_commit_details_user_enriched', 'user_id', 'enriched'),
+    )
     
     # 主键
     id = Column(BigInteger, primary_key=True, autoincrement=True, comment='提交ID')
@@ -32,6 +36,9 @@ class CommitDetail(Base):
     # 语言信息
     primary_language = Column(String(50), comment='主要语言')
     
+    # 两阶段同步：只从提交列表写入的提交为False，增删行数、文件数和语言由后台补全
+    enriched = Column(Boolean, nullable=False, default=True, server_default=true(), comment='是否已获取提交详情')
+    
     # 时间分析字段
     commit_hour = Column(SMALLINT, index=True, comment='提交小时（0-23）')
     commit_weekday = Column(SMALLINT, comment='提交星期（0-6，0=周日）')
@@ -59,6 +66,7 @@ class CommitDetail(Base):
             'deletions': self.deletions,
             'files_changed': self.files_changed,
             'primary_language': self.primary_language,
+            'enriched': self.enriched,
             'commit_hour': self.commit_hour,
             'commit_weekday': self.commit_weekday,
             'created_at': self.created_at.isoformat() if self.created_at else None
@@ -1,7 +1,7 @@
 """
 编程语言统计模型 - SQLAlchemy ORM
 """
-from sqlalchemy import Column, BigInteger, String, Integer, Enum, TIMESTAMP, ForeignKey, func
+from sqlalchemy import Column, BigInteger, String, Integer, Enum, TIMESTAMP, ForeignKey, UniqueConstraint, func
 from sqlalchemy.orm import relationship
 
 from .base import Base
@@ -11,6 +11,10 @@ class LanguageStat(Base):
     """编程语言统计表"""
     
     __tablename__ = 'language_stats'
+    __table_args__ = (
+        # 每个用户每种语言一行，写入提交时按该键累加计数
+        UniqueConstraint('user_id', 'language', name='uq_language_stats_user_language'),
+    )
     
     # 主键
     id = Column(BigInteger, primary_key=True, autoincrement=True, comment='统计ID')
@@ -1,7 +1,7 @@
 """
 仓库数据模型 - SQLAlchemy ORM
 """
-from sqlalchemy import Column, BigInteger, String, Integer, Boolean, TEXT, TIMESTAMP, ForeignKey, JSON, func
+from sqlalchemy import Column, BigInteger, String, Integer, Boolean, TEXT, TIMESTAMP, ForeignKey, JSON, UniqueConstraint, func
 from sqlalchemy.orm import relationship
 
 from .base import Base
@@ -11,6 +11,10 @@ class Repository(Base):
     """仓库信息表"""
     
     __tablename__ = 'repositories'
+    __table_args__ = (
+        # 同一用户下GitHub仓库唯一，同步时按该键批量upsert
+        UniqueConstraint('user_id', 'github_repo_id', name='uq_repositories_user_repo'),
+    )
     
     # 主键
     id = Column(BigInteger, primary_key=True, autoincrement=True, comment='仓库ID')
@@ -19,7 +23,7 @@ class Repository(Base):
     user_id = Column(BigInteger, ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True, comment='用户ID')
     
     # GitHub信息
-    github_repo_id = Column(BigInteger, nullable=False, comment='GitHub仓库ID')
+    github_repo_id = Column(BigInteger, nullable=False, index=True, comment='GitHub仓库ID')
     repo_name = Column(String(255), nullable=False, index=True, comment='仓库名称（owner/repo）')
     description = Column(TEXT, comment='仓库描述')
     language = Column(String(50), comment='主要编程语言')
@@ -32,6 +36,16 @@ class Repository(Base):
     is_private = Column(Boolean, default=False, comment='是否私有仓库')
     category_tags = Column(JSON, comment='分类标签数组')
     
+    # GitHub时间戳（pushed_at未变化说明没有新的推送）
+    pushed_at = Column(TIMESTAMP, nullable=True, comment='GitHub最后推送时间')
+    github_updated_at = Column(TIMESTAMP, nullable=True, comment='GitHub最后更新时间')
+    
+    # 提交同步水位：仓库的提交同步完成后才推进
+    last_synced_commit_at = Column(TIMESTAMP, nullable=True, comment='已同步的最新提交时间')
+    last_synced_sha = Column(String(40), nullable=True, comment='已同步的最新提交SHA')
+    synced_pushed_at = Column(TIMESTAMP, nullable=True, comment='上次同步完成时的pushed_at')
+    push_head_sha = Column(String(40), nullable=True, comment='最近处理的推送事件之后的默认分支HEAD')
+    
     # 时间戳
     last_commit_at = Column(TIMESTAMP, nullable=True, index=True, comment='最后提交时间')
     created_at = Column(TIMESTAMP, server_default=func.current_timestamp(), comment='创建时间')
@@ -62,6 +76,8 @@ class Repository(Base):
             'forks': self.forks,
             'is_private': self.is_private,
             'category_tags': self.category_tags,
+            'pushed_at': self.pushed_at.isoformat() if self.pushed_at else None,
+            'last_synced_commit_at': self.last_synced_commit_at.isoformat() if self.last_synced_commit_at else None,
             'last_commit_at': self.last_commit_at.isoformat() if self.last_commit_at else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
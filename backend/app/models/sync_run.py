@@ -0,0 +1,123 @@
+"""
+同步运行记录模型 - SQLAlchemy ORM
+记录一次用户数据同步的整体状态和每个仓库的分页进度，中断后可从检查点继续
+"""
+from sqlalchemy import Column, BigInteger, String, Integer, Boolean, Enum, TEXT, TIMESTAMP, ForeignKey, UniqueConstraint, func
+from sqlalchemy.orm import relationship
+
+from .base import Base
+
+
+class SyncRun(Base):
+    """同步运行表"""
+
+    __tablename__ = 'sync_runs'
+
+    # 主键
+    id = Column(BigInteger, primary_key=True, autoincrement=True, comment='同步运行ID')
+
+    # 外键
+    user_id = Column(BigInteger, ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True, comment='用户ID')
+
+    # 同步参数（继续同步时参数必须一致，否则分页游标无效）
+    incremental = Column(Boolean, default=True, comment='是否增量同步')
+    sync_strategy = Column(String(20), nullable=False, comment='提交同步策略（rest/graphql/git）')
+    max_commits_per_repo = Column(Integer, nullable=True, comment='每个仓库最大同步提交数')
+    author_filter = Column(String(40), nullable=True, comment='提交作者过滤条件的指纹（为空表示不过滤）')
+
+    # 状态：running（进行中或进程中断）、failed（部分仓库失败）、completed、abandoned（参数变化后放弃）
+    status = Column(
+        Enum('running', 'completed', 'failed', 'abandoned', name='sync_run_status_enum'),
+        default='running',
+        nullable=False,
+        index=True,
+        comment='运行状态'
+    )
+
+    # 统计数据
+    total_repos = Column(Integer, default=0, comment='需要同步的仓库数')
+    completed_repos = Column(Integer, default=0, comment='已完成的仓库数')
+    failed_repos = Column(Integer, default=0, comment='失败的仓库数')
+    total_commits = Column(Integer, default=0, comment='新增提交数')
+    resume_count = Column(Integer, default=0, comment='从检查点继续的次数')
+
+    # 时间戳
+    started_at = Column(TIMESTAMP, server_default=func.current_timestamp(), comment='开始时间')
+    finished_at = Column(TIMESTAMP, nullable=True, comment='结束时间')
+    updated_at = Column(
+        TIMESTAMP,
+        server_default=func.current_timestamp(),
+        onupdate=func.current_timestamp(),
+        comment='更新时间'
+    )
+
+    # 关系定义
+    repos = relationship('SyncRunRepo', back_populates='run', cascade='all, delete-orphan')
+
+    def __repr__(self):
+        return f"<SyncRun(id={self.id}, user_id={self.user_id}, status='{self.status}')>"
+
+    def to_dict(self):
+        """转换为字典"""
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'incremental': self.incremental,
+            'sync_strategy': self.sync_strategy,
+            'max_commits_per_repo': self.max_commits_per_repo,
+            'author_filter': self.author_filter,
+            'status': self.status,
+            'total_repos': self.total_repos,
+            'completed_repos': self.completed_repos,
+            'failed_repos': self.failed_repos,
+            'total_commits': self.total_commits,
+            'resume_count': self.resume_count,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class SyncRunRepo(Base):
+    """同步运行中单个仓库的检查点表"""
+
+    __tablename__ = 'sync_run_repos'
+    __table_args__ = (
+        # 每次运行中每个仓库一行
+        UniqueConstraint('run_id', 'repo_id', name='uq_sync_run_repos_run_repo'),
+    )
+
+    # 主键
+    id = Column(BigInteger, primary_key=True, autoincrement=True, comment='检查点ID')
+
+    # 外键
+    run_id = Column(BigInteger, ForeignKey('sync_runs.id', ondelete='CASCADE'), nullable=False, index=True, comment='同步运行ID')
+    repo_id = Column(BigInteger, ForeignKey('repositories.id', ondelete='CASCADE'), nullable=False, comment='仓库ID')
+
+    # 状态
+    status = Column(
+        Enum('pending', 'completed', 'failed', name='sync_run_repo_status_enum'),
+        default='pending',
+        nullable=False,
+        comment='仓库同步状态'
+    )
+
+    # 检查点：since在运行开始时确定，继续同步时沿用，保证分页游标仍然有效
+    since = Column(String(32), nullable=True, comment='提交起始时间（ISO 8601）')
+    cursor = Column(String(255), nullable=True, comment='下一页游标（REST为页码，GraphQL为endCursor）')
+    commits_listed = Column(Integer, default=0, comment='游标之前已列出的提交数')
+    commits_synced = Column(Integer, default=0, comment='已写入的新提交数')
+    error = Column(TEXT, nullable=True, comment='失败原因')
+
+    # 时间戳
+    updated_at = Column(
+        TIMESTAMP,
+        server_default=func.current_timestamp(),
+        onupdate=func.current_timestamp(),
+        comment='更新时间'
+    )
+
+    # 关系定义
+    run = relationship('SyncRun', back_populates='repos')
+
+    def __repr__(self):
+        return f"<SyncRunRepo(run_id={self.run_id}, repo_id={self.repo_id}, status='{self.status}', cursor={self.cursor!r})>"
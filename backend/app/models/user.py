@@ -44,6 +44,8 @@ class User(Base):
         comment='更新时间'
     )
     last_sync_at = Column(TIMESTAMP, comment='最后同步时间')
+    last_event_id = Column(String(32), nullable=True, comment='上次同步时事件流中最新的事件ID')
+    aggregate_synced_at = Column(TIMESTAMP, nullable=True, comment='统计数据来自仓库聚合统计的时间（提交详情同步后清除）')
     
     # 关系定义
     repositories = relationship('Repository', back_populates='user', cascade='all, delete-orphan')
@@ -52,6 +54,7 @@ class User(Base):
     language_stats = relationship('LanguageStat', back_populates='user', cascade='all, delete-orphan')
     milestones = relationship('MilestoneAchievement', back_populates='user', cascade='all, delete-orphan')
     goals = relationship('CodingGoal', back_populates='user', cascade='all, delete-orphan')
+    email_aliases = relationship('UserEmailAlias', back_populates='user', cascade='all, delete-orphan')
     
     def __repr__(self):
         return f"<User(id={self.id}, username='{self.username}')>"
@@ -0,0 +1,45 @@
+"""
+用户邮箱别名模型 - SQLAlchemy ORM
+记录用户提交时使用的邮箱（如未添加到GitHub账号的工作邮箱），同步时只获取这些作者的提交
+"""
+from sqlalchemy import Column, BigInteger, String, TIMESTAMP, ForeignKey, UniqueConstraint, func
+from sqlalchemy.orm import relationship
+
+from .base import Base
+
+
+class UserEmailAlias(Base):
+    """用户邮箱别名表"""
+
+    __tablename__ = 'user_email_aliases'
+    __table_args__ = (
+        # 每个用户的同一邮箱只记录一次
+        UniqueConstraint('user_id', 'email', name='uq_user_email_aliases_user_email'),
+    )
+
+    # 主键
+    id = Column(BigInteger, primary_key=True, autoincrement=True, comment='别名ID')
+
+    # 外键
+    user_id = Column(BigInteger, ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True, comment='用户ID')
+
+    # 提交作者邮箱（统一保存为小写）
+    email = Column(String(255), nullable=False, comment='提交作者邮箱')
+
+    # 时间戳
+    created_at = Column(TIMESTAMP, server_default=func.current_timestamp(), comment='创建时间')
+
+    # 关系定义
+    user = relationship('User', back_populates='email_aliases')
+
+    def __repr__(self):
+        return f"<UserEmailAlias(user_id={self.user_id}, email='{self.email}')>"
+
+    def to_dict(self):
+        """转换为字典"""
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'email': self.email,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
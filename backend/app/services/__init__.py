@@ -3,14 +3,51 @@
 包含GitHub API客户端、数据同步等业务逻辑
 """
 from .github_client import GitHubClient, GitHubAPIError, RateLimitError, AuthenticationError
+from .response_cache import ResponseCache, MemoryResponseCache, SQLiteResponseCache
+from .commit_store import CommitStore
+from .token_pool import TokenPool
+from .client_registry import GitHubClientRegistry, github_client_registry
+from .git_mirror import GitMirror, GitMirrorError
 from .commit_parser import CommitParser
+from .commit_author_filter import CommitAuthorFilter
+from .user_stats_service import UserStatsService
+from .user_email_alias_service import UserEmailAliasService
+from .sync_run_service import SyncRunService
+from .sync_pipeline import SyncPipeline
 from .data_sync_service import DataSyncService
+from .push_event_service import PushEvent, PushEventService
+from .repo_stats_sync_service import RepoStatsSyncService
+from .commit_enricher import CommitEnricher
+from .history_backfill import HistoryBackfillService
+from .sync_job_manager import SyncJob, SyncJobManager, sync_job_manager
 
 __all__ = [
     'GitHubClient',
     'GitHubAPIError',
     'RateLimitError',
     'AuthenticationError',
+    'ResponseCache',
+    'MemoryResponseCache',
+    'SQLiteResponseCache',
+    'CommitStore',
+    'TokenPool',
+    'GitHubClientRegistry',
+    'github_client_registry',
+    'GitMirror',
+    'GitMirrorError',
     'CommitParser',
+    'CommitAuthorFilter',
+    'UserStatsService',
+    'UserEmailAliasService',
+    'SyncRunService',
+    'SyncPipeline',
     'DataSyncService',
+    'PushEvent',
+    'PushEventService',
+    'RepoStatsSyncService',
+    'CommitEnricher',
+    'HistoryBackfillService',
+    'SyncJob',
+    'SyncJobManager',
+    'sync_job_manager',
 ]
\ No newline at end of file
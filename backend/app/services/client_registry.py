@@ -0,0 +1,214 @@
+"""
+GitHub客户端注册表
+应用级共享的HTTP连接池：所有GitHubClient复用同一个httpx.AsyncClient，
+保留TLS会话和keep-alive连接；按Token提供轻量的客户端视图。
+"""
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+import httpx
+
+from app.core.config import settings
+from app.services.github_client import GitHubClient
+from app.services.response_cache import create_response_cache
+from app.services.commit_store import create_commit_store
+from app.services.token_pool import TokenPool
+from app.services.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401  HTTP/2为可选依赖
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class GitHubClientRegistry:
+    """
+    共享连接池与按Token缓存的GitHubClient视图
+
+    使用示例:
+        registry = GitHubClientRegistry()
+        registry.start()
+        client = registry.get_client()            # 使用配置中的Token池
+        client = registry.get_client("ghp_xxx")   # 使用指定Token
+        await registry.close()
+    """
+
+    MAX_VIEWS = 64  # 缓存的Token视图上限（用户自带Token的视图按LRU淘汰）
+
+    def __init__(self, base_url: Optional[str] = None):
+        """
+        Args:
+            base_url: API根地址，默认使用配置中的GITHUB_API_URL
+        """
+        self.base_url = base_url or settings.GITHUB_API_URL or GitHubClient.BASE_URL
+        self.http_client: Optional[httpx.AsyncClient] = None
+        self.http2 = False
+        self.cache = None
+        self.commit_store = None
+        self.token_pool: Optional[TokenPool] = None
+        # 所有视图共享请求合并器：定时任务与手动同步重叠时相同请求只发起一次
+        self.single_flight = SingleFlight()
+        # 所有视图共享并发请求上限：多个用户、多个仓库同时同步时总并发受控
+        self.request_limiter = asyncio.Semaphore(settings.GITHUB_MAX_CONCURRENT_REQUESTS)
+        self._views: "OrderedDict[Optional[str], GitHubClient]" = OrderedDict()
+        self.request_stats = {
+            'requests': 0,
+            'responses': 0,
+            'http_versions': {}
+        }
+
+    @property
+    def started(self) -> bool:
+        """连接池是否已创建"""
+        return self.http_client is not None
+
+    def start(self) -> None:
+        """创建共享连接池、响应缓存、提交详情存储和默认Token池"""
+        if self.started:
+            return
+
+        self.http2 = settings.GITHUB_HTTP2 and HTTP2_AVAILABLE
+        if settings.GITHUB_HTTP2 and not HTTP2_AVAILABLE:
+            logger.warning("未安装h2，GitHub请求将使用HTTP/1.1（pip install h2 以启用HTTP/2）")
+
+        self.http_client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=GitHubClient.DEFAULT_HEADERS,
+            timeout=30.0,
+            follow_redirects=True,
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=settings.GITHUB_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.GITHUB_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.GITHUB_KEEPALIVE_EXPIRY
+            ),
+            event_hooks={
+                'request': [self._on_request],
+                'response': [self._on_response]
+            }
+        )
+        self.cache = create_response_cache()
+        self.commit_store = create_commit_store()
+        self.token_pool = TokenPool.from_settings()
+        logger.info(
+            f"GitHub连接池已创建 (HTTP/2: {self.http2}, "
+            f"最大连接数: {settings.GITHUB_MAX_CONNECTIONS})"
+        )
+
+    async def close(self) -> None:
+        """关闭共享连接池和缓存"""
+        if not self.started:
+            return
+
+        self._views.clear()
+        await self.http_client.aclose()
+        self.http_client = None
+
+        if hasattr(self.cache, 'close'):
+            self.cache.close()
+        self.cache = None
+        logger.info("GitHub连接池已关闭")
+
+    def get_client(self, token: Optional[str] = None) -> GitHubClient:
+        """
+        获取共享连接池上的GitHubClient视图
+
+        同一Token返回同一个视图，配额记录在多次请求之间保留；
+        视图的close()不会关闭共享连接池。
+
+        Args:
+            token: GitHub Token，None表示使用配置中的Token池（GITHUB_TOKENS + GITHUB_TOKEN）
+
+        Returns:
+            GitHubClient实例
+        """
+        if not self.started:
+            self.start()
+
+        client = self._views.get(token)
+        if client is not None:
+            self._views.move_to_end(token)
+            return client
+
+        client = GitHubClient(
+            base_url=self.base_url,
+            cache=self.cache,
+            commit_store=self.commit_store,
+            token_pool=self.token_pool if token is None else TokenPool([token]),
+            http_client=self.http_client,
+            single_flight=self.single_flight,
+            request_limiter=self.request_limiter
+        )
+        self._views[token] = client
+        while len(self._views) > self.MAX_VIEWS:
+            self._views.popitem(last=False)
+        return client
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        """请求事件钩子：统计请求数"""
+        self.request_stats['requests'] += 1
+
+    async def _on_response(self, response: httpx.Response) -> None:
+        """响应事件钩子：按HTTP版本统计响应数"""
+        self.request_stats['responses'] += 1
+        versions = self.request_stats['http_versions']
+        versions[response.http_version] = versions.get(response.http_version, 0) + 1
+
+    def _connection_stats(self) -> Dict[str, int]:
+        """读取连接池中的连接状态（依赖httpcore连接池的公开属性）"""
+        stats = {'total': 0, 'idle': 0, 'active': 0, 'http2': 0}
+        pool = getattr(getattr(self.http_client, '_transport', None), '_pool', None)
+        for connection in getattr(pool, 'connections', []):
+            stats['total'] += 1
+            if connection.is_idle():
+                stats['idle'] += 1
+            else:
+                stats['active'] += 1
+            if 'HTTP/2' in connection.info():
+                stats['http2'] += 1
+        return stats
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取连接池统计信息
+
+        Returns:
+            连接数、请求数、各视图缓存命中、请求合并次数和Token池配额汇总
+        """
+        if not self.started:
+            return {'started': False}
+
+        cache_stats = {'hits': 0, 'misses': 0, 'stores': 0}
+        for client in self._views.values():
+            for key in cache_stats:
+                cache_stats[key] += client.cache_stats[key]
+
+        rate_limit = self.token_pool.status()
+        return {
+            'started': True,
+            'http2': self.http2,
+            'limits': {
+                'max_connections': settings.GITHUB_MAX_CONNECTIONS,
+                'max_keepalive_connections': settings.GITHUB_MAX_KEEPALIVE_CONNECTIONS,
+                'keepalive_expiry': settings.GITHUB_KEEPALIVE_EXPIRY
+            },
+            'connections': self._connection_stats(),
+            'requests': dict(self.request_stats, http_versions=dict(self.request_stats['http_versions'])),
+            'views': len(self._views),
+            'cache': cache_stats,
+            'single_flight': dict(self.single_flight.stats, in_flight=self.single_flight.in_flight),
+            'rate_limit': {
+                'remaining': rate_limit['remaining'],
+                'limit': rate_limit['limit'],
+                'tokens': len(rate_limit['tokens'])
+            }
+        }
+
+
+# 全局客户端注册表实例（在应用lifespan中启动和关闭）
+github_client_registry = GitHubClientRegistry()
@@ -0,0 +1,101 @@
+"""
+提交作者过滤条件
+共享仓库和组织仓库中大部分提交来自其他贡献者，按用户的GitHub登录名和邮箱别名
+过滤提交列表，只获取和保存用户自己的提交详情
+"""
+import hashlib
+import json
+import re
+from typing import Optional, List, Dict, Any, Iterable
+
+from app.services.git_mirror import GitMirror, ERE_SPECIAL
+
+
+class CommitAuthorFilter:
+    """
+    提交作者过滤条件：GitHub登录名和用户的邮箱别名
+
+    REST和GraphQL的过滤参数都不能一次覆盖所有身份，因此按身份分多次列出提交（称为一轮）：
+    - REST的author参数每次只接受一个登录名或邮箱：登录名一轮，每个邮箱各一轮
+    - GraphQL的history(author:)中id优先于emails：按用户节点ID一轮，所有邮箱合并为一轮
+    - 本地Git镜像没有账号关联信息，按邮箱和GitHub的noreply邮箱匹配，git log一轮完成
+    同一提交在多轮中出现时由SHA去重。推送事件中的提交已带有作者信息，用matches逐个判断。
+
+    使用示例:
+        authors = CommitAuthorFilter('octocat', ['octocat@work.example.com'], node_id='MDQ6VXNlcjE=')
+        for author in authors.passes('rest'):
+            pages = github_client.iter_repo_commits(owner, repo, author=author)
+    """
+
+    def __init__(self, login: str, emails: Iterable[str] = (), node_id: Optional[str] = None):
+        """
+        Args:
+            login: GitHub登录名
+            emails: 邮箱别名（未关联到GitHub账号的提交作者邮箱）
+            node_id: 用户的GraphQL节点ID，graphql策略按登录名过滤时需要
+        """
+        self.login = login
+        self.emails = sorted({email.strip().lower() for email in emails if email and email.strip()})
+        self.node_id = node_id
+
+    def passes(self, sync_strategy: str) -> List[Any]:
+        """
+        按同步策略生成每一轮的作者过滤参数
+
+        Args:
+            sync_strategy: 提交同步策略（rest / graphql / git）
+
+        Returns:
+            rest为author查询参数列表；graphql为CommitAuthor输入对象列表，
+            没有节点ID也没有邮箱时返回[None]（不过滤）；git为一轮，参数是 --author 正则列表
+        """
+        if sync_strategy == 'git':
+            return [self.git_authors()]
+        if sync_strategy == 'graphql':
+            authors: List[Optional[Dict[str, Any]]] = []
+            if self.node_id:
+                authors.append({'id': self.node_id})
+            if self.emails:
+                authors.append({'emails': self.emails})
+            return authors or [None]
+        return [self.login] + self.emails
+
+    def git_authors(self) -> List[str]:
+        """
+        本地Git镜像的作者匹配规则（git log --author 扩展正则）
+
+        Returns:
+            每个邮箱一条，另加登录名对应的noreply邮箱（login@ 或 id+login@users.noreply.github.com）
+        """
+        login = ERE_SPECIAL.sub(r"\\\1", self.login)
+        patterns = [GitMirror.author_pattern(email) for email in self.emails]
+        patterns.append(f"<([0-9]+\\+)?{login}@users\\.noreply\\.github\\.com>")
+        return patterns
+
+    def matches(self, login: Optional[str], email: Optional[str]) -> bool:
+        """
+        判断提交作者是否为该用户（推送事件等已包含作者信息的提交）
+
+        Args:
+            login: 作者的GitHub登录名（邮箱未关联到账号时为None）
+            email: 作者邮箱
+
+        Returns:
+            登录名相同，或邮箱为邮箱别名、登录名对应的noreply邮箱时返回True
+        """
+        if login and login.lower() == self.login.lower():
+            return True
+        if not email:
+            return False
+        email = email.strip().lower()
+        noreply = rf"([0-9]+\+)?{re.escape(self.login.lower())}@users\.noreply\.github\.com"
+        return email in self.emails or re.fullmatch(noreply, email) is not None
+
+    @property
+    def fingerprint(self) -> str:
+        """过滤条件的指纹（过滤条件变化时分页游标失效）"""
+        data = json.dumps([self.login, self.node_id, self.emails], ensure_ascii=False)
+        return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+    def __repr__(self):
+        return f"<CommitAuthorFilter(login='{self.login}', emails={self.emails})>"
@@ -0,0 +1,271 @@
+"""
+提交详情后台补全服务
+两阶段同步先从提交列表写入提交（提交数、热力图和最近活动立即可用），标记为未补全；
+本服务在后台按批获取这些提交的详情，补全增删行数、文件数和语言，
+并在REST剩余配额降到保留值时暂停，不与交互式同步争抢配额。
+"""
+import asyncio
+import logging
+from typing import Optional, List, Dict, Any, Set, Tuple
+
+from sqlalchemy import select, update, func, bindparam
+
+from app.core.config import settings
+from app.models.commit_detail import CommitDetail
+from app.models.repository import Repository
+from app.models.user import User
+from app.services.commit_parser import CommitParser
+from app.services.data_sync_service import DataSyncService
+from app.services.github_client import GitHubAPIError, RateLimitError
+
+logger = logging.getLogger(__name__)
+
+
+class CommitEnricher:
+    """
+    提交详情后台补全服务
+
+    每批取出用户最新的一批未补全提交，并发获取详情后用一条多行UPDATE写回，
+    用户累计值和语言统计在同一事务中累加。获取失败的提交本次不再重试，下次补全时重新获取。
+
+    使用示例:
+        sync_service = DataSyncService(db, github_client, progress_callback=job.record)
+        result = await CommitEnricher(sync_service).enrich_user(user)
+    """
+
+    def __init__(
+        self,
+        sync_service: DataSyncService,
+        batch_size: Optional[int] = None,
+        min_remaining: Optional[int] = None
+    ):
+        """
+        初始化服务
+
+        Args:
+            sync_service: 数据同步服务（提供数据库会话、GitHub客户端、详情并发数、用户统计和进度回调）
+            batch_size: 每批补全的提交数，默认使用配置SYNC_ENRICH_BATCH_SIZE
+            min_remaining: 为交互式同步保留的REST配额，默认使用配置SYNC_ENRICH_MIN_REMAINING
+        """
+        self.sync_service = sync_service
+        self.db = sync_service.db
+        self.github_client = sync_service.github_client
+        self.batch_size = batch_size or settings.SYNC_ENRICH_BATCH_SIZE
+        self.min_remaining = settings.SYNC_ENRICH_MIN_REMAINING if min_remaining is None else min_remaining
+
+    async def count_pending(self, user: User) -> int:
+        """
+        统计用户尚未补全的提交数
+
+        Args:
+            user: 用户ORM对象
+
+        Returns:
+            未补全的提交数
+        """
+        return (await self.db.execute(
+            select(func.count(CommitDetail.id))
+            .where(CommitDetail.user_id == user.id, CommitDetail.enriched.is_(False))
+        )).scalar_one()
+
+    async def enrich_user(self, user: User, max_commits: Optional[int] = None) -> Dict[str, Any]:
+        """
+        补全用户未补全的提交，直到全部完成、达到上限或剩余配额降到保留值
+
+        Args:
+            user: 用户ORM对象
+            max_commits: 本次最多补全的提交数，默认使用配置SYNC_ENRICH_MAX_COMMITS
+
+        Returns:
+            {'enriched': 本次补全数, 'failed': 获取失败的提交数, 'pending': 仍未补全的提交数,
+             'paused': 是否因配额不足暂停}
+        """
+        max_commits = max_commits or settings.SYNC_ENRICH_MAX_COMMITS
+        self.sync_service.report_progress('stage', stage='enrich')
+
+        enriched = 0
+        failed: Set[str] = set()
+        paused = False
+        while enriched < max_commits:
+            limit = self._batch_limit(max_commits - enriched)
+            if limit <= 0:
+                paused = True
+                break
+
+            batch = await self._load_batch(user, limit, failed)
+            if not batch:
+                break
+
+            rows, batch_failed, rate_limited = await self._fetch_batch(batch)
+            failed.update(batch_failed)
+            if rows:
+                enriched += await self._save_batch(user, rows)
+            if rate_limited:
+                paused = True
+                break
+
+        if enriched:
+            await self.sync_service.user_stats.refresh_active_language(user)
+            await self.db.commit()
+
+        pending = await self.count_pending(user)
+        if paused:
+            logger.info(
+                f"REST剩余配额不足（保留 {self.min_remaining}），暂停补全: "
+                f"用户 {user.username} 还有 {pending} 个提交未补全"
+            )
+        logger.info(f"补全了用户 {user.username} 的 {enriched} 个提交，{len(failed)} 个失败，{pending} 个未补全")
+        return {'enriched': enriched, 'failed': len(failed), 'pending': pending, 'paused': paused}
+
+    def _batch_limit(self, remaining_commits: int) -> int:
+        """
+        按剩余配额计算本批最多补全的提交数（每个提交一个详情请求）
+
+        Args:
+            remaining_commits: 本次补全还可以补全的提交数
+
+        Returns:
+            本批提交数，0表示剩余配额已到保留值
+        """
+        limit = min(self.batch_size, remaining_commits)
+        remaining = self.github_client.rate_limit_info['remaining']
+        if remaining is None:
+            # 尚无配额数据（还没有发起过请求），先取一批
+            return limit
+        return max(0, min(limit, remaining - self.min_remaining))
+
+    async def _load_batch(
+        self,
+        user: User,
+        limit: int,
+        exclude: Set[str]
+    ) -> List[Tuple[Any, ...]]:
+        """
+        取出用户最新的一批未补全提交（最近的活动先补全）
+
+        Args:
+            user: 用户ORM对象
+            limit: 最多取出的提交数
+            exclude: 本次已获取失败、不再重试的SHA
+
+        Returns:
+            (提交ID, SHA, 提交时间, 仓库名称, 仓库主语言) 列表
+        """
+        query = (
+            select(
+                CommitDetail.id,
+                CommitDetail.commit_sha,
+                CommitDetail.commit_date,
+                Repository.repo_name,
+                Repository.language
+            )
+            .join(Repository, Repository.id == CommitDetail.repo_id)
+            .where(CommitDetail.user_id == user.id, CommitDetail.enriched.is_(False))
+            .order_by(CommitDetail.commit_date.desc())
+            .limit(limit)
+        )
+        if exclude:
+            query = query.where(CommitDetail.commit_sha.notin_(exclude))
+        return list((await self.db.execute(query)).all())
+
+    async def _fetch_batch(
+        self,
+        batch: List[Tuple[Any, ...]]
+    ) -> Tuple[List[Dict[str, Any]], List[str], bool]:
+        """
+        并发获取一批提交的详情并解析为 commit_details 的补全字段
+
+        Args:
+            batch: _load_batch 的返回值
+
+        Returns:
+            (补全后的行, 获取失败的SHA, 是否遇到速率限制)
+        """
+        semaphore = asyncio.Semaphore(self.sync_service.detail_concurrency)
+        failed: List[str] = []
+        rate_limited = False
+
+        async def fetch(commit_id, sha, commit_date, repo_name, repo_language) -> Optional[Dict[str, Any]]:
+            nonlocal rate_limited
+            if rate_limited:
+                return None
+            owner, name = repo_name.split('/', 1)
+            try:
+                async with semaphore:
+                    detail = await self.github_client.get_commit_detail(owner, name, sha)
+            except RateLimitError as e:
+                logger.warning(f"补全提交时遇到速率限制: {e}")
+                rate_limited = True
+                return None
+            except GitHubAPIError as e:
+                logger.error(f"获取提交 {repo_name}@{sha[:7]} 的详情失败: {e}")
+                failed.append(sha)
+                return None
+            parsed = CommitParser.parse_commit(detail)
+            return {
+                'id': commit_id,
+                'commit_date': commit_date,
+                'additions': parsed['additions'],
+                'deletions': parsed['deletions'],
+                'files_changed': parsed['files_changed'],
+                'primary_language': parsed['languages'][0] if parsed['languages'] else repo_language
+            }
+
+        results = await asyncio.gather(*(fetch(*row) for row in batch))
+        return [row for row in results if row is not None], failed, rate_limited
+
+    async def _save_batch(self, user: User, rows: List[Dict[str, Any]]) -> int:
+        """
+        用一条多行UPDATE写回补全的字段，并在同一事务中累加用户统计
+
+        先锁定本批中仍未补全的行：另一个补全任务已写回的行被跳过，
+        用户统计只累加本事务实际写回的行，不会重复累加。
+
+        Args:
+            user: 用户ORM对象
+            rows: _fetch_batch 返回的补全后的行
+
+        Returns:
+            实际写回的提交数
+        """
+        # 加锁读取最新提交的补全标记，其他补全任务在本事务提交前无法写回这些行
+        result = await self.db.execute(
+            select(CommitDetail.id)
+            .where(CommitDetail.id.in_([row['id'] for row in rows]), CommitDetail.enriched.is_(False))
+            .with_for_update()
+        )
+        pending_ids = set(result.scalars().all())
+        if len(pending_ids) < len(rows):
+            logger.warning(f"{len(rows) - len(pending_ids)} 个提交已被其他补全任务补全 (用户: {user.username})")
+            rows = [row for row in rows if row['id'] in pending_ids]
+        if not rows:
+            await self.db.commit()
+            return 0
+
+        table = CommitDetail.__table__
+        await self.db.execute(
+            update(table)
+            .where(table.c.id == bindparam('commit_id'), table.c.enriched.is_(False))
+            .values(
+                additions=bindparam('new_additions'),
+                deletions=bindparam('new_deletions'),
+                files_changed=bindparam('new_files_changed'),
+                primary_language=bindparam('new_primary_language'),
+                enriched=True
+            ),
+            [
+                {
+                    'commit_id': row['id'],
+                    'new_additions': row['additions'],
+                    'new_deletions': row['deletions'],
+                    'new_files_changed': row['files_changed'],
+                    'new_primary_language': row['primary_language']
+                }
+                for row in rows
+            ]
+        )
+        await self.sync_service.user_stats.apply_enrichment(user, rows)
+
+        await self.db.commit()
+        self.sync_service.report_progress('commits', count=len(rows))
+        return len(rows)
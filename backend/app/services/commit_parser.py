@@ -2,8 +2,8 @@
 提交详情解析器
 解析GitHub提交数据，提取统计信息
 """
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+from datetime import datetime, timezone
 import re
 
 
@@ -86,12 +86,29 @@ class CommitParser:
         })
         
         # 解析文件语言和类型
+        languages, file_types = CommitParser._classify_files(
+            file_info.get('filename', '') for file_info in files
+        )
+        parsed['languages'] = languages
+        parsed['file_types'] = file_types
+        
+        return parsed
+    
+    @staticmethod
+    def _classify_files(filenames: Iterable[str]) -> Tuple[List[str], Dict[str, int]]:
+        """
+        按文件扩展名识别编程语言并统计文件类型
+        
+        Args:
+            filenames: 文件路径
+            
+        Returns:
+            (涉及的编程语言列表, {扩展名: 文件数})
+        """
         languages = set()
         file_types = {}
         
-        for file_info in files:
-            filename = file_info.get('filename', '')
-            
+        for filename in filenames:
             # 提取文件扩展名
             ext = CommitParser._get_file_extension(filename)
             if ext:
@@ -103,10 +120,97 @@ class CommitParser:
                 if language:
                     languages.add(language)
         
-        parsed['languages'] = list(languages)
-        parsed['file_types'] = file_types
-        
+        return list(languages), file_types
+    
+    @staticmethod
+    def parse_listing_commit(commit: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        解析REST提交列表中的提交（两阶段同步的第一阶段）
+
+        提交列表包含SHA、提交信息、作者和时间，不包含统计数据和文件列表：
+        增删行数和文件数为0，languages为空，enriched为False（由后台补全任务获取详情）。
+
+        Args:
+            commit: /repos/{owner}/{repo}/commits 返回的单个提交
+
+        Returns:
+            与parse_commit结构一致的解析结果，另含 enriched
+        """
+        parsed = CommitParser.parse_commit(commit)
+        parsed['enriched'] = False
         return parsed
+
+    @staticmethod
+    def parse_graphql_commit(node: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        解析GraphQL history连接返回的提交节点
+        
+        GraphQL不返回文件列表，languages和file_types为空，
+        files_changed使用changedFilesIfAvailable（不可用时为0）。
+        
+        Args:
+            node: history.nodes中的单个提交节点
+            
+        Returns:
+            与parse_commit结构一致的解析结果
+        """
+        author_info = node.get('author') or {}
+        additions = node.get('additions') or 0
+        deletions = node.get('deletions') or 0
+        
+        return {
+            'sha': node.get('oid', ''),
+            'message': node.get('message', ''),
+            'author_name': author_info.get('name', ''),
+            'author_email': author_info.get('email', ''),
+            'commit_date': author_info.get('date') or node.get('committedDate', ''),
+            'files_changed': node.get('changedFilesIfAvailable') or 0,
+            'additions': additions,
+            'deletions': deletions,
+            'total_changes': additions + deletions,
+            'languages': [],
+            'file_types': {},
+        }
+    
+    @staticmethod
+    def parse_git_commit(record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        解析本地Git镜像（git log --numstat）读取的提交记录
+        
+        增删行数为各文件numstat之和，语言和文件类型按文件扩展名识别；
+        提交时间转换为UTC，与GitHub API返回的时间一致。
+        
+        Args:
+            record: GitMirror.iter_commits产出的提交记录
+            
+        Returns:
+            与parse_commit结构一致的解析结果
+        """
+        files = record.get('files') or []
+        additions = sum(file_info['additions'] for file_info in files)
+        deletions = sum(file_info['deletions'] for file_info in files)
+        languages, file_types = CommitParser._classify_files(
+            file_info['filename'] for file_info in files
+        )
+        
+        commit_date = record.get('commit_date', '')
+        if commit_date:
+            commit_date = datetime.fromisoformat(commit_date.replace('Z', '+00:00'))
+            commit_date = commit_date.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        
+        return {
+            'sha': record.get('sha', ''),
+            'message': record.get('message', ''),
+            'author_name': record.get('author_name', ''),
+            'author_email': record.get('author_email', ''),
+            'commit_date': commit_date,
+            'files_changed': len(files),
+            'additions': additions,
+            'deletions': deletions,
+            'total_changes': additions + deletions,
+            'languages': languages,
+            'file_types': file_types,
+        }
     
     @staticmethod
     def parse_commit_batch(commits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
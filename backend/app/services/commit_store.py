@@ -0,0 +1,186 @@
+"""
+提交详情本地存储
+按SHA持久化GitHub提交详情原始响应。同一SHA的提交内容不可变，
+因此重置数据库、迁移用户或同步fork仓库时可直接复用，无需再次请求API。
+
+存储布局: <root>/<sha[0:2]>/<sha[2:4]>/<sha>.json.z （zlib压缩的JSON）
+"""
+import json
+import logging
+import mmap
+import os
+import re
+import tempfile
+import time
+import zlib
+from typing import Optional, Dict, Any, Iterator, Iterable
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SHA_PATTERN = re.compile(r"^[0-9a-f]{40}$")
+
+
+class CommitStore:
+    """
+    以SHA为键的不可变提交详情存储
+
+    使用示例:
+        store = CommitStore(".cache/commit_store")
+        store.put(sha, payload)
+        payload = store.get(sha)
+    """
+
+    SUFFIX = ".json.z"
+
+    def __init__(self, root: str, compression_level: int = 6):
+        """
+        Args:
+            root: 存储根目录
+            compression_level: zlib压缩级别（1-9）
+        """
+        self.root = root
+        self.compression_level = compression_level
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def is_valid_sha(sha: str) -> bool:
+        """判断是否为完整的40位SHA（缩写SHA不能作为存储键）"""
+        return bool(sha) and bool(SHA_PATTERN.match(sha.lower()))
+
+    def _path(self, sha: str) -> str:
+        """计算SHA对应的分片文件路径"""
+        sha = sha.lower()
+        if not SHA_PATTERN.match(sha):
+            raise ValueError(f"无效的提交SHA: {sha}")
+        return os.path.join(self.root, sha[:2], sha[2:4], sha + self.SUFFIX)
+
+    def has(self, sha: str) -> bool:
+        """判断SHA是否已存储"""
+        return os.path.exists(self._path(sha))
+
+    def get(self, sha: str) -> Optional[Dict[str, Any]]:
+        """
+        读取提交详情
+
+        通过mmap映射文件，直接在映射内存上解压，避免额外的读缓冲区拷贝。
+
+        Args:
+            sha: 提交SHA
+
+        Returns:
+            提交详情字典，不存在时返回None
+        """
+        path = self._path(sha)
+        try:
+            with open(path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    raw = zlib.decompress(mapped)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, zlib.error) as e:
+            # 空文件或损坏的文件视为不存在，下次获取时会被覆盖
+            logger.warning(f"提交详情缓存文件损坏，已忽略: {path} ({e})")
+            return None
+        return json.loads(raw)
+
+    def put(self, sha: str, payload: Dict[str, Any]) -> None:
+        """
+        写入提交详情（原子写入：先写临时文件再重命名）
+
+        Args:
+            sha: 提交SHA
+            payload: GitHub返回的提交详情
+        """
+        path = self._path(sha)
+        if os.path.exists(path):
+            return  # 内容不可变，已存在则无需重复写入
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        data = zlib.compress(
+            json.dumps(payload, separators=(",", ":")).encode("utf-8"),
+            self.compression_level
+        )
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def delete(self, sha: str) -> bool:
+        """删除指定SHA，返回是否删除成功"""
+        try:
+            os.unlink(self._path(sha))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def iter_shas(self) -> Iterator[str]:
+        """遍历所有已存储的SHA"""
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith(self.SUFFIX):
+                    yield filename[:-len(self.SUFFIX)]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        统计存储使用情况
+
+        Returns:
+            条目数和磁盘占用字节数
+        """
+        count = 0
+        total_bytes = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith(self.SUFFIX):
+                    count += 1
+                    total_bytes += os.path.getsize(os.path.join(dirpath, filename))
+        return {'root': self.root, 'entries': count, 'bytes': total_bytes}
+
+    def gc(self, keep: Iterable[str], keep_days: int = 0, dry_run: bool = False) -> int:
+        """
+        清理不再被引用的条目
+
+        Args:
+            keep: 需要保留的SHA集合（例如commit_details表中仍引用的SHA）
+            keep_days: 未被引用但最近N天内写入的条目同样保留
+            dry_run: 仅统计不删除
+
+        Returns:
+            删除（或将被删除）的条目数
+        """
+        keep = {sha.lower() for sha in keep}
+        cutoff = time.time() - keep_days * 86400
+        removed = 0
+
+        for sha in list(self.iter_shas()):
+            if sha in keep:
+                continue
+            path = self._path(sha)
+            if keep_days and os.path.getmtime(path) >= cutoff:
+                continue
+            removed += 1
+            if not dry_run:
+                os.unlink(path)
+
+        return removed
+
+
+def create_commit_store() -> Optional[CommitStore]:
+    """
+    根据配置创建提交详情存储
+
+    Returns:
+        存储实例；COMMIT_STORE_ENABLED为False时返回None
+    """
+    if not settings.COMMIT_STORE_ENABLED:
+        return None
+    return CommitStore(settings.COMMIT_STORE_PATH)
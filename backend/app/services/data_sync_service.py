@@ -3,34 +3,154 @@
 从GitHub API获取数据并持久化到数据库
 """
 import logging
-from typing import Optional, List, Dict, Any
-from datetime import datetime
+from contextlib import aclosing
+from typing import Optional, List, Dict, Any, Tuple, Callable
+from datetime import datetime, timedelta, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import select, update, func
 from sqlalchemy.exc import IntegrityError
 
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, insert_ignore, upsert
 from app.models.user import User
 from app.models.repository import Repository
 from app.models.commit_detail import CommitDetail
+from app.models.sync_run import SyncRunRepo
+from app.models.user_email_alias import UserEmailAlias
 from app.services.github_client import GitHubClient
 from app.services.commit_parser import CommitParser
+from app.services.commit_author_filter import CommitAuthorFilter
+from app.services.git_mirror import GitMirror
+from app.services.user_stats_service import UserStatsService
+from app.services.sync_run_service import SyncRunService
+from app.services.repo_sync_scheduler import RepoSyncScheduler
 
 logger = logging.getLogger(__name__)
 
+# 支持的提交同步策略
+SYNC_STRATEGIES = ('rest', 'graphql', 'git')
+
+# 用户事件流：GitHub最多返回300个事件（3页，每页100个）
+EVENTS_PER_PAGE = 100
+EVENTS_MAX_PAGES = 3
+
+# 事件出现在事件流中的延迟上限：更新的事件之后可能还有未出现的事件，不作为下次检测的起点
+EVENTS_LAG = timedelta(minutes=5)
+
+# 可能使用户的仓库列表发生变化的事件（出现时重新获取仓库列表）
+REPOSITORY_LIST_EVENTS = ('ForkEvent', 'PublicEvent')
+
 
 class DataSyncService:
     """数据同步服务类"""
     
-    def __init__(self, db: AsyncSession, github_client: GitHubClient):
+    def __init__(
+        self,
+        db: AsyncSession,
+        github_client: GitHubClient,
+        detail_concurrency: Optional[int] = None,
+        sync_strategy: Optional[str] = None,
+        detect_languages: Optional[bool] = None,
+        use_pipeline: Optional[bool] = None,
+        repo_concurrency: Optional[int] = None,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+        progress_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        commit_authors: Optional[CommitAuthorFilter] = None,
+        git_mirror: Optional[GitMirror] = None,
+        events_precheck: Optional[bool] = None,
+        two_phase: Optional[bool] = None
+    ):
         """
         初始化数据同步服务
         
         Args:
             db: 数据库会话
             github_client: GitHub API客户端
+            detail_concurrency: 并发获取提交详情的请求数，默认使用配置中的SYNC_DETAIL_CONCURRENCY
+            sync_strategy: 提交同步策略，rest(逐个获取提交详情) / graphql(批量获取提交历史) /
+                git(从本地Git镜像读取完整历史)，默认使用配置中的SYNC_STRATEGY
+            detect_languages: graphql策略下是否额外调用REST获取文件列表以识别语言，
+                默认使用配置中的SYNC_GRAPHQL_DETECT_LANGUAGES（关闭时使用仓库主语言）
+            use_pipeline: 同步单个仓库时是否使用流水线（各阶段并行），
+                默认使用配置中的SYNC_PIPELINE_ENABLED
+            repo_concurrency: sync_user_data同时同步的仓库数，默认使用配置中的SYNC_REPO_CONCURRENCY
+            session_factory: 并行同步仓库时为每个仓库创建会话的工厂，默认使用AsyncSessionLocal
+            progress_callback: 进度回调 callback(事件名称, 事件数据)，如后台同步任务的SyncJob.record
+            commit_authors: 提交作者过滤条件，只列出这些作者的提交；None表示列出所有提交
+                （sync_user_data按配置SYNC_AUTHOR_FILTER通过apply_author_filter设置）
+            git_mirror: git策略使用的本地Git镜像，默认按配置创建（使用客户端的Token克隆私有仓库）
+            events_precheck: 增量同步前是否先检查用户事件流，默认在配置SYNC_EVENTS_PRECHECK
+                和SYNC_AUTHOR_FILTER都启用时检查
+            two_phase: 是否两阶段同步（仅rest策略）：只从提交列表写入未补全的提交，
+                不获取提交详情，由CommitEnricher在后台补全；默认使用配置SYNC_TWO_PHASE
         """
         self.db = db
         self.github_client = github_client
+        self.detail_concurrency = detail_concurrency or settings.SYNC_DETAIL_CONCURRENCY
+        self.sync_strategy = sync_strategy or settings.SYNC_STRATEGY
+        if self.sync_strategy not in SYNC_STRATEGIES:
+            raise ValueError(f"不支持的同步策略: {self.sync_strategy}")
+        self.detect_languages = (
+            settings.SYNC_GRAPHQL_DETECT_LANGUAGES if detect_languages is None else detect_languages
+        )
+        self.use_pipeline = settings.SYNC_PIPELINE_ENABLED if use_pipeline is None else use_pipeline
+        self.repo_concurrency = repo_concurrency or settings.SYNC_REPO_CONCURRENCY
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.progress_callback = progress_callback
+        self.commit_authors = commit_authors
+        if git_mirror is None and self.sync_strategy == 'git':
+            git_mirror = GitMirror(token=github_client.token)
+        self.git_mirror = git_mirror
+        self.events_precheck = (
+            settings.SYNC_EVENTS_PRECHECK and settings.SYNC_AUTHOR_FILTER
+            if events_precheck is None else events_precheck
+        )
+        self.two_phase = (
+            settings.SYNC_TWO_PHASE if two_phase is None else two_phase
+        ) and self.sync_strategy == 'rest'
+        self.user_stats = UserStatsService(db)
+        self.sync_runs = SyncRunService(db)
+    
+    def for_session(self, db: AsyncSession) -> "DataSyncService":
+        """
+        创建使用另一个数据库会话、其余配置相同的同步服务
+        
+        Args:
+            db: 数据库会话
+            
+        Returns:
+            新的数据同步服务
+        """
+        return DataSyncService(
+            db,
+            self.github_client,
+            detail_concurrency=self.detail_concurrency,
+            sync_strategy=self.sync_strategy,
+            detect_languages=self.detect_languages,
+            use_pipeline=self.use_pipeline,
+            repo_concurrency=self.repo_concurrency,
+            session_factory=self.session_factory,
+            progress_callback=self.progress_callback,
+            commit_authors=self.commit_authors,
+            git_mirror=self.git_mirror,
+            events_precheck=self.events_precheck,
+            two_phase=self.two_phase
+        )
+    
+    def report_progress(self, event: str, **data: Any) -> None:
+        """
+        通知进度回调（未设置回调时忽略；回调出错只记录日志，不影响同步）
+        
+        Args:
+            event: 事件名称（stage / repositories / commits / repository）
+            **data: 事件数据
+        """
+        if self.progress_callback is None:
+            return
+        try:
+            self.progress_callback(event, data)
+        except Exception as e:
+            logger.warning(f"进度回调出错: {e}")
     
     async def sync_user(self, username: str) -> User:
         """
@@ -66,60 +186,177 @@ class DataSyncService:
         
         return user
     
-    async def sync_repositories(self, user: User) -> List[Repository]:
+    async def detect_changes(self, user: User) -> Tuple[Optional[str], Optional[Dict[str, datetime]]]:
         """
-        同步用户的所有仓库
+        通过用户事件流检测上次同步以来推送过的仓库
+        
+        第1页使用条件请求，事件流没有变化时GitHub返回304，不消耗配额；
+        只有遇到上次记录的事件ID之前的新事件才继续翻页。事件流最多包含300个、90天内的事件，
+        只有读到上次记录的事件才能确定期间的全部推送，否则（事件流为空或已不包含该事件）需要完整同步。
+        事件出现在事件流中有延迟，返回的事件ID取创建时间早于 EVENTS_LAG 的最新事件，
+        更新的事件下次检测时重新读取。
         
         Args:
-            user: 用户ORM对象
+            user: 用户ORM对象（last_event_id为上次同步时的最新事件ID）
             
         Returns:
-            仓库ORM对象列表
+            (下次检测的起点事件ID, {仓库名称(小写): 最后推送时间})；无法据事件流确定变化范围时
+            后者为None（尚未记录事件ID、事件流未包含上次的事件、出现新建或复刻的仓库），需要完整同步
         """
-        # 从GitHub获取仓库列表
-        github_repos = await self.github_client.get_user_repos(user.username)
-        
-        synced_repos = []
+        last_seen = int(user.last_event_id) if user.last_event_id else None
+        settled_before = datetime.utcnow() - EVENTS_LAG
+        newest_event_id = user.last_event_id
+        settled = False
+        pushed: Dict[str, datetime] = {}
+        complete = False
+        new_repositories = False
         
-        for github_repo in github_repos:
-            # 检查仓库是否已存在
-            result = await self.db.execute(
-                select(Repository).where(
-                    Repository.user_id == user.id,
-                    Repository.github_repo_id == github_repo['id']
-                )
+        for page in range(1, EVENTS_MAX_PAGES + 1):
+            response = await self.github_client.get_user_events(
+                user.username, page=page, per_page=EVENTS_PER_PAGE
             )
-            repo = result.scalar_one_or_none()
+            events = response.data or []
+            if page == 1 and response.from_cache:
+                logger.info(f"用户 {user.username} 的事件流没有变化")
             
-            if repo:
-                # 更新现有仓库
-                repo.repo_name = github_repo['full_name']
-                repo.description = github_repo.get('description')
-                repo.language = github_repo.get('language')
-                repo.stars = github_repo.get('stargazers_count', 0)
-                repo.forks = github_repo.get('forks_count', 0)
-                repo.is_private = github_repo.get('private', False)
-            else:
-                # 创建新仓库
-                repo = Repository(
-                    user_id=user.id,
-                    github_repo_id=github_repo['id'],
-                    repo_name=github_repo['full_name'],
-                    description=github_repo.get('description'),
-                    language=github_repo.get('language'),
-                    stars=github_repo.get('stargazers_count', 0),
-                    forks=github_repo.get('forks_count', 0),
-                    is_private=github_repo.get('private', False)
-                )
-                self.db.add(repo)
+            for event in events:
+                if last_seen is not None and int(event['id']) <= last_seen:
+                    complete = True
+                    break
+                created_at = self._parse_github_time(event.get('created_at'))
+                if not settled and created_at is not None and created_at <= settled_before:
+                    newest_event_id = event['id']
+                    settled = True
+                event_type = event.get('type')
+                payload = event.get('payload') or {}
+                if event_type == 'PushEvent':
+                    repo_name = (event.get('repo') or {}).get('name', '').lower()
+                    if repo_name and (repo_name not in pushed or (created_at and created_at > pushed[repo_name])):
+                        pushed[repo_name] = created_at
+                elif event_type in REPOSITORY_LIST_EVENTS or (
+                    event_type == 'CreateEvent' and payload.get('ref_type') == 'repository'
+                ):
+                    new_repositories = True
             
-            synced_repos.append(repo)
+            # 事件流已读完（不足一页）仍未读到上次的事件：期间的事件可能已超出事件流的范围
+            if complete or len(events) < EVENTS_PER_PAGE:
+                break
         
+        if not complete and last_seen is not None:
+            logger.info(f"用户 {user.username} 的事件流未包含上次的事件 {user.last_event_id}，完整同步")
+        if last_seen is None or not complete or new_repositories:
+            return newest_event_id, None
+        return newest_event_id, pushed
+    
+    async def _load_changed_repositories(
+        self,
+        user: User,
+        pushed: Dict[str, datetime]
+    ) -> Optional[List[Repository]]:
+        """
+        从数据库取出需要同步的仓库：事件流中推送过的仓库，以及尚未同步到最新的仓库
+        （上次同步失败、推送事件只记录了推送时间等），不请求GitHub仓库列表
+        
+        推送过的仓库的pushed_at更新为事件时间，之后按同步水位判断是否需要同步。
+        
+        Args:
+            user: 用户ORM对象
+            pushed: detect_changes返回的 {仓库名称(小写): 最后推送时间}
+            
+        Returns:
+            仓库ORM对象列表；推送的仓库不在数据库中时返回None（需要获取仓库列表）
+        """
+        result = await self.db.execute(
+            select(Repository).where(Repository.user_id == user.id).order_by(Repository.id)
+        )
+        repositories = list(result.scalars().all())
+        
+        known = {repository.repo_name.lower() for repository in repositories}
+        unknown = set(pushed) - known
+        if unknown:
+            logger.info(f"事件流中有未记录的仓库 {sorted(unknown)}，获取仓库列表")
+            return None
+        
+        changed = []
+        for repository in repositories:
+            pushed_at = pushed.get(repository.repo_name.lower())
+            if pushed_at is not None and (repository.pushed_at is None or pushed_at > repository.pushed_at):
+                repository.pushed_at = pushed_at
+            if repository.repo_name.lower() in pushed or not self.is_repository_unchanged(repository):
+                changed.append(repository)
+        
+        # 提交pushed_at的修改，仓库对象随后并入各仓库的会话
         await self.db.commit()
+        return changed
+    
+    async def apply_author_filter(self, user: User) -> Optional[CommitAuthorFilter]:
+        """
+        按用户的GitHub登录名和邮箱别名设置提交作者过滤条件
+        
+        共享仓库和组织仓库中其他贡献者的提交不再获取详情。配置SYNC_AUTHOR_FILTER关闭时
+        清除过滤条件；graphql策略需要用户的节点ID，会请求一次用户信息（命中缓存时不消耗配额）；
+        git策略没有账号关联信息，用户资料中的邮箱也作为作者邮箱。
+        
+        Args:
+            user: 用户ORM对象
+            
+        Returns:
+            提交作者过滤条件，未启用时返回None
+        """
+        if not settings.SYNC_AUTHOR_FILTER:
+            self.commit_authors = None
+            return None
+        
+        result = await self.db.execute(
+            select(UserEmailAlias.email).where(UserEmailAlias.user_id == user.id)
+        )
+        emails = list(result.scalars().all())
+        if self.sync_strategy == 'git' and user.email:
+            emails.append(user.email)
+        
+        node_id = None
+        if self.sync_strategy == 'graphql':
+            github_user = await self.github_client.get_user(user.username)
+            node_id = github_user.get('node_id')
+        
+        self.commit_authors = CommitAuthorFilter(user.username, emails, node_id=node_id)
+        logger.info(f"只同步作者的提交: {self.commit_authors}")
+        return self.commit_authors
+    
+    async def sync_repositories(self, user: User) -> List[Repository]:
+        """
+        同步用户的所有仓库
+        
+        每页仓库使用一条 INSERT ... ON DUPLICATE KEY UPDATE 写入（按 user_id + github_repo_id 唯一键），
+        全部写入后用一次查询取回仓库对象。
         
-        # 刷新所有仓库对象
-        for repo in synced_repos:
-            await self.db.refresh(repo)
+        Args:
+            user: 用户ORM对象
+            
+        Returns:
+            仓库ORM对象列表（与GitHub返回顺序一致）
+        """
+        github_repo_ids = []
+        
+        # 逐页获取仓库列表并批量写入
+        async for github_repos in self.github_client.iter_user_repos(user.username):
+            rows = [self._repository_row(user, github_repo) for github_repo in github_repos]
+            if not rows:
+                continue
+            await self.db.execute(upsert(
+                Repository,
+                self.db,
+                rows,
+                key_columns=['user_id', 'github_repo_id'],
+                update_columns=[
+                    'repo_name', 'description', 'language', 'stars', 'forks', 'is_private',
+                    'pushed_at', 'github_updated_at'
+                ],
+                extra_updates={'updated_at': func.current_timestamp()}
+            ))
+            github_repo_ids.extend(row['github_repo_id'] for row in rows)
+        
+        synced_repos = await self._load_repositories(user, github_repo_ids)
         
         # 更新用户的仓库总数
         user.total_repos = len(synced_repos)
@@ -129,12 +366,118 @@ class DataSyncService:
         
         return synced_repos
     
+    @staticmethod
+    def _repository_row(user: User, github_repo: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        将GitHub仓库数据转换为repositories表的行
+        
+        Args:
+            user: 用户ORM对象
+            github_repo: GitHub返回的仓库数据
+            
+        Returns:
+            列名到值的字典
+        """
+        return {
+            'user_id': user.id,
+            'github_repo_id': github_repo['id'],
+            'repo_name': github_repo['full_name'],
+            'description': github_repo.get('description'),
+            'language': github_repo.get('language'),
+            'stars': github_repo.get('stargazers_count', 0),
+            'forks': github_repo.get('forks_count', 0),
+            'is_private': github_repo.get('private', False),
+            'pushed_at': DataSyncService._parse_github_time(github_repo.get('pushed_at')),
+            'github_updated_at': DataSyncService._parse_github_time(github_repo.get('updated_at'))
+        }
+    
+    @staticmethod
+    def _parse_github_time(value: Optional[str]) -> Optional[datetime]:
+        """
+        解析GitHub返回的ISO 8601时间
+        
+        Args:
+            value: 时间字符串（如 2024-01-01T00:00:00Z），可以为None
+            
+        Returns:
+            无时区的UTC时间（与TIMESTAMP列读回的值可直接比较）
+        """
+        if not value:
+            return None
+        return DataSyncService._to_naive_utc(datetime.fromisoformat(value.replace('Z', '+00:00')))
+    
+    @staticmethod
+    def _to_naive_utc(value: datetime) -> datetime:
+        """带时区的时间转换为无时区的UTC时间"""
+        if value.tzinfo is None:
+            return value
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    
+    @staticmethod
+    def is_repository_unchanged(repository: Repository) -> bool:
+        """
+        仓库自上次完成同步以来是否没有新的推送
+        
+        Args:
+            repository: 仓库ORM对象
+            
+        Returns:
+            pushed_at未晚于上次同步完成时记录的值时返回True
+        """
+        return (
+            repository.synced_pushed_at is not None
+            and repository.pushed_at is not None
+            and repository.pushed_at <= repository.synced_pushed_at
+        )
+    
+    @staticmethod
+    def repository_since(repository: Repository) -> Optional[str]:
+        """
+        仓库的增量同步起始时间（已同步的最新提交时间）
+        
+        Args:
+            repository: 仓库ORM对象
+            
+        Returns:
+            ISO 8601时间，尚未同步过的仓库返回None（获取完整历史）
+        """
+        if repository.last_synced_commit_at is None:
+            return None
+        return repository.last_synced_commit_at.strftime('%Y-%m-%dT%H:%M:%SZ')
+    
+    async def _load_repositories(self, user: User, github_repo_ids: List[int]) -> List[Repository]:
+        """
+        按GitHub仓库ID批量查询仓库对象（保持传入顺序）
+        
+        Args:
+            user: 用户ORM对象
+            github_repo_ids: GitHub仓库ID列表
+            
+        Returns:
+            仓库ORM对象列表
+        """
+        if not github_repo_ids:
+            return []
+        
+        result = await self.db.execute(
+            select(Repository)
+            .where(
+                Repository.user_id == user.id,
+                Repository.github_repo_id.in_(github_repo_ids)
+            )
+            .execution_options(populate_existing=True)
+        )
+        repos_by_id = {repo.github_repo_id: repo for repo in result.scalars().all()}
+        
+        return [repos_by_id[repo_id] for repo_id in dict.fromkeys(github_repo_ids) if repo_id in repos_by_id]
+    
     async def sync_commits(
         self,
         user: User,
         repository: Repository,
         since: Optional[str] = None,
-        max_commits: Optional[int] = 100
+        max_commits: Optional[int] = 100,
+        checkpoint: Optional[SyncRunRepo] = None
     ) -> List[CommitDetail]:
         """
         同步仓库的提交记录
@@ -144,6 +487,8 @@ class DataSyncService:
             repository: 仓库ORM对象
             since: 起始时间（ISO 8601格式）
             max_commits: 最大同步提交数
+            checkpoint: 同步运行中该仓库的检查点，提供时从其游标继续，
+                并在每页写入后提交下一页的游标
             
         Returns:
             提交详情ORM对象列表
@@ -156,59 +501,610 @@ class DataSyncService:
         
         owner, repo_name = parts
         
-        # 从GitHub获取提交历史
-        github_commits = await self.github_client.get_repo_commits(
+        synced_commits = []
+        cursor, max_commits = self.resume_position(checkpoint, max_commits)
+        if max_commits is not None and max_commits <= 0:
+            # 中断前已列出足够的提交，只需推进水位
+            await self.finish_repository(user, repository, synced_commits, checkpoint)
+            return synced_commits
+        
+        # 逐页获取提交历史，每页处理完即写入数据库（后续页在后台预取）
+        pages = self.iter_commit_pages(
+            owner, repo_name, since=since, max_commits=max_commits, cursor=cursor
+        )
+        
+        async with aclosing(pages):
+            async for page, next_cursor in pages:
+                page_commits = await self.sync_page(user, repository, owner, repo_name, page)
+                synced_commits.extend(page_commits)
+                if checkpoint is not None:
+                    await self.sync_runs.save_page(checkpoint, next_cursor, len(page), len(page_commits))
+        
+        await self.finish_repository(user, repository, synced_commits, checkpoint)
+        return synced_commits
+    
+    async def sync_page(
+        self,
+        user: User,
+        repository: Repository,
+        owner: str,
+        repo_name: str,
+        page: List[Dict[str, Any]]
+    ) -> List[CommitDetail]:
+        """
+        按同步策略同步一页提交（rest逐个获取详情或两阶段直接写入，graphql，git）
+        
+        Args:
+            user: 用户ORM对象
+            repository: 仓库ORM对象
+            owner: 仓库所有者
+            repo_name: 仓库名称
+            page: iter_commit_pages产出的一页
+            
+        Returns:
+            本页新增的提交详情ORM对象列表
+        """
+        if self.sync_strategy == 'graphql':
+            sync_page = self._sync_history_page
+        elif self.sync_strategy == 'git':
+            sync_page = self._sync_mirror_page
+        elif self.two_phase:
+            sync_page = self._sync_listing_page
+        else:
+            sync_page = self._sync_commit_page
+        return await sync_page(user, repository, owner, repo_name, page)
+    
+    @staticmethod
+    def resume_position(
+        checkpoint: Optional[SyncRunRepo],
+        max_commits: Optional[int]
+    ) -> Tuple[Optional[str], Optional[int]]:
+        """
+        根据检查点计算继续同步的游标和剩余可获取的提交数
+        
+        Args:
+            checkpoint: 仓库检查点，None表示从头开始
+            max_commits: 每个仓库最大同步提交数
+            
+        Returns:
+            (下一页游标, 剩余最大提交数)
+        """
+        if checkpoint is None:
+            return None, max_commits
+        if max_commits:
+            max_commits -= checkpoint.commits_listed or 0
+        return checkpoint.cursor, max_commits
+    
+    def iter_commit_pages(
+        self,
+        owner: str,
+        repo_name: str,
+        since: Optional[str] = None,
+        max_commits: Optional[int] = None,
+        cursor: Optional[str] = None
+    ):
+        """
+        按同步策略逐页获取提交：rest返回提交列表页，graphql返回history节点页，
+        git返回本地镜像的提交记录（含逐文件增删行数）
+        
+        设置了提交作者过滤条件时只列出这些作者的提交（每个身份一轮）。
+        
+        Args:
+            owner: 仓库所有者
+            repo_name: 仓库名称
+            since: 起始时间（ISO 8601格式）
+            max_commits: 最大提交数
+            cursor: 从该游标开始获取（rest为页码，graphql为endCursor，git为"起点SHA:已读取数"；
+                按作者过滤时前面加上轮次，如 "1:3"）
+            
+        Returns:
+            异步生成器，每次产出 (一页, 下一页游标)
+        """
+        if self.commit_authors is not None:
+            return self._iter_author_pages(owner, repo_name, since, max_commits, cursor)
+        return self._iter_listing_pages(owner, repo_name, since, max_commits, cursor)
+    
+    def _iter_listing_pages(
+        self,
+        owner: str,
+        repo_name: str,
+        since: Optional[str],
+        max_commits: Optional[int],
+        cursor: Optional[str],
+        author: Any = None,
+        until: Optional[str] = None
+    ):
+        """
+        按同步策略逐页获取一次提交列表（可按一个作者过滤），产出 (一页, 下一页游标)
+        
+        until只用于rest和graphql（按时间窗口回填历史），git策略总是读取到默认分支的最新提交。
+        """
+        if self.sync_strategy == 'git':
+            return self._iter_mirror_pages(owner, repo_name, since, max_commits, cursor, authors=author)
+        if self.sync_strategy == 'graphql':
+            return self.github_client.iter_commit_history_pages(
+                owner,
+                repo_name,
+                since=since,
+                until=until,
+                max_commits=max_commits,
+                after=cursor,
+                author=author
+            )
+        return self._iter_rest_commit_pages(
             owner,
             repo_name,
             since=since,
-            max_commits=max_commits
+            max_commits=max_commits,
+            start_page=int(cursor) if cursor else 1,
+            author=author,
+            until=until
         )
+    
+    async def _iter_rest_commit_pages(
+        self,
+        owner: str,
+        repo_name: str,
+        since: Optional[str],
+        max_commits: Optional[int],
+        start_page: int,
+        author: Optional[str] = None,
+        until: Optional[str] = None
+    ):
+        """逐页获取REST提交列表，并以下一页的页码作为游标"""
+        pages = self.github_client.iter_repo_commits(
+            owner,
+            repo_name,
+            since=since,
+            until=until,
+            max_commits=max_commits,
+            start_page=start_page,
+            author=author
+        )
+        next_page = start_page
+        async with aclosing(pages):
+            async for page in pages:
+                next_page += 1
+                yield page, str(next_page)
+    
+    async def _iter_mirror_pages(
+        self,
+        owner: str,
+        repo_name: str,
+        since: Optional[str],
+        max_commits: Optional[int],
+        cursor: Optional[str],
+        authors: Optional[List[str]] = None
+    ):
+        """
+        拉取本地Git镜像后逐批读取提交记录，游标为 "起点SHA:已读取数"
         
-        if not github_commits:
+        第一次读取时固定默认分支的最新SHA作为起点，从检查点继续时沿用该起点，
+        之后拉取的新提交不会改变已读取的位置（留给下一次增量同步）。
+        """
+        await self.git_mirror.update(owner, repo_name)
+        if cursor:
+            rev, _, skip = cursor.partition(':')
+            skip = int(skip or 0)
+        else:
+            rev, skip = await self.git_mirror.resolve_head(owner, repo_name), 0
+            if rev is None:
+                logger.warning(f"仓库 {owner}/{repo_name} 无提交")
+                return
+        
+        commits = self.git_mirror.iter_commits(
+            owner,
+            repo_name,
+            rev=rev,
+            since=since,
+            max_commits=max_commits,
+            skip=skip,
+            authors=authors
+        )
+        async with aclosing(commits):
+            async for batch in commits:
+                skip += len(batch)
+                yield batch, f"{rev}:{skip}"
+    
+    async def _iter_author_pages(
+        self,
+        owner: str,
+        repo_name: str,
+        since: Optional[str],
+        max_commits: Optional[int],
+        cursor: Optional[str]
+    ):
+        """
+        按作者过滤条件的每一轮依次列出提交
+        
+        游标格式为 "轮次:该轮的游标"，从检查点继续时跳过已完成的轮次；
+        max_commits是所有轮次合计的上限。
+        """
+        authors = self.commit_authors.passes(self.sync_strategy)
+        start, inner_cursor = 0, None
+        if cursor:
+            index, _, inner_cursor = cursor.partition(':')
+            start, inner_cursor = int(index), inner_cursor or None
+        
+        fetched = 0
+        for index in range(start, len(authors)):
+            pages = self._iter_listing_pages(
+                owner,
+                repo_name,
+                since,
+                max_commits - fetched if max_commits else None,
+                inner_cursor if index == start else None,
+                author=authors[index]
+            )
+            async with aclosing(pages):
+                async for page, next_cursor in pages:
+                    fetched += len(page)
+                    yield page, f"{index}:{next_cursor or ''}"
+            if max_commits and fetched >= max_commits:
+                return
+    
+    async def finish_repository(
+        self,
+        user: User,
+        repository: Repository,
+        synced_commits: List[CommitDetail],
+        checkpoint: Optional[SyncRunRepo] = None
+    ) -> None:
+        """
+        仓库的全部提交写入后推进同步水位并提交事务
+        
+        只有整个仓库同步完成才会调用：中途失败的仓库下次从原水位（或检查点）重新获取。
+        
+        Args:
+            user: 用户ORM对象
+            repository: 仓库ORM对象
+            synced_commits: 本次新增的提交详情对象
+            checkpoint: 仓库检查点，与水位在同一事务中标记为完成
+        """
+        repository.synced_pushed_at = repository.pushed_at
+        
+        if checkpoint is not None:
+            self.sync_runs.complete_repository(checkpoint)
+            # 从检查点继续时，最新的提交可能在中断前已写入，以数据库中的最新提交为准
+            latest = (await self.db.execute(
+                select(CommitDetail.commit_date, CommitDetail.commit_sha)
+                .where(CommitDetail.repo_id == repository.id)
+                .order_by(CommitDetail.commit_date.desc())
+                .limit(1)
+            )).one_or_none()
+            if latest is not None:
+                latest = (self._to_naive_utc(latest[0]), latest[1])
+        elif synced_commits:
+            latest_commit = max(synced_commits, key=lambda c: c.commit_date)
+            latest = (self._to_naive_utc(latest_commit.commit_date), latest_commit.commit_sha)
+        else:
+            latest = None
+        
+        if latest is None:
+            await self.db.commit()
             logger.info(f"仓库 {repository.repo_name} 没有新提交")
-            return []
+            return
         
-        synced_commits = []
+        # 更新仓库的最后提交时间和同步水位
+        latest_commit_at, latest_sha = latest
+        repository.last_commit_at = latest_commit_at
+        if repository.last_synced_commit_at is None or latest_commit_at >= repository.last_synced_commit_at:
+            repository.last_synced_commit_at = latest_commit_at
+            repository.last_synced_sha = latest_sha
+        
+        # 累计值已随每页写入增量更新，这里只刷新最活跃语言
+        await self.user_stats.refresh_active_language(user)
+        
+        await self.db.commit()
+        
+        logger.info(f"同步了 {len(synced_commits)} 个新提交 (仓库: {repository.repo_name})")
+    
+    async def sync_pushed_commits(
+        self,
+        user: User,
+        repository: Repository,
+        shas: List[str],
+        head_sha: str,
+        pushed_at: Optional[datetime] = None,
+        advance: bool = False
+    ) -> List[CommitDetail]:
+        """
+        同步推送事件中的提交：只获取尚未写入的SHA的详情，不列出提交
         
-        for github_commit in github_commits:
-            commit_sha = github_commit.get('sha')
+        推送时间总是记录到pushed_at，定时同步据此发现仓库有新推送；advance为True
+        （推送前仓库已同步到最新，且没有遗漏的推送）时同时推进同步水位，定时同步跳过该仓库。
+        
+        Args:
+            user: 用户ORM对象
+            repository: 仓库ORM对象
+            shas: 推送中需要同步的提交SHA
+            head_sha: 推送后默认分支的HEAD
+            pushed_at: 推送时间（无时区的UTC时间）
+            advance: 是否推进同步水位
             
-            # 检查提交是否已存在
-            result = await self.db.execute(
-                select(CommitDetail).where(CommitDetail.commit_sha == commit_sha)
+        Returns:
+            新增的提交详情ORM对象列表
+        """
+        owner, repo_name = repository.repo_name.split('/', 1)
+        synced_commits = await self._sync_commit_page(
+            user, repository, owner, repo_name, [{'sha': sha} for sha in shas]
+        )
+        
+        repository.push_head_sha = head_sha
+        if pushed_at is not None and (repository.pushed_at is None or pushed_at > repository.pushed_at):
+            repository.pushed_at = pushed_at
+        
+        if advance:
+            await self.finish_repository(user, repository, synced_commits)
+        else:
+            await self.db.commit()
+            logger.info(
+                f"推送事件写入 {len(synced_commits)} 个新提交 (仓库: {repository.repo_name})，"
+                f"同步水位留给下一次定时同步"
             )
-            existing_commit = result.scalar_one_or_none()
+        return synced_commits
+    
+    async def _sync_commit_page(
+        self,
+        user: User,
+        repository: Repository,
+        owner: str,
+        repo_name: str,
+        github_commits: List[Dict[str, Any]]
+    ) -> List[CommitDetail]:
+        """
+        同步一页REST提交列表：过滤已存在的提交、获取详情并写入数据库
+        
+        Args:
+            user: 用户ORM对象
+            repository: 仓库ORM对象
+            owner: 仓库所有者
+            repo_name: 仓库名称
+            github_commits: 提交列表中的一页
+            
+        Returns:
+            本页新增的提交详情ORM对象列表
+        """
+        new_shas = await self._filter_new_shas(
+            [github_commit.get('sha') for github_commit in github_commits]
+        )
+        
+        # 并发获取提交详情（结果顺序与new_shas一致）
+        commit_details = await self.github_client.get_commit_details(
+            owner,
+            repo_name,
+            new_shas,
+            concurrency=self.detail_concurrency
+        )
+        
+        parsed_commits = [CommitParser.parse_commit(detail) for detail in commit_details]
+        
+        return await self._save_parsed_commits(user, repository, parsed_commits)
+    
+    async def _sync_listing_page(
+        self,
+        user: User,
+        repository: Repository,
+        owner: str,
+        repo_name: str,
+        github_commits: List[Dict[str, Any]]
+    ) -> List[CommitDetail]:
+        """
+        两阶段同步：直接写入一页REST提交列表中的新提交，标记为未补全（不请求提交详情）
+        
+        Args:
+            user: 用户ORM对象
+            repository: 仓库ORM对象
+            owner: 仓库所有者
+            repo_name: 仓库名称
+            github_commits: 提交列表中的一页
             
-            if existing_commit:
-                continue  # 跳过已存在的提交
+        Returns:
+            本页新增的提交详情ORM对象列表
+        """
+        parsed_by_sha = {
+            github_commit.get('sha'): CommitParser.parse_listing_commit(github_commit)
+            for github_commit in github_commits
+        }
+        new_shas = await self._filter_new_shas(list(parsed_by_sha))
+        
+        return await self._save_parsed_commits(
+            user, repository, [parsed_by_sha[sha] for sha in new_shas]
+        )
+    
+    async def _sync_history_page(
+        self,
+        user: User,
+        repository: Repository,
+        owner: str,
+        repo_name: str,
+        nodes: List[Dict[str, Any]]
+    ) -> List[CommitDetail]:
+        """
+        同步一页GraphQL提交历史
+        
+        增删行数和变更文件数直接来自GraphQL节点；仅在启用语言检测时
+        才逐个调用REST /commits/{sha} 获取文件列表。
+        
+        Args:
+            user: 用户ORM对象
+            repository: 仓库ORM对象
+            owner: 仓库所有者
+            repo_name: 仓库名称
+            nodes: history连接中的一页提交节点
             
-            # 获取提交详情
-            commit_detail = await self.github_client.get_commit_detail(
+        Returns:
+            本页新增的提交详情ORM对象列表
+        """
+        parsed_by_sha = {
+            node['oid']: CommitParser.parse_graphql_commit(node)
+            for node in nodes
+        }
+        new_shas = await self._filter_new_shas(list(parsed_by_sha))
+        parsed_commits = [parsed_by_sha[sha] for sha in new_shas]
+        
+        if self.detect_languages and new_shas:
+            commit_details = await self.github_client.get_commit_details(
                 owner,
                 repo_name,
-                commit_sha
+                new_shas,
+                concurrency=self.detail_concurrency
             )
+            for parsed, detail in zip(parsed_commits, commit_details):
+                rest_parsed = CommitParser.parse_commit(detail)
+                parsed['languages'] = rest_parsed['languages']
+                parsed['file_types'] = rest_parsed['file_types']
+        
+        return await self._save_parsed_commits(user, repository, parsed_commits)
+    
+    async def _sync_mirror_page(
+        self,
+        user: User,
+        repository: Repository,
+        owner: str,
+        repo_name: str,
+        records: List[Dict[str, Any]]
+    ) -> List[CommitDetail]:
+        """
+        同步一批本地Git镜像的提交记录（统计和文件列表来自git log --numstat，不请求API）
+        
+        Args:
+            user: 用户ORM对象
+            repository: 仓库ORM对象
+            owner: 仓库所有者
+            repo_name: 仓库名称
+            records: GitMirror.iter_commits产出的一批提交记录
             
-            # 解析提交信息
-            parsed_commit = CommitParser.parse_commit(commit_detail)
+        Returns:
+            本批新增的提交详情ORM对象列表
+        """
+        parsed_by_sha = {
+            record['sha']: CommitParser.parse_git_commit(record)
+            for record in records
+        }
+        new_shas = await self._filter_new_shas(list(parsed_by_sha))
+        
+        return await self._save_parsed_commits(
+            user, repository, [parsed_by_sha[sha] for sha in new_shas]
+        )
+    
+    async def _filter_new_shas(self, shas: List[str]) -> List[str]:
+        """
+        筛选出数据库中尚不存在的提交SHA（保持原有顺序）
+        
+        整页SHA使用一次 IN (...) 查询判断是否存在。
+        
+        Args:
+            shas: 提交SHA列表
             
+        Returns:
+            不存在的SHA列表
+        """
+        shas = [sha for sha in shas if sha]
+        if not shas:
+            return []
+        
+        result = await self.db.execute(
+            select(CommitDetail.commit_sha).where(CommitDetail.commit_sha.in_(shas))
+        )
+        existing_shas = set(result.scalars().all())
+        
+        # 跳过已存在的提交（同一页中重复的SHA只保留一次）
+        new_shas = []
+        for commit_sha in shas:
+            if commit_sha not in existing_shas:
+                existing_shas.add(commit_sha)
+                new_shas.append(commit_sha)
+        
+        return new_shas
+    
+    async def _lock_existing_shas(self, shas: List[str]) -> set:
+        """
+        加锁读取已存在的提交SHA
+
+        加锁读取总是读取最新提交的数据（与隔离级别和事务中已有的快照无关），
+        并锁定这些行和不存在的SHA所在的索引间隙，直到事务结束。
+
+        Args:
+            shas: 提交SHA列表
+
+        Returns:
+            已存在的SHA集合
+        """
+        result = await self.db.execute(
+            select(CommitDetail.commit_sha)
+            .where(CommitDetail.commit_sha.in_(shas))
+            .with_for_update()
+        )
+        return set(result.scalars().all())
+
+    async def _load_inserted_shas(self, user: User, shas: List[str]) -> set:
+        """
+        找出INSERT IGNORE实际为该用户写入的提交SHA
+
+        调用方已锁定用户行，并确认写入前这些SHA都不存在：同一用户的其他写入在本事务结束前
+        无法进行，因此该用户名下的这些SHA只能由本事务写入；被忽略的行属于其他用户
+        （commit_sha全局唯一，例如不同用户fork的仓库中的同一提交）。
+
+        Args:
+            user: 用户ORM对象
+            shas: 本次尝试写入的提交SHA
+
+        Returns:
+            实际写入的SHA集合
+        """
+        result = await self.db.execute(
+            select(CommitDetail.commit_sha)
+            .where(CommitDetail.commit_sha.in_(shas), CommitDetail.user_id == user.id)
+            .with_for_update()
+        )
+        return set(result.scalars().all())
+
+    async def _save_parsed_commits(
+        self,
+        user: User,
+        repository: Repository,
+        parsed_commits: List[Dict[str, Any]]
+    ) -> List[CommitDetail]:
+        """
+        将解析后的提交写入数据库
+        
+        整页提交使用一条多行 INSERT IGNORE 写入（commit_sha唯一键冲突的行被忽略，
+        例如另一个同步任务刚写入的提交），不逐行刷新。写入前锁定用户行并加锁排除已存在的提交，
+        用户统计在同一事务中只累加实际写入的行，与数据库的隔离级别无关。
+        用户的统计来自仅聚合统计同步时，先从 commit_details 完整重算并清除 aggregate_synced_at。
+        未补全的提交（两阶段同步）不记录语言，补全后再计入语言统计。
+        
+        Args:
+            user: 用户ORM对象
+            repository: 仓库ORM对象
+            parsed_commits: CommitParser解析结果列表
+            
+        Returns:
+            新增的提交详情对象列表（未加入会话，不含数据库生成的id）
+        """
+        synced_commits = []
+        
+        for parsed_commit in parsed_commits:
             # 解析提交时间
             commit_date = datetime.fromisoformat(
                 parsed_commit['commit_date'].replace('Z', '+00:00')
             )
             
             # 提取语言（使用第一个语言，如果有的话）
-            primary_language = (
-                parsed_commit['languages'][0] 
-                if parsed_commit['languages'] 
-                else repository.language
-            )
+            enriched = parsed_commit.get('enriched', True)
+            if not enriched:
+                primary_language = None
+            elif parsed_commit['languages']:
+                primary_language = parsed_commit['languages'][0]
+            else:
+                primary_language = repository.language
             
             # 创建提交记录
             commit_obj = CommitDetail(
                 user_id=user.id,
                 repo_id=repository.id,
-                commit_sha=commit_sha,
+                commit_sha=parsed_commit['sha'],
                 commit_message=parsed_commit['message'],
                 commit_date=commit_date,
                 additions=parsed_commit['additions'],
@@ -216,66 +1112,56 @@ class DataSyncService:
                 files_changed=parsed_commit['files_changed'],
                 primary_language=primary_language,
                 commit_hour=CommitParser.extract_commit_hour(parsed_commit['commit_date']),
-                commit_weekday=commit_date.weekday()
+                commit_weekday=commit_date.weekday(),
+                enriched=enriched
             )
             
-            self.db.add(commit_obj)
             synced_commits.append(commit_obj)
         
-        if synced_commits:
-            await self.db.commit()
-            
-            # 刷新所有提交对象
-            for commit in synced_commits:
-                await self.db.refresh(commit)
-            
-            # 更新仓库的最后提交时间
-            if synced_commits:
-                latest_commit = max(synced_commits, key=lambda c: c.commit_date)
-                repository.last_commit_at = latest_commit.commit_date
-            
-            # 更新用户统计
-            await self._update_user_stats(user)
-            
-            await self.db.commit()
+        if not synced_commits:
+            return synced_commits
         
-        logger.info(f"同步了 {len(synced_commits)} 个新提交 (仓库: {repository.repo_name})")
-        
-        return synced_commits
-    
-    async def _update_user_stats(self, user: User) -> None:
-        """
-        更新用户的统计数据
-        
-        Args:
-            user: 用户ORM对象
-        """
-        # 查询用户的所有提交
-        result = await self.db.execute(
-            select(CommitDetail).where(CommitDetail.user_id == user.id)
-        )
-        all_commits = result.scalars().all()
+        # 锁定用户行，同一用户的写入（定时同步、手动同步、推送事件）依次进行；
+        # 再加锁读取最新的已存在提交，排除流水线在更早的事务中筛选之后其他任务已写入的提交
+        if await self.user_stats.lock_user(user) is not None:
+            # 累计值来自仅聚合统计同步（例如推送事件先于提交详情同步到达），先完整重算再累加新提交
+            logger.info(f"用户 {user.username} 的统计来自仓库聚合统计，写入提交详情前完整重算")
+            await self.user_stats.rebuild(user)
+        existing_shas = await self._lock_existing_shas([commit.commit_sha for commit in synced_commits])
+        synced_commits = [commit for commit in synced_commits if commit.commit_sha not in existing_shas]
+        if not synced_commits:
+            await self.db.commit()
+            return synced_commits
         
-        if not all_commits:
-            return
+        rows = [
+            {
+                column: getattr(commit, column)
+                for column in (
+                    'user_id', 'repo_id', 'commit_sha', 'commit_message', 'commit_date',
+                    'additions', 'deletions', 'files_changed', 'primary_language',
+                    'commit_hour', 'commit_weekday', 'enriched'
+                )
+            }
+            for commit in synced_commits
+        ]
+        result = await self.db.execute(insert_ignore(CommitDetail, self.db).values(rows))
         
-        # 统计数据
-        user.total_commits = len(all_commits)
-        user.total_additions = sum(c.additions for c in all_commits)
-        user.total_deletions = sum(c.deletions for c in all_commits)
+        if result.rowcount is not None and 0 <= result.rowcount < len(rows):
+            logger.warning(
+                f"{len(rows) - result.rowcount} 个提交已被其他用户的同步任务写入 (仓库: {repository.repo_name})"
+            )
+            # 只累加本事务实际写入的行
+            inserted = await self._load_inserted_shas(user, [row['commit_sha'] for row in rows])
+            rows = [row for row in rows if row['commit_sha'] in inserted]
+            synced_commits = [commit for commit in synced_commits if commit.commit_sha in inserted]
         
-        # 统计最活跃语言
-        language_count = {}
-        for commit in all_commits:
-            if commit.primary_language:
-                language_count[commit.primary_language] = language_count.get(
-                    commit.primary_language, 0
-                ) + 1
+        if rows:
+            await self.user_stats.apply_commits(user, rows)
         
-        if language_count:
-            user.active_language = max(language_count, key=language_count.get)
+        await self.db.commit()
+        self.report_progress('commits', repo_name=repository.repo_name, count=len(synced_commits))
         
-        logger.debug(f"更新用户统计: {user.username} - {user.total_commits} commits")
+        return synced_commits
     
     async def sync_user_data(
         self,
@@ -287,11 +1173,15 @@ class DataSyncService:
         """
         完整同步用户数据（用户、仓库、提交）
         
+        上一次参数相同的同步被中断（进程退出、被限流、部分仓库失败）时继续该次运行：
+        已完成的仓库不再请求，其余仓库从检查点的分页游标继续。
+        
         Args:
             username: GitHub用户名
             max_repos: 最大同步仓库数（None表示全部）
             max_commits_per_repo: 每个仓库最大同步提交数
-            incremental: 是否启用增量同步（默认True）
+            incremental: 是否启用增量同步（默认True）：每个仓库从自己的同步水位开始获取，
+                自上次同步以来没有推送的仓库直接跳过
             
         Returns:
             同步结果统计
@@ -299,48 +1189,147 @@ class DataSyncService:
         logger.info(f"开始同步用户数据: {username} (增量模式: {incremental})")
         
         # 1. 同步用户
+        self.report_progress('stage', stage='user')
         user = await self.sync_user(username)
+        commit_authors = await self.apply_author_filter(user)
+        if user.aggregate_synced_at is not None:
+            # 累计值来自仅聚合统计同步，并行写入提交前先从 commit_details 完整重算
+            await self.user_stats.lock_user(user)
+            await self.user_stats.rebuild(user)
+            await self.db.commit()
         
-        # 2. 确定同步起始时间
-        since = None
-        if incremental and user.last_sync_at:
-            since = user.last_sync_at.isoformat()
-            logger.info(f"增量同步，起始时间: {since}")
+        # 增量同步前先检查事件流，确定上次同步以来推送过的仓库
+        newest_event_id, pushed = None, None
+        if incremental and self.events_precheck:
+            newest_event_id, pushed = await self.detect_changes(user)
+        
+        # 2. 确定同步模式（增量同步按每个仓库自己的水位获取）
+        last_sync_at = user.last_sync_at.isoformat() if user.last_sync_at else None
+        if incremental:
+            logger.info(f"增量同步，上次同步时间: {last_sync_at}")
         else:
             logger.info("全量同步")
         
-        # 3. 同步仓库
-        repos = await self.sync_repositories(user)
+        # 3. 同步仓库（事件流能确定变化范围时只取出这些仓库，不请求仓库列表）
+        self.report_progress('stage', stage='repositories')
+        repos = None
+        if pushed is not None:
+            repos = await self._load_changed_repositories(user, pushed)
+        if repos is None:
+            change_detection = 'full' if incremental and self.events_precheck else None
+            repos = await self.sync_repositories(user)
+        elif not repos:
+            return await self._finish_unchanged(user, username, newest_event_id, last_sync_at)
+        else:
+            change_detection = 'narrowed'
+            logger.info(f"事件流检测到 {len(repos)} 个需要同步的仓库")
         
         if max_repos:
             repos = repos[:max_repos]
         
-        # 4. 同步提交
-        total_commits = 0
+        # 4. 继续上次中断的同步运行，或开始新的运行
+        sync_run, checkpoints = await self.sync_runs.resume_or_start(
+            user, incremental, max_commits_per_repo, self.sync_strategy,
+            author_filter=commit_authors.fingerprint if commit_authors is not None else None
+        )
+        
+        # 5. 同步提交：跳过本次运行中已完成的仓库和自上次同步以来没有推送的仓库（不发起API请求），
+        #    从检查点继续的仓库沿用运行开始时的起始时间
+        pending_repos = []
+        resumed_repos = 0
         for repo in repos:
-            commits = await self.sync_commits(
-                user,
-                repo,
-                since=since,
-                max_commits=max_commits_per_repo
-            )
-            total_commits += len(commits)
+            checkpoint = checkpoints.get(repo.id)
+            if checkpoint is not None:
+                if checkpoint.status == 'completed':
+                    resumed_repos += 1
+                else:
+                    pending_repos.append((repo, checkpoint.since))
+            elif not (incremental and self.is_repository_unchanged(repo)):
+                pending_repos.append((repo, self.repository_since(repo) if incremental else None))
+        skipped_repos = len(repos) - len(pending_repos)
+        checkpoints = await self.sync_runs.add_repositories(sync_run, pending_repos, checkpoints)
+        self.report_progress('repositories', total=len(repos), pending=len(pending_repos), skipped=skipped_repos)
+        self.report_progress('stage', stage='commits')
+        
+        # 同时同步多个仓库，每个仓库使用独立会话，单个仓库失败不中断其他仓库
+        scheduler = RepoSyncScheduler(self, self.session_factory, self.repo_concurrency)
+        repo_result = await scheduler.run(
+            user, pending_repos, max_commits=max_commits_per_repo, checkpoints=checkpoints
+        )
+        total_commits = repo_result['total_commits']
+        await self.sync_runs.finish(sync_run, total_commits)
+        
+        if resumed_repos:
+            logger.info(f"同步运行 {sync_run.id} 中已完成的 {resumed_repos} 个仓库不再同步")
+        if skipped_repos > resumed_repos:
+            logger.info(f"跳过 {skipped_repos - resumed_repos} 个没有新推送的仓库")
+        
+        # 用户统计已在各仓库的会话中累加，重新读取
+        await self.db.refresh(user)
         
-        # 5. 更新最后同步时间
+        # 6. 更新最后同步时间和事件流位置（有仓库同步失败时不推进事件流位置，下次重新检测这些事件）
         user.last_sync_at = datetime.utcnow()
+        if newest_event_id is not None and not repo_result['failed_repos']:
+            user.last_event_id = newest_event_id
         await self.db.commit()
         
         result = {
             'username': username,
             'user_id': user.id,
             'total_repos_synced': len(repos),
+            'total_repos_skipped': skipped_repos,
+            'failed_repos': repo_result['failed_repos'],
             'total_commits_synced': total_commits,
             'total_additions': user.total_additions,
             'total_deletions': user.total_deletions,
-            'sync_mode': 'incremental' if (incremental and since) else 'full',
-            'since': since
+            'sync_mode': 'incremental' if (incremental and last_sync_at) else 'full',
+            'sync_strategy': self.sync_strategy,
+            'since': last_sync_at,
+            'sync_run_id': sync_run.id,
+            'resumed': sync_run.resume_count > 0,
+            'change_detection': change_detection,
+            'pipeline': repo_result['pipeline']
         }
         
         logger.info(f"完成用户数据同步: {result}")
         
-        return result
\ No newline at end of file
+        return result
+    
+    async def _finish_unchanged(
+        self,
+        user: User,
+        username: str,
+        newest_event_id: Optional[str],
+        last_sync_at: Optional[str]
+    ) -> Dict[str, Any]:
+        """
+        事件流中没有新推送且所有仓库都已同步到最新：不请求仓库列表和提交，直接结束同步
+        
+        Returns:
+            与sync_user_data结构一致的同步结果
+        """
+        logger.info(f"用户 {username} 自上次同步以来没有新推送，跳过同步")
+        self.report_progress('repositories', total=0, pending=0, skipped=0)
+        
+        user.last_sync_at = datetime.utcnow()
+        if newest_event_id is not None:
+            user.last_event_id = newest_event_id
+        await self.db.commit()
+        
+        return {
+            'username': username,
+            'user_id': user.id,
+            'total_repos_synced': 0,
+            'total_repos_skipped': 0,
+            'failed_repos': [],
+            'total_commits_synced': 0,
+            'total_additions': user.total_additions,
+            'total_deletions': user.total_deletions,
+            'sync_mode': 'incremental',
+            'sync_strategy': self.sync_strategy,
+            'since': last_sync_at,
+            'sync_run_id': None,
+            'resumed': False,
+            'change_detection': 'unchanged',
+            'pipeline': None
+        }
@@ -0,0 +1,299 @@
+"""
+本地Git镜像提交来源
+为可克隆的仓库维护本地裸仓库镜像，每次同步只需一次 git fetch，再用 git log --numstat
+流式读取完整历史的增删行数和文件列表，不消耗GitHub API配额，也无需逐个获取提交详情。
+
+镜像布局: <root>/<owner>/<repo>.git （只包含分支，HEAD指向默认分支）
+"""
+import asyncio
+import base64
+import logging
+import os
+import re
+from typing import Optional, List, Dict, Any, AsyncIterator, Iterable
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# git log 输出格式：记录分隔符 + SHA、作者时间、作者名称、作者邮箱（单元分隔符分隔）+ 完整提交消息 + 组分隔符
+# 提交消息可能跨多行，以组分隔符标记结束；随后是 --numstat 的逐文件统计行
+_RECORD = "\x1e"
+_FIELD = "\x1f"
+_MESSAGE_END = "\x1d"
+LOG_FORMAT = "%x1e%H%x1f%aI%x1f%an%x1f%ae%x1f%B%x1d"
+
+# 重命名文件的numstat路径: "src/{old => new}/a.py" 或 "old.py => new.py"
+RENAME_PATTERN = re.compile(r"\{([^{}]*) => ([^{}]*)\}")
+
+# git log --author 使用扩展正则，邮箱中的元字符需要转义
+ERE_SPECIAL = re.compile(r"([.\[\]()*+?{}|^$\\])")
+
+
+class GitMirrorError(Exception):
+    """Git镜像操作错误（克隆、拉取或读取历史失败）"""
+    pass
+
+
+class GitMirror:
+    """
+    本地Git镜像
+
+    使用示例:
+        mirror = GitMirror(token="ghp_xxx")
+        await mirror.update("octocat", "hello")
+        async for commits in mirror.iter_commits("octocat", "hello", since="2024-01-01T00:00:00Z"):
+            ...                     # 每批最多batch_size个提交记录
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        url_template: Optional[str] = None,
+        token: Optional[str] = None,
+        timeout: Optional[float] = None,
+        batch_size: int = 100
+    ):
+        """
+        Args:
+            root: 镜像根目录，默认使用配置中的GIT_MIRROR_PATH
+            url_template: 克隆地址模板（{owner}、{repo}占位），默认使用配置中的GIT_MIRROR_URL_TEMPLATE；
+                测试时可指向本地仓库目录
+            token: 克隆私有仓库使用的GitHub Token（通过环境变量传给git，不写入镜像配置）
+            timeout: 单次克隆或拉取的超时时间（秒），默认使用配置中的GIT_MIRROR_TIMEOUT
+            batch_size: iter_commits每批产出的提交数
+        """
+        self.root = root or settings.GIT_MIRROR_PATH
+        self.url_template = url_template or settings.GIT_MIRROR_URL_TEMPLATE
+        self.token = token
+        self.timeout = timeout or settings.GIT_MIRROR_TIMEOUT
+        self.batch_size = batch_size
+        # 同一镜像同时只允许一次克隆或拉取
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def mirror_path(self, owner: str, repo: str) -> str:
+        """仓库镜像的目录路径"""
+        return os.path.join(self.root, owner, f"{repo}.git")
+
+    def _env(self) -> Dict[str, str]:
+        """git子进程的环境变量：禁止交互式输入凭据，Token以请求头方式提供"""
+        env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+        if self.token:
+            credentials = base64.b64encode(f"x-access-token:{self.token}".encode()).decode()
+            env.update({
+                "GIT_CONFIG_COUNT": "1",
+                "GIT_CONFIG_KEY_0": "http.extraHeader",
+                "GIT_CONFIG_VALUE_0": f"Authorization: Basic {credentials}",
+            })
+        return env
+
+    async def _run_git(self, *args: str, timeout: Optional[float] = None) -> str:
+        """
+        执行git命令并返回标准输出
+
+        Raises:
+            GitMirrorError: 命令失败或超时
+        """
+        process = await asyncio.create_subprocess_exec(
+            "git", *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=self._env()
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise GitMirrorError(f"git {args[0]} 超时（{timeout}秒）")
+        except asyncio.CancelledError:
+            process.kill()
+            await process.wait()
+            raise
+        if process.returncode != 0:
+            message = stderr.decode("utf-8", errors="replace").strip()
+            raise GitMirrorError(f"git {args[0]} 失败: {message}")
+        return stdout.decode("utf-8", errors="replace")
+
+    async def update(self, owner: str, repo: str) -> str:
+        """
+        克隆或拉取仓库镜像（只获取分支，不获取Pull Request等其他引用）
+
+        Args:
+            owner: 仓库所有者
+            repo: 仓库名称
+
+        Returns:
+            镜像目录路径
+
+        Raises:
+            GitMirrorError: 克隆或拉取失败（如仓库不可访问）
+        """
+        path = self.mirror_path(owner, repo)
+        lock = self._locks.setdefault(path, asyncio.Lock())
+        async with lock:
+            if os.path.isdir(path):
+                await self._run_git(
+                    "--git-dir", path, "fetch", "--prune", "--quiet",
+                    "origin", "+refs/heads/*:refs/heads/*",
+                    timeout=self.timeout
+                )
+                logger.info(f"已拉取镜像 {owner}/{repo}")
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                url = self.url_template.format(owner=owner, repo=repo)
+                await self._run_git("clone", "--bare", "--quiet", url, path, timeout=self.timeout)
+                logger.info(f"已克隆镜像 {owner}/{repo}")
+        return path
+
+    async def resolve_head(self, owner: str, repo: str) -> Optional[str]:
+        """
+        获取镜像默认分支最新提交的SHA
+
+        Returns:
+            SHA，空仓库返回None
+        """
+        try:
+            output = await self._run_git(
+                "--git-dir", self.mirror_path(owner, repo),
+                "rev-parse", "--verify", "--quiet", "HEAD^{commit}"
+            )
+        except GitMirrorError:
+            return None
+        return output.strip() or None
+
+    @staticmethod
+    def author_pattern(email: str) -> str:
+        """把邮箱转换为 git log --author 的扩展正则（匹配 "名称 <邮箱>" 中的邮箱）"""
+        escaped = ERE_SPECIAL.sub(r"\\\1", email)
+        return f"<{escaped}>"
+
+    async def iter_commits(
+        self,
+        owner: str,
+        repo: str,
+        rev: str = "HEAD",
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        max_commits: Optional[int] = None,
+        skip: int = 0,
+        authors: Optional[Iterable[str]] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        流式读取 git log --numstat 的输出，逐批产出提交记录（异步生成器）
+
+        调用方提前停止迭代时终止git进程。
+
+        Args:
+            owner: 仓库所有者
+            repo: 仓库名称
+            rev: 起点提交（默认为默认分支HEAD；继续同步时传入固定的SHA，保证skip有效）
+            since: 起始时间（ISO 8601格式）
+            until: 结束时间（ISO 8601格式）
+            max_commits: 最大提交数量，None表示全部
+            skip: 跳过前skip个提交
+            authors: 作者过滤的扩展正则列表（任意一个匹配即可，见author_pattern）
+
+        Yields:
+            提交记录列表，每个记录包含sha、message、author_name、author_email、
+            commit_date（带时区）和files（filename、additions、deletions，二进制文件为0）
+        """
+        args = [
+            "--git-dir", self.mirror_path(owner, repo),
+            # -M：重命名按一个文件统计（与GitHub API一致）
+            "log", rev, "--numstat", "-M", f"--format={LOG_FORMAT}", "--no-color",
+        ]
+        if since:
+            args.append(f"--since={since}")
+        if until:
+            args.append(f"--until={until}")
+        if max_commits:
+            args.append(f"--max-count={max_commits}")
+        if skip:
+            args.append(f"--skip={skip}")
+        authors = list(authors or ())
+        if authors:
+            args += ["--extended-regexp", "--regexp-ignore-case"]
+            args += [f"--author={pattern}" for pattern in authors]
+        args.append("--")
+
+        process = await asyncio.create_subprocess_exec(
+            "git", *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=self._env(),
+            limit=1 << 20  # 单行（如超长的提交消息行）最多1MB
+        )
+        batch: List[Dict[str, Any]] = []
+        commit: Optional[Dict[str, Any]] = None
+        message_lines: Optional[List[str]] = None
+        try:
+            async for raw_line in process.stdout:
+                line = raw_line.decode("utf-8", errors="replace").rstrip("\n")
+
+                if message_lines is not None:
+                    # 多行提交消息，直到组分隔符为止
+                    text, end, _ = line.partition(_MESSAGE_END)
+                    message_lines.append(text)
+                    if end:
+                        commit["message"] = "\n".join(message_lines).strip()
+                        message_lines = None
+                    continue
+
+                if line.startswith(_RECORD):
+                    if commit is not None:
+                        batch.append(commit)
+                        if len(batch) >= self.batch_size:
+                            yield batch
+                            batch = []
+                    sha, date, name, email, message = line[1:].split(_FIELD, 4)
+                    commit = {
+                        "sha": sha,
+                        "commit_date": date,
+                        "author_name": name,
+                        "author_email": email,
+                        "message": "",
+                        "files": [],
+                    }
+                    text, end, _ = message.partition(_MESSAGE_END)
+                    if end:
+                        commit["message"] = text.strip()
+                    else:
+                        message_lines = [text]
+                    continue
+
+                if line and commit is not None:
+                    commit["files"].append(self._parse_numstat(line))
+
+            if commit is not None:
+                batch.append(commit)
+            if batch:
+                yield batch
+
+            stderr = await process.stderr.read()
+            if await process.wait() != 0:
+                message = stderr.decode("utf-8", errors="replace").strip()
+                raise GitMirrorError(f"git log 失败 ({owner}/{repo}): {message}")
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+
+    @staticmethod
+    def _parse_numstat(line: str) -> Dict[str, Any]:
+        """
+        解析一行numstat输出: "新增\\t删除\\t路径"
+
+        二进制文件的行数为 "-"，按0计；重命名的文件取新路径。
+        """
+        additions, deletions, path = line.split("\t", 2)
+        if " => " in path:
+            if "{" in path:
+                path = RENAME_PATTERN.sub(lambda m: m.group(2), path).replace("//", "/")
+            else:
+                path = path.split(" => ", 1)[1]
+        return {
+            "filename": path,
+            "additions": int(additions) if additions.isdigit() else 0,
+            "deletions": int(deletions) if deletions.isdigit() else 0,
+        }
@@ -5,13 +5,51 @@ GitHub API客户端
 import httpx
 import logging
 import asyncio
-from typing import Optional, Dict, Any, List
+import re
+from collections import deque
+from urllib.parse import urlparse, parse_qs
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator
+from contextlib import aclosing
 from datetime import datetime, timedelta
 
 from app.core.config import settings
+from app.services.response_cache import ResponseCache, CachedResponse, create_response_cache
+from app.services.commit_store import CommitStore, create_commit_store
+from app.services.token_pool import TokenPool
+from app.services.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# GraphQL提交历史查询：每个提交直接返回增删行数和变更文件数
+COMMIT_HISTORY_QUERY = """
+query($owner: String!, $name: String!, $first: Int!, $after: String,
+      $since: GitTimestamp, $until: GitTimestamp, $author: CommitAuthor) {
+  repository(owner: $owner, name: $name) {
+    defaultBranchRef {
+      target {
+        ... on Commit {
+          history(first: $first, after: $after, since: $since, until: $until, author: $author) {
+            pageInfo { hasNextPage endCursor }
+            nodes {
+              oid
+              message
+              committedDate
+              additions
+              deletions
+              changedFilesIfAvailable
+              author { name email date user { login } }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+# Link响应头中的单个链接: <url>; rel="next"
+LINK_PATTERN = re.compile(r'<([^>]+)>;\s*rel="([^"]+)"')
+
 
 class GitHubAPIError(Exception):
     """GitHub API错误基类"""
@@ -28,6 +66,29 @@ class AuthenticationError(GitHubAPIError):
     pass
 
 
+class GitHubResponse:
+    """GitHub API响应：解析后的JSON数据及响应头"""
+    
+    def __init__(
+        self,
+        data: Any,
+        headers: httpx.Headers,
+        status_code: int,
+        from_cache: bool = False
+    ):
+        """
+        Args:
+            data: 响应JSON数据
+            headers: 响应头（大小写不敏感）
+            status_code: HTTP状态码（命中条件请求缓存时为304）
+            from_cache: 数据是否来自条件请求缓存
+        """
+        self.data = data
+        self.headers = headers
+        self.status_code = status_code
+        self.from_cache = from_cache
+
+
 class GitHubClient:
     """
     GitHub API客户端
@@ -35,45 +96,111 @@ class GitHubClient:
     使用示例:
         client = GitHubClient(token="ghp_xxx")
         repos = await client.get_user_repos("username")
+        
+        # 多个Token：每次请求使用剩余配额最多的Token
+        client = GitHubClient(tokens=["ghp_a", "ghp_b"])
     """
     
     BASE_URL = "https://api.github.com"
+    DEFAULT_HEADERS = {
+        "Accept": "application/vnd.github.v3+json",
+        "User-Agent": "GitHub-Monitor-App",
+    }
     
-    def __init__(self, token: Optional[str] = None, auto_retry: bool = True):
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        auto_retry: bool = True,
+        base_url: Optional[str] = None,
+        graphql_url: Optional[str] = None,
+        cache: Optional[ResponseCache] = None,
+        commit_store: Optional[CommitStore] = None,
+        tokens: Optional[List[str]] = None,
+        token_pool: Optional[TokenPool] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        single_flight: Optional[SingleFlight] = None,
+        request_limiter: Optional[asyncio.Semaphore] = None
+    ):
         """
         初始化GitHub客户端
         
         Args:
             token: GitHub Personal Access Token，如果不提供则从配置读取
+                （GITHUB_TOKENS与GITHUB_TOKEN组成Token池）
             auto_retry: 是否在遇到速率限制时自动重试
+            base_url: API根地址，默认使用配置中的GITHUB_API_URL（测试时可指向本地模拟服务）
+            graphql_url: GraphQL端点，默认使用配置中的GITHUB_GRAPHQL_URL；
+                指定了base_url时默认为 {base_url}/graphql
+            cache: 条件请求缓存后端，默认按配置GITHUB_CACHE_BACKEND创建
+            commit_store: 提交详情本地存储，默认按配置COMMIT_STORE_ENABLED创建
+            tokens: 多个Token，按各自剩余配额分配请求
+            token_pool: 共享的Token池（多个客户端共用配额记录）
+            http_client: 共享的HTTP客户端（连接池），由调用方负责关闭；
+                不提供时创建独立的HTTP客户端，并在close()时关闭
+            single_flight: 共享的请求合并器（多个客户端合并相同的并发GET请求）
+            request_limiter: 共享的并发请求上限（多个客户端、多个仓库同时同步时共用），
+                默认按配置GITHUB_MAX_CONCURRENT_REQUESTS创建
         """
-        self.token = token or settings.GITHUB_TOKEN
+        if token_pool is not None:
+            self.token_pool = token_pool
+        elif tokens or token:
+            self.token_pool = TokenPool(tokens or [token])
+        else:
+            self.token_pool = TokenPool.from_settings()
+        
+        self.token = self.token_pool.tokens[0]
         if not self.token:
             logger.warning("GitHub Token未配置，API请求将受限（60次/小时）")
         
         self.auto_retry = auto_retry
-        self.rate_limit_info = {
-            'remaining': None,
-            'limit': None,
-            'reset': None
+        
+        if graphql_url:
+            self.graphql_url = graphql_url
+        elif base_url:
+            self.graphql_url = f"{base_url.rstrip('/')}/graphql"
+        else:
+            self.graphql_url = settings.GITHUB_GRAPHQL_URL
+        
+        # 条件请求缓存：GET请求携带ETag/Last-Modified，304响应直接返回缓存内容
+        self.cache = cache if cache is not None else create_response_cache()
+        self.cache_stats = {
+            'hits': 0,  # 304命中缓存（不消耗配额）
+            'misses': 0,  # 缓存中无可用校验值
+            'stores': 0  # 写入缓存次数
         }
         
-        # 配置HTTP客户端
-        self.headers = {
-            "Accept": "application/vnd.github.v3+json",
-            "User-Agent": "GitHub-Monitor-App",
+        # 提交详情本地存储：同一SHA的详情不可变，命中时不发起网络请求
+        self.commit_store = commit_store if commit_store is not None else create_commit_store()
+        self.store_stats = {
+            'hits': 0,
+            'misses': 0
         }
         
-        if self.token:
-            self.headers["Authorization"] = f"token {self.token}"
+        # 请求合并：相同的并发GET请求只发起一次网络调用
+        self.single_flight = single_flight if single_flight is not None else SingleFlight()
         
-        # 创建异步HTTP客户端
-        self.client = httpx.AsyncClient(
-            base_url=self.BASE_URL,
-            headers=self.headers,
-            timeout=30.0,
-            follow_redirects=True
+        # 同时进行中的网络请求上限（并行同步多个仓库时共用）
+        self.request_limiter = (
+            request_limiter if request_limiter is not None
+            else asyncio.Semaphore(settings.GITHUB_MAX_CONCURRENT_REQUESTS)
         )
+        
+        # 配置HTTP客户端（Authorization按请求分配的Token设置）
+        self.headers = dict(self.DEFAULT_HEADERS)
+        
+        if http_client is not None:
+            # 使用共享连接池，关闭时不关闭共享客户端
+            self.client = http_client
+            self._owns_client = False
+        else:
+            # 创建异步HTTP客户端
+            self.client = httpx.AsyncClient(
+                base_url=base_url or settings.GITHUB_API_URL or self.BASE_URL,
+                headers=self.headers,
+                timeout=30.0,
+                follow_redirects=True
+            )
+            self._owns_client = True
     
     async def _request(
         self,
@@ -81,7 +208,8 @@ class GitHubClient:
         endpoint: str,
         params: Optional[Dict[str, Any]] = None,
         json_data: Optional[Dict[str, Any]] = None,
-        max_retries: int = 3
+        max_retries: int = 3,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """
         发送HTTP请求到GitHub API（支持自动重试）
@@ -92,6 +220,7 @@ class GitHubClient:
             params: URL查询参数
             json_data: JSON请求体
             max_retries: 最大重试次数
+            use_cache: GET请求是否使用条件请求缓存（内容已另行持久化时不必缓存）
             
         Returns:
             响应JSON数据
@@ -101,23 +230,112 @@ class GitHubClient:
             AuthenticationError: 认证失败
             GitHubAPIError: 其他API错误
         """
+        response = await self._send(method, endpoint, params, json_data, max_retries, use_cache)
+        return response.data
+    
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        json_data: Optional[Dict[str, Any]] = None,
+        max_retries: int = 3,
+        use_cache: bool = True
+    ) -> GitHubResponse:
+        """
+        发送HTTP请求到GitHub API，返回数据和响应头（支持自动重试）
+        
+        Args:
+            method: HTTP方法（GET, POST等）
+            endpoint: API端点（如 /user/repos）
+            params: URL查询参数
+            json_data: JSON请求体
+            max_retries: 最大重试次数
+            use_cache: GET请求是否使用条件请求缓存（内容已另行持久化时不必缓存）
+            
+        Returns:
+            GitHubResponse响应对象
+            
+        Raises:
+            RateLimitError: 速率限制超限且未启用自动重试
+            AuthenticationError: 认证失败
+            GitHubAPIError: 其他API错误
+        """
+        if method.upper() != "GET":
+            return await self._execute(method, endpoint, params, json_data, max_retries, use_cache)
+        
+        # 相同凭据下相同的并发GET请求只发起一次网络调用；不同凭据的请求各自发起，
+        # 调用方不会收到用其他Token获取的数据（如私有仓库）或其他Token的认证/限流错误
+        key = self._request_key(method, endpoint, params)
+        return await self.single_flight.do(
+            key,
+            lambda: self._execute(method, endpoint, params, json_data, max_retries, use_cache)
+        )
+    
+    async def _execute(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        json_data: Optional[Dict[str, Any]] = None,
+        max_retries: int = 3,
+        use_cache: bool = True
+    ) -> GitHubResponse:
+        """
+        实际发送请求（不经过请求合并），参数与返回值同_send
+        """
         retries = 0
         
+        # GraphQL请求使用独立的配额
+        resource = "graphql" if endpoint == self.graphql_url else "core"
+        
+        # 仅GET请求使用条件请求缓存
+        cache_key = None
+        cached = None
+        if self.cache is not None and use_cache and method.upper() == "GET":
+            cache_key = self._request_key(method, endpoint, params)
+            cached = await self.cache.get(cache_key)
+            if cached is None:
+                self.cache_stats['misses'] += 1
+        
         while retries <= max_retries:
+            # 选择剩余配额最多的Token（全部耗尽时等待重置）
+            state = await self.token_pool.acquire(resource, wait=self.auto_retry)
+            response = None
             try:
-                # 检查是否需要等待速率限制重置
-                if self.auto_retry:
-                    await self._check_rate_limit()
+                headers = cached.validator_headers() if cached else {}
+                if state.token:
+                    headers["Authorization"] = f"token {state.token}"
                 
-                response = await self.client.request(
-                    method=method,
-                    url=endpoint,
-                    params=params,
-                    json=json_data
-                )
+                try:
+                    async with self.request_limiter:
+                        response = await self.client.request(
+                            method=method,
+                            url=endpoint,
+                            params=params,
+                            json=json_data,
+                            headers=headers
+                        )
+                finally:
+                    # 归还Token并更新其速率限制信息
+                    self.token_pool.release(
+                        state,
+                        response.headers if response is not None else None,
+                        resource
+                    )
                 
-                # 更新速率限制信息
-                self._update_rate_limit(response.headers)
+                # 资源未变化，直接返回缓存内容（不计入速率限制）
+                if response.status_code == 304 and cached is not None:
+                    self.cache_stats['hits'] += 1
+                    logger.debug(f"条件请求命中缓存: {endpoint}")
+                    headers = httpx.Headers(cached.headers)
+                    headers.update(response.headers)
+                    return GitHubResponse(
+                        data=cached.json(),
+                        headers=headers,
+                        status_code=304,
+                        from_cache=True
+                    )
                 
                 # 处理错误响应
                 if response.status_code == 401:
@@ -125,10 +343,16 @@ class GitHubClient:
                 
                 if response.status_code == 403:
                     if "rate limit" in response.text.lower():
+                        reset = response.headers.get("X-RateLimit-Reset")
+                        self.token_pool.mark_exhausted(state, resource, int(reset) if reset else None)
                         if self.auto_retry and retries < max_retries:
-                            wait_time = self._calculate_wait_time()
-                            logger.warning(f"遇到速率限制，等待 {wait_time} 秒后重试...")
-                            await asyncio.sleep(wait_time)
+                            # 其他Token仍有配额时立即切换，否则等待最早的配额重置
+                            if self.token_pool.has_budget(resource):
+                                logger.warning(f"Token {state.name} 遇到速率限制，切换Token重试...")
+                            else:
+                                wait_time = self._calculate_wait_time(resource)
+                                logger.warning(f"遇到速率限制，等待 {wait_time} 秒后重试...")
+                                await asyncio.sleep(wait_time)
                             retries += 1
                             continue
                         raise RateLimitError("API速率限制已达上限")
@@ -143,7 +367,16 @@ class GitHubClient:
                     )
                 
                 response.raise_for_status()
-                return response.json()
+                
+                # 202（统计计算中）的响应体不是最终结果，不缓存
+                if cache_key is not None and response.status_code == 200:
+                    await self._store_response(cache_key, response)
+                
+                return GitHubResponse(
+                    data=response.json() if response.content else None,
+                    headers=response.headers,
+                    status_code=response.status_code
+                )
                 
             except httpx.HTTPError as e:
                 if retries < max_retries:
@@ -156,67 +389,80 @@ class GitHubClient:
         
         raise GitHubAPIError(f"请求失败，已达最大重试次数 ({max_retries})")
     
-    def _update_rate_limit(self, headers: Dict[str, str]) -> None:
+    def _request_key(self, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None) -> str:
         """
-        更新速率限制信息
+        生成请求的缓存键，按Token池指纹区分凭据：
+        一个Token获取的响应（包括私有仓库的数据）不会返回给使用其他Token的调用方
         
         Args:
-            headers: HTTP响应头
-        """
-        remaining = headers.get("X-RateLimit-Remaining")
-        limit = headers.get("X-RateLimit-Limit")
-        reset_timestamp = headers.get("X-RateLimit-Reset")
-        
-        if remaining and limit:
-            self.rate_limit_info['remaining'] = int(remaining)
-            self.rate_limit_info['limit'] = int(limit)
-            
-            if reset_timestamp:
-                self.rate_limit_info['reset'] = int(reset_timestamp)
-                reset_time = datetime.fromtimestamp(int(reset_timestamp))
-                logger.debug(f"配额重置时间: {reset_time}")
-            
-            logger.debug(f"API配额: {remaining}/{limit} 剩余")
+            method: HTTP方法
+            endpoint: API端点
+            params: URL查询参数
             
-            # 警告：配额即将用尽
-            if int(remaining) < 100:
-                logger.warning(f"⚠️  API配额不足: {remaining}/{limit}")
+        Returns:
+            缓存键
+        """
+        return ResponseCache.make_key(
+            method, f"{self.client.base_url}{endpoint}", params, scope=self.token_pool.fingerprint
+        )
     
-    async def _check_rate_limit(self) -> None:
+    async def _store_response(self, cache_key: str, response: httpx.Response) -> None:
         """
-        检查速率限制，如果配额不足则等待
+        将带有校验值的响应写入缓存
+        
+        Args:
+            cache_key: 缓存键
+            response: HTTP响应
         """
-        if self.rate_limit_info['remaining'] is not None:
-            if self.rate_limit_info['remaining'] < 10:  # 剩余配额低于10
-                wait_time = self._calculate_wait_time()
-                if wait_time > 0:
-                    logger.warning(f"API配额不足，等待 {wait_time} 秒...")
-                    await asyncio.sleep(wait_time)
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        
+        # 分页信息随缓存保存，304时仍可据此并发获取后续页
+        cached_headers = {}
+        if "Link" in response.headers:
+            cached_headers["Link"] = response.headers["Link"]
+        
+        await self.cache.set(cache_key, CachedResponse(
+            body=response.content,
+            etag=etag,
+            last_modified=last_modified,
+            headers=cached_headers
+        ))
+        self.cache_stats['stores'] += 1
+    
+    @property
+    def rate_limit_info(self) -> Dict[str, Any]:
+        """REST配额汇总（各Token剩余配额之和）"""
+        return self.token_pool.status()
+    
+    @property
+    def resource_rate_limits(self) -> Dict[str, Dict[str, Any]]:
+        """其他速率限制资源（如graphql）的配额汇总，不影响REST配额判断"""
+        return self.token_pool.resource_status()
     
-    def _calculate_wait_time(self) -> int:
+    def _calculate_wait_time(self, resource: str = "core") -> int:
         """
-        计算需要等待的时间（秒）
+        计算需要等待的时间（秒），即最早有Token配额重置的时间
         
+        Args:
+            resource: 速率限制资源
+            
         Returns:
             等待时间（秒）
         """
-        if self.rate_limit_info['reset'] is None:
-            return 60  # 默认等待60秒
-        
-        now = datetime.now().timestamp()
-        reset_time = self.rate_limit_info['reset']
-        
-        wait_time = max(0, int(reset_time - now) + 5)  # 额外等待5秒确保配额已重置
-        return wait_time
+        return self.token_pool.wait_time(resource)
     
     def get_rate_limit_status(self) -> Dict[str, Any]:
         """
         获取当前速率限制状态（本地缓存）
         
         Returns:
-            速率限制状态字典
+            速率限制状态字典：remaining/limit为Token池中各Token之和，
+            reset为最早的重置时间，tokens为各Token明细
         """
-        status = self.rate_limit_info.copy()
+        status = self.token_pool.status()
         
         if status['reset']:
             status['reset_time'] = datetime.fromtimestamp(status['reset']).isoformat()
@@ -245,6 +491,35 @@ class GitHubClient:
         """
         return await self._request("GET", f"/users/{username}")
     
+    async def iter_user_repos(
+        self,
+        username: str,
+        type: str = "all",
+        sort: str = "updated",
+        per_page: int = 100
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        逐页获取用户的仓库列表（异步生成器）
+        
+        Args:
+            username: GitHub用户名
+            type: 仓库类型 (all, owner, member) 默认all
+            sort: 排序方式 (created, updated, pushed, full_name) 默认updated
+            per_page: 每页数量，最大100
+            
+        Yields:
+            每页的仓库列表
+        """
+        params = {
+            "type": type,
+            "sort": sort
+        }
+        
+        pages = self.iter_pages(f"/users/{username}/repos", params, per_page)
+        async with aclosing(pages):
+            async for batch in pages:
+                yield batch
+    
     async def get_user_repos(
         self,
         username: str,
@@ -265,32 +540,122 @@ class GitHubClient:
             仓库列表
         """
         repos = []
-        page = 1
         
-        while True:
-            params = {
-                "type": type,
-                "sort": sort,
-                "per_page": per_page,
-                "page": page
-            }
-            
-            batch = await self._request("GET", f"/users/{username}/repos", params=params)
-            
-            if not batch:
-                break
-            
+        async for batch in self.iter_user_repos(username, type=type, sort=sort, per_page=per_page):
             repos.extend(batch)
-            
-            # 如果返回数量小于per_page，说明已经是最后一页
-            if len(batch) < per_page:
-                break
-            
-            page += 1
         
         logger.info(f"获取到 {len(repos)} 个仓库 (用户: {username})")
         return repos
     
+    async def get_user_events(
+        self,
+        username: str,
+        page: int = 1,
+        per_page: int = 100
+    ) -> GitHubResponse:
+        """
+        获取用户的事件流（按时间从新到旧，最多300个、90天内的事件）
+        
+        认证用户查询自己时包含私有仓库的事件。请求携带ETag：事件流没有变化时
+        GitHub返回304，响应的from_cache为True，不消耗速率限制配额。
+        
+        Args:
+            username: GitHub用户名
+            page: 页码
+            per_page: 每页数量，最大100
+            
+        Returns:
+            GitHubResponse响应对象，data为事件列表
+        """
+        return await self._send(
+            "GET",
+            f"/users/{username}/events",
+            params={"page": page, "per_page": per_page}
+        )
+    
+    async def get_contributor_stats(self, owner: str, repo: str) -> GitHubResponse:
+        """
+        获取仓库按作者、按周的提交统计（/stats/contributors），一个请求覆盖仓库的全部历史
+        
+        GitHub在后台计算统计：尚未计算好时返回202，稍后重新请求即可；空仓库返回204（data为None）。
+        只包含关联到GitHub账号的作者；提交数超过10000的仓库增删行数为0。
+        
+        Args:
+            owner: 仓库所有者
+            repo: 仓库名称
+            
+        Returns:
+            GitHubResponse响应对象，status_code为200时data为贡献者列表，每项包含author、total和
+            weeks（w为周起始的Unix时间戳，a/d/c为该周的新增行数、删除行数和提交数）
+        """
+        return await self._send("GET", f"/repos/{owner}/{repo}/stats/contributors")
+    
+    async def iter_repo_commits(
+        self,
+        owner: str,
+        repo: str,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        per_page: int = 100,
+        max_commits: Optional[int] = None,
+        start_page: int = 1,
+        author: Optional[str] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        逐页获取仓库的提交历史（异步生成器）
+        
+        调用方处理当前页时，后续页已在后台请求，网络I/O与数据库写入可以重叠；
+        驻留内存的页数受并发数限制。
+        
+        Args:
+            owner: 仓库所有者
+            repo: 仓库名称
+            since: 起始时间 (ISO 8601格式, 例如: 2024-01-01T00:00:00Z)
+            until: 结束时间 (ISO 8601格式)
+            per_page: 每页数量，最大100
+            max_commits: 最大获取提交数量，None表示获取所有
+            start_page: 起始页码（从检查点继续时使用）
+            author: 只列出该作者的提交（GitHub登录名或提交作者邮箱）
+            
+        Yields:
+            每页的提交列表（仓库为空或不存在时不产生任何数据）
+        """
+        params = {}
+        
+        if since:
+            params["since"] = since
+        if until:
+            params["until"] = until
+        if author:
+            params["author"] = author
+        
+        fetched = 0
+        
+        pages = self.iter_pages(
+            f"/repos/{owner}/{repo}/commits",
+            params,
+            per_page,
+            max_items=max_commits or None,
+            start_page=start_page
+        )
+        
+        try:
+            async with aclosing(pages):
+                async for batch in pages:
+                    # 如果设置了最大提交数，截断并停止
+                    if max_commits and fetched + len(batch) >= max_commits:
+                        yield batch[:max_commits - fetched]
+                        return
+                    
+                    fetched += len(batch)
+                    yield batch
+        except GitHubAPIError as e:
+            # 如果仓库为空或无提交，不返回数据
+            if "资源不存在" in str(e) or "404" in str(e):
+                logger.warning(f"仓库 {owner}/{repo} 无提交或不存在")
+                return
+            raise
+    
     async def get_repo_commits(
         self,
         owner: str,
@@ -298,7 +663,8 @@ class GitHubClient:
         since: Optional[str] = None,
         until: Optional[str] = None,
         per_page: int = 100,
-        max_commits: Optional[int] = None
+        max_commits: Optional[int] = None,
+        author: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         获取仓库的提交历史
@@ -310,55 +676,349 @@ class GitHubClient:
             until: 结束时间 (ISO 8601格式)
             per_page: 每页数量，最大100
             max_commits: 最大获取提交数量，None表示获取所有
+            author: 只获取该作者的提交（GitHub登录名或提交作者邮箱）
             
         Returns:
             提交列表
         """
         commits = []
-        page = 1
         
-        while True:
-            params = {
-                "per_page": per_page,
-                "page": page
-            }
+        async for batch in self.iter_repo_commits(
+            owner,
+            repo,
+            since=since,
+            until=until,
+            per_page=per_page,
+            max_commits=max_commits,
+            author=author
+        ):
+            commits.extend(batch)
+        
+        logger.info(f"获取到 {len(commits)} 个提交 (仓库: {owner}/{repo})")
+        return commits
+    
+    @staticmethod
+    def _parse_last_page(link_header: Optional[str]) -> Optional[int]:
+        """
+        从Link响应头中解析最后一页的页码
+        
+        Args:
+            link_header: Link响应头，如 <https://api.github.com/...&page=5>; rel="last"
+            
+        Returns:
+            最后一页页码，没有rel="last"时返回None
+        """
+        if not link_header:
+            return None
+        
+        for part in link_header.split(","):
+            match = LINK_PATTERN.search(part)
+            if match and match.group(2) == "last":
+                page = parse_qs(urlparse(match.group(1)).query).get("page")
+                if page and page[0].isdigit():
+                    return int(page[0])
+        return None
+    
+    async def iter_pages(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        per_page: int = 100,
+        max_items: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        start_page: int = 1
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        按页码顺序获取分页端点的全部数据（异步生成器）
+        
+        第一页返回后，若Link响应头包含rel="last"，剩余页以有限并发同时请求，
+        并按页码顺序产出；否则逐页请求，并在产出当前页前预取下一页。
+        任意时刻驻留内存的页数不超过并发数+1。
+        
+        Args:
+            endpoint: API端点
+            params: 查询参数（不含page）
+            per_page: 每页数量，返回数量小于该值时视为最后一页
+            max_items: 累计获取达到该数量后不再请求后续页
+            concurrency: 最大并发请求页数，默认使用配置中的GITHUB_PAGE_CONCURRENCY
+            start_page: 起始页码（从检查点继续时跳过已处理的页）
+            
+        Yields:
+            每页数据（空页不产出），第N次产出的是第 start_page+N-1 页
+        """
+        params = {**(params or {}), "per_page": per_page}
+        concurrency = concurrency or settings.GITHUB_PAGE_CONCURRENCY
+        
+        def fetch(page: int):
+            return self._request("GET", endpoint, params={**params, "page": page})
+        
+        first = await self._send("GET", endpoint, params={**params, "page": start_page})
+        batch = first.data
+        if not batch:
+            return
+        
+        # 计算还需要请求的最后一页
+        last_page = self._parse_last_page(first.headers.get("Link"))
+        if max_items:
+            max_pages = -(-max_items // per_page)
+            if last_page is not None:
+                last_page = min(last_page, start_page + max_pages - 1)
+        
+        if len(batch) < per_page or (max_items and len(batch) >= max_items):
+            yield batch
+            return
+        
+        pending = deque()
+        next_page = start_page + 1
+        fetched = len(batch)
+        
+        try:
+            yield batch
+            
+            while True:
+                if last_page is not None:
+                    # 已知总页数：以滑动窗口并发请求剩余页
+                    while next_page <= last_page and len(pending) < concurrency:
+                        pending.append(asyncio.create_task(fetch(next_page)))
+                        next_page += 1
+                elif not pending:
+                    # 未知总页数：逐页请求（预取下一页）
+                    pending.append(asyncio.create_task(fetch(next_page)))
+                    next_page += 1
+                
+                if not pending:
+                    break
+                
+                batch = await pending.popleft()
+                if not batch:
+                    break
+                
+                fetched += len(batch)
+                is_last = len(batch) < per_page or (max_items and fetched >= max_items)
+                
+                if last_page is None and not is_last:
+                    pending.append(asyncio.create_task(fetch(next_page)))
+                    next_page += 1
+                
+                yield batch
+                
+                if is_last:
+                    break
+        finally:
+            # 提前结束（调用方停止迭代、出错或已到最后一页）时取消未完成的请求，
+            # 并等待它们结束（取回异常，避免任务在后台继续运行或被销毁时告警）
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+    
+    async def paginate(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        per_page: int = 100,
+        max_items: Optional[int] = None,
+        concurrency: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        获取分页端点的全部数据并按顺序合并
+        
+        Args:
+            endpoint: API端点
+            params: 查询参数（不含page）
+            per_page: 每页数量
+            max_items: 最大获取数量，None表示获取所有
+            concurrency: 最大并发请求页数
+            
+        Returns:
+            合并后的数据列表
+        """
+        items = []
+        pages = self.iter_pages(endpoint, params, per_page, max_items, concurrency)
+        async with aclosing(pages):
+            async for batch in pages:
+                items.extend(batch)
+        return items[:max_items] if max_items else items
+    
+    async def graphql(
+        self,
+        query: str,
+        variables: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        执行GraphQL查询
+        
+        Args:
+            query: GraphQL查询语句
+            variables: 查询变量
+            
+        Returns:
+            响应中的data字段
+            
+        Raises:
+            GitHubAPIError: 查询返回errors
+        """
+        result = await self._request(
+            "POST",
+            self.graphql_url,
+            json_data={"query": query, "variables": variables or {}}
+        )
+        
+        if result.get("errors"):
+            messages = "; ".join(e.get("message", str(e)) for e in result["errors"])
+            if "rate limit" in messages.lower():
+                raise RateLimitError(f"GraphQL速率限制已达上限: {messages}")
+            if any(e.get("type") == "NOT_FOUND" for e in result["errors"]):
+                raise GitHubAPIError(f"资源不存在: {messages}")
+            raise GitHubAPIError(f"GraphQL查询失败: {messages}")
+        
+        return result.get("data") or {}
+    
+    @staticmethod
+    def _to_git_timestamp(value: Optional[str]) -> Optional[str]:
+        """GraphQL的GitTimestamp要求带时区，无时区的时间按UTC处理"""
+        if not value:
+            return None
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if parsed.tzinfo is None:
+            return parsed.isoformat() + "Z"
+        return parsed.isoformat()
+    
+    async def iter_commit_history(
+        self,
+        owner: str,
+        repo: str,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        per_page: int = 100,
+        max_commits: Optional[int] = None,
+        author: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        通过GraphQL逐页获取默认分支的提交历史（异步生成器）
+        
+        每页一次请求即可拿到最多100个提交的增删行数和变更文件数，
+        无需逐个调用 /commits/{sha}。
+        
+        Args:
+            owner: 仓库所有者
+            repo: 仓库名称
+            since: 起始时间 (ISO 8601格式)
+            until: 结束时间 (ISO 8601格式)
+            per_page: 每页数量，最大100
+            max_commits: 最大获取提交数量，None表示获取所有
+            author: 作者过滤条件（GraphQL CommitAuthor: {'id': 用户节点ID} 或 {'emails': [邮箱]}）
             
-            if since:
-                params["since"] = since
-            if until:
-                params["until"] = until
+        Yields:
+            每页的提交节点列表（仓库为空或不存在时不产生任何数据）
+        """
+        pages = self.iter_commit_history_pages(
+            owner, repo, since=since, until=until, per_page=per_page, max_commits=max_commits, author=author
+        )
+        async with aclosing(pages):
+            async for nodes, _ in pages:
+                yield nodes
+    
+    async def iter_commit_history_pages(
+        self,
+        owner: str,
+        repo: str,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        per_page: int = 100,
+        max_commits: Optional[int] = None,
+        after: Optional[str] = None,
+        author: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Tuple[List[Dict[str, Any]], Optional[str]]]:
+        """
+        通过GraphQL逐页获取提交历史，同时产出每页的endCursor（异步生成器）
+        
+        Args:
+            owner: 仓库所有者
+            repo: 仓库名称
+            since: 起始时间 (ISO 8601格式)
+            until: 结束时间 (ISO 8601格式)
+            per_page: 每页数量，最大100
+            max_commits: 最大获取提交数量，None表示获取所有
+            after: 从该游标之后开始获取（从检查点继续时使用）
+            author: 作者过滤条件（GraphQL CommitAuthor: {'id': 用户节点ID} 或 {'emails': [邮箱]}）
             
+        Yields:
+            (提交节点列表, 本页的endCursor)，把endCursor作为after即可从下一页继续
+        """
+        variables = {
+            "owner": owner,
+            "name": repo,
+            "first": min(per_page, max_commits) if max_commits else per_page,
+            "after": after,
+            "since": self._to_git_timestamp(since),
+            "until": self._to_git_timestamp(until),
+            "author": author
+        }
+        fetched = 0
+        
+        while True:
             try:
-                batch = await self._request(
-                    "GET",
-                    f"/repos/{owner}/{repo}/commits",
-                    params=params
-                )
+                data = await self.graphql(COMMIT_HISTORY_QUERY, variables)
             except GitHubAPIError as e:
-                # 如果仓库为空或无提交，返回空列表
-                if "资源不存在" in str(e) or "404" in str(e):
+                if "资源不存在" in str(e):
                     logger.warning(f"仓库 {owner}/{repo} 无提交或不存在")
-                    return []
+                    return
                 raise
             
-            if not batch:
-                break
+            repository = data.get("repository") or {}
+            target = (repository.get("defaultBranchRef") or {}).get("target") or {}
+            history = target.get("history")
+            if not history:
+                logger.warning(f"仓库 {owner}/{repo} 无提交或不存在")
+                return
             
-            commits.extend(batch)
+            nodes = history.get("nodes") or []
+            page_info = history.get("pageInfo") or {}
+            end_cursor = page_info.get("endCursor")
+            if max_commits and fetched + len(nodes) >= max_commits:
+                yield nodes[:max_commits - fetched], end_cursor
+                return
             
-            # 如果设置了最大提交数，检查是否已达到
-            if max_commits and len(commits) >= max_commits:
-                commits = commits[:max_commits]
-                break
+            if nodes:
+                fetched += len(nodes)
+                yield nodes, end_cursor
             
-            # 如果返回数量小于per_page，说明已经是最后一页
-            if len(batch) < per_page:
-                break
+            if not page_info.get("hasNextPage"):
+                return
+            variables["after"] = end_cursor
+    
+    async def get_commit_history(
+        self,
+        owner: str,
+        repo: str,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        max_commits: Optional[int] = None,
+        author: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        通过GraphQL获取默认分支的提交历史
+        
+        Args:
+            owner: 仓库所有者
+            repo: 仓库名称
+            since: 起始时间 (ISO 8601格式)
+            until: 结束时间 (ISO 8601格式)
+            max_commits: 最大获取提交数量，None表示获取所有
+            author: 作者过滤条件（GraphQL CommitAuthor）
             
-            page += 1
+        Returns:
+            提交节点列表（包含oid、additions、deletions、changedFilesIfAvailable等字段）
+        """
+        nodes = []
+        async for batch in self.iter_commit_history(
+            owner, repo, since=since, until=until, max_commits=max_commits, author=author
+        ):
+            nodes.extend(batch)
         
-        logger.info(f"获取到 {len(commits)} 个提交 (仓库: {owner}/{repo})")
-        return commits
+        logger.info(f"通过GraphQL获取到 {len(nodes)} 个提交 (仓库: {owner}/{repo})")
+        return nodes
     
     async def get_commit_detail(
         self,
@@ -377,11 +1037,63 @@ class GitHubClient:
         Returns:
             提交详细信息，包含文件变更、统计数据等
         """
-        return await self._request("GET", f"/repos/{owner}/{repo}/commits/{sha}")
+        if self.commit_store is None or not CommitStore.is_valid_sha(sha):
+            return await self._request("GET", f"/repos/{owner}/{repo}/commits/{sha}")
+        
+        # 优先读取本地存储（fork仓库中的相同SHA同样命中）
+        stored = await asyncio.to_thread(self.commit_store.get, sha)
+        if stored is not None:
+            self.store_stats['hits'] += 1
+            return stored
+        
+        self.store_stats['misses'] += 1
+        # 详情已写入本地存储，不再在响应缓存中保留一份
+        detail = await self._request("GET", f"/repos/{owner}/{repo}/commits/{sha}", use_cache=False)
+        await asyncio.to_thread(self.commit_store.put, sha, detail)
+        return detail
+    
+    async def get_commit_details(
+        self,
+        owner: str,
+        repo: str,
+        shas: List[str],
+        concurrency: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        并发获取多个提交的详细信息
+        
+        使用信号量限制同时进行的请求数，速率限制检查和记录仍由_request统一处理。
+        
+        Args:
+            owner: 仓库所有者
+            repo: 仓库名称
+            shas: 提交SHA列表
+            concurrency: 最大并发请求数，默认使用配置中的SYNC_DETAIL_CONCURRENCY
+            
+        Returns:
+            提交详细信息列表，顺序与shas一致
+        """
+        semaphore = asyncio.Semaphore(concurrency or settings.SYNC_DETAIL_CONCURRENCY)
+        
+        async def fetch(sha: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.get_commit_detail(owner, repo, sha)
+        
+        tasks = [asyncio.create_task(fetch(sha)) for sha in shas]
+        try:
+            return list(await asyncio.gather(*tasks))
+        finally:
+            # 某个请求失败（或调用方被取消）时取消其余请求并等待它们结束
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
     
     async def close(self):
-        """关闭HTTP客户端连接"""
-        await self.client.aclose()
+        """关闭HTTP客户端连接（共享的HTTP客户端由其所有者关闭）"""
+        if self._owns_client:
+            await self.client.aclose()
     
     async def __aenter__(self):
         """异步上下文管理器入口"""
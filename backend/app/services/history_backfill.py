@@ -0,0 +1,419 @@
+"""
+大仓库历史回填服务
+把仓库的提交历史按 since/until 切分为时间窗口并行列出，按SHA合并去重后写入；
+窗口大小按已列出提交的时间密度自适应，并且只使用每小时配额的一部分，
+回填可以在低峰期运行而不影响交互式同步。
+"""
+import asyncio
+import logging
+import math
+import time
+from contextlib import aclosing
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any, Set
+
+from app.core.config import settings
+from app.models.commit_detail import CommitDetail
+from app.models.repository import Repository
+from app.models.user import User
+from app.services.data_sync_service import DataSyncService
+
+logger = logging.getLogger(__name__)
+
+# 每页提交数（REST和GraphQL的上限）
+PAGE_SIZE = 100
+
+# 估算的剩余提交数超过目标的该倍数才切分（略超出目标的窗口继续逐页获取）
+SPLIT_THRESHOLD = 1.5
+
+
+class BackfillWindow:
+    """一个待列出的时间窗口（since/until均为闭区间，None表示不限）"""
+
+    def __init__(
+        self,
+        author: Any,
+        since: Optional[datetime],
+        until: Optional[datetime],
+        splittable: bool = True
+    ):
+        """
+        Args:
+            author: 作者过滤条件（CommitAuthorFilter.passes的一项，None表示不过滤）
+            since: 起始时间（无时区的UTC时间）
+            until: 结束时间（无时区的UTC时间）
+            splittable: 是否可以继续切分（切分时重新列出的已列出部分不再切分）
+        """
+        self.author = author
+        self.since = since
+        self.until = until
+        self.splittable = splittable
+
+    def __repr__(self) -> str:
+        return f"BackfillWindow({self.since} ~ {self.until})"
+
+
+class HistoryBackfillService:
+    """
+    大仓库历史回填服务
+
+    每个时间窗口先只列出第一页：根据这一页提交的时间跨度估算窗口内剩余的提交数，
+    超过目标时把剩余的时间范围切分为多个窗口放回队列，否则继续逐页列出。
+    提交列表并不严格按时间排序，切分时已列出的时间范围作为不再切分的窗口重新列出一次，
+    不会遗漏时间乱序的提交；窗口边界和多个作者身份列出的重复SHA只写入一次。
+
+    每页之前检查剩余配额：剩余配额低于上限的 (1 - rate_share) 时等待配额重置。
+    全部窗口完成后推进同步水位；任何窗口失败时已写入的提交保留，水位不变，下次回填时重新列出。
+    git策略直接读取本地镜像的完整历史，不需要回填。
+
+    使用示例:
+        sync_service = DataSyncService(db, github_client, sync_strategy='graphql')
+        backfill = HistoryBackfillService(sync_service, concurrency=4, rate_share=0.5)
+        result = await backfill.backfill_repository(user, repository)
+    """
+
+    def __init__(
+        self,
+        sync_service: DataSyncService,
+        concurrency: Optional[int] = None,
+        window_commits: Optional[int] = None,
+        min_window_hours: Optional[float] = None,
+        rate_share: Optional[float] = None
+    ):
+        """
+        初始化服务
+
+        Args:
+            sync_service: 数据同步服务（提供会话工厂、GitHub客户端、同步策略、作者过滤条件和进度回调）
+            concurrency: 同时列出的时间窗口数，默认使用配置SYNC_BACKFILL_CONCURRENCY
+            window_commits: 每个时间窗口的目标提交数，默认使用配置SYNC_BACKFILL_WINDOW_COMMITS
+            min_window_hours: 时间窗口的最小长度（小时），默认使用配置SYNC_BACKFILL_MIN_WINDOW_HOURS
+            rate_share: 可以使用的每小时配额比例，默认使用配置SYNC_BACKFILL_RATE_SHARE
+        """
+        if sync_service.sync_strategy == 'git':
+            raise ValueError("git策略直接读取本地镜像的完整历史，不需要按时间窗口回填")
+        self.sync_service = sync_service
+        self.db = sync_service.db
+        self.github_client = sync_service.github_client
+        self.concurrency = concurrency or settings.SYNC_BACKFILL_CONCURRENCY
+        self.window_commits = window_commits or settings.SYNC_BACKFILL_WINDOW_COMMITS
+        self.min_window = timedelta(hours=min_window_hours or settings.SYNC_BACKFILL_MIN_WINDOW_HOURS)
+        self.rate_share = rate_share or settings.SYNC_BACKFILL_RATE_SHARE
+
+    async def backfill_user(self, username: str, max_repos: Optional[int] = None) -> Dict[str, Any]:
+        """
+        同步用户信息和仓库列表后依次回填各仓库的完整历史（每个仓库内并行列出时间窗口）
+
+        Args:
+            username: GitHub用户名
+            max_repos: 最大回填仓库数（None表示全部）
+
+        Returns:
+            回填结果统计
+        """
+        logger.info(f"开始回填用户历史: {username}")
+        sync = self.sync_service
+
+        sync.report_progress('stage', stage='user')
+        user = await sync.sync_user(username)
+        await sync.apply_author_filter(user)
+
+        sync.report_progress('stage', stage='repositories')
+        repositories = await sync.sync_repositories(user)
+        if max_repos:
+            repositories = repositories[:max_repos]
+        sync.report_progress('repositories', total=len(repositories), pending=len(repositories), skipped=0)
+
+        sync.report_progress('stage', stage='commits')
+        outcomes = []
+        for repository in repositories:
+            outcomes.append(await self.backfill_repository(user, repository))
+
+        await self.db.refresh(user)
+        failed = [outcome for outcome in outcomes if outcome['error'] is not None]
+        result = {
+            'username': username,
+            'user_id': user.id,
+            'total_repos_synced': len(outcomes) - len(failed),
+            'failed_repos': [
+                {'repo_name': outcome['repo_name'], 'error': outcome['error']}
+                for outcome in failed
+            ],
+            'total_commits_synced': sum(outcome['commits'] for outcome in outcomes),
+            'total_commits': user.total_commits,
+            'windows': sum(outcome['windows'] for outcome in outcomes),
+            'rate_wait_seconds': sum(outcome['rate_wait_seconds'] for outcome in outcomes),
+            'sync_strategy': sync.sync_strategy
+        }
+        logger.info(f"完成用户历史回填: {result}")
+        return result
+
+    async def backfill_repository(
+        self,
+        user: User,
+        repository: Repository,
+        since: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        按时间窗口并行列出仓库的提交历史并写入，全部窗口完成后推进同步水位
+
+        Args:
+            user: 用户ORM对象（已提交，无未保存的修改）
+            repository: 仓库ORM对象（已提交）
+            since: 起始时间（ISO 8601格式），None表示完整历史
+
+        Returns:
+            {'repo_name', 'commits': 新增提交数, 'windows': 列出的窗口数, 'splits': 切分次数,
+             'rate_wait_seconds': 等待配额重置的时间, 'elapsed_seconds', 'error'}
+        """
+        start = time.perf_counter()
+        run = {
+            'seen': set(),
+            'commits': [],
+            'windows': 0,
+            'splits': 0,
+            'rate_wait_seconds': 0,
+            'error': None
+        }
+
+        queue: asyncio.Queue = asyncio.Queue()
+        authors = self.sync_service.commit_authors
+        passes = authors.passes(self.sync_service.sync_strategy) if authors is not None else [None]
+        since_at = DataSyncService._parse_github_time(since)
+        for author in passes:
+            queue.put_nowait(BackfillWindow(author, since_at, None))
+
+        async def worker() -> None:
+            while True:
+                window = await queue.get()
+                try:
+                    # 已有窗口失败时不再列出其余窗口（水位不会推进）
+                    if run['error'] is None:
+                        await self._backfill_window(user, repository, window, queue, run)
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        if run['error'] is None:
+            # 各窗口在自己的会话中写入并累加用户统计（调用方需要时重新读取用户的累计值）
+            await self.sync_service.finish_repository(user, repository, run['commits'])
+
+        outcome = {
+            'repo_name': repository.repo_name,
+            'commits': len(run['commits']),
+            'windows': run['windows'],
+            'splits': run['splits'],
+            'rate_wait_seconds': run['rate_wait_seconds'],
+            'elapsed_seconds': round(time.perf_counter() - start, 3),
+            'error': run['error']
+        }
+        logger.info(f"回填仓库 {repository.repo_name}: {outcome}")
+        self.sync_service.report_progress(
+            'repository', repo_name=outcome['repo_name'], commits=outcome['commits'], error=outcome['error']
+        )
+        return outcome
+
+    async def _backfill_window(
+        self,
+        user: User,
+        repository: Repository,
+        window: BackfillWindow,
+        queue: asyncio.Queue,
+        run: Dict[str, Any]
+    ) -> None:
+        """在独立会话中列出一个时间窗口，密度过高时切分剩余范围，异常记录在run中而不向上抛出"""
+        run['windows'] += 1
+        owner, repo_name = repository.repo_name.split('/', 1)
+        async with self.sync_service.session_factory() as session:
+            service = self.sync_service.for_session(session)
+            try:
+                # 把对象复制到本会话（不查询数据库），各窗口之间互不影响
+                repo_user = await session.merge(user, load=False)
+                repo = await session.merge(repository, load=False)
+
+                # 可切分的窗口先只列出第一页，据此决定切分或继续
+                first_only = PAGE_SIZE if window.splittable else None
+                cursor, last_page = None, None
+                pages = self._iter_window_pages(service, owner, repo_name, window, first_only, run)
+                async for page, cursor in pages:
+                    await self._write_page(service, repo_user, repo, owner, repo_name, page, run)
+                    last_page = page
+
+                if first_only is None or last_page is None or len(last_page) < PAGE_SIZE:
+                    return
+
+                windows = self._split_window(window, last_page)
+                if windows:
+                    run['splits'] += 1
+                    logger.info(f"仓库 {repository.repo_name} 的 {window} 切分为 {len(windows)} 个窗口")
+                    for new_window in windows:
+                        queue.put_nowait(new_window)
+                    return
+
+                pages = self._iter_window_pages(service, owner, repo_name, window, None, run, cursor)
+                async for page, _ in pages:
+                    await self._write_page(service, repo_user, repo, owner, repo_name, page, run)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 已写入的提交保留，水位不推进，下次回填时重新列出（已存在的提交不再获取详情）
+                await session.rollback()
+                if run['error'] is None:
+                    run['error'] = str(e) or e.__class__.__name__
+                logger.error(f"回填仓库 {repository.repo_name} 的 {window} 失败: {e}", exc_info=True)
+
+    async def _iter_window_pages(
+        self,
+        service: DataSyncService,
+        owner: str,
+        repo_name: str,
+        window: BackfillWindow,
+        max_commits: Optional[int],
+        run: Dict[str, Any],
+        cursor: Optional[str] = None
+    ):
+        """逐页列出一个时间窗口，每页之前等待配额满足回填可用的比例，产出 (一页, 下一页游标)"""
+        pages = service._iter_listing_pages(
+            owner,
+            repo_name,
+            self._format_time(window.since),
+            max_commits,
+            cursor,
+            author=window.author,
+            until=self._format_time(window.until)
+        )
+        async with aclosing(pages):
+            while True:
+                await self._wait_for_budget(run)
+                try:
+                    item = await pages.__anext__()
+                except StopAsyncIteration:
+                    return
+                yield item
+
+    async def _write_page(
+        self,
+        service: DataSyncService,
+        user: User,
+        repository: Repository,
+        owner: str,
+        repo_name: str,
+        page: List[Dict[str, Any]],
+        run: Dict[str, Any]
+    ) -> None:
+        """按SHA去重后写入一页（其他窗口已列出的提交跳过，不再获取详情）"""
+        seen: Set[str] = run['seen']
+        new_items = []
+        for item in page:
+            sha = self._item_sha(item)
+            if sha and sha not in seen:
+                seen.add(sha)
+                new_items.append(item)
+        if not new_items:
+            return
+        commits: List[CommitDetail] = await service.sync_page(user, repository, owner, repo_name, new_items)
+        run['commits'].extend(commits)
+
+    def _split_window(self, window: BackfillWindow, page: List[Dict[str, Any]]) -> List[BackfillWindow]:
+        """
+        按第一页提交的时间密度估算窗口内剩余的提交数，超过目标时切分剩余的时间范围
+
+        Args:
+            window: 当前窗口
+            page: 当前窗口的第一页（满页）
+
+        Returns:
+            替代当前窗口的新窗口（第一个为已列出部分，重新列出但不再切分）；不需要切分时为空列表
+        """
+        dates = [date for date in (self._item_date(item) for item in page) if date is not None]
+        if not dates:
+            return []
+        newest, oldest = max(dates), min(dates)
+        span = max((newest - oldest).total_seconds(), 1.0)
+        window_size = max(timedelta(seconds=span * self.window_commits / len(dates)), self.min_window)
+
+        if window.since is not None:
+            remaining = oldest - window.since
+            if remaining <= window_size * SPLIT_THRESHOLD:
+                return []
+            parts = min(math.ceil(remaining / window_size), self.concurrency)
+            window_size = remaining / parts
+        else:
+            # 起始时间不限：向前切出若干个窗口，最早的窗口不设起始时间（之后按需要继续切分）
+            parts = self.concurrency
+
+        windows = [BackfillWindow(window.author, oldest, window.until, splittable=False)]
+        until = oldest - timedelta(seconds=1)
+        for index in range(parts):
+            since = window.since if index == parts - 1 else oldest - window_size * (index + 1)
+            windows.append(BackfillWindow(window.author, since, until))
+            if since is not None:
+                until = since - timedelta(seconds=1)
+        return windows
+
+    def _page_costs(self) -> Dict[str, int]:
+        """列出并写入一页最多消耗的各资源配额"""
+        sync = self.sync_service
+        if sync.sync_strategy == 'graphql':
+            costs = {'graphql': 1}
+            if sync.detect_languages:
+                costs['core'] = PAGE_SIZE
+            return costs
+        return {'core': 1 if sync.two_phase else 1 + PAGE_SIZE}
+
+    def _budget_wait(self) -> int:
+        """
+        计算下一页之前需要等待的时间：列出并写入一页后剩余配额会低于
+        上限的 (1 - rate_share) 时，等待到配额重置
+
+        Returns:
+            等待时间（秒），0表示可以立即继续
+        """
+        pool = self.github_client.token_pool
+        for resource, cost in self._page_costs().items():
+            status = pool.status(resource)
+            if status['remaining'] is None:
+                # 尚无配额数据（还没有发起过该资源的请求）
+                continue
+            reserve = status['limit'] * (1 - self.rate_share)
+            if status['remaining'] - cost < reserve:
+                return pool.wait_time(resource)
+        return 0
+
+    async def _wait_for_budget(self, run: Dict[str, Any]) -> None:
+        """配额不足回填可用的比例时等待到配额重置（醒来后直接继续，由下一个响应更新配额）"""
+        wait_time = self._budget_wait()
+        if wait_time <= 0:
+            return
+        logger.info(f"剩余配额已到回填可用比例（{self.rate_share:.0%}）的下限，等待 {wait_time} 秒")
+        run['rate_wait_seconds'] += wait_time
+        await asyncio.sleep(wait_time)
+
+    @staticmethod
+    def _item_sha(item: Dict[str, Any]) -> Optional[str]:
+        """REST提交列表项或GraphQL节点的SHA"""
+        return item.get('sha') or item.get('oid')
+
+    @staticmethod
+    def _item_date(item: Dict[str, Any]) -> Optional[datetime]:
+        """提交时间（与since/until过滤一致使用committer时间，缺失时使用作者时间）"""
+        if 'committedDate' in item:
+            value = item.get('committedDate')
+        else:
+            commit = item.get('commit') or {}
+            value = (commit.get('committer') or {}).get('date') or (commit.get('author') or {}).get('date')
+        return DataSyncService._parse_github_time(value)
+
+    @staticmethod
+    def _format_time(value: Optional[datetime]) -> Optional[str]:
+        """无时区的UTC时间格式化为ISO 8601"""
+        if value is None:
+            return None
+        return value.strftime('%Y-%m-%dT%H:%M:%SZ')
@@ -0,0 +1,197 @@
+"""
+推送事件处理服务
+GitHub推送事件（push webhook）送达后只获取本次推送中用户自己的提交详情并写入数据库，
+新数据在几秒内可见，API请求数等于新提交数；推送与上一次处理的推送连续时直接推进仓库的
+同步水位，定时同步因此跳过该仓库，不再需要轮询。
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, AsyncIterator
+
+from sqlalchemy import select
+
+from app.models.repository import Repository
+from app.models.user import User
+from app.services.data_sync_service import DataSyncService
+
+logger = logging.getLogger(__name__)
+
+# 分支创建时的before
+NULL_SHA = '0' * 40
+
+# 推送事件的commits最多包含的提交数，达到时可能有提交未列出
+MAX_PAYLOAD_COMMITS = 2048
+
+
+class PushEvent:
+    """
+    GitHub推送事件的有效载荷
+
+    使用示例:
+        event = PushEvent(payload)
+        if event.is_default_branch:
+            result = await PushEventService(DataSyncService(db, client, sync_strategy='rest')).ingest(event)
+    """
+
+    def __init__(self, payload: Dict[str, Any]):
+        """
+        Args:
+            payload: push事件的JSON有效载荷
+
+        Raises:
+            ValueError: 有效载荷缺少必需字段
+        """
+        try:
+            repository = payload['repository']
+            self.github_repo_id = int(repository['id'])
+            self.repo_name = repository['full_name']
+            self.default_branch = repository.get('default_branch')
+            self.ref = payload['ref']
+            self.before = payload.get('before') or NULL_SHA
+            self.after = payload['after']
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"无效的推送事件: {e}")
+
+        self.deleted = bool(payload.get('deleted'))
+        self.pushed_at = self._parse_pushed_at(repository.get('pushed_at'))
+        self.commits: List[Dict[str, Any]] = [
+            {
+                'sha': commit['id'],
+                'author_login': (commit.get('author') or {}).get('username'),
+                'author_email': (commit.get('author') or {}).get('email'),
+            }
+            for commit in payload.get('commits') or []
+            if commit.get('id')
+        ]
+        # commits被截断时有提交没有列出
+        self.truncated = len(self.commits) >= MAX_PAYLOAD_COMMITS
+
+    @property
+    def is_default_branch(self) -> bool:
+        """是否推送到默认分支（同步只统计默认分支的提交）"""
+        return self.default_branch is not None and self.ref == f"refs/heads/{self.default_branch}"
+
+    @staticmethod
+    def _parse_pushed_at(value: Any) -> Optional[datetime]:
+        """推送事件中的pushed_at为Unix时间戳，转换为无时区的UTC时间"""
+        if isinstance(value, (int, float)):
+            return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+        if isinstance(value, str) and value:
+            return DataSyncService._parse_github_time(value)
+        return None
+
+    def __repr__(self):
+        return f"<PushEvent(repo_name='{self.repo_name}', ref='{self.ref}', commits={len(self.commits)})>"
+
+
+class PushEventService:
+    """
+    推送事件处理服务
+
+    同一仓库的推送事件依次处理。推送的before等于上一次处理的推送之后的HEAD，
+    且推送前仓库已同步到最新时，才推进同步水位；否则（首个推送事件、遗漏或乱序的推送、
+    commits被截断）只写入推送中的提交并记录推送时间，由下一次定时同步补齐。
+    """
+
+    # 按GitHub仓库ID串行处理推送事件：{仓库ID: [锁, 持有或等待的事件数]}，没有事件时删除
+    _locks: Dict[int, list] = {}
+
+    def __init__(self, sync_service: DataSyncService):
+        """
+        初始化服务
+
+        Args:
+            sync_service: 数据同步服务（提供数据库会话、GitHub客户端和进度回调），
+                应使用rest策略：推送中的提交按SHA逐个获取详情
+        """
+        self.sync_service = sync_service
+        self.db = sync_service.db
+
+    async def ingest(self, event: PushEvent) -> Dict[str, Any]:
+        """
+        处理一次推送事件：写入跟踪该仓库的每个用户自己的新提交
+
+        Args:
+            event: 推送事件
+
+        Returns:
+            处理结果，包含每个跟踪该仓库的用户写入的提交数和是否推进了同步水位
+        """
+        async with self._repository_lock(event.github_repo_id):
+            result = await self.db.execute(
+                select(Repository, User)
+                .join(User, Repository.user_id == User.id)
+                .where(Repository.github_repo_id == event.github_repo_id)
+            )
+            rows = result.all()
+            if not rows:
+                logger.info(f"未跟踪的仓库 {event.repo_name}，忽略推送事件")
+
+            repositories = []
+            for repository, user in rows:
+                repositories.append(await self._ingest_repository(event, user, repository))
+
+        return {
+            'repo_name': event.repo_name,
+            'ref': event.ref,
+            'after': event.after,
+            'commits': len(event.commits),
+            'repositories': repositories
+        }
+
+    @classmethod
+    @asynccontextmanager
+    async def _repository_lock(cls, github_repo_id: int) -> AsyncIterator[None]:
+        """
+        持有仓库的推送事件锁，最后一个持有或等待的事件结束后删除该锁
+
+        Args:
+            github_repo_id: GitHub仓库ID
+        """
+        entry = cls._locks.get(github_repo_id)
+        if entry is None:
+            entry = cls._locks[github_repo_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del cls._locks[github_repo_id]
+
+    async def _ingest_repository(self, event: PushEvent, user: User, repository: Repository) -> Dict[str, Any]:
+        """为一个跟踪该仓库的用户写入推送中的提交"""
+        authors = await self.sync_service.apply_author_filter(user)
+        shas = [
+            commit['sha'] for commit in event.commits
+            if authors is None or authors.matches(commit['author_login'], commit['author_email'])
+        ]
+
+        advance = (
+            not event.truncated
+            and repository.push_head_sha is not None
+            and event.before == repository.push_head_sha
+            and DataSyncService.is_repository_unchanged(repository)
+        )
+        synced_commits = await self.sync_service.sync_pushed_commits(
+            user,
+            repository,
+            shas,
+            head_sha=event.after,
+            pushed_at=event.pushed_at,
+            advance=advance
+        )
+        logger.info(
+            f"推送事件 {event.repo_name}@{event.after[:7]}: 用户 {user.username} "
+            f"{len(shas)} 个提交，新增 {len(synced_commits)} 个，推进水位: {advance}"
+        )
+        return {
+            'repo_id': repository.id,
+            'user_id': user.id,
+            'commits_matched': len(shas),
+            'commits_synced': len(synced_commits),
+            'advanced': advance
+        }
@@ -0,0 +1,263 @@
+"""
+仓库聚合统计同步服务
+仪表盘只需要按周、按月的汇总时不获取提交详情：每个仓库请求一次 /stats/contributors
+（按作者、按周的提交数和增删行数），汇总后写入 daily_stats 和用户累计值，500个仓库的用户
+首次同步只需约500个请求。只用于还没有提交详情的用户；之后写入提交详情时（手动同步、定时同步、
+推送事件）先从 commit_details 完整重算，再累加新提交。
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, date, timezone
+from typing import Optional, List, Dict, Any, Tuple
+
+from sqlalchemy import select, delete, insert
+
+from app.core.config import settings
+from app.models.commit_detail import CommitDetail
+from app.models.daily_stat import DailyStat
+from app.models.repository import Repository
+from app.models.user import User
+from app.services.data_sync_service import DataSyncService
+from app.services.github_client import GitHubAPIError
+
+logger = logging.getLogger(__name__)
+
+# 按提交数估算工作时长：每个提交约15分钟（与 update_daily_stats 一致）
+HOURS_PER_COMMIT = 0.25
+
+
+class RepoStatsSyncService:
+    """
+    仓库聚合统计同步服务
+
+    GitHub的统计按周（周日00:00 UTC开始）汇总，每周的数据记在该周第一天的 daily_stats 中：
+    按周、按月的合计与提交详情一致，按天的分布要等提交详情同步后才有。统计接口只包含关联到
+    GitHub账号的提交，按登录名匹配用户，邮箱别名的提交不计入。
+
+    使用示例:
+        sync_service = DataSyncService(db, github_client, progress_callback=job.record)
+        result = await RepoStatsSyncService(sync_service).sync_user_stats('octocat')
+    """
+
+    def __init__(
+        self,
+        sync_service: DataSyncService,
+        poll_interval: Optional[float] = None,
+        poll_timeout: Optional[float] = None
+    ):
+        """
+        初始化服务
+
+        Args:
+            sync_service: 数据同步服务（提供数据库会话、GitHub客户端、仓库列表同步和进度回调）
+            poll_interval: 统计计算中（202）时重新请求的间隔（秒），默认使用配置SYNC_STATS_POLL_INTERVAL
+            poll_timeout: 等待统计计算的最长时间（秒），默认使用配置SYNC_STATS_POLL_TIMEOUT
+        """
+        self.sync_service = sync_service
+        self.db = sync_service.db
+        self.github_client = sync_service.github_client
+        self.poll_interval = settings.SYNC_STATS_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.poll_timeout = settings.SYNC_STATS_POLL_TIMEOUT if poll_timeout is None else poll_timeout
+
+    async def sync_user_stats(self, username: str, max_repos: Optional[int] = None) -> Dict[str, Any]:
+        """
+        同步用户信息、仓库列表和各仓库的聚合统计，重写用户的 daily_stats 和累计值
+
+        用户已有提交详情时不请求统计也不重写（统计以 commit_details 为准），结果中的
+        skipped_reason 说明原因。
+
+        Args:
+            username: GitHub用户名
+            max_repos: 最大同步仓库数（None表示全部）
+
+        Returns:
+            同步结果统计（结构与 DataSyncService.sync_user_data 一致）
+        """
+        logger.info(f"开始仅聚合统计同步: {username}")
+        sync = self.sync_service
+
+        sync.report_progress('stage', stage='user')
+        user = await sync.sync_user(username)
+
+        stats, failed_repos, weeks, skipped_reason = {}, [], {}, None
+        if await self.has_commit_details(user):
+            skipped_reason = '已有提交详情，统计从 commit_details 计算'
+            logger.warning(f"用户 {username} {skipped_reason}，跳过仅聚合统计同步")
+        else:
+            sync.report_progress('stage', stage='repositories')
+            repositories = await sync.sync_repositories(user)
+            if max_repos:
+                repositories = repositories[:max_repos]
+            sync.report_progress('repositories', total=len(repositories), pending=len(repositories), skipped=0)
+
+            sync.report_progress('stage', stage='statistics')
+            stats, failed_repos = await self.fetch_contributor_stats(repositories)
+            weeks = self.aggregate_weeks(user.username, stats)
+            await self.save_daily_stats(user, weeks)
+
+        result = {
+            'username': username,
+            'user_id': user.id,
+            'total_repos_synced': len(stats),
+            'total_repos_skipped': 0,
+            'failed_repos': failed_repos,
+            'total_commits_synced': 0,
+            'total_commits': user.total_commits,
+            'total_additions': user.total_additions,
+            'total_deletions': user.total_deletions,
+            'weeks': len(weeks),
+            'sync_mode': 'aggregate',
+            'skipped_reason': skipped_reason,
+            'sync_strategy': None,
+            'since': None,
+            'sync_run_id': None,
+            'resumed': False,
+            'pipeline': None
+        }
+        logger.info(f"完成仅聚合统计同步: {result}")
+        return result
+
+    async def has_commit_details(self, user: User) -> bool:
+        """
+        用户是否已有提交详情
+
+        Args:
+            user: 用户ORM对象
+
+        Returns:
+            commit_details 中有该用户的提交时为True
+        """
+        result = await self.db.execute(
+            select(CommitDetail.id).where(CommitDetail.user_id == user.id).limit(1)
+        )
+        return result.first() is not None
+
+    async def fetch_contributor_stats(
+        self,
+        repositories: List[Repository]
+    ) -> Tuple[Dict[int, List[Dict[str, Any]]], List[Dict[str, str]]]:
+        """
+        并发获取各仓库的贡献者统计，GitHub仍在计算的仓库按间隔重新请求
+
+        首轮请求同时触发所有仓库的统计计算，之后只重新请求返回202的仓库；
+        并发数受客户端的全局请求上限约束。
+
+        Args:
+            repositories: 仓库ORM对象列表
+
+        Returns:
+            ({仓库ID: 贡献者列表}, 失败或等待超时的仓库及原因)
+        """
+        stats: Dict[int, List[Dict[str, Any]]] = {}
+        failed_repos: List[Dict[str, str]] = []
+
+        async def fetch(repository: Repository) -> bool:
+            """获取一个仓库的统计，返回是否仍在计算中"""
+            parts = repository.repo_name.split('/')
+            if len(parts) != 2:
+                logger.error(f"无效的仓库名称: {repository.repo_name}")
+                return False
+            try:
+                response = await self.github_client.get_contributor_stats(*parts)
+            except GitHubAPIError as e:
+                logger.error(f"获取仓库 {repository.repo_name} 的统计失败: {e}")
+                self._fail(failed_repos, repository, str(e))
+                return False
+            if response.status_code == 202:
+                return True
+            stats[repository.id] = response.data or []
+            self.sync_service.report_progress('repository', repo_name=repository.repo_name, commits=0, error=None)
+            return False
+
+        pending = list(repositories)
+        deadline = time.monotonic() + self.poll_timeout
+        while pending:
+            computing = await asyncio.gather(*(fetch(repository) for repository in pending))
+            pending = [repository for repository, waiting in zip(pending, computing) if waiting]
+            if not pending or time.monotonic() + self.poll_interval > deadline:
+                break
+            logger.info(f"GitHub正在计算 {len(pending)} 个仓库的统计，{self.poll_interval} 秒后重新请求")
+            await asyncio.sleep(self.poll_interval)
+
+        for repository in pending:
+            self._fail(failed_repos, repository, "GitHub仍在计算仓库统计，下次同步时重试")
+        return stats, failed_repos
+
+    def _fail(self, failed_repos: List[Dict[str, str]], repository: Repository, error: str) -> None:
+        """记录失败的仓库并通知进度回调"""
+        failed_repos.append({'repo_name': repository.repo_name, 'error': error})
+        self.sync_service.report_progress('repository', repo_name=repository.repo_name, commits=0, error=error)
+
+    @staticmethod
+    def aggregate_weeks(
+        login: str,
+        stats: Dict[int, List[Dict[str, Any]]]
+    ) -> Dict[date, Dict[str, Any]]:
+        """
+        汇总用户在各仓库中每周的提交数和增删行数
+
+        Args:
+            login: 用户的GitHub登录名
+            stats: {仓库ID: 贡献者列表}
+
+        Returns:
+            {周起始日期: {'commits', 'additions', 'deletions', 'repos'(有提交的仓库ID集合)}}，
+            不包含没有活动的周
+        """
+        weeks: Dict[date, Dict[str, Any]] = {}
+        for repo_id, contributors in stats.items():
+            for contributor in contributors:
+                author = contributor.get('author') or {}
+                if (author.get('login') or '').lower() != login.lower():
+                    continue
+                for week in contributor.get('weeks') or []:
+                    commits, additions, deletions = week.get('c', 0), week.get('a', 0), week.get('d', 0)
+                    if not (commits or additions or deletions):
+                        continue
+                    stat_date = datetime.fromtimestamp(week['w'], timezone.utc).date()
+                    entry = weeks.setdefault(
+                        stat_date, {'commits': 0, 'additions': 0, 'deletions': 0, 'repos': set()}
+                    )
+                    entry['commits'] += commits
+                    entry['additions'] += additions
+                    entry['deletions'] += deletions
+                    if commits:
+                        entry['repos'].add(repo_id)
+        return weeks
+
+    async def save_daily_stats(self, user: User, weeks: Dict[date, Dict[str, Any]]) -> None:
+        """
+        用每周汇总重写用户的 daily_stats，并更新提交总数和增删行数
+
+        只用于没有提交详情的用户（见 has_commit_details），否则会覆盖按提交详情计算的统计。
+
+        Args:
+            user: 用户ORM对象
+            weeks: aggregate_weeks 的返回值
+        """
+        rows = [
+            {
+                'user_id': user.id,
+                'stat_date': stat_date,
+                'commits': week['commits'],
+                'additions': week['additions'],
+                'deletions': week['deletions'],
+                'active_repos': len(week['repos']),
+                'work_hours': round(week['commits'] * HOURS_PER_COMMIT, 2)
+            }
+            for stat_date, week in sorted(weeks.items())
+        ]
+
+        await self.db.execute(delete(DailyStat).where(DailyStat.user_id == user.id))
+        if rows:
+            await self.db.execute(insert(DailyStat), rows)
+
+        user.total_commits = sum(row['commits'] for row in rows)
+        user.total_additions = sum(row['additions'] for row in rows)
+        user.total_deletions = sum(row['deletions'] for row in rows)
+        # 之后写入提交详情前从 commit_details 完整重算（DataSyncService._save_parsed_commits）
+        user.aggregate_synced_at = datetime.utcnow()
+        await self.db.commit()
+
+        logger.info(f"写入用户 {user.username} 的 {len(rows)} 周聚合统计: {user.total_commits} commits")
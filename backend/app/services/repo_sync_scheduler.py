@@ -0,0 +1,170 @@
+"""
+仓库并行同步调度
+同时同步多个仓库，每个仓库使用独立的数据库会话；GitHub请求受客户端共享的并发上限约束。
+单个仓库失败不影响其他仓库，失败信息汇总在结果中。
+"""
+import asyncio
+import logging
+import time
+from typing import Optional, List, Dict, Any, Tuple, Callable, TYPE_CHECKING
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.user import User
+from app.models.repository import Repository
+from app.models.sync_run import SyncRunRepo
+from app.services.sync_pipeline import SyncPipeline
+
+if TYPE_CHECKING:
+    from app.services.data_sync_service import DataSyncService
+
+logger = logging.getLogger(__name__)
+
+
+class RepoSyncScheduler:
+    """
+    仓库并行同步调度器
+
+    每个仓库在独立的会话中完成 列表 → 详情 → 写入 → 推进水位（按服务配置使用流水线或顺序同步），
+    同一时刻最多concurrency个仓库在同步。
+
+    使用示例:
+        scheduler = RepoSyncScheduler(sync_service, AsyncSessionLocal, concurrency=4)
+        result = await scheduler.run(user, [(repo, since), ...], max_commits=100)
+        print(result['failed_repos'])
+    """
+
+    def __init__(
+        self,
+        service: "DataSyncService",
+        session_factory: Callable[[], AsyncSession],
+        concurrency: Optional[int] = None
+    ):
+        """
+        Args:
+            service: 数据同步服务（提供GitHub客户端和同步配置）
+            session_factory: 会话工厂（如AsyncSessionLocal），每个仓库创建一个会话
+            concurrency: 同时同步的仓库数，默认使用配置中的SYNC_REPO_CONCURRENCY
+        """
+        self.service = service
+        self.session_factory = session_factory
+        self.concurrency = concurrency or settings.SYNC_REPO_CONCURRENCY
+
+    async def run(
+        self,
+        user: User,
+        repositories: List[Tuple[Repository, Optional[str]]],
+        max_commits: Optional[int] = None,
+        checkpoints: Optional[Dict[int, SyncRunRepo]] = None
+    ) -> Dict[str, Any]:
+        """
+        并行同步多个仓库的提交
+
+        Args:
+            user: 用户ORM对象（已提交，无未保存的修改）
+            repositories: (仓库, 起始时间) 列表，起始时间为None表示获取完整历史
+            max_commits: 每个仓库最大同步提交数
+            checkpoints: 同步运行的检查点字典 {仓库ID: 检查点}（已提交），
+                提供时各仓库从检查点继续并逐页记录进度
+
+        Returns:
+            新增提交数、成功/失败的仓库，以及所有仓库合计的流水线阶段统计
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        start = time.perf_counter()
+        checkpoints = checkpoints or {}
+
+        async def sync_one(repository: Repository, since: Optional[str]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._sync_repository(
+                    user, repository, since, max_commits, checkpoints.get(repository.id)
+                )
+
+        outcomes = await asyncio.gather(*(
+            sync_one(repository, since) for repository, since in repositories
+        ))
+
+        failed = [outcome for outcome in outcomes if outcome['error'] is not None]
+        elapsed = time.perf_counter() - start
+        result = {
+            'total_commits': sum(outcome['commits'] for outcome in outcomes),
+            'synced_repos': len(outcomes) - len(failed),
+            'failed_repos': [
+                {'repo_name': outcome['repo_name'], 'error': outcome['error']}
+                for outcome in failed
+            ],
+            'elapsed_seconds': round(elapsed, 3),
+            'pipeline': self._merge_pipeline_stats(
+                [outcome['pipeline'] for outcome in outcomes if outcome['pipeline'] is not None],
+                elapsed
+            )
+        }
+        if failed:
+            logger.warning(f"{len(failed)} 个仓库同步失败: {result['failed_repos']}")
+        return result
+
+    async def _sync_repository(
+        self,
+        user: User,
+        repository: Repository,
+        since: Optional[str],
+        max_commits: Optional[int],
+        checkpoint: Optional[SyncRunRepo] = None
+    ) -> Dict[str, Any]:
+        """在独立会话中同步一个仓库，异常被记录而不向上抛出"""
+        outcome = {'repo_name': repository.repo_name, 'commits': 0, 'error': None, 'pipeline': None}
+        async with self.session_factory() as session:
+            service = self.service.for_session(session)
+            try:
+                # 把对象复制到本会话（不查询数据库），各会话之间互不影响
+                repo_user = await session.merge(user, load=False)
+                repo = await session.merge(repository, load=False)
+                repo_checkpoint = None
+                if checkpoint is not None:
+                    repo_checkpoint = await session.merge(checkpoint, load=False)
+
+                if service.use_pipeline:
+                    pipeline = SyncPipeline(service)
+                    commits = await pipeline.run(
+                        repo_user, [(repo, since)], max_commits=max_commits,
+                        checkpoints={repo.id: repo_checkpoint} if repo_checkpoint is not None else None
+                    )
+                    outcome['pipeline'] = pipeline.stats()
+                else:
+                    commits = await service.sync_commits(
+                        repo_user, repo, since=since, max_commits=max_commits, checkpoint=repo_checkpoint
+                    )
+                outcome['commits'] = len(commits)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 未完成的仓库不推进水位，下次同步从原水位（或检查点的游标）重新获取
+                await session.rollback()
+                outcome['error'] = str(e) or e.__class__.__name__
+                logger.error(f"同步仓库 {repository.repo_name} 失败: {e}", exc_info=True)
+                if checkpoint is not None:
+                    try:
+                        await service.sync_runs.fail_repository(checkpoint.id, outcome['error'])
+                    except Exception as checkpoint_error:
+                        logger.error(f"记录仓库 {repository.repo_name} 的失败状态出错: {checkpoint_error}")
+        self.service.report_progress(
+            'repository', repo_name=outcome['repo_name'], commits=outcome['commits'], error=outcome['error']
+        )
+        return outcome
+
+    @staticmethod
+    def _merge_pipeline_stats(stats_list: List[Dict[str, Any]], elapsed: float) -> Optional[Dict[str, Any]]:
+        """合计各仓库流水线的阶段统计（并发数取单个仓库的值）"""
+        if not stats_list:
+            return None
+        stages = {}
+        for stats in stats_list:
+            for name, stage in stats['stages'].items():
+                merged = stages.setdefault(name, dict(stage, items=0, busy_seconds=0.0, idle_seconds=0.0, blocked_seconds=0.0))
+                for key in ('items', 'busy_seconds', 'idle_seconds', 'blocked_seconds'):
+                    merged[key] += stage[key]
+        for stage in stages.values():
+            for key in ('busy_seconds', 'idle_seconds', 'blocked_seconds'):
+                stage[key] = round(stage[key], 3)
+        return {'elapsed_seconds': round(elapsed, 3), 'stages': stages}
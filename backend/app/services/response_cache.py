@@ -0,0 +1,273 @@
+"""
+GitHub API条件请求缓存
+保存响应的ETag/Last-Modified校验值和响应体，配合If-None-Match请求头使用。
+GitHub对304 Not Modified响应不计入速率限制。
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+from urllib.parse import urlencode
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse:
+    """缓存的响应条目"""
+
+    def __init__(
+        self,
+        body: bytes,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        stored_at: Optional[float] = None
+    ):
+        """
+        Args:
+            body: 原始响应体（JSON字节）
+            etag: ETag响应头
+            last_modified: Last-Modified响应头
+            headers: 需要随缓存一起返回的其他响应头（如Link）
+            stored_at: 写入时间戳
+        """
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.headers = headers or {}
+        self.stored_at = stored_at or time.time()
+
+    def json(self) -> Any:
+        """解析缓存的响应体（每次返回新对象，调用方可以安全修改）"""
+        return json.loads(self.body)
+
+    def validator_headers(self) -> Dict[str, str]:
+        """构造条件请求头"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache(ABC):
+    """
+    响应缓存后端基类
+
+    子类需要实现get/set/delete/clear方法（未全部实现的子类无法实例化）。
+    """
+
+    @staticmethod
+    def make_key(
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        scope: Optional[str] = None
+    ) -> str:
+        """
+        生成缓存键：凭据范围 + 方法 + URL + 排序后的查询参数
+
+        Args:
+            method: HTTP方法
+            url: 请求URL
+            params: 查询参数
+            scope: 凭据范围（如Token池指纹），不同凭据的响应互不复用
+        """
+        query = urlencode(sorted((params or {}).items()))
+        key = f"{method.upper()} {url}?{query}" if query else f"{method.upper()} {url}"
+        return f"[{scope}] {key}" if scope else key
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        """读取缓存条目，不存在时返回None"""
+
+    @abstractmethod
+    async def set(self, key: str, entry: CachedResponse) -> None:
+        """写入缓存条目"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """删除缓存条目"""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """清空所有缓存条目"""
+
+
+class MemoryResponseCache(ResponseCache):
+    """基于LRU的内存缓存后端"""
+
+    def __init__(self, max_entries: int = 1024):
+        """
+        Args:
+            max_entries: 最大缓存条目数，超出时淘汰最久未使用的条目
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, entry: CachedResponse) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    基于SQLite文件的持久化缓存后端
+
+    进程重启后缓存仍然有效，数据库操作在线程池中执行以免阻塞事件循环。
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000):
+        """
+        Args:
+            path: SQLite数据库文件路径
+            max_entries: 最大缓存条目数，超出时按最近访问时间淘汰
+        """
+        self.path = path
+        self.max_entries = max_entries
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS response_cache (
+                key TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                headers TEXT,
+                body BLOB NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def _get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, headers, body, stored_at FROM response_cache WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE response_cache SET accessed_at = ? WHERE key = ?",
+                (time.time(), key)
+            )
+            self._conn.commit()
+        etag, last_modified, headers, body, stored_at = row
+        return CachedResponse(
+            body=bytes(body),
+            etag=etag,
+            last_modified=last_modified,
+            headers=json.loads(headers) if headers else {},
+            stored_at=stored_at
+        )
+
+    def _set(self, key: str, entry: CachedResponse) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO response_cache
+                    (key, etag, last_modified, headers, body, stored_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    key,
+                    entry.etag,
+                    entry.last_modified,
+                    json.dumps(entry.headers),
+                    entry.body,
+                    entry.stored_at,
+                    now
+                )
+            )
+            self._conn.execute(
+                """
+                DELETE FROM response_cache WHERE key IN (
+                    SELECT key FROM response_cache
+                    ORDER BY accessed_at DESC
+                    LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def _delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def _clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache")
+            self._conn.commit()
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, entry: CachedResponse) -> None:
+        await asyncio.to_thread(self._set, key, entry)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._delete, key)
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._clear)
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
+def create_response_cache() -> Optional[ResponseCache]:
+    """
+    根据配置创建响应缓存后端
+
+    Returns:
+        缓存实例；GITHUB_CACHE_BACKEND为none时返回None
+    """
+    backend = settings.GITHUB_CACHE_BACKEND.lower()
+
+    if backend == "memory":
+        return MemoryResponseCache(max_entries=settings.GITHUB_CACHE_MAX_ENTRIES)
+    if backend == "sqlite":
+        return SQLiteResponseCache(
+            settings.GITHUB_CACHE_PATH,
+            max_entries=settings.GITHUB_CACHE_MAX_ENTRIES
+        )
+    if backend != "none":
+        logger.warning(f"未知的缓存后端: {backend}，已禁用条件请求缓存")
+    return None
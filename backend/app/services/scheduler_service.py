@@ -10,8 +10,11 @@ from apscheduler.triggers.interval import IntervalTrigger
 
 from app.core.database import AsyncSessionLocal
 from app.core.config import settings
-from app.services.github_client import GitHubClient
+from app.services.client_registry import github_client_registry
+from app.models.user import User
 from app.services.data_sync_service import DataSyncService
+from app.services.commit_enricher import CommitEnricher
+from app.services.history_backfill import HistoryBackfillService
 
 logger = logging.getLogger(__name__)
 
@@ -34,9 +37,9 @@ class SchedulerService:
         logger.info(f"开始定时同步任务: {username}")
         
         try:
-            # 创建GitHub客户端
+            # 使用共享连接池上的GitHub客户端
             if not self.github_client:
-                self.github_client = GitHubClient(settings.GITHUB_TOKEN)
+                self.github_client = github_client_registry.get_client()
             
             async with AsyncSessionLocal() as db:
                 sync_service = DataSyncService(db, self.github_client)
@@ -49,9 +52,55 @@ class SchedulerService:
                 
                 logger.info(f"定时同步完成: {result}")
                 
+                # 两阶段同步：补全提交详情（剩余配额降到保留值时暂停，下次定时同步继续）
+                if sync_service.two_phase:
+                    user = await db.get(User, result['user_id'])
+                    enrich_result = await CommitEnricher(sync_service).enrich_user(user)
+                    logger.info(f"定时补全完成: {enrich_result}")
+                
         except Exception as e:
             logger.error(f"定时同步失败: {e}", exc_info=True)
     
+    async def backfill_history_job(self, username: str):
+        """
+        历史回填任务（按时间窗口并行列出完整历史，只使用部分每小时配额）
+        
+        Args:
+            username: GitHub用户名
+        """
+        logger.info(f"开始历史回填任务: {username}")
+        
+        try:
+            if not self.github_client:
+                self.github_client = github_client_registry.get_client()
+            
+            async with AsyncSessionLocal() as db:
+                sync_service = DataSyncService(db, self.github_client)
+                result = await HistoryBackfillService(sync_service).backfill_user(username)
+                logger.info(f"历史回填完成: {result}")
+                
+        except Exception as e:
+            logger.error(f"历史回填失败: {e}", exc_info=True)
+    
+    def add_backfill_job(self, username: str, hour: int = 3, minute: int = 0):
+        """
+        添加每日低峰期的历史回填任务
+        
+        Args:
+            username: GitHub用户名
+            hour: 执行时间（小时，0-23）
+            minute: 执行时间（分钟，0-59）
+        """
+        self.scheduler.add_job(
+            self.backfill_history_job,
+            trigger=CronTrigger(hour=hour, minute=minute),
+            args=[username],
+            id=f"backfill_{username}",
+            name=f"历史回填 - {username}",
+            replace_existing=True
+        )
+        logger.info(f"已添加历史回填任务: {username} (每天 {hour:02d}:{minute:02d})")
+    
     def add_daily_sync_job(self, username: str, hour: int = 2, minute: int = 0):
         """
         添加每日同步任务
@@ -0,0 +1,79 @@
+"""
+请求合并（single-flight）
+相同键的并发调用只执行一次，所有调用方共享同一个结果或异常。
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """一次正在执行的调用及其等待者数量"""
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    合并相同键的并发调用
+
+    使用示例:
+        flight = SingleFlight()
+        data = await flight.do(("GET", "/users/octocat"), lambda: fetch("/users/octocat"))
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self.stats = {
+            'calls': 0,  # 调用总数
+            'executions': 0,  # 实际执行次数
+            'coalesced': 0  # 被合并（共享他人结果）的调用次数
+        }
+
+    @property
+    def in_flight(self) -> int:
+        """正在执行的调用数"""
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        执行调用；若相同键的调用正在进行，则等待其结果
+
+        调用在独立的任务中执行：单个等待者被取消不影响其他等待者，
+        所有等待者都取消时才取消底层调用。
+
+        Args:
+            key: 调用键，相同键的调用会被合并
+            fn: 无参数的协程函数
+
+        Returns:
+            调用结果（多个调用方共享同一对象，不应修改）
+        """
+        self.stats['calls'] += 1
+
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.stats['executions'] += 1
+        else:
+            self.stats['coalesced'] += 1
+            logger.debug(f"合并相同的进行中请求: {key}")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        """调用结束后移除记录（之后的相同调用会重新执行）"""
+        if self._calls.get(key) is call:
+            del self._calls[key]
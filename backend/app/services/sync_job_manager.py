@@ -0,0 +1,310 @@
+"""
+后台同步任务管理
+同步请求提交为后台任务后立即返回任务ID，调用方通过任务ID查询状态、计数、吞吐量和错误，
+或订阅服务器推送事件（SSE）获取进度；同一用户同时只运行一个同步任务。
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple, Callable, Awaitable, AsyncIterator, Hashable
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 任务结束状态
+FINISHED_STATUSES = ('succeeded', 'failed', 'cancelled')
+
+
+class SyncJob:
+    """
+    一个后台同步任务的状态和进度
+
+    record() 作为 DataSyncService 的进度回调，接收以下事件：
+        stage        - {'stage': 'user' | 'repositories' | 'commits' | 'statistics' | 'enrich'}
+        repositories - {'total': 仓库数, 'pending': 需要同步的仓库数, 'skipped': 跳过的仓库数}
+        commits      - {'repo_name': 仓库, 'count': 本批写入的提交数}（补全任务为本批补全的提交数）
+        repository   - {'repo_name': 仓库, 'commits': 新增提交数, 'error': 错误或None}
+    """
+
+    def __init__(self, job_id: str, key: Hashable, params: Dict[str, Any]):
+        """
+        Args:
+            job_id: 任务ID
+            key: 去重键（同一键同时只有一个未结束的任务）
+            params: 任务参数（返回给调用方，不应包含Token等敏感信息）
+        """
+        self.id = job_id
+        self.key = key
+        self.params = params
+        self.status = 'queued'
+        self.stage: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.total_repos = 0
+        self.pending_repos = 0
+        self.skipped_repos = 0
+        self.completed_repos = 0
+        self.failed_repos: List[Dict[str, str]] = []
+        self.commits_synced = 0
+        self.error: Optional[str] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.version = 0  # 每次状态变化加一
+        self._started = None  # 开始运行时的perf_counter
+        self._elapsed = None
+        self._changed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def finished(self) -> bool:
+        """任务是否已结束"""
+        return self.status in FINISHED_STATUSES
+
+    @property
+    def elapsed_seconds(self) -> float:
+        """运行耗时（秒），未开始时为0"""
+        if self._elapsed is not None:
+            return self._elapsed
+        if self._started is None:
+            return 0.0
+        return time.perf_counter() - self._started
+
+    def record(self, event: str, data: Dict[str, Any]) -> None:
+        """
+        记录同步进度事件
+
+        Args:
+            event: 事件名称
+            data: 事件数据
+        """
+        if event == 'stage':
+            self.stage = data['stage']
+        elif event == 'repositories':
+            self.total_repos = data['total']
+            self.pending_repos = data['pending']
+            self.skipped_repos = data['skipped']
+        elif event == 'commits':
+            self.commits_synced += data['count']
+        elif event == 'repository':
+            if data.get('error'):
+                self.failed_repos.append({'repo_name': data['repo_name'], 'error': data['error']})
+            else:
+                self.completed_repos += 1
+        self._notify()
+
+    def _set_status(self, status: str) -> None:
+        """更新任务状态"""
+        self.status = status
+        if status == 'running':
+            self.started_at = datetime.utcnow()
+            self._started = time.perf_counter()
+        elif status in FINISHED_STATUSES:
+            self.finished_at = datetime.utcnow()
+            self._elapsed = self.elapsed_seconds
+        self._notify()
+
+    def _notify(self) -> None:
+        """唤醒等待状态变化的订阅者"""
+        self.version += 1
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait_for_change(self, version: int, timeout: float) -> bool:
+        """
+        等待任务状态在version之后发生变化
+
+        Args:
+            version: 调用方已看到的版本
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            超时前发生变化时返回True
+        """
+        if self.version != version:
+            return True
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def events(
+        self,
+        min_interval: Optional[float] = None,
+        heartbeat: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """
+        以服务器推送事件（SSE）格式产出任务进度（异步生成器）
+
+        每次状态变化产出一个progress事件（两次推送至少间隔min_interval秒，期间的变化合并），
+        空闲时按heartbeat秒发送注释保持连接，任务结束时产出done事件后结束。
+
+        Args:
+            min_interval: 两次进度推送的最小间隔，默认使用配置中的SYNC_JOB_EVENT_INTERVAL
+            heartbeat: 空闲时发送心跳的间隔，默认使用配置中的SYNC_JOB_EVENT_HEARTBEAT
+
+        Yields:
+            SSE消息文本
+        """
+        min_interval = settings.SYNC_JOB_EVENT_INTERVAL if min_interval is None else min_interval
+        heartbeat = heartbeat or settings.SYNC_JOB_EVENT_HEARTBEAT
+        version = -1
+        while True:
+            if self.version == version:
+                if not await self.wait_for_change(version, heartbeat):
+                    yield ": keep-alive\n\n"
+                    continue
+
+            version = self.version
+            data = json.dumps(self.to_dict(), ensure_ascii=False)
+            if self.finished:
+                yield f"event: done\ndata: {data}\n\n"
+                return
+            yield f"event: progress\ndata: {data}\n\n"
+            if min_interval:
+                await asyncio.sleep(min_interval)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        elapsed = self.elapsed_seconds
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'stage': self.stage,
+            'params': self.params,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'elapsed_seconds': round(elapsed, 3),
+            'total_repos': self.total_repos,
+            'pending_repos': self.pending_repos,
+            'skipped_repos': self.skipped_repos,
+            'completed_repos': self.completed_repos,
+            'failed_repos': list(self.failed_repos),
+            'commits_synced': self.commits_synced,
+            'commits_per_second': round(self.commits_synced / elapsed, 2) if elapsed > 0 else 0.0,
+            'error': self.error,
+            'result': self.result
+        }
+
+
+class SyncJobManager:
+    """
+    后台同步任务管理器（进程内）
+
+    任务在事件循环中以后台任务运行，同时运行的任务数受SYNC_JOB_MAX_CONCURRENT限制，
+    超出的任务排队；结束的任务保留SYNC_JOB_RETENTION_SECONDS秒供查询。
+    进程退出时未完成的任务被取消，同步运行的检查点保证下次同步从中断处继续。
+
+    使用示例:
+        job, created = sync_job_manager.submit(('octocat',), {'username': 'octocat'}, run)
+        status = sync_job_manager.get(job.id).to_dict()
+    """
+
+    def __init__(self, max_concurrent: Optional[int] = None, retention_seconds: Optional[int] = None):
+        """
+        Args:
+            max_concurrent: 同时运行的最大任务数，默认使用配置中的SYNC_JOB_MAX_CONCURRENT
+            retention_seconds: 结束的任务保留时长（秒），默认使用配置中的SYNC_JOB_RETENTION_SECONDS
+        """
+        self.max_concurrent = max_concurrent or settings.SYNC_JOB_MAX_CONCURRENT
+        self.retention_seconds = (
+            settings.SYNC_JOB_RETENTION_SECONDS if retention_seconds is None else retention_seconds
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        self._jobs: Dict[str, SyncJob] = {}
+        self._active: Dict[Hashable, SyncJob] = {}
+
+    def submit(
+        self,
+        key: Hashable,
+        params: Dict[str, Any],
+        run: Callable[[SyncJob], Awaitable[Dict[str, Any]]]
+    ) -> Tuple[SyncJob, bool]:
+        """
+        提交后台任务；相同键的任务尚未结束时返回该任务
+
+        Args:
+            key: 去重键
+            params: 任务参数（会出现在状态中）
+            run: 执行任务的协程函数，接收任务对象（用于记录进度），返回结果字典
+
+        Returns:
+            (任务, 是否新建)
+        """
+        self._prune()
+
+        active = self._active.get(key)
+        if active is not None and not active.finished:
+            return active, False
+
+        job = SyncJob(uuid.uuid4().hex, key, params)
+        self._jobs[job.id] = job
+        self._active[key] = job
+        job._task = asyncio.ensure_future(self._run(job, run))
+        logger.info(f"已提交同步任务 {job.id}: {params}")
+        return job, True
+
+    def get(self, job_id: str) -> Optional[SyncJob]:
+        """
+        获取任务
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            任务，不存在或已过保留期时返回None
+        """
+        self._prune()
+        return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[SyncJob]:
+        """获取所有保留中的任务（按创建时间倒序）"""
+        self._prune()
+        return sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    async def shutdown(self) -> None:
+        """取消所有未结束的任务并等待其退出"""
+        tasks = [job._task for job in self._jobs.values() if job._task is not None and not job._task.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, job: SyncJob, run: Callable[[SyncJob], Awaitable[Dict[str, Any]]]) -> None:
+        """排队等待并执行任务，记录结果或错误"""
+        try:
+            async with self._semaphore:
+                job._set_status('running')
+                job.result = await run(job)
+            job._set_status('succeeded')
+            logger.info(f"同步任务 {job.id} 完成，耗时 {job.elapsed_seconds:.1f} 秒")
+        except asyncio.CancelledError:
+            job.error = "任务已取消"
+            job._set_status('cancelled')
+            raise
+        except Exception as e:
+            job.error = str(e) or e.__class__.__name__
+            job._set_status('failed')
+            logger.error(f"同步任务 {job.id} 失败: {e}", exc_info=True)
+        finally:
+            if self._active.get(job.key) is job:
+                del self._active[job.key]
+
+    def _prune(self) -> None:
+        """删除超过保留期的已结束任务"""
+        now = datetime.utcnow()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and (now - job.finished_at).total_seconds() > self.retention_seconds
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+# 全局同步任务管理器实例（在应用lifespan中关闭）
+sync_job_manager = SyncJobManager()
@@ -0,0 +1,411 @@
+"""
+流水线同步引擎
+提交列表获取、提交详情获取、解析和批量写入四个阶段通过有界队列连接并行执行：
+写数据库时网络请求不停顿，等待网络时数据库写入不停顿。
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import aclosing
+from typing import Optional, List, Dict, Any, Tuple, TYPE_CHECKING
+
+from app.core.config import settings
+from app.models.user import User
+from app.models.repository import Repository
+from app.models.commit_detail import CommitDetail
+from app.models.sync_run import SyncRunRepo
+from app.services.commit_parser import CommitParser
+
+if TYPE_CHECKING:
+    from app.services.data_sync_service import DataSyncService
+
+logger = logging.getLogger(__name__)
+
+# 队列结束标记
+_DONE = object()
+
+
+class StageMetrics:
+    """
+    单个阶段的计时统计
+
+    busy为处理耗时，idle为等待上游输入的时间，blocked为下游队列已满时的等待时间（背压）；
+    三者均为该阶段所有worker的累计值。
+    """
+
+    def __init__(self, name: str, concurrency: int):
+        """
+        Args:
+            name: 阶段名称
+            concurrency: worker数
+        """
+        self.name = name
+        self.concurrency = concurrency
+        self.items = 0
+        self.busy = 0.0
+        self.idle = 0.0
+        self.blocked = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {
+            'concurrency': self.concurrency,
+            'items': self.items,
+            'busy_seconds': round(self.busy, 3),
+            'idle_seconds': round(self.idle, 3),
+            'blocked_seconds': round(self.blocked, 3)
+        }
+
+
+class _PageState:
+    """一页提交在流水线中的进度（用于按页推进检查点）"""
+
+    def __init__(self, cursor: Optional[str], listed: int, remaining: int):
+        self.cursor = cursor  # 下一页游标
+        self.listed = listed  # 本页列出的提交数
+        self.remaining = remaining  # 本页尚未写入的新提交数
+
+
+class _RepoState:
+    """单个仓库在流水线中的进度"""
+
+    def __init__(self, repository: Repository, since: Optional[str], checkpoint: Optional[SyncRunRepo]):
+        self.repository = repository
+        self.owner, self.name = repository.repo_name.split('/')
+        self.since = since
+        self.checkpoint = checkpoint
+        self.pending = 0  # 已进入流水线但尚未写入的提交数
+        self.listed = False  # 提交列表是否已全部获取
+        self.synced: List[CommitDetail] = []
+        self.pages = deque()  # 按顺序排列、检查点尚未越过的页
+        self.unsaved = 0  # 已写入但尚未记录到检查点的提交数
+
+
+class SyncPipeline:
+    """
+    流水线同步引擎
+
+    阶段与并发：
+        list   - 单个列表worker依次获取各仓库的提交列表（页的预取由GitHub客户端完成），并过滤已存在的SHA；
+                 仓库之间的并行由RepoSyncScheduler为每个仓库运行一条流水线实现
+        detail - 并发获取提交详情的请求数（SYNC_DETAIL_CONCURRENCY）
+        parse  - 解析worker数（SYNC_PIPELINE_PARSE_CONCURRENCY）
+        write  - 单个写入者，按批（SYNC_PIPELINE_BATCH_SIZE 或 SYNC_PIPELINE_FLUSH_INTERVAL）写入数据库
+
+    所有数据库操作共用DataSyncService的会话，通过锁串行执行。
+    提供检查点时，某页及之前所有页的提交都写入后才把检查点推进到下一页的游标。
+
+    使用示例:
+        pipeline = SyncPipeline(sync_service)
+        commits = await pipeline.run(user, [(repo, since), ...], max_commits=100)
+        print(pipeline.stats())
+    """
+
+    STAGES = ('list', 'detail', 'parse', 'write')
+
+    def __init__(
+        self,
+        service: "DataSyncService",
+        detail_concurrency: Optional[int] = None,
+        parse_concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        queue_size: Optional[int] = None
+    ):
+        """
+        Args:
+            service: 数据同步服务（提供GitHub客户端、数据库会话和写入逻辑）
+            detail_concurrency: 并发获取提交详情的请求数，默认使用服务的detail_concurrency
+            parse_concurrency: 解析worker数
+            batch_size: 每批写入的最大提交数
+            flush_interval: 取到一批的第一项后最多等待多久再写入（秒）
+            queue_size: 阶段之间队列的容量
+        """
+        self.service = service
+        self.detail_concurrency = detail_concurrency or service.detail_concurrency
+        self.parse_concurrency = parse_concurrency or settings.SYNC_PIPELINE_PARSE_CONCURRENCY
+        self.batch_size = batch_size or settings.SYNC_PIPELINE_BATCH_SIZE
+        self.flush_interval = (
+            settings.SYNC_PIPELINE_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        )
+        self.queue_size = queue_size or settings.SYNC_PIPELINE_QUEUE_SIZE
+
+        self.metrics = {
+            'list': StageMetrics('list', 1),
+            'detail': StageMetrics('detail', self.detail_concurrency),
+            'parse': StageMetrics('parse', self.parse_concurrency),
+            'write': StageMetrics('write', 1)
+        }
+        self.elapsed = 0.0
+        self._db_lock = asyncio.Lock()
+
+    async def run(
+        self,
+        user: User,
+        repositories: List[Tuple[Repository, Optional[str]]],
+        max_commits: Optional[int] = None,
+        checkpoints: Optional[Dict[int, SyncRunRepo]] = None
+    ) -> List[CommitDetail]:
+        """
+        同步多个仓库的提交
+
+        任一阶段出错时取消其余阶段并抛出异常；已完成的仓库的水位已推进。
+
+        Args:
+            user: 用户ORM对象
+            repositories: (仓库, 起始时间) 列表，起始时间为None表示获取完整历史
+            max_commits: 每个仓库最大同步提交数
+            checkpoints: 检查点字典 {仓库ID: 检查点}（属于服务的会话），
+                提供时从检查点继续并逐页记录进度
+
+        Returns:
+            新增的提交详情对象列表
+        """
+        self._user = user
+        self._max_commits = max_commits
+
+        checkpoints = checkpoints or {}
+        states = []
+        for repository, since in repositories:
+            if len(repository.repo_name.split('/')) != 2:
+                logger.error(f"无效的仓库名称: {repository.repo_name}")
+                continue
+            states.append(_RepoState(repository, since, checkpoints.get(repository.id)))
+        repo_queue: asyncio.Queue = asyncio.Queue()
+        for state in states:
+            repo_queue.put_nowait(state)
+
+        detail_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        parse_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        write_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+
+        stages = [
+            self._run_stage([self._list_worker(repo_queue, detail_queue)], detail_queue, self.detail_concurrency),
+            self._run_stage(
+                [self._detail_worker(detail_queue, parse_queue) for _ in range(self.detail_concurrency)],
+                parse_queue, self.parse_concurrency
+            ),
+            self._run_stage(
+                [self._parse_worker(parse_queue, write_queue) for _ in range(self.parse_concurrency)],
+                write_queue, 1
+            ),
+            self._write_worker(write_queue)
+        ]
+
+        start = time.perf_counter()
+        tasks = [asyncio.ensure_future(stage) for stage in stages]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            self.elapsed = time.perf_counter() - start
+            logger.info(f"流水线同步完成: {self.stats()}")
+
+        return [commit for state in states for commit in state.synced]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取各阶段的计时统计
+
+        Returns:
+            总耗时和每个阶段的处理数、处理/等待/背压耗时
+        """
+        return {
+            'elapsed_seconds': round(self.elapsed, 3),
+            'stages': {name: self.metrics[name].to_dict() for name in self.STAGES}
+        }
+
+    async def _run_stage(self, workers: List, next_queue: asyncio.Queue, next_workers: int) -> None:
+        """运行一个阶段的所有worker，全部结束后通知下游每个worker结束"""
+        await asyncio.gather(*workers)
+        for _ in range(next_workers):
+            await next_queue.put(_DONE)
+
+    async def _get(self, queue: asyncio.Queue, metrics: StageMetrics) -> Any:
+        """从上游队列取出一项，记录等待时间"""
+        start = time.perf_counter()
+        item = await queue.get()
+        metrics.idle += time.perf_counter() - start
+        return item
+
+    async def _put(self, queue: asyncio.Queue, item: Any, metrics: StageMetrics) -> None:
+        """放入下游队列，记录队列已满时的等待时间"""
+        start = time.perf_counter()
+        await queue.put(item)
+        metrics.blocked += time.perf_counter() - start
+
+    async def _list_worker(self, repo_queue: asyncio.Queue, detail_queue: asyncio.Queue) -> None:
+        """获取提交列表，过滤已存在的SHA后把新提交送入详情队列"""
+        metrics = self.metrics['list']
+        while True:
+            try:
+                state = repo_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            cursor, max_commits = self.service.resume_position(state.checkpoint, self._max_commits)
+            if max_commits is not None and max_commits <= 0:
+                # 中断前已列出足够的提交，只需推进水位
+                state.listed = True
+                await self._finish(state)
+                continue
+
+            pages = self.service.iter_commit_pages(
+                state.owner, state.name, since=state.since, max_commits=max_commits, cursor=cursor
+            )
+            async with aclosing(pages):
+                while True:
+                    start = time.perf_counter()
+                    try:
+                        page, next_cursor = await pages.__anext__()
+                    except StopAsyncIteration:
+                        break
+                    # rest页为提交列表，graphql页为已包含统计数据的history节点，git页为镜像中的提交记录；
+                    # 两阶段同步直接写入提交列表中的提交，不获取详情
+                    if self.service.sync_strategy == 'graphql':
+                        nodes = {node['oid']: node for node in page}
+                    elif self.service.sync_strategy == 'git':
+                        nodes = {record['sha']: record for record in page}
+                    elif self.service.two_phase:
+                        nodes = {commit.get('sha'): commit for commit in page}
+                    else:
+                        nodes = {commit.get('sha'): None for commit in page}
+                    async with self._db_lock:
+                        new_shas = await self.service._filter_new_shas(list(nodes))
+                    metrics.busy += time.perf_counter() - start
+                    metrics.items += len(new_shas)
+
+                    page_state = _PageState(next_cursor, len(page), len(new_shas))
+                    state.pages.append(page_state)
+                    if not new_shas:
+                        await self._save_checkpoint(state)
+                    for sha in new_shas:
+                        state.pending += 1
+                        await self._put(detail_queue, (state, page_state, sha, nodes[sha]), metrics)
+
+            state.listed = True
+            if state.pending == 0:
+                await self._finish(state)
+
+    async def _detail_worker(self, detail_queue: asyncio.Queue, parse_queue: asyncio.Queue) -> None:
+        """获取提交详情（graphql策略仅在启用语言检测时获取，git策略和两阶段同步不获取）"""
+        metrics = self.metrics['detail']
+        client = self.service.github_client
+        fetch_for_languages = self.service.sync_strategy == 'graphql' and self.service.detect_languages
+        while True:
+            item = await self._get(detail_queue, metrics)
+            if item is _DONE:
+                return
+            state, page_state, sha, node = item
+
+            start = time.perf_counter()
+            detail = None
+            if node is None or fetch_for_languages:
+                detail = await client.get_commit_detail(state.owner, state.name, sha)
+            metrics.busy += time.perf_counter() - start
+            metrics.items += 1
+
+            await self._put(parse_queue, (state, page_state, detail, node), metrics)
+
+    async def _parse_worker(self, parse_queue: asyncio.Queue, write_queue: asyncio.Queue) -> None:
+        """解析提交详情（CPU操作，在事件循环中执行）"""
+        metrics = self.metrics['parse']
+        while True:
+            item = await self._get(parse_queue, metrics)
+            if item is _DONE:
+                return
+            state, page_state, detail, node = item
+
+            start = time.perf_counter()
+            if node is None:
+                parsed = CommitParser.parse_commit(detail)
+            elif self.service.sync_strategy == 'git':
+                parsed = CommitParser.parse_git_commit(node)
+            elif self.service.sync_strategy == 'rest':
+                parsed = CommitParser.parse_listing_commit(node)
+            else:
+                parsed = CommitParser.parse_graphql_commit(node)
+                if detail is not None:
+                    rest_parsed = CommitParser.parse_commit(detail)
+                    parsed['languages'] = rest_parsed['languages']
+                    parsed['file_types'] = rest_parsed['file_types']
+            metrics.busy += time.perf_counter() - start
+            metrics.items += 1
+
+            await self._put(write_queue, (state, page_state, parsed), metrics)
+
+    async def _write_worker(self, write_queue: asyncio.Queue) -> None:
+        """攒批写入数据库：取到第一项后最多等待flush_interval秒或攒满batch_size个再写入"""
+        metrics = self.metrics['write']
+        loop = asyncio.get_running_loop()
+        done = False
+        while not done:
+            item = await self._get(write_queue, metrics)
+            if item is _DONE:
+                return
+            batch = [item]
+            start = time.perf_counter()
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                if write_queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(write_queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = write_queue.get_nowait()
+                if item is _DONE:
+                    done = True
+                    break
+                batch.append(item)
+            metrics.idle += time.perf_counter() - start
+
+            start = time.perf_counter()
+            by_repo: Dict[int, Tuple[_RepoState, List[Dict[str, Any]]]] = {}
+            for state, page_state, parsed in batch:
+                by_repo.setdefault(id(state), (state, []))[1].append(parsed)
+                page_state.remaining -= 1
+
+            for state, parsed_commits in by_repo.values():
+                async with self._db_lock:
+                    saved = await self.service._save_parsed_commits(
+                        self._user, state.repository, parsed_commits
+                    )
+                state.synced.extend(saved)
+                state.unsaved += len(saved)
+                state.pending -= len(parsed_commits)
+                await self._save_checkpoint(state)
+                if state.listed and state.pending == 0:
+                    await self._finish(state)
+            metrics.busy += time.perf_counter() - start
+            metrics.items += len(batch)
+
+    async def _save_checkpoint(self, state: _RepoState) -> None:
+        """把检查点推进到最后一个已全部写入的连续页之后"""
+        if state.checkpoint is None:
+            return
+        completed = []
+        while state.pages and state.pages[0].remaining == 0:
+            completed.append(state.pages.popleft())
+        if not completed:
+            return
+        cursor = completed[-1].cursor
+        listed = sum(page_state.listed for page_state in completed)
+        async with self._db_lock:
+            await self.service.sync_runs.save_page(state.checkpoint, cursor, listed, state.unsaved)
+        state.unsaved = 0
+
+    async def _finish(self, state: _RepoState) -> None:
+        """仓库的全部提交写入后推进同步水位"""
+        async with self._db_lock:
+            await self.service.finish_repository(
+                self._user, state.repository, state.synced, state.checkpoint
+            )
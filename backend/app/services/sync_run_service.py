@@ -0,0 +1,279 @@
+"""
+同步运行检查点服务
+为每次用户数据同步记录一条 sync_runs 记录和每个仓库的 sync_run_repos 检查点，
+每写完一页提交就提交下一页的游标；进程中断或被限流后，下一次同步继续未完成的运行，
+已完成的仓库不再请求，未完成的仓库从游标处继续分页。
+结束超过 SYNC_RUN_RETENTION_DAYS 天的运行在下一次同步开始时删除。
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, delete, func
+
+from app.core.config import settings
+from app.models.user import User
+from app.models.repository import Repository
+from app.models.sync_run import SyncRun, SyncRunRepo
+
+logger = logging.getLogger(__name__)
+
+
+class SyncRunService:
+    """
+    同步运行检查点服务
+
+    使用示例:
+        runs = SyncRunService(db)
+        run, checkpoints = await runs.resume_or_start(user, incremental=False, max_commits=None, sync_strategy='rest')
+        checkpoints = await runs.add_repositories(run, [(repo, since), ...], checkpoints)
+        ...                                              # 各仓库同步时调用 save_page / complete_repository
+        await runs.finish(run, total_commits=120)
+    """
+
+    def __init__(self, db: AsyncSession):
+        """
+        Args:
+            db: 数据库会话
+        """
+        self.db = db
+
+    async def resume_or_start(
+        self,
+        user: User,
+        incremental: bool,
+        max_commits: Optional[int],
+        sync_strategy: str,
+        author_filter: Optional[str] = None
+    ) -> Tuple[SyncRun, Dict[int, SyncRunRepo]]:
+        """
+        继续用户最近一次未完成的同步运行，没有可继续的运行时创建新运行
+
+        只有同步参数（增量/全量、每仓库最大提交数、同步策略、作者过滤条件）相同且开始时间在
+        SYNC_RESUME_MAX_AGE_HOURS 之内的运行才会继续，其余未完成的运行标记为abandoned。
+        同时删除该用户结束超过 SYNC_RUN_RETENTION_DAYS 天的运行。调用方负责提交事务。
+
+        Args:
+            user: 用户ORM对象
+            incremental: 是否增量同步
+            max_commits: 每个仓库最大同步提交数
+            sync_strategy: 提交同步策略（游标格式与策略相关）
+            author_filter: 提交作者过滤条件的指纹（过滤条件不同时游标无效），None表示不过滤
+
+        Returns:
+            (同步运行, 已有检查点字典 {仓库ID: 检查点})，新运行的检查点字典为空
+        """
+        result = await self.db.execute(
+            select(SyncRun)
+            .where(SyncRun.user_id == user.id, SyncRun.status.in_(('running', 'failed')))
+            .order_by(SyncRun.id.desc())
+        )
+        unfinished = result.scalars().all()
+
+        now = datetime.utcnow()
+        oldest_started_at = now - timedelta(hours=settings.SYNC_RESUME_MAX_AGE_HOURS)
+        resumable = None
+        for run in unfinished:
+            if (
+                resumable is None
+                and run.incremental == incremental
+                and run.max_commits_per_repo == max_commits
+                and run.sync_strategy == sync_strategy
+                and run.author_filter == author_filter
+                and run.started_at is not None
+                and run.started_at >= oldest_started_at
+            ):
+                resumable = run
+            else:
+                run.status = 'abandoned'
+                run.finished_at = now
+
+        await self._prune_finished(user, now)
+
+        if resumable is not None:
+            resumable.status = 'running'
+            resumable.resume_count = (resumable.resume_count or 0) + 1
+            result = await self.db.execute(
+                select(SyncRunRepo).where(SyncRunRepo.run_id == resumable.id)
+            )
+            checkpoints = {checkpoint.repo_id: checkpoint for checkpoint in result.scalars().all()}
+            logger.info(
+                f"继续同步运行 {resumable.id}: "
+                f"{sum(c.status == 'completed' for c in checkpoints.values())}/{len(checkpoints)} 个仓库已完成"
+            )
+            return resumable, checkpoints
+
+        run = SyncRun(
+            user_id=user.id,
+            incremental=incremental,
+            sync_strategy=sync_strategy,
+            max_commits_per_repo=max_commits,
+            author_filter=author_filter,
+            status='running',
+            total_repos=0,
+            completed_repos=0,
+            failed_repos=0,
+            total_commits=0,
+            resume_count=0,
+            started_at=now,
+            finished_at=None
+        )
+        self.db.add(run)
+        await self.db.flush()
+        return run, {}
+
+    async def _prune_finished(self, user: User, now: datetime) -> None:
+        """
+        删除用户结束超过保留期的运行及其检查点
+
+        只删除completed和abandoned的运行；failed的运行超过继续期限后会先被标记为abandoned，
+        再在保留期之后删除。
+
+        Args:
+            user: 用户ORM对象
+            now: 当前时间
+        """
+        if settings.SYNC_RUN_RETENTION_DAYS <= 0:
+            return
+
+        expired = (
+            SyncRun.user_id == user.id,
+            SyncRun.status.in_(('completed', 'abandoned')),
+            SyncRun.finished_at < now - timedelta(days=settings.SYNC_RUN_RETENTION_DAYS)
+        )
+        # 先删除子表，不依赖数据库的级联删除
+        await self.db.execute(
+            delete(SyncRunRepo)
+            .where(SyncRunRepo.run_id.in_(select(SyncRun.id).where(*expired)))
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(
+            delete(SyncRun).where(*expired).execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            logger.info(f"删除用户 {user.username} 的 {result.rowcount} 个过期同步运行")
+
+    async def add_repositories(
+        self,
+        run: SyncRun,
+        repositories: List[Tuple[Repository, Optional[str]]],
+        checkpoints: Dict[int, SyncRunRepo]
+    ) -> Dict[int, SyncRunRepo]:
+        """
+        为尚无检查点的仓库创建检查点并提交事务
+
+        Args:
+            run: 同步运行
+            repositories: 本次需要同步的 (仓库, 起始时间) 列表
+            checkpoints: 已有检查点字典
+
+        Returns:
+            包含所有仓库的检查点字典 {仓库ID: 检查点}
+        """
+        # 所有列都显式赋值：检查点会被复制到各仓库的会话中使用，未加载的列无法在异步会话中延迟加载
+        checkpoints = dict(checkpoints)
+        for repository, since in repositories:
+            if repository.id in checkpoints:
+                continue
+            checkpoint = SyncRunRepo(
+                run_id=run.id,
+                repo_id=repository.id,
+                status='pending',
+                since=since,
+                cursor=None,
+                commits_listed=0,
+                commits_synced=0,
+                error=None
+            )
+            self.db.add(checkpoint)
+            checkpoints[repository.id] = checkpoint
+
+        run.total_repos = len(checkpoints)
+        await self.db.commit()
+        return checkpoints
+
+    async def save_page(
+        self,
+        checkpoint: SyncRunRepo,
+        cursor: Optional[str],
+        listed: int,
+        synced: int
+    ) -> None:
+        """
+        一页（或连续多页）提交写入后记录下一页的游标并提交事务
+
+        页数据先于游标提交：两次提交之间中断时，继续同步会重新列出这一页，
+        已写入的提交按SHA过滤，不会重复写入。
+
+        Args:
+            checkpoint: 仓库检查点（属于当前会话）
+            cursor: 下一页游标
+            listed: 这些页列出的提交数
+            synced: 这些页新写入的提交数
+        """
+        checkpoint.cursor = cursor
+        checkpoint.commits_listed = (checkpoint.commits_listed or 0) + listed
+        checkpoint.commits_synced = (checkpoint.commits_synced or 0) + synced
+        await self.db.commit()
+
+    @staticmethod
+    def complete_repository(checkpoint: SyncRunRepo) -> None:
+        """
+        标记仓库已完成（与推进仓库水位在同一事务中提交）
+
+        Args:
+            checkpoint: 仓库检查点
+        """
+        checkpoint.status = 'completed'
+        checkpoint.error = None
+
+    async def fail_repository(self, checkpoint_id: int, error: str) -> None:
+        """
+        标记仓库失败并提交事务，已提交的游标保留，下次从游标处继续
+
+        会话回滚后ORM对象已过期，因此按ID直接更新。
+
+        Args:
+            checkpoint_id: 检查点ID
+            error: 失败原因
+        """
+        await self.db.execute(
+            update(SyncRunRepo)
+            .where(SyncRunRepo.id == checkpoint_id)
+            .values(status='failed', error=error)
+        )
+        await self.db.commit()
+
+    async def finish(self, run: SyncRun, total_commits: int) -> SyncRun:
+        """
+        汇总各仓库检查点，结束同步运行并提交事务
+
+        所有仓库完成时状态为completed；有失败的仓库时为failed，下次同步继续该运行。
+
+        Args:
+            run: 同步运行
+            total_commits: 本次新增的提交数
+
+        Returns:
+            同步运行
+        """
+        result = await self.db.execute(
+            select(SyncRunRepo.status, func.count(SyncRunRepo.id))
+            .where(SyncRunRepo.run_id == run.id)
+            .group_by(SyncRunRepo.status)
+        )
+        counts = dict(result.all())
+
+        run.completed_repos = counts.get('completed', 0)
+        run.failed_repos = run.total_repos - run.completed_repos
+        run.total_commits = (run.total_commits or 0) + total_commits
+        run.status = 'completed' if run.failed_repos == 0 else 'failed'
+        run.finished_at = datetime.utcnow()
+        await self.db.commit()
+
+        logger.info(
+            f"同步运行 {run.id} 结束: {run.status}, "
+            f"{run.completed_repos}/{run.total_repos} 个仓库完成"
+        )
+        return run
@@ -0,0 +1,282 @@
+"""
+GitHub Token池
+为多个Token分别记录速率限制配额，每次请求选择剩余配额最多的Token，
+仅当所有Token的配额都耗尽时才等待重置。
+"""
+import asyncio
+import hashlib
+import logging
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Iterable
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 配额未知时按GitHub认证用户的默认配额估算
+DEFAULT_LIMIT = 5000
+
+
+class TokenState:
+    """单个Token的配额状态（按速率限制资源分别记录，如core、graphql）"""
+
+    def __init__(self, token: Optional[str]):
+        """
+        Args:
+            token: GitHub Token，None表示匿名访问
+        """
+        self.token = token
+        self.resources: Dict[str, Dict[str, Any]] = {}
+        self.in_flight: Dict[str, int] = {}
+        self.requests = 0
+
+    @property
+    def name(self) -> str:
+        """脱敏后的Token名称，用于日志和状态展示"""
+        if not self.token:
+            return "anonymous"
+        return f"***{self.token[-4:]}"
+
+    def quota(self, resource: str = "core") -> Dict[str, Any]:
+        """获取指定资源的配额记录"""
+        return self.resources.setdefault(resource, {
+            'remaining': None,
+            'limit': None,
+            'reset': None
+        })
+
+    def available(self, resource: str = "core") -> int:
+        """
+        估算可用配额：剩余配额减去已发出但尚未返回的请求数
+
+        Args:
+            resource: 速率限制资源
+
+        Returns:
+            可用配额估算值
+        """
+        quota = self.quota(resource)
+        remaining = quota['remaining']
+        if remaining is None:
+            remaining = quota['limit'] or DEFAULT_LIMIT
+        return remaining - self.in_flight.get(resource, 0)
+
+
+class TokenPool:
+    """
+    多Token配额池
+
+    使用示例:
+        pool = TokenPool(["ghp_a", "ghp_b"])
+        state = await pool.acquire()
+        try:
+            response = await send(state.token)
+        finally:
+            pool.release(state, response.headers)
+    """
+
+    MIN_REMAINING = 10  # 剩余配额低于该值的Token不再分配请求
+
+    def __init__(self, tokens: Iterable[Optional[str]]):
+        """
+        Args:
+            tokens: Token列表（重复和空值会被去除，全部为空时使用匿名访问）
+        """
+        unique = list(dict.fromkeys(t for t in tokens if t))
+        self.states: List[TokenState] = [TokenState(t) for t in unique] or [TokenState(None)]
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "TokenPool":
+        """
+        根据配置创建Token池（GITHUB_TOKENS中的Token加上GITHUB_TOKEN）
+
+        Returns:
+            Token池实例
+        """
+        tokens = [t.strip() for t in settings.GITHUB_TOKENS.split(',')]
+        tokens.append(settings.GITHUB_TOKEN)
+        return cls(tokens)
+
+    @property
+    def tokens(self) -> List[Optional[str]]:
+        """池中的全部Token"""
+        return [state.token for state in self.states]
+
+    @property
+    def fingerprint(self) -> str:
+        """池中Token组合的指纹（不同凭据的响应缓存和请求合并互相隔离）"""
+        data = '\n'.join(sorted(token for token in self.tokens if token))
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()[:16] if data else 'anonymous'
+
+    def _select(self, resource: str) -> Optional[TokenState]:
+        """选择可用配额最多的Token，全部低于阈值时返回None"""
+        best = max(self.states, key=lambda s: s.available(resource))
+        if best.available(resource) < self.MIN_REMAINING:
+            return None
+        return best
+
+    async def acquire(self, resource: str = "core", wait: bool = True) -> TokenState:
+        """
+        为一次请求分配Token
+
+        Args:
+            resource: 速率限制资源（core、graphql等）
+            wait: 所有Token配额耗尽时是否等待重置；为False时直接返回配额最多的Token
+
+        Returns:
+            分配的Token状态，请求完成后需调用release
+        """
+        state = self._select(resource)
+
+        if state is None and wait:
+            # 串行化等待，避免多个协程同时判断后各自休眠
+            async with self._lock:
+                state = self._select(resource)
+                if state is None:
+                    wait_time = self.wait_time(resource)
+                    logger.warning(f"所有Token的API配额不足，等待 {wait_time} 秒...")
+                    await asyncio.sleep(wait_time)
+                    self._expire(resource)
+                    state = self._select(resource)
+
+        if state is None:
+            state = max(self.states, key=lambda s: s.available(resource))
+
+        state.in_flight[resource] = state.in_flight.get(resource, 0) + 1
+        state.requests += 1
+        return state
+
+    def release(self, state: TokenState, headers=None, resource: str = "core") -> None:
+        """
+        请求完成后归还Token并根据响应头更新配额
+
+        Args:
+            state: acquire返回的Token状态
+            headers: HTTP响应头（请求失败时为None）
+            resource: acquire时使用的速率限制资源
+        """
+        state.in_flight[resource] = max(0, state.in_flight.get(resource, 0) - 1)
+        if headers is not None:
+            self.update(state, headers)
+
+    def update(self, state: TokenState, headers) -> None:
+        """
+        根据响应头更新Token配额
+
+        Args:
+            state: Token状态
+            headers: HTTP响应头
+        """
+        remaining = headers.get("X-RateLimit-Remaining")
+        limit = headers.get("X-RateLimit-Limit")
+        reset_timestamp = headers.get("X-RateLimit-Reset")
+        if not remaining or not limit:
+            return
+
+        resource = headers.get("X-RateLimit-Resource", "core")
+        quota = state.quota(resource)
+        remaining_value = int(remaining)
+        reset_value = int(reset_timestamp) if reset_timestamp else None
+
+        # 并发请求的响应可能乱序到达：同一配额窗口内只接受更小的剩余值，
+        # 避免较早发出的请求用过期的数值覆盖最新状态
+        same_window = reset_value is None or reset_value == quota['reset']
+        if quota['remaining'] is not None and same_window and remaining_value > quota['remaining']:
+            return
+
+        quota['remaining'] = remaining_value
+        quota['limit'] = int(limit)
+        if reset_value:
+            quota['reset'] = reset_value
+            logger.debug(f"Token {state.name} 配额重置时间: {datetime.fromtimestamp(reset_value)}")
+
+        logger.debug(f"Token {state.name} {resource}配额: {remaining}/{limit} 剩余")
+
+        # 警告：配额即将用尽
+        if resource == "core" and remaining_value < 100:
+            logger.warning(f"⚠️  Token {state.name} API配额不足: {remaining}/{limit}")
+
+    def mark_exhausted(self, state: TokenState, resource: str = "core", reset: Optional[int] = None) -> None:
+        """
+        将Token标记为配额耗尽（收到速率限制响应时调用）
+
+        Args:
+            state: Token状态
+            resource: 速率限制资源
+            reset: 配额重置时间戳，未知时按60秒后估算
+        """
+        quota = state.quota(resource)
+        quota['remaining'] = 0
+        if reset:
+            quota['reset'] = reset
+        elif not quota['reset'] or quota['reset'] <= datetime.now().timestamp():
+            quota['reset'] = int(datetime.now().timestamp()) + 60
+
+    def _expire(self, resource: str) -> None:
+        """清除已过重置时间的配额记录，等待结束后重新按默认配额分配"""
+        now = datetime.now().timestamp()
+        for state in self.states:
+            quota = state.quota(resource)
+            if quota['reset'] is None or quota['reset'] <= now:
+                quota['remaining'] = None
+
+    def has_budget(self, resource: str = "core") -> bool:
+        """是否还有Token可以立即发起请求"""
+        return self._select(resource) is not None
+
+    def wait_time(self, resource: str = "core") -> int:
+        """
+        计算最早有Token配额重置的等待时间（秒）
+
+        Args:
+            resource: 速率限制资源
+
+        Returns:
+            等待时间（秒）
+        """
+        resets = [s.quota(resource)['reset'] for s in self.states]
+        resets = [r for r in resets if r]
+        if not resets:
+            return 60  # 默认等待60秒
+
+        now = datetime.now().timestamp()
+        return max(0, int(min(resets) - now) + 5)  # 额外等待5秒确保配额已重置
+
+    def status(self, resource: str = "core") -> Dict[str, Any]:
+        """
+        汇总所有Token的配额状态
+
+        Args:
+            resource: 速率限制资源
+
+        Returns:
+            汇总状态：remaining/limit为各Token之和（尚无数据的Token不计入），
+            reset为最早的重置时间，tokens为各Token的明细
+        """
+        known = [s.quota(resource) for s in self.states if s.quota(resource)['remaining'] is not None]
+        resets = [q['reset'] for q in known if q['reset']]
+
+        return {
+            'remaining': sum(q['remaining'] for q in known) if known else None,
+            'limit': sum(q['limit'] for q in known) if known else None,
+            'reset': min(resets) if resets else None,
+            'tokens': [
+                {
+                    'token': s.name,
+                    'requests': s.requests,
+                    **s.quota(resource)
+                }
+                for s in self.states
+            ]
+        }
+
+    def resource_status(self) -> Dict[str, Dict[str, Any]]:
+        """汇总core以外资源（如graphql）的配额状态"""
+        resources = {r for s in self.states for r in s.resources if r != "core"}
+        result = {}
+        for resource in resources:
+            status = self.status(resource)
+            if status['remaining'] is not None:
+                result[resource] = {k: status[k] for k in ('remaining', 'limit', 'reset')}
+        return result
@@ -0,0 +1,93 @@
+"""
+用户邮箱别名服务
+管理用户提交时使用的邮箱别名，同步时只获取用户登录名和这些邮箱的提交
+"""
+import logging
+from typing import List
+
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import insert_ignore
+from app.models.user import User
+from app.models.user_email_alias import UserEmailAlias
+
+logger = logging.getLogger(__name__)
+
+
+class UserEmailAliasService:
+    """用户邮箱别名服务"""
+
+    def __init__(self, db: AsyncSession):
+        """
+        初始化服务
+
+        Args:
+            db: 数据库会话
+        """
+        self.db = db
+
+    async def list_aliases(self, user_id: int) -> List[UserEmailAlias]:
+        """
+        获取用户的邮箱别名
+
+        Args:
+            user_id: 用户ID
+
+        Returns:
+            邮箱别名列表（按邮箱排序）
+        """
+        result = await self.db.execute(
+            select(UserEmailAlias)
+            .where(UserEmailAlias.user_id == user_id)
+            .order_by(UserEmailAlias.email)
+        )
+        return list(result.scalars().all())
+
+    async def add_alias(self, user_id: int, email: str) -> UserEmailAlias:
+        """
+        添加邮箱别名（已存在时返回已有记录）
+
+        Args:
+            user_id: 用户ID
+            email: 提交作者邮箱（保存为小写）
+
+        Returns:
+            邮箱别名
+
+        Raises:
+            ValueError: 用户不存在或邮箱格式无效
+        """
+        email = email.strip().lower()
+        if '@' not in email:
+            raise ValueError(f"无效的邮箱: {email}")
+        if await self.db.get(User, user_id) is None:
+            raise ValueError(f"用户不存在: {user_id}")
+
+        await self.db.execute(
+            insert_ignore(UserEmailAlias, self.db).values([{'user_id': user_id, 'email': email}])
+        )
+        await self.db.commit()
+
+        result = await self.db.execute(
+            select(UserEmailAlias).where(UserEmailAlias.user_id == user_id, UserEmailAlias.email == email)
+        )
+        logger.info(f"用户 {user_id} 添加邮箱别名: {email}")
+        return result.scalar_one()
+
+    async def remove_alias(self, user_id: int, alias_id: int) -> bool:
+        """
+        删除邮箱别名
+
+        Args:
+            user_id: 用户ID
+            alias_id: 别名ID
+
+        Returns:
+            是否删除了记录
+        """
+        result = await self.db.execute(
+            delete(UserEmailAlias).where(UserEmailAlias.id == alias_id, UserEmailAlias.user_id == user_id)
+        )
+        await self.db.commit()
+        return result.rowcount > 0
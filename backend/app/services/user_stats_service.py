@@ -0,0 +1,256 @@
+"""
+用户统计聚合服务
+写入提交时按批次增量维护 users 表的累计值和 language_stats 表的按语言计数，
+避免每次同步后全表扫描用户的所有提交；rebuild() 从 commit_details 完整重算。
+"""
+import logging
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, delete, insert, func
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.database import upsert
+from app.models.user import User
+from app.models.commit_detail import CommitDetail
+from app.models.language_stat import LanguageStat
+
+logger = logging.getLogger(__name__)
+
+
+class UserStatsService:
+    """
+    用户统计聚合服务
+
+    使用示例:
+        stats = UserStatsService(db)
+        await stats.lock_user(user)                 # 写入提交前锁定用户行（返回 aggregate_synced_at）
+        await stats.apply_commits(user, rows)       # 与提交写入在同一事务中
+        await stats.apply_enrichment(user, rows)    # 两阶段同步补全提交详情后
+        await stats.refresh_active_language(user)
+        await stats.rebuild(user)                   # 计数漂移时完整重算
+    """
+
+    def __init__(self, db: AsyncSession):
+        """
+        Args:
+            db: 数据库会话
+        """
+        self.db = db
+
+    async def lock_user(self, user: User) -> Optional[datetime]:
+        """
+        锁定用户行直到事务结束，同一用户的提交写入和统计累加依次进行
+
+        Args:
+            user: 用户ORM对象
+
+        Returns:
+            加锁读取的 aggregate_synced_at（累计值来自仓库聚合统计时不为空）；
+            并行同步时各会话中的用户对象可能已过期，以加锁读取的值为准
+        """
+        result = await self.db.execute(
+            select(User.aggregate_synced_at).where(User.id == user.id).with_for_update()
+        )
+        return result.scalar_one_or_none()
+
+    async def apply_commits(self, user: User, rows: List[Dict[str, Any]]) -> None:
+        """
+        将一批新写入的提交累加到用户统计
+
+        users 表使用 total = total + delta 的单条UPDATE，language_stats 表按语言
+        分组后使用一条多行upsert累加；调用方负责提交事务。
+
+        Args:
+            user: 用户ORM对象
+            rows: 新写入的 commit_details 行（需包含 commit_date、additions、
+                deletions、files_changed、primary_language）
+        """
+        if not rows:
+            return
+
+        commits = len(rows)
+        additions = sum(row['additions'] or 0 for row in rows)
+        deletions = sum(row['deletions'] or 0 for row in rows)
+
+        await self.db.execute(
+            update(User.__table__)
+            .where(User.id == user.id)
+            .values(
+                total_commits=func.coalesce(User.total_commits, 0) + commits,
+                total_additions=func.coalesce(User.total_additions, 0) + additions,
+                total_deletions=func.coalesce(User.total_deletions, 0) + deletions
+            )
+        )
+        # 同步内存中的值，避免之后读取属性时再查询数据库
+        set_committed_value(user, 'total_commits', (user.total_commits or 0) + commits)
+        set_committed_value(user, 'total_additions', (user.total_additions or 0) + additions)
+        set_committed_value(user, 'total_deletions', (user.total_deletions or 0) + deletions)
+
+        await self._apply_languages(user, rows)
+
+    async def apply_enrichment(self, user: User, rows: List[Dict[str, Any]]) -> None:
+        """
+        将一批补全了详情的提交累加到用户统计
+
+        提交数已在写入未补全的提交时累加，这里只累加增删行数，并把提交计入语言统计
+        （未补全的提交不记录语言）；调用方负责提交事务。
+
+        Args:
+            user: 用户ORM对象
+            rows: 补全后的 commit_details 行（字段同 apply_commits）
+        """
+        if not rows:
+            return
+
+        additions = sum(row['additions'] or 0 for row in rows)
+        deletions = sum(row['deletions'] or 0 for row in rows)
+
+        await self.db.execute(
+            update(User.__table__)
+            .where(User.id == user.id)
+            .values(
+                total_additions=func.coalesce(User.total_additions, 0) + additions,
+                total_deletions=func.coalesce(User.total_deletions, 0) + deletions
+            )
+        )
+        set_committed_value(user, 'total_additions', (user.total_additions or 0) + additions)
+        set_committed_value(user, 'total_deletions', (user.total_deletions or 0) + deletions)
+
+        await self._apply_languages(user, rows)
+
+    async def _apply_languages(self, user: User, rows: List[Dict[str, Any]]) -> None:
+        """按语言分组后使用一条多行upsert累加 language_stats（没有语言的提交不计入）"""
+        languages: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            language = row['primary_language']
+            if not language:
+                continue
+            stat = languages.get(language)
+            if stat is None:
+                stat = languages[language] = {
+                    'user_id': user.id,
+                    'language': language,
+                    'total_commits': 0,
+                    'total_additions': 0,
+                    'total_deletions': 0,
+                    'total_files': 0,
+                    'first_used_at': row['commit_date'],
+                    'last_used_at': row['commit_date']
+                }
+            stat['total_commits'] += 1
+            stat['total_additions'] += row['additions'] or 0
+            stat['total_deletions'] += row['deletions'] or 0
+            stat['total_files'] += row['files_changed'] or 0
+            stat['first_used_at'] = min(stat['first_used_at'], row['commit_date'])
+            stat['last_used_at'] = max(stat['last_used_at'], row['commit_date'])
+
+        if languages:
+            # 按语言排序，多个仓库并行写入时以相同顺序加锁，避免死锁
+            await self.db.execute(
+                upsert(
+                    LanguageStat,
+                    self.db,
+                    [languages[language] for language in sorted(languages)],
+                    key_columns=['user_id', 'language'],
+                    merge_columns={
+                        'total_commits': 'add',
+                        'total_additions': 'add',
+                        'total_deletions': 'add',
+                        'total_files': 'add',
+                        'first_used_at': 'min',
+                        'last_used_at': 'max'
+                    }
+                )
+            )
+
+    async def refresh_active_language(self, user: User) -> Optional[str]:
+        """
+        按 language_stats 中提交次数最多的语言更新用户的最活跃语言
+
+        Args:
+            user: 用户ORM对象
+
+        Returns:
+            最活跃语言，没有语言统计时返回None（不修改用户）
+        """
+        language = (await self.db.execute(
+            select(LanguageStat.language)
+            .where(LanguageStat.user_id == user.id)
+            .order_by(LanguageStat.total_commits.desc(), LanguageStat.language)
+            .limit(1)
+        )).scalar_one_or_none()
+
+        if language is not None and language != user.active_language:
+            user.active_language = language
+        return language
+
+    async def rebuild(self, user: User) -> Dict[str, Any]:
+        """
+        从 commit_details 完整重算用户统计和按语言计数（聚合在数据库中完成）
+
+        用于增量计数可能漂移的场景：提交被删除、并发写入冲突、升级前已有的数据，
+        以及累计值来自仓库聚合统计（同时清除 aggregate_synced_at）。
+        users 表使用单条UPDATE写入，之后可以直接调用 apply_commits 累加；调用方负责提交事务。
+
+        Args:
+            user: 用户ORM对象
+
+        Returns:
+            重算后的统计数据
+        """
+        totals = (await self.db.execute(
+            select(
+                func.count(CommitDetail.id),
+                func.coalesce(func.sum(CommitDetail.additions), 0),
+                func.coalesce(func.sum(CommitDetail.deletions), 0)
+            ).where(CommitDetail.user_id == user.id)
+        )).one()
+
+        values = {
+            'total_commits': int(totals[0]),
+            'total_additions': int(totals[1]),
+            'total_deletions': int(totals[2]),
+            'aggregate_synced_at': None
+        }
+        await self.db.execute(update(User.__table__).where(User.id == user.id).values(**values))
+        for key, value in values.items():
+            set_committed_value(user, key, value)
+
+        await self.db.execute(delete(LanguageStat).where(LanguageStat.user_id == user.id))
+        await self.db.execute(
+            insert(LanguageStat).from_select(
+                [
+                    'user_id', 'language', 'total_commits', 'total_additions',
+                    'total_deletions', 'total_files', 'first_used_at', 'last_used_at'
+                ],
+                select(
+                    CommitDetail.user_id,
+                    CommitDetail.primary_language,
+                    func.count(CommitDetail.id),
+                    func.coalesce(func.sum(CommitDetail.additions), 0),
+                    func.coalesce(func.sum(CommitDetail.deletions), 0),
+                    func.coalesce(func.sum(CommitDetail.files_changed), 0),
+                    func.min(CommitDetail.commit_date),
+                    func.max(CommitDetail.commit_date)
+                )
+                .where(
+                    CommitDetail.user_id == user.id,
+                    CommitDetail.primary_language.isnot(None),
+                    CommitDetail.primary_language != ''
+                )
+                .group_by(CommitDetail.user_id, CommitDetail.primary_language)
+            )
+        )
+
+        active_language = await self.refresh_active_language(user)
+
+        logger.info(f"重算用户统计: {user.username} - {user.total_commits} commits")
+
+        return {
+            'total_commits': user.total_commits,
+            'total_additions': user.total_additions,
+            'total_deletions': user.total_deletions,
+            'active_language': active_language
+        }
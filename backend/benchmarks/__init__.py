@@ -0,0 +1,4 @@
+"""
+基准测试工具包
+本地模拟GitHub服务器与同步性能基准测试脚本
+"""
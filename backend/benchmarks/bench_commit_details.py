@@ -0,0 +1,65 @@
+"""
+提交详情并发获取基准测试
+对比逐个获取与并发获取提交详情的耗时
+
+使用方法:
+    python benchmarks/bench_commit_details.py --commits 100 --latency 0.05 --concurrency 8
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.github_client import GitHubClient
+from benchmarks.fake_github import FakeGitHubServer
+
+
+async def run_once(server: FakeGitHubServer, shas, concurrency: int) -> float:
+    """使用指定并发数获取全部提交详情，返回耗时（秒）"""
+    server.reset_stats()
+    async with GitHubClient(token="fake-token", base_url=server.url) as client:
+        # 只测量网络获取耗时，不使用本地提交详情存储
+        client.commit_store = None
+        start = time.perf_counter()
+        details = await client.get_commit_details("bench", "repo", shas, concurrency=concurrency)
+        elapsed = time.perf_counter() - start
+
+    assert [d["sha"] for d in details] == shas, "返回顺序与SHA顺序不一致"
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="提交详情并发获取基准测试")
+    parser.add_argument("--commits", type=int, default=100, help="提交数量")
+    parser.add_argument("--latency", type=float, default=0.05, help="模拟网络延迟（秒）")
+    parser.add_argument("--concurrency", type=int, default=8, help="并发请求数")
+    args = parser.parse_args()
+
+    server = FakeGitHubServer(latency=args.latency)
+    server.add_synthetic_repo("bench", "repo", commits=args.commits)
+    await server.start()
+
+    try:
+        shas = [c["sha"] for c in server.commits["bench/repo"]]
+
+        sequential = await run_once(server, shas, concurrency=1)
+        concurrent = await run_once(server, shas, concurrency=args.concurrency)
+        max_in_flight = server.max_in_flight
+
+        print("=" * 60)
+        print("提交详情获取基准测试")
+        print("=" * 60)
+        print(f"提交数: {args.commits}, 模拟延迟: {args.latency * 1000:.0f}ms")
+        print(f"逐个获取:            {sequential:.2f} 秒")
+        print(f"并发获取 (并发={args.concurrency}):  {concurrent:.2f} 秒 (服务器峰值并发 {max_in_flight})")
+        print(f"加速比: {sequential / concurrent:.1f}x")
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
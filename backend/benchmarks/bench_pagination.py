@@ -0,0 +1,62 @@
+"""
+分页列表并发获取基准测试
+对比逐页获取与基于Link响应头并发获取提交列表的耗时
+
+使用方法:
+    python benchmarks/bench_pagination.py --commits 3000 --latency 0.1 --concurrency 4
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.github_client import GitHubClient
+from benchmarks.fake_github import FakeGitHubServer
+
+
+async def run_once(server: FakeGitHubServer, expected, concurrency: int) -> float:
+    """使用指定并发页数获取完整提交列表，返回耗时（秒）"""
+    server.reset_stats()
+    async with GitHubClient(token="fake-token", base_url=server.url) as client:
+        start = time.perf_counter()
+        commits = await client.paginate("/repos/bench/repo/commits", per_page=100, concurrency=concurrency)
+        elapsed = time.perf_counter() - start
+
+    assert [c["sha"] for c in commits] == expected, "合并后的顺序与原始顺序不一致"
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="分页列表并发获取基准测试")
+    parser.add_argument("--commits", type=int, default=3000, help="提交数量")
+    parser.add_argument("--latency", type=float, default=0.1, help="模拟网络延迟（秒）")
+    parser.add_argument("--concurrency", type=int, default=4, help="并发请求页数")
+    args = parser.parse_args()
+
+    server = FakeGitHubServer(latency=args.latency)
+    server.add_synthetic_repo("bench", "repo", commits=args.commits)
+    await server.start()
+
+    try:
+        expected = [c["sha"] for c in server.commits["bench/repo"]]
+
+        sequential = await run_once(server, expected, concurrency=1)
+        concurrent = await run_once(server, expected, concurrency=args.concurrency)
+
+        print("=" * 60)
+        print("分页列表获取基准测试")
+        print("=" * 60)
+        print(f"提交数: {args.commits} ({-(-args.commits // 100)} 页), 模拟延迟: {args.latency * 1000:.0f}ms")
+        print(f"逐页获取:            {sequential:.2f} 秒")
+        print(f"并发获取 (并发={args.concurrency}):  {concurrent:.2f} 秒")
+        print(f"加速比: {sequential / concurrent:.1f}x")
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
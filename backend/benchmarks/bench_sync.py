@@ -0,0 +1,197 @@
+"""
+完整同步基准测试
+对模拟GitHub服务器执行 DataSyncService.sync_user_data，按同步策略报告吞吐量
+（提交数/秒、每个提交的API调用次数和数据库往返次数）
+
+使用方法:
+    # 合成数据：5个仓库 × 200个提交
+    python benchmarks/bench_sync.py --repos 5 --commits 200 --latency 0.02
+
+    # 回放录制的响应（见 record_cassette.py）
+    python benchmarks/bench_sync.py --cassette benchmarks/cassettes/octocat.json.gz --user octocat
+
+    # 使用本地SQLite数据库（需安装aiosqlite），不影响配置中的MySQL
+    python benchmarks/bench_sync.py --database-url sqlite+aiosqlite:///.cache/bench.db
+
+    # 对比流水线同步与逐仓库顺序同步
+    python benchmarks/bench_sync.py --modes pipeline sequential
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import BigInteger, delete, select, event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.ext.compiler import compiles
+
+from app.core.config import settings
+from app.models import Base, User, Repository, CommitDetail, DailyStat, LanguageStat
+from app.services.github_client import GitHubClient
+from app.services.data_sync_service import DataSyncService, SYNC_STRATEGIES
+from benchmarks.cassette import Cassette
+from benchmarks.fake_github import FakeGitHubServer
+
+# git策略从github.com克隆仓库，不经过模拟服务器，无法离线测试
+BENCH_STRATEGIES = [strategy for strategy in SYNC_STRATEGIES if strategy != "git"]
+
+
+@compiles(BigInteger, "sqlite")
+def _compile_big_integer_sqlite(type_, compiler, **kw):
+    """SQLite仅对INTEGER主键自增，BIGINT主键按INTEGER建表"""
+    return "INTEGER"
+
+
+class QueryCounter:
+    """统计数据库往返次数（每次执行SQL语句计一次）"""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+async def reset_user(session_factory, username: str) -> None:
+    """删除基准测试用户的已有数据，保证每个策略从空数据库开始"""
+    async with session_factory() as db:
+        user_id = (await db.execute(
+            select(User.id).where(User.username == username)
+        )).scalar_one_or_none()
+        if user_id is None:
+            return
+        for model in (CommitDetail, Repository, DailyStat, LanguageStat):
+            await db.execute(delete(model).where(model.user_id == user_id))
+        await db.execute(delete(User).where(User.id == user_id))
+        await db.commit()
+
+
+async def run_strategy(
+    server: FakeGitHubServer,
+    session_factory,
+    counter: QueryCounter,
+    username: str,
+    strategy: str,
+    mode: str,
+    args
+) -> dict:
+    """使用指定策略完整同步一次，返回吞吐量统计"""
+    await reset_user(session_factory, username)
+    server.reset_stats()
+    counter.count = 0
+
+    async with GitHubClient(token="bench-token", base_url=server.url) as client:
+        # 只测量网络获取与入库，不使用本地提交详情存储
+        client.commit_store = None
+        async with session_factory() as db:
+            service = DataSyncService(
+                db, client, sync_strategy=strategy, use_pipeline=(mode == 'pipeline'),
+                repo_concurrency=args.repo_concurrency, session_factory=session_factory
+            )
+            start = time.perf_counter()
+            result = await service.sync_user_data(
+                username,
+                max_commits_per_repo=args.max_commits,
+                incremental=False
+            )
+            elapsed = time.perf_counter() - start
+
+    commits = result['total_commits_synced']
+    return {
+        'strategy': strategy,
+        'mode': mode,
+        'commits': commits,
+        'seconds': elapsed,
+        'commits_per_sec': commits / elapsed if elapsed else 0.0,
+        'api_calls': server.request_count,
+        'calls_per_commit': server.request_count / commits if commits else 0.0,
+        'db_queries': counter.count,
+        'queries_per_commit': counter.count / commits if commits else 0.0,
+        'not_modified': server.not_modified_count,
+        'rate_limited': server.rate_limited_count,
+        'pipeline': result.get('pipeline'),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="完整同步基准测试")
+    parser.add_argument("--user", default="bench-user", help="同步的用户名")
+    parser.add_argument("--repos", type=int, default=5, help="合成仓库数")
+    parser.add_argument("--commits", type=int, default=200, help="每个合成仓库的提交数")
+    parser.add_argument("--max-commits", type=int, default=None, help="每个仓库最多同步的提交数（默认全部）")
+    parser.add_argument("--cassette", help="回放录制的响应文件，代替合成数据")
+    parser.add_argument("--latency", type=float, default=0.02, help="模拟网络延迟（秒）")
+    parser.add_argument("--rate-limit", type=int, default=5000, help="每个Token的配额（用尽后返回403）")
+    parser.add_argument("--rate-window", type=int, default=3600, help="配额窗口长度（秒）")
+    parser.add_argument("--strategies", nargs="+", default=BENCH_STRATEGIES, choices=BENCH_STRATEGIES,
+                        help="需要测试的同步策略（git策略需要访问github.com，不参与测试）")
+    parser.add_argument("--modes", nargs="+", default=["pipeline"], choices=["pipeline", "sequential"],
+                        help="同步方式：pipeline(流水线) / sequential(逐仓库顺序)")
+    parser.add_argument("--repo-concurrency", type=int, default=None,
+                        help="同时同步的仓库数（默认使用配置中的SYNC_REPO_CONCURRENCY）")
+    parser.add_argument("--database-url", default=settings.DATABASE_URL, help="数据库连接URL")
+    args = parser.parse_args()
+
+    cassette = Cassette.load(args.cassette) if args.cassette else None
+    server = FakeGitHubServer(
+        latency=args.latency,
+        rate_limit=args.rate_limit,
+        rate_window=args.rate_window,
+        cassette=cassette
+    )
+    if cassette is None:
+        server.add_synthetic_user(args.user, repos=args.repos, commits_per_repo=args.commits)
+    await server.start()
+
+    engine = create_async_engine(args.database_url)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    counter = QueryCounter(engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    try:
+        results = []
+        for strategy in args.strategies:
+            for mode in args.modes:
+                results.append(await run_strategy(server, session_factory, counter, args.user, strategy, mode, args))
+
+        print("=" * 90)
+        print("完整同步基准测试")
+        print("=" * 90)
+        source = f"回放 {args.cassette}" if cassette else f"合成 {args.repos} 个仓库 × {args.commits} 个提交"
+        print(f"数据: {source}, 模拟延迟: {args.latency * 1000:.0f}ms")
+        print(
+            f"{'策略':<10}{'方式':<12}{'提交数':>8}{'耗时(秒)':>10}{'提交/秒':>10}{'API调用':>10}{'调用/提交':>10}"
+            f"{'DB往返':>10}{'往返/提交':>10}{'403':>6}"
+        )
+        for r in results:
+            print(
+                f"{r['strategy']:<10}{r['mode']:<12}{r['commits']:>8}{r['seconds']:>10.2f}{r['commits_per_sec']:>10.1f}"
+                f"{r['api_calls']:>10}{r['calls_per_commit']:>10.2f}"
+                f"{r['db_queries']:>10}{r['queries_per_commit']:>10.2f}{r['rate_limited']:>6}"
+            )
+
+        # 流水线各阶段耗时（busy: 处理, idle: 等待上游, blocked: 等待下游队列空位）
+        for r in results:
+            if not r['pipeline']:
+                continue
+            print()
+            print(f"{r['strategy']} 流水线阶段（总耗时 {r['pipeline']['elapsed_seconds']:.2f} 秒）")
+            print(f"{'阶段':<10}{'并发':>6}{'处理数':>8}{'处理(秒)':>10}{'等待上游':>10}{'背压':>10}")
+            for name, stage in r['pipeline']['stages'].items():
+                print(
+                    f"{name:<10}{stage['concurrency']:>6}{stage['items']:>8}{stage['busy_seconds']:>10.2f}"
+                    f"{stage['idle_seconds']:>10.2f}{stage['blocked_seconds']:>10.2f}"
+                )
+    finally:
+        await engine.dispose()
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
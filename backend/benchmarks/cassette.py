@@ -0,0 +1,116 @@
+"""
+GitHub API录制回放（cassette）
+录制真实GitHub API的响应并保存为JSON文件，由模拟服务器离线回放
+"""
+import gzip
+import hashlib
+import json
+from typing import Dict, Any, Optional, Tuple
+
+import httpx
+
+# 录制时保留的响应头（其余响应头由模拟服务器重新生成）
+RECORDED_HEADERS = ("Link",)
+
+
+def _open(path: str, mode: str):
+    """按扩展名选择是否gzip压缩"""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class Cassette:
+    """
+    录制的请求与响应集合
+
+    请求以 方法 + 路径 + 排序后的查询参数（POST请求附加请求体摘要）为键，
+    Link响应头中的API根地址被替换为相对路径，回放时再拼接模拟服务器地址。
+
+    使用示例:
+        cassette = Cassette.load("benchmarks/cassettes/octocat.json")
+        server = FakeGitHubServer(cassette=cassette)
+    """
+
+    VERSION = 1
+
+    def __init__(self, base_url: str = "https://api.github.com"):
+        """
+        Args:
+            base_url: 录制时的API根地址
+        """
+        self.base_url = base_url.rstrip("/")
+        self.interactions: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def make_key(method: str, path: str, query: Dict[str, str], body: Optional[bytes] = None) -> str:
+        """生成请求键"""
+        key = f"{method.upper()} {path}"
+        if query:
+            key += "?" + "&".join(f"{k}={query[k]}" for k in sorted(query))
+        if body and method.upper() != "GET":
+            key += " #" + hashlib.sha1(body).hexdigest()[:16]
+        return key
+
+    def __len__(self) -> int:
+        return len(self.interactions)
+
+    def record(self, response: httpx.Response) -> None:
+        """
+        录制一个响应（响应体需已读取）
+
+        Args:
+            response: httpx响应
+        """
+        request = response.request
+        key = self.make_key(
+            request.method,
+            request.url.path,
+            dict(request.url.params),
+            request.content
+        )
+        headers = {}
+        for name in RECORDED_HEADERS:
+            if name in response.headers:
+                headers[name] = response.headers[name].replace(self.base_url, "")
+
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+
+        self.interactions[key] = {
+            "status": response.status_code,
+            "headers": headers,
+            "body": body,
+        }
+
+    def lookup(self, method: str, path: str, query: Dict[str, str], body: Optional[bytes] = None) -> Optional[Tuple[int, Dict[str, str], Any]]:
+        """
+        查找录制的响应
+
+        Returns:
+            (状态码, 响应头, 响应体)，未录制时返回None
+        """
+        interaction = self.interactions.get(self.make_key(method, path, query, body))
+        if interaction is None:
+            return None
+        return interaction["status"], dict(interaction["headers"]), interaction["body"]
+
+    def save(self, path: str) -> None:
+        """保存到文件（扩展名为.gz时压缩）"""
+        with _open(path, "w") as f:
+            json.dump({
+                "version": self.VERSION,
+                "base_url": self.base_url,
+                "interactions": self.interactions,
+            }, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        """从文件加载"""
+        with _open(path, "r") as f:
+            data = json.load(f)
+        cassette = cls(data.get("base_url", "https://api.github.com"))
+        cassette.interactions = data["interactions"]
+        return cassette
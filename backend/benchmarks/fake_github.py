@@ -0,0 +1,613 @@
+"""
+本地模拟GitHub API服务器
+用于离线基准测试，模拟网络延迟、分页、ETag、速率限制响应头和403速率限制响应；
+支持生成合成用户/仓库/提交，或回放录制的真实API响应（cassette）
+"""
+import asyncio
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional
+
+from aiohttp import web
+
+from benchmarks.cassette import Cassette
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    """解析ISO 8601时间，统一转换为无时区的UTC时间"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def make_sha(*parts: Any) -> str:
+    """根据任意字段生成确定性的40位SHA"""
+    return hashlib.sha1(":".join(str(p) for p in parts).encode()).hexdigest()
+
+
+def make_node_id(login: str) -> str:
+    """根据登录名生成确定性的GraphQL用户节点ID"""
+    return f"U_{make_sha('user', login)[:16]}"
+
+
+def generate_commit(
+    owner: str,
+    repo: str,
+    index: int,
+    base_date: Optional[datetime] = None,
+    author: Optional[str] = None,
+    email: Optional[str] = None,
+    linked: bool = True
+) -> Dict[str, Any]:
+    """
+    生成一个与GitHub /commits/{sha} 响应结构一致的提交详情
+
+    Args:
+        owner: 仓库所有者
+        repo: 仓库名称
+        index: 提交序号（序号越大越新）
+        base_date: 第0个提交的时间
+        author: 提交作者的登录名，默认为仓库所有者
+        email: 提交作者邮箱，默认为 {author}@example.com
+        linked: 作者邮箱是否关联到GitHub账号（未关联时响应中的author为null）
+    """
+    base_date = base_date or datetime(2024, 1, 1)
+    author = author or owner
+    email = email or f"{author}@example.com"
+    commit_date = (base_date + timedelta(hours=index)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    files = [
+        {
+            "filename": f"src/module_{index % 7}.{ext}",
+            "additions": 3 + index % 5,
+            "deletions": index % 3,
+        }
+        for ext in ("py", "ts")[: 1 + index % 2]
+    ]
+    additions = sum(f["additions"] for f in files)
+    deletions = sum(f["deletions"] for f in files)
+    return {
+        "sha": make_sha(owner, repo, index),
+        "commit": {
+            "message": f"commit #{index} in {repo}",
+            "author": {"name": author, "email": email, "date": commit_date},
+            "committer": {"name": author, "email": email, "date": commit_date},
+        },
+        "author": {"login": author} if linked else None,
+        "stats": {"additions": additions, "deletions": deletions, "total": additions + deletions},
+        "files": files,
+    }
+
+
+class FakeGitHubServer:
+    """
+    模拟GitHub REST API的本地HTTP服务器
+
+    使用示例:
+        server = FakeGitHubServer(latency=0.05)
+        server.add_synthetic_repo("octocat", "hello", commits=100)
+        server.add_synthetic_user("alice", repos=5, commits_per_repo=200)
+        await server.start()
+        client = GitHubClient(token="fake", base_url=server.url)
+        ...
+        await server.stop()
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        rate_limit: int = 5000,
+        rate_window: int = 3600,
+        cassette: Optional[Cassette] = None
+    ):
+        """
+        Args:
+            latency: 每个请求的模拟网络延迟（秒）
+            host: 监听地址
+            port: 监听端口，0表示随机分配
+            rate_limit: 每个Token在一个配额窗口内的REST请求数
+            rate_window: 配额窗口长度（秒），窗口结束后所有Token配额恢复
+            cassette: 录制的API响应，命中时优先于合成数据返回
+        """
+        self.latency = latency
+        self.host = host
+        self.port = port
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.rate_reset = int(time.time()) + rate_window
+        self.cassette = cassette
+        self.replayed_count = 0
+        self.rate_limited_count = 0
+        # 与GitHub一致：每个Token独立计算REST配额
+        self.token_remaining: Dict[str, int] = {}
+        self.token_requests: Dict[str, int] = {}
+
+        self.users: Dict[str, Dict[str, Any]] = {}
+        self.repos: Dict[str, List[Dict[str, Any]]] = {}
+        # 按仓库保存提交详情，列表按时间从新到旧排列
+        self.commits: Dict[str, List[Dict[str, Any]]] = {}
+        # 按用户保存事件流，列表从新到旧排列（与GitHub一致最多保留300个）
+        self.events: Dict[str, List[Dict[str, Any]]] = {}
+        self._next_event_id = 1000
+        # 与GitHub一致：仓库统计需要后台计算，仓库有新提交后的前stats_compute_polls次请求返回202
+        self.stats_compute_polls = 1
+        self._stats_requests: Dict[str, Any] = {}
+
+        self.graphql_remaining = 5000
+
+        self.request_count = 0
+        self.not_modified_count = 0
+        self.graphql_count = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+        self._runner: Optional[web.AppRunner] = None
+        self.app = web.Application(middlewares=[self._instrument])
+        self.app.router.add_get("/users/{user}", self._get_user)
+        self.app.router.add_get("/users/{user}/repos", self._get_user_repos)
+        self.app.router.add_get("/users/{user}/events", self._get_user_events)
+        self.app.router.add_get("/repos/{owner}/{repo}/commits", self._get_commits)
+        self.app.router.add_get("/repos/{owner}/{repo}/stats/contributors", self._get_contributor_stats)
+        self.app.router.add_get("/repos/{owner}/{repo}/commits/{sha}", self._get_commit)
+        self.app.router.add_post("/graphql", self._graphql)
+
+    @property
+    def rate_remaining(self) -> int:
+        """所有已使用过的Token的剩余REST配额之和"""
+        return sum(self.token_remaining.values())
+
+    def set_token_quota(self, token: str, remaining: int) -> None:
+        """设置指定Token的剩余REST配额（配额为0时请求返回403速率限制）"""
+        self.token_remaining[token] = remaining
+
+    @staticmethod
+    def _request_token(request: web.Request) -> str:
+        """从Authorization请求头中取出Token，匿名请求返回空字符串"""
+        auth = request.headers.get("Authorization", "")
+        return auth.split(" ", 1)[1] if " " in auth else ""
+
+    @property
+    def url(self) -> str:
+        """服务器根地址"""
+        return f"http://{self.host}:{self.port}"
+
+    def add_synthetic_user(self, username: str, repos: int, commits_per_repo: int) -> None:
+        """添加一个合成用户，包含repos个仓库，每个仓库commits_per_repo个提交"""
+        for i in range(repos):
+            self.add_synthetic_repo(username, f"repo-{i}", commits_per_repo)
+
+    def _add_user(self, login: str) -> None:
+        """注册一个GitHub用户（已存在时忽略）"""
+        self.users.setdefault(login, {
+            "login": login, "node_id": make_node_id(login), "email": f"{login}@example.com", "avatar_url": None
+        })
+
+    def add_synthetic_repo(self, owner: str, repo: str, commits: int) -> None:
+        """添加一个包含指定数量合成提交的仓库"""
+        self._add_user(owner)
+        full_name = f"{owner}/{repo}"
+        self.commits[full_name] = [
+            generate_commit(owner, repo, i) for i in reversed(range(commits))
+        ]
+        pushed_at = self._latest_commit_date(full_name)
+        self.repos.setdefault(owner, []).append({
+            "id": int(make_sha(full_name)[:8], 16),
+            "name": repo,
+            "full_name": full_name,
+            "description": f"synthetic repo {repo}",
+            "language": "Python",
+            "stargazers_count": 0,
+            "forks_count": 0,
+            "private": False,
+            "default_branch": "main",
+            "pushed_at": pushed_at,
+            "updated_at": pushed_at,
+        })
+        self._add_event(owner, "CreateEvent", full_name, {"ref": None, "ref_type": "repository"})
+
+    def push_commits(
+        self,
+        owner: str,
+        repo: str,
+        count: int,
+        author: Optional[str] = None,
+        email: Optional[str] = None,
+        linked: bool = True
+    ) -> None:
+        """
+        向已有的合成仓库推送count个新提交，并更新仓库的pushed_at/updated_at
+
+        author/email/linked指定提交作者（默认为仓库所有者），用于模拟其他贡献者的提交
+        和使用未关联邮箱的提交。
+        """
+        full_name = f"{owner}/{repo}"
+        if author and linked:
+            self._add_user(author)
+        start = len(self.commits[full_name])
+        new_commits = [
+            generate_commit(owner, repo, i, author=author, email=email, linked=linked)
+            for i in reversed(range(start, start + count))
+        ]
+        before = self.commits[full_name][0]["sha"] if self.commits[full_name] else "0" * 40
+        self.commits[full_name] = new_commits + self.commits[full_name]
+        for github_repo in self.repos[owner]:
+            if github_repo["full_name"] == full_name:
+                github_repo["pushed_at"] = github_repo["updated_at"] = self._latest_commit_date(full_name)
+        self._add_event(author or owner, "PushEvent", full_name, {
+            "ref": "refs/heads/main",
+            "before": before,
+            "head": self.commits[full_name][0]["sha"],
+            "size": count,
+        })
+
+    def push_event(self, owner: str, repo: str, count: int, **kwargs: Any) -> Dict[str, Any]:
+        """
+        推送count个新提交（参数同push_commits），返回与GitHub push webhook结构一致的有效载荷
+
+        Returns:
+            推送事件的有效载荷（ref为默认分支，commits从旧到新排列）
+        """
+        full_name = f"{owner}/{repo}"
+        before = self.commits[full_name][0]["sha"] if self.commits[full_name] else "0" * 40
+        self.push_commits(owner, repo, count, **kwargs)
+        github_repo = next(r for r in self.repos[owner] if r["full_name"] == full_name)
+        pushed = self.commits[full_name][:count]
+        return {
+            "ref": f"refs/heads/{github_repo['default_branch']}",
+            "before": before,
+            "after": pushed[0]["sha"] if pushed else before,
+            "created": False,
+            "deleted": False,
+            "forced": False,
+            "repository": {
+                "id": github_repo["id"],
+                "name": repo,
+                "full_name": full_name,
+                "default_branch": github_repo["default_branch"],
+                "pushed_at": int(_parse_time(github_repo["pushed_at"]).replace(tzinfo=timezone.utc).timestamp()),
+            },
+            "pusher": {"name": owner},
+            "commits": [
+                {
+                    "id": commit["sha"],
+                    "distinct": True,
+                    "message": commit["commit"]["message"],
+                    "timestamp": commit["commit"]["author"]["date"],
+                    "author": {
+                        "name": commit["commit"]["author"]["name"],
+                        "email": commit["commit"]["author"]["email"],
+                        "username": (commit["author"] or {}).get("login"),
+                    },
+                }
+                for commit in reversed(pushed)
+            ],
+        }
+
+    def _add_event(self, actor: str, event_type: str, full_name: str, payload: Dict[str, Any]) -> None:
+        """在用户的事件流中添加一个事件（事件ID递增）"""
+        self._next_event_id += 1
+        github_repo = next(r for r in self.repos[full_name.split("/")[0]] if r["full_name"] == full_name)
+        events = self.events.setdefault(actor, [])
+        events.insert(0, {
+            "id": str(self._next_event_id),
+            "type": event_type,
+            "actor": {"login": actor},
+            "repo": {"id": github_repo["id"], "name": full_name},
+            "payload": payload,
+            "created_at": github_repo["pushed_at"],
+        })
+        del events[300:]
+
+    def _latest_commit_date(self, full_name: str) -> Optional[str]:
+        """仓库最新提交的时间（作为合成仓库的pushed_at）"""
+        commits = self.commits.get(full_name)
+        return commits[0]["commit"]["committer"]["date"] if commits else None
+
+    async def start(self) -> None:
+        """启动服务器"""
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """停止服务器"""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def reset_stats(self) -> None:
+        """重置请求统计"""
+        self.request_count = 0
+        self.not_modified_count = 0
+        self.graphql_count = 0
+        self.max_in_flight = 0
+        self.replayed_count = 0
+        self.rate_limited_count = 0
+        self.token_requests = {}
+
+    @web.middleware
+    async def _instrument(self, request: web.Request, handler):
+        """统计请求、模拟延迟、处理ETag并附加速率限制响应头"""
+        self.request_count += 1
+        token = self._request_token(request)
+        self.token_requests[token] = self.token_requests.get(token, 0) + 1
+
+        # 配额窗口结束，所有Token配额恢复
+        now = int(time.time())
+        if now >= self.rate_reset:
+            self.rate_reset = now + self.rate_window
+            self.token_remaining.clear()
+        remaining = self.token_remaining.setdefault(token, self.rate_limit)
+
+        if request.path != "/graphql" and remaining <= 0:
+            self.rate_limited_count += 1
+            return web.json_response(
+                {"message": "API rate limit exceeded"},
+                status=403,
+                headers={
+                    "X-RateLimit-Resource": "core",
+                    "X-RateLimit-Limit": str(self.rate_limit),
+                    "X-RateLimit-Remaining": "0",
+                    "X-RateLimit-Reset": str(self.rate_reset),
+                }
+            )
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            response = await self._replay(request)
+            if response is None:
+                response = await handler(request)
+        finally:
+            self.in_flight -= 1
+
+        if request.path == "/graphql":
+            # GraphQL使用独立的配额
+            self.graphql_count += 1
+            self.graphql_remaining = max(0, self.graphql_remaining - 1)
+            response.headers["X-RateLimit-Resource"] = "graphql"
+            response.headers["X-RateLimit-Limit"] = str(self.rate_limit)
+            response.headers["X-RateLimit-Remaining"] = str(self.graphql_remaining)
+            response.headers["X-RateLimit-Reset"] = str(self.rate_reset)
+            return response
+
+        if request.method == "GET" and response.status == 200 and response.body is not None:
+            etag = f'"{hashlib.sha1(response.body).hexdigest()}"'
+            if request.headers.get("If-None-Match") == etag:
+                # 与GitHub一致：304响应不消耗速率限制配额
+                self.not_modified_count += 1
+                response = web.Response(status=304)
+            else:
+                self.token_remaining[token] = max(0, self.token_remaining[token] - 1)
+            response.headers["ETag"] = etag
+        else:
+            self.token_remaining[token] = max(0, self.token_remaining[token] - 1)
+        response.headers["X-RateLimit-Resource"] = "core"
+        response.headers["X-RateLimit-Limit"] = str(self.rate_limit)
+        response.headers["X-RateLimit-Remaining"] = str(self.token_remaining[token])
+        response.headers["X-RateLimit-Reset"] = str(self.rate_reset)
+        return response
+
+    async def _replay(self, request: web.Request) -> Optional[web.Response]:
+        """回放录制的响应，未录制时返回None"""
+        if self.cassette is None:
+            return None
+
+        body = await request.read() if request.can_read_body else None
+        recorded = self.cassette.lookup(request.method, request.path, dict(request.query), body)
+        if recorded is None:
+            return None
+
+        status, headers, data = recorded
+        if "Link" in headers:
+            # 录制时保存为相对地址，回放时指向本服务器
+            headers["Link"] = headers["Link"].replace("<", f"<{self.url}")
+        self.replayed_count += 1
+        return web.Response(
+            status=status,
+            body=json.dumps(data).encode("utf-8"),
+            content_type="application/json",
+            headers=headers
+        )
+
+    @staticmethod
+    def _paginate(request: web.Request, items: List[Dict[str, Any]]) -> web.Response:
+        """返回分页数据，并与GitHub一致地附加Link响应头"""
+        per_page = int(request.query.get("per_page", 30))
+        page = int(request.query.get("page", 1))
+        start = (page - 1) * per_page
+        response = web.json_response(items[start:start + per_page])
+
+        last_page = max(1, -(-len(items) // per_page))
+        links = []
+        if page < last_page:
+            links.append(f'<{request.url.update_query(page=page + 1)}>; rel="next"')
+            links.append(f'<{request.url.update_query(page=last_page)}>; rel="last"')
+        if page > 1:
+            links.append(f'<{request.url.update_query(page=1)}>; rel="first"')
+            links.append(f'<{request.url.update_query(page=page - 1)}>; rel="prev"')
+        if links:
+            response.headers["Link"] = ", ".join(links)
+        return response
+
+    async def _get_user(self, request: web.Request) -> web.Response:
+        user = self.users.get(request.match_info["user"])
+        if not user:
+            return web.json_response({"message": "Not Found"}, status=404)
+        return web.json_response(user)
+
+    async def _get_user_repos(self, request: web.Request) -> web.Response:
+        repos = self.repos.get(request.match_info["user"], [])
+        return self._paginate(request, repos)
+
+    async def _get_user_events(self, request: web.Request) -> web.Response:
+        return self._paginate(request, self.events.get(request.match_info["user"], []))
+
+    async def _get_contributor_stats(self, request: web.Request) -> web.Response:
+        full_name = f"{request.match_info['owner']}/{request.match_info['repo']}"
+        if full_name not in self.commits:
+            return web.json_response({"message": "Not Found"}, status=404)
+        commits = self.commits[full_name]
+        if not commits:
+            return web.Response(status=204)
+
+        # 统计按仓库当前的HEAD计算，有新提交后重新计算（polls为None表示已计算好）
+        head, polls = self._stats_requests.get(full_name, (None, 0))
+        if head != commits[0]["sha"]:
+            polls = 0
+        if polls is not None:
+            polls += 1
+            if polls <= self.stats_compute_polls:
+                self._stats_requests[full_name] = (commits[0]["sha"], polls)
+                return web.json_response({}, status=202)
+        self._stats_requests[full_name] = (commits[0]["sha"], None)
+        return web.json_response(self.contributor_stats(full_name))
+
+    def contributor_stats(self, full_name: str) -> List[Dict[str, Any]]:
+        """
+        按作者、按周汇总仓库的提交（与GitHub /stats/contributors 结构一致）
+
+        只包含关联到GitHub账号的作者；每个作者的weeks覆盖仓库第一个提交到最后一个提交之间的
+        所有周（周日00:00 UTC开始），没有提交的周为0。
+        """
+        def week_start(commit: Dict[str, Any]) -> int:
+            day = _parse_time(commit["commit"]["author"]["date"]).replace(hour=0, minute=0, second=0)
+            start = day - timedelta(days=(day.weekday() + 1) % 7)
+            return int(start.replace(tzinfo=timezone.utc).timestamp())
+
+        commits = self.commits[full_name]
+        all_weeks = range(
+            min(week_start(c) for c in commits), max(week_start(c) for c in commits) + 1, 7 * 86400
+        )
+        authors: Dict[str, Dict[int, Dict[str, int]]] = {}
+        for commit in commits:
+            if not commit["author"]:
+                continue
+            weeks = authors.setdefault(commit["author"]["login"], {})
+            week = weeks.setdefault(week_start(commit), {"a": 0, "d": 0, "c": 0})
+            week["a"] += commit["stats"]["additions"]
+            week["d"] += commit["stats"]["deletions"]
+            week["c"] += 1
+        return [
+            {
+                "author": {"login": login},
+                "total": sum(week["c"] for week in weeks.values()),
+                "weeks": [dict({"w": w, "a": 0, "d": 0, "c": 0}, **weeks.get(w, {})) for w in all_weeks],
+            }
+            for login, weeks in sorted(authors.items(), key=lambda item: sum(w["c"] for w in item[1].values()))
+        ]
+
+    def _filter_commits(
+        self,
+        full_name: str,
+        since: Optional[str],
+        until: Optional[str],
+        logins: Optional[List[str]] = None,
+        emails: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        按作者时间过滤提交（since/until为闭区间）
+
+        提供logins或emails时只保留关联到这些登录名或使用这些邮箱的提交。
+        """
+        since_dt = _parse_time(since)
+        until_dt = _parse_time(until)
+        filter_authors = logins is not None or emails is not None
+        logins = set(logins or ())
+        emails = {email.lower() for email in emails or ()}
+        commits = []
+        for commit in self.commits.get(full_name, []):
+            date = _parse_time(commit["commit"]["author"]["date"])
+            if since_dt and date < since_dt:
+                continue
+            if until_dt and date > until_dt:
+                continue
+            if filter_authors:
+                login = (commit["author"] or {}).get("login")
+                if login not in logins and commit["commit"]["author"]["email"].lower() not in emails:
+                    continue
+            commits.append(commit)
+        return commits
+
+    async def _get_commits(self, request: web.Request) -> web.Response:
+        full_name = f"{request.match_info['owner']}/{request.match_info['repo']}"
+        if full_name not in self.commits:
+            return web.json_response({"message": "Not Found"}, status=404)
+        # 与GitHub一致：author参数为登录名或提交作者邮箱
+        author = request.query.get("author")
+        commits = self._filter_commits(
+            full_name,
+            request.query.get("since"),
+            request.query.get("until"),
+            logins=[author] if author else None,
+            emails=[author] if author else None
+        )
+        listing = [{"sha": c["sha"], "commit": c["commit"], "author": c["author"]} for c in commits]
+        return self._paginate(request, listing)
+
+    async def _get_commit(self, request: web.Request) -> web.Response:
+        full_name = f"{request.match_info['owner']}/{request.match_info['repo']}"
+        sha = request.match_info["sha"]
+        for commit in self.commits.get(full_name, []):
+            if commit["sha"] == sha:
+                return web.json_response(commit)
+        return web.json_response({"message": "Not Found"}, status=404)
+
+    async def _graphql(self, request: web.Request) -> web.Response:
+        """GraphQL替身：仅支持默认分支history连接查询"""
+        payload = await request.json()
+        variables = payload.get("variables") or {}
+        full_name = f"{variables.get('owner')}/{variables.get('name')}"
+
+        if full_name not in self.commits:
+            return web.json_response({
+                "data": {"repository": None},
+                "errors": [{"type": "NOT_FOUND", "message": f"Could not resolve to a Repository '{full_name}'"}],
+            })
+
+        # 与GitHub一致：CommitAuthor的id优先于emails
+        author = variables.get("author") or {}
+        logins = emails = None
+        if author.get("id"):
+            logins = [login for login, user in self.users.items() if user["node_id"] == author["id"]]
+        elif author.get("emails"):
+            emails = author["emails"]
+        commits = self._filter_commits(
+            full_name, variables.get("since"), variables.get("until"), logins=logins, emails=emails
+        )
+        first = min(int(variables.get("first") or 100), 100)
+        offset = int(variables.get("after") or 0)
+        page = commits[offset:offset + first]
+
+        nodes = [
+            {
+                "oid": c["sha"],
+                "message": c["commit"]["message"],
+                "committedDate": c["commit"]["committer"]["date"],
+                "additions": c["stats"]["additions"],
+                "deletions": c["stats"]["deletions"],
+                "changedFilesIfAvailable": len(c["files"]),
+                "author": {**c["commit"]["author"], "user": {"login": c["author"]["login"]} if c["author"] else None},
+            }
+            for c in page
+        ]
+        history = {
+            "pageInfo": {
+                "hasNextPage": offset + first < len(commits),
+                "endCursor": str(offset + first),
+            },
+            "nodes": nodes,
+        }
+        return web.json_response({
+            "data": {"repository": {"defaultBranchRef": {"target": {"history": history}}}}
+        })
@@ -0,0 +1,87 @@
+"""
+录制GitHub API响应（cassette）
+按同步流程请求真实GitHub API（用户、仓库列表、提交列表、提交详情，以及可选的GraphQL历史），
+保存全部响应供模拟服务器离线回放
+
+使用方法:
+    python benchmarks/record_cassette.py --user octocat --max-repos 3 --max-commits 50 \\
+        --output benchmarks/cassettes/octocat.json.gz --graphql
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.services.github_client import GitHubClient
+from benchmarks.cassette import Cassette
+
+
+async def record(
+    username: str,
+    max_repos: int,
+    max_commits: int,
+    graphql: bool,
+    output: str,
+    base_url: str = None
+) -> Cassette:
+    """
+    按同步流程请求并录制响应
+
+    Args:
+        username: GitHub用户名
+        max_repos: 最多录制的仓库数
+        max_commits: 每个仓库最多录制的提交数
+        graphql: 是否同时录制GraphQL提交历史
+        output: 输出文件路径
+        base_url: API根地址，默认使用配置中的GITHUB_API_URL
+
+    Returns:
+        录制结果
+    """
+    base_url = base_url or settings.GITHUB_API_URL
+    cassette = Cassette(base_url)
+
+    async def on_response(response):
+        await response.aread()
+        cassette.record(response)
+
+    async with GitHubClient(base_url=base_url) as client:
+        # 录制完整响应：不使用条件请求缓存和本地提交详情存储
+        client.cache = None
+        client.commit_store = None
+        client.client.event_hooks["response"].append(on_response)
+
+        await client.get_user(username)
+        repos = await client.get_user_repos(username)
+        for repo in repos[:max_repos]:
+            owner, name = repo["full_name"].split("/")
+            commits = await client.get_repo_commits(owner, name, max_commits=max_commits)
+            await client.get_commit_details(owner, name, [c["sha"] for c in commits])
+            if graphql:
+                await client.get_commit_history(owner, name, max_commits=max_commits)
+            print(f"   {repo['full_name']}: {len(commits)} 个提交")
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    cassette.save(output)
+    print(f"✅ 已录制 {len(cassette)} 个响应: {output}")
+    return cassette
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="录制GitHub API响应")
+    parser.add_argument("--user", required=True, help="GitHub用户名")
+    parser.add_argument("--max-repos", type=int, default=3, help="最多录制的仓库数")
+    parser.add_argument("--max-commits", type=int, default=50, help="每个仓库最多录制的提交数")
+    parser.add_argument("--graphql", action="store_true", help="同时录制GraphQL提交历史")
+    parser.add_argument("--output", required=True, help="输出文件（.gz结尾时压缩）")
+    args = parser.parse_args()
+
+    await record(args.user, args.max_repos, args.max_commits, args.graphql, args.output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -27,12 +27,15 @@ async def clean_all_tables():
     
     # 定义表清理顺序（按照外键依赖关系，先删除子表）
     tables = [
+        'sync_run_repos',      # 同步检查点（依赖sync_runs和repositories）
+        'sync_runs',           # 同步运行（依赖users）
         'commit_details',      # 提交详情（依赖users和repositories）
         'daily_stats',         # 每日统计（依赖users）
         'language_stats',      # 语言统计（依赖users）
         'milestone_achievements',  # 里程碑成就（依赖users）
         'coding_goals',        # 编码目标（依赖users）
         'repositories',        # 仓库（依赖users）
+        'user_email_aliases',  # 提交邮箱别名（依赖users）
         'users',              # 用户（基础表）
     ]
     
@@ -90,7 +93,10 @@ async def verify_cleanup():
         'daily_stats',
         'language_stats',
         'milestone_achievements',
-        'coding_goals'
+        'coding_goals',
+        'sync_runs',
+        'sync_run_repos',
+        'user_email_aliases'
     ]
     
     async with AsyncSessionLocal() as db:
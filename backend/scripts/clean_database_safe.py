@@ -26,12 +26,15 @@ async def clean_all_tables():
     
     # 定义表清理顺序（按照外键依赖关系）
     tables = [
+        'sync_run_repos',
+        'sync_runs',
         'commit_details',
         'daily_stats',
         'language_stats',
         'milestone_achievements',
         'coding_goals',
         'repositories',
+        'user_email_aliases',
         'users',
     ]
     
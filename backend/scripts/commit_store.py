@@ -0,0 +1,164 @@
+"""
+提交详情本地存储管理脚本
+预热、查看和清理按SHA存储的提交详情
+"""
+import asyncio
+import sys
+import os
+from collections import defaultdict
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 设置UTF-8编码
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.services.commit_store import CommitStore
+from app.services.github_client import GitHubClient
+
+
+async def load_db_commits(username: str = None):
+    """
+    读取数据库中已同步的提交SHA及其所属仓库
+
+    Args:
+        username: 仅读取该用户的提交，None表示全部
+
+    Returns:
+        {仓库全名: [SHA, ...]}
+    """
+    sql = """
+        SELECT r.repo_name, c.commit_sha
+        FROM commit_details c
+        JOIN repositories r ON r.id = c.repo_id
+    """
+    params = {}
+    if username:
+        sql += " JOIN users u ON u.id = c.user_id WHERE u.username = :username"
+        params["username"] = username
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(text(sql), params)
+        commits = defaultdict(list)
+        for repo_name, sha in result.fetchall():
+            commits[repo_name].append(sha)
+    return commits
+
+
+async def prewarm(store: CommitStore, username: str = None, repo: str = None):
+    """
+    预热存储：获取尚未存储的提交详情
+
+    Args:
+        store: 提交详情存储
+        username: 从数据库读取该用户已同步的提交
+        repo: 从GitHub读取该仓库（owner/repo）的完整提交历史
+    """
+    async with GitHubClient(settings.GITHUB_TOKEN, commit_store=store) as client:
+        if repo:
+            owner, name = repo.split('/')
+            listing = await client.get_repo_commits(owner, name)
+            targets = {repo: [c['sha'] for c in listing]}
+        else:
+            targets = await load_db_commits(username)
+
+        total_missing = 0
+        for repo_name, shas in targets.items():
+            missing = [sha for sha in shas if not store.has(sha)]
+            if not missing:
+                continue
+
+            owner, name = repo_name.split('/')
+            print(f"   {repo_name}: 获取 {len(missing)} 个提交详情...")
+            await client.get_commit_details(owner, name, missing)
+            total_missing += len(missing)
+
+        print(f"✅ 预热完成，新增 {total_missing} 个提交详情")
+        print(f"   API配额剩余: {client.get_rate_limit_status().get('remaining')}")
+
+
+def inspect(store: CommitStore, sha: str = None):
+    """
+    查看存储状态或单个提交详情
+
+    Args:
+        store: 提交详情存储
+        sha: 需要查看的提交SHA，None表示查看整体统计
+    """
+    if sha:
+        payload = store.get(sha)
+        if payload is None:
+            print(f"❌ 未找到提交: {sha}")
+            return
+        commit = payload.get('commit', {})
+        stats = payload.get('stats', {})
+        print(f"SHA: {payload.get('sha')}")
+        print(f"作者: {commit.get('author', {}).get('name')}")
+        print(f"时间: {commit.get('author', {}).get('date')}")
+        print(f"消息: {commit.get('message', '').splitlines()[0] if commit.get('message') else ''}")
+        print(f"变更: +{stats.get('additions', 0)} -{stats.get('deletions', 0)}，{len(payload.get('files', []))} 个文件")
+        return
+
+    stats = store.stats()
+    print(f"存储目录: {stats['root']}")
+    print(f"条目数: {stats['entries']}")
+    print(f"磁盘占用: {stats['bytes'] / 1024 / 1024:.2f} MB")
+
+
+async def gc(store: CommitStore, keep_days: int, dry_run: bool):
+    """
+    清理未被commit_details引用的条目
+
+    Args:
+        store: 提交详情存储
+        keep_days: 最近N天写入的条目即使未被引用也保留
+        dry_run: 仅统计不删除
+    """
+    commits = await load_db_commits()
+    referenced = {sha for shas in commits.values() for sha in shas}
+    removed = store.gc(referenced, keep_days=keep_days, dry_run=dry_run)
+
+    if dry_run:
+        print(f"将清理 {removed} 个未被引用的条目（未实际删除）")
+    else:
+        print(f"✅ 已清理 {removed} 个未被引用的条目")
+
+
+async def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='提交详情本地存储管理')
+    parser.add_argument('--path', default=settings.COMMIT_STORE_PATH, help='存储根目录')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    prewarm_parser = subparsers.add_parser('prewarm', help='预热存储')
+    prewarm_parser.add_argument('--user', help='预热该用户已同步的提交（默认全部用户）')
+    prewarm_parser.add_argument('--repo', help='预热指定仓库（owner/repo）的完整提交历史')
+
+    inspect_parser = subparsers.add_parser('inspect', help='查看存储状态')
+    inspect_parser.add_argument('sha', nargs='?', help='查看单个提交详情')
+
+    gc_parser = subparsers.add_parser('gc', help='清理未被引用的条目')
+    gc_parser.add_argument('--keep-days', type=int, default=30, help='保留最近N天写入的条目（默认30）')
+    gc_parser.add_argument('--dry-run', action='store_true', help='仅统计不删除')
+
+    args = parser.parse_args()
+    store = CommitStore(args.path)
+
+    if args.command == 'prewarm':
+        await prewarm(store, username=args.user, repo=args.repo)
+    elif args.command == 'inspect':
+        inspect(store, args.sha)
+    elif args.command == 'gc':
+        await gc(store, keep_days=args.keep_days, dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -25,12 +25,15 @@ async def reset_database():
             
             # 清空所有表
             tables = [
+                'sync_run_repos',
+                'sync_runs',
                 'daily_stats',
                 'language_stats',
                 'coding_goals',
                 'milestones',
                 'commit_details',
                 'repositories',
+                'user_email_aliases',
                 'users'
             ]
             
@@ -15,19 +15,26 @@ if sys.platform == 'win32':
     import io
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
+from sqlalchemy import select
+
 from app.core.database import AsyncSessionLocal
 from app.core.config import settings
 from app.services.github_client import GitHubClient
 from app.services.data_sync_service import DataSyncService
+from app.services.repo_stats_sync_service import RepoStatsSyncService
+from app.services.commit_enricher import CommitEnricher
+from app.services.history_backfill import HistoryBackfillService
+from app.models.user import User
 
 
-async def sync_user_data(username: str, full_sync: bool = False):
+async def sync_user_data(username: str, full_sync: bool = False, strategy: str = None):
     """
     同步用户数据
     
     Args:
         username: GitHub用户名
         full_sync: 是否完整同步（True=同步所有历史，False=只同步最近数据）
+        strategy: 提交同步策略（rest / graphql / git），None表示使用配置
     """
     print("=" * 60)
     print(f"GitHub数据同步 - {username}")
@@ -35,10 +42,10 @@ async def sync_user_data(username: str, full_sync: bool = False):
     print("=" * 60)
     
     # 创建客户端和服务
-    github_client = GitHubClient(settings.GITHUB_TOKEN)
+    github_client = GitHubClient()
     
     async with AsyncSessionLocal() as db:
-        sync_service = DataSyncService(db, github_client)
+        sync_service = DataSyncService(db, github_client, sync_strategy=strategy)
         
         try:
             start_time = datetime.now()
@@ -46,9 +53,12 @@ async def sync_user_data(username: str, full_sync: bool = False):
             # 1. 同步用户基本信息
             print("\n[1/3] 同步用户信息...")
             user = await sync_service.sync_user(username)
+            commit_authors = await sync_service.apply_author_filter(user)
             print(f"✅ 用户: {user.username}")
             print(f"   - 仓库数: {user.total_repos}")
             print(f"   - 提交数: {user.total_commits}")
+            if commit_authors is not None:
+                print(f"   - 只同步作者: {', '.join([commit_authors.login] + commit_authors.emails)}")
             
             # 2. 同步仓库列表
             print("\n[2/3] 同步仓库列表...")
@@ -63,7 +73,7 @@ async def sync_user_data(username: str, full_sync: bool = False):
                 max_commits_per_repo = None  # 不限制
                 days_back = 365  # 1年内的提交
             else:
-                print("   模式: 增量同步（最近30天）")
+                print("   模式: 增量同步（从各仓库的同步水位开始，未同步过的仓库取最近30天）")
                 max_commits_per_repo = 100  # 每个仓库最多100个
                 days_back = 30
             
@@ -74,11 +84,15 @@ async def sync_user_data(username: str, full_sync: bool = False):
             for i, repo in enumerate(repos, 1):
                 print(f"\n   [{i}/{len(repos)}] {repo.repo_name}")
                 
+                if not full_sync and sync_service.is_repository_unchanged(repo):
+                    print(f"       ○ 上次同步后没有新推送，跳过")
+                    continue
+                
                 try:
                     commits = await sync_service.sync_commits(
                         user=user,
                         repository=repo,
-                        since=since_str,
+                        since=since_str if full_sync else (sync_service.repository_since(repo) or since_str),
                         max_commits=max_commits_per_repo
                     )
                     
@@ -120,6 +134,105 @@ async def sync_user_data(username: str, full_sync: bool = False):
             raise
 
 
+async def sync_aggregate_stats(username: str):
+    """
+    仅聚合统计同步：每个仓库请求一次统计接口，填充每周汇总和用户累计值，不获取提交详情
+    
+    Args:
+        username: GitHub用户名
+    """
+    print("=" * 60)
+    print(f"GitHub聚合统计同步 - {username}")
+    print("=" * 60)
+    
+    github_client = GitHubClient()
+    
+    async with AsyncSessionLocal() as db:
+        sync_service = DataSyncService(db, github_client)
+        start_time = datetime.now()
+        result = await RepoStatsSyncService(sync_service).sync_user_stats(username)
+        duration = (datetime.now() - start_time).total_seconds()
+        
+        print("\n" + "=" * 60)
+        print("✅ 同步完成")
+        print("-" * 60)
+        print(f"用户: {username}")
+        print(f"仓库: {result['total_repos_synced']} 个")
+        print(f"提交: {result['total_commits']} 个（{result['weeks']} 周）")
+        print(f"代码行: +{result['total_additions']} / -{result['total_deletions']}")
+        for failed in result['failed_repos']:
+            print(f"   ✗ {failed['repo_name']}: {failed['error']}")
+        print(f"耗时: {duration:.2f} 秒")
+        print("=" * 60)
+
+
+async def enrich_commits(username: str):
+    """
+    补全两阶段同步写入的提交详情（增删行数、文件数和语言），剩余配额降到保留值时暂停
+    
+    Args:
+        username: GitHub用户名
+    """
+    print("=" * 60)
+    print(f"补全提交详情 - {username}")
+    print("=" * 60)
+    
+    github_client = GitHubClient()
+    
+    async with AsyncSessionLocal() as db:
+        user = (await db.execute(select(User).where(User.username == username))).scalar_one_or_none()
+        if user is None:
+            print(f"❌ 用户不存在: {username}（请先同步）")
+            return
+        
+        sync_service = DataSyncService(db, github_client, sync_strategy='rest')
+        start_time = datetime.now()
+        result = await CommitEnricher(sync_service).enrich_user(user)
+        duration = (datetime.now() - start_time).total_seconds()
+        
+        print("\n" + "=" * 60)
+        print("✅ 补全完成" if not result['paused'] else "⏸  剩余配额不足，已暂停")
+        print("-" * 60)
+        print(f"补全: {result['enriched']} 个提交（失败 {result['failed']} 个）")
+        print(f"未补全: {result['pending']} 个")
+        print(f"耗时: {duration:.2f} 秒")
+        print("=" * 60)
+
+
+async def backfill_history(username: str, strategy: str = None):
+    """
+    按时间窗口并行回填各仓库的完整提交历史（只使用SYNC_BACKFILL_RATE_SHARE比例的配额）
+    
+    Args:
+        username: GitHub用户名
+        strategy: 提交同步策略（rest / graphql），None表示使用配置
+    """
+    print("=" * 60)
+    print(f"历史回填 - {username}")
+    print("=" * 60)
+    
+    github_client = GitHubClient()
+    
+    async with AsyncSessionLocal() as db:
+        sync_service = DataSyncService(db, github_client, sync_strategy=strategy)
+        start_time = datetime.now()
+        result = await HistoryBackfillService(sync_service).backfill_user(username)
+        duration = (datetime.now() - start_time).total_seconds()
+        
+        print("\n" + "=" * 60)
+        print("✅ 回填完成")
+        print("-" * 60)
+        print(f"用户: {username}")
+        print(f"仓库: {result['total_repos_synced']} 个（{result['windows']} 个时间窗口）")
+        print(f"新增提交: {result['total_commits_synced']} 个（共 {result['total_commits']} 个）")
+        for failed in result['failed_repos']:
+            print(f"   ✗ {failed['repo_name']}: {failed['error']}")
+        if result['rate_wait_seconds']:
+            print(f"等待配额重置: {result['rate_wait_seconds']} 秒")
+        print(f"耗时: {duration:.2f} 秒")
+        print("=" * 60)
+
+
 async def main():
     """主函数"""
     import argparse
@@ -131,6 +244,26 @@ async def main():
         action='store_true',
         help='完整同步（同步所有历史数据）'
     )
+    parser.add_argument(
+        '--strategy',
+        choices=['rest', 'graphql', 'git'],
+        help='提交同步策略（graphql每页100个提交只需一次请求，git从本地镜像读取不消耗API配额）'
+    )
+    parser.add_argument(
+        '--aggregate',
+        action='store_true',
+        help='仅聚合统计（每个仓库一次统计接口请求，填充每周汇总，不获取提交详情）'
+    )
+    parser.add_argument(
+        '--enrich',
+        action='store_true',
+        help='补全两阶段同步写入的提交详情（不同步提交列表）'
+    )
+    parser.add_argument(
+        '--backfill',
+        action='store_true',
+        help='按时间窗口并行回填各仓库的完整历史（只使用部分每小时配额）'
+    )
     parser.add_argument(
         '--clean',
         action='store_true',
@@ -160,7 +293,14 @@ async def main():
         print()
     
     # 执行同步
-    await sync_user_data(args.username, full_sync=args.full)
+    if args.aggregate:
+        await sync_aggregate_stats(args.username)
+    elif args.enrich:
+        await enrich_commits(args.username)
+    elif args.backfill:
+        await backfill_history(args.username, strategy=args.strategy)
+    else:
+        await sync_user_data(args.username, full_sync=args.full, strategy=args.strategy)
 
 
 if __name__ == "__main__":
@@ -1,6 +1,10 @@
 """
 更新用户统计数据脚本
 从commit_details表聚合数据更新users表
+
+提交总数、增删行数和语言计数在同步写入提交时增量维护，默认只更新仓库数和连续天数；
+--rebuild 从commit_details完整重算（计数漂移或升级前已有数据时使用）；
+之前执行过仅聚合统计同步的用户自动完整重算
 """
 import sys
 import os
@@ -11,6 +15,8 @@ import asyncio
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app.core.database import AsyncSessionLocal
+from app.models.user import User
+from app.services.user_stats_service import UserStatsService
 from sqlalchemy import text
 
 
@@ -49,45 +55,37 @@ async def calculate_streak_days(user_id: int, session) -> int:
     return streak
 
 
-async def update_user_statistics(user_id: int):
-    """更新指定用户的统计数据"""
+async def update_user_statistics(user_id: int, rebuild: bool = False):
+    """
+    更新指定用户的统计数据
+    
+    Args:
+        user_id: 用户ID
+        rebuild: 是否从commit_details完整重算提交总数、增删行数和语言计数
+    """
     async with AsyncSessionLocal() as session:
         try:
-            # 1. 从commit_details聚合数据
-            stats_result = await session.execute(
-                text("""
-                    SELECT
-                        COUNT(*) as total_commits,
-                        COALESCE(SUM(additions), 0) as total_additions,
-                        COALESCE(SUM(deletions), 0) as total_deletions,
-                        COUNT(DISTINCT repo_id) as total_repos
-                    FROM commit_details
-                    WHERE user_id = :user_id
-                """),
-                {"user_id": user_id}
-            )
+            user = await session.get(User, user_id)
+            if user is None:
+                print(f"❌ 用户 {user_id} 不存在")
+                return
             
-            row = stats_result.fetchone()
-            total_commits = row[0] or 0
-            total_additions = row[1] or 0
-            total_deletions = row[2] or 0
-            total_repos = row[3] or 0
+            # 1. 提交总数、增删行数、语言计数（默认使用增量维护的值；
+            #    累计值来自仓库聚合统计时完整重算，重算同时清除 aggregate_synced_at）
+            rebuild = rebuild or user.aggregate_synced_at is not None
+            if rebuild:
+                await UserStatsService(session).rebuild(user)
             
-            # 2. 计算最活跃语言
-            lang_result = await session.execute(
+            # 2. 统计有提交的仓库数
+            repos_result = await session.execute(
                 text("""
-                    SELECT primary_language, COUNT(*) as cnt
+                    SELECT COUNT(DISTINCT repo_id)
                     FROM commit_details
-                    WHERE user_id = :user_id AND primary_language IS NOT NULL
-                    GROUP BY primary_language
-                    ORDER BY cnt DESC
-                    LIMIT 1
+                    WHERE user_id = :user_id
                 """),
                 {"user_id": user_id}
             )
-            
-            lang_row = lang_result.fetchone()
-            active_language = lang_row[0] if lang_row else 'Unknown'
+            total_repos = repos_result.scalar() or 0
             
             # 3. 计算连续天数
             streak_days = await calculate_streak_days(user_id, session)
@@ -99,37 +97,31 @@ async def update_user_statistics(user_id: int):
             await session.execute(
                 text("""
                     UPDATE users SET
-                        total_commits = :total_commits,
-                        total_additions = :total_additions,
-                        total_deletions = :total_deletions,
                         total_repos = :total_repos,
                         streak_days = :streak_days,
                         max_streak_days = :max_streak_days,
-                        active_language = :active_language,
+                        active_language = COALESCE(active_language, 'Unknown'),
                         updated_at = NOW()
                     WHERE id = :user_id
                 """),
                 {
-                    "total_commits": total_commits,
-                    "total_additions": total_additions,
-                    "total_deletions": total_deletions,
                     "total_repos": total_repos,
                     "streak_days": streak_days,
                     "max_streak_days": max_streak_days,
-                    "active_language": active_language,
                     "user_id": user_id
                 }
             )
             
             await session.commit()
+            await session.refresh(user)
             
-            print(f"✅ 用户 {user_id} 统计数据更新成功:")
-            print(f"  - 总提交数: {total_commits}")
-            print(f"  - 总新增行数: {total_additions}")
-            print(f"  - 总删除行数: {total_deletions}")
+            print(f"✅ 用户 {user_id} 统计数据更新成功{'（完整重算）' if rebuild else ''}:")
+            print(f"  - 总提交数: {user.total_commits}")
+            print(f"  - 总新增行数: {user.total_additions}")
+            print(f"  - 总删除行数: {user.total_deletions}")
             print(f"  - 总仓库数: {total_repos}")
             print(f"  - 连续天数: {streak_days}")
-            print(f"  - 最活跃语言: {active_language}")
+            print(f"  - 最活跃语言: {user.active_language}")
             
         except Exception as e:
             await session.rollback()
@@ -141,12 +133,14 @@ async def update_user_statistics(user_id: int):
 
 if __name__ == "__main__":
     
-    if len(sys.argv) < 2:
-        print("Usage: python update_user_stats.py <user_id>")
+    args = [arg for arg in sys.argv[1:] if arg != "--rebuild"]
+    if len(args) != 1:
+        print("Usage: python update_user_stats.py <user_id> [--rebuild]")
         sys.exit(1)
     
-    user_id = int(sys.argv[1])
+    user_id = int(args[0])
+    rebuild = "--rebuild" in sys.argv[1:]
     
     print(f"开始更新用户 {user_id} 的统计数据...")
-    asyncio.run(update_user_statistics(user_id))
+    asyncio.run(update_user_statistics(user_id, rebuild=rebuild))
     print("完成！")
\ No newline at end of file
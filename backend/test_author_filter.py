@@ -0,0 +1,167 @@
+"""
+提交作者过滤测试脚本
+验证按GitHub登录名和邮箱别名过滤提交列表，只获取用户自己的提交详情
+（使用本地模拟GitHub服务器和内存中的写入记录，无需网络和数据库）
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.models import User, Repository, SyncRunRepo
+from app.services.github_client import GitHubClient
+from app.services.data_sync_service import DataSyncService
+from app.services.commit_author_filter import CommitAuthorFilter
+from benchmarks.fake_github import FakeGitHubServer, make_node_id
+
+WORK_EMAIL = "octocat@work.example.com"
+
+
+class AliasResult:
+    """邮箱别名查询结果"""
+
+    def __init__(self, emails):
+        self.emails = emails
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.emails
+
+
+class MemorySession:
+    """返回固定邮箱别名的会话"""
+
+    def __init__(self, emails=()):
+        self.emails = list(emails)
+
+    async def commit(self):
+        pass
+
+    async def execute(self, statement):
+        return AliasResult(self.emails)
+
+
+class MemorySyncService(DataSyncService):
+    """把写入记录在内存中的同步服务"""
+
+    def __init__(self, github_client, emails=(), **kwargs):
+        super().__init__(MemorySession(emails), github_client, **kwargs)
+        self.saved = {}
+
+    async def _filter_new_shas(self, shas):
+        return [sha for sha in dict.fromkeys(shas) if sha not in self.saved]
+
+    async def _save_parsed_commits(self, user, repository, parsed_commits):
+        for parsed in parsed_commits:
+            self.saved[parsed['sha']] = parsed['author_email']
+        return parsed_commits
+
+    async def finish_repository(self, user, repository, synced_commits, checkpoint=None):
+        pass
+
+
+async def test_author_filter():
+    """测试提交作者过滤"""
+    print("=" * 60)
+    print("提交作者过滤测试")
+    print("=" * 60)
+    print()
+
+    server = FakeGitHubServer()
+    server.add_synthetic_repo("acme", "platform", commits=50)
+    server.push_commits("acme", "platform", 100, author="octocat")
+    server.push_commits("acme", "platform", 30, author="octocat", email=WORK_EMAIL, linked=False)
+    server.push_commits("acme", "platform", 200, author="hubot")
+    await server.start()
+    user = User(id=1, username="octocat")
+    repository = Repository(id=1, repo_name="acme/platform")
+
+    try:
+        async with GitHubClient(token="fake-token", base_url=server.url) as client:
+            client.commit_store = None
+
+            print("测试 1: 过滤条件按同步策略生成每一轮的参数")
+            print("-" * 60)
+            authors = CommitAuthorFilter("octocat", [" Octocat@Work.example.com", WORK_EMAIL], node_id="U_1")
+            assert authors.passes('rest') == ["octocat", WORK_EMAIL]
+            assert authors.passes('graphql') == [{'id': "U_1"}, {'emails': [WORK_EMAIL]}]
+            assert CommitAuthorFilter("octocat").passes('graphql') == [None]
+            assert authors.fingerprint != CommitAuthorFilter("octocat", node_id="U_1").fingerprint
+            print("[PASS] REST每个身份一轮，GraphQL节点ID和邮箱各一轮")
+            print()
+
+            print("测试 2: REST只获取登录名和邮箱别名的提交详情")
+            print("-" * 60)
+            service = MemorySyncService(client, use_pipeline=False)
+            server.reset_stats()
+            await service.sync_commits(user, repository, max_commits=None)
+            unfiltered_requests = server.request_count
+            assert len(service.saved) == 380
+
+            service = MemorySyncService(client, emails=[WORK_EMAIL], use_pipeline=False)
+            assert (await service.apply_author_filter(user)).passes('rest') == ["octocat", WORK_EMAIL]
+            server.reset_stats()
+            await service.sync_commits(user, repository, max_commits=None)
+            assert len(service.saved) == 130
+            assert sorted(set(service.saved.values())) == ["octocat@example.com", WORK_EMAIL]
+            # 3个列表请求（登录名和邮箱别名各一轮），130个提交详情
+            assert server.request_count == 3 + 130, server.request_count
+            print(f"[PASS] 请求数 {unfiltered_requests} -> {server.request_count}，其他贡献者的200个提交不再获取")
+            print()
+
+            print("测试 3: GraphQL按用户节点ID和邮箱别名过滤")
+            print("-" * 60)
+            service = MemorySyncService(client, emails=[WORK_EMAIL], sync_strategy='graphql')
+            server.reset_stats()
+            authors = await service.apply_author_filter(user)
+            assert authors.node_id == make_node_id("octocat")
+            await service.sync_commits(user, repository, max_commits=None)
+            assert len(service.saved) == 130
+            assert server.graphql_count == 2, server.graphql_count
+            print(f"[PASS] {server.graphql_count} 次GraphQL请求获取130个提交")
+            print()
+
+            print("测试 4: 检查点游标记录轮次，继续同步时跳过已完成的轮次")
+            print("-" * 60)
+            checkpoint = SyncRunRepo(
+                id=1, run_id=1, repo_id=1, status='pending', since=None, cursor=None,
+                commits_listed=0, commits_synced=0, error=None
+            )
+            service = MemorySyncService(client, emails=[WORK_EMAIL], use_pipeline=False)
+            await service.apply_author_filter(user)
+            await service.sync_commits(user, repository, max_commits=None, checkpoint=checkpoint)
+            assert checkpoint.cursor == "1:2" and checkpoint.commits_listed == 130
+
+            checkpoint.status, checkpoint.cursor = 'pending', "1:1"
+            server.reset_stats()
+            service = MemorySyncService(client, emails=[WORK_EMAIL], use_pipeline=False)
+            await service.apply_author_filter(user)
+            commits = await service.sync_commits(user, repository, max_commits=None, checkpoint=checkpoint)
+            # 只重新列出邮箱别名一轮（1页 + 30个详情）
+            assert len(commits) == 30 and server.request_count == 1 + 30, server.request_count
+            print(f"[PASS] 游标 {checkpoint.cursor}，继续同步只发起 {server.request_count} 个请求")
+            print()
+
+            print("测试 5: 每仓库最大提交数是所有轮次的合计")
+            print("-" * 60)
+            service = MemorySyncService(client, emails=[WORK_EMAIL], use_pipeline=False)
+            await service.apply_author_filter(user)
+            commits = await service.sync_commits(user, repository, max_commits=120)
+            assert len(commits) == 120
+            assert sum(email == WORK_EMAIL for email in service.saved.values()) == 20
+            print("[PASS] 登录名100个 + 邮箱别名20个")
+            print()
+
+        print("=" * 60)
+        print("[SUCCESS] 所有测试通过！")
+        print("=" * 60)
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(test_author_filter())
@@ -0,0 +1,86 @@
+"""
+GitHub共享连接池测试脚本
+验证客户端视图复用同一连接池、视图关闭不影响共享连接以及连接池统计
+（使用本地模拟GitHub服务器，无需网络）
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.services.client_registry import GitHubClientRegistry
+from benchmarks.fake_github import FakeGitHubServer
+
+
+async def test_client_registry():
+    """测试共享连接池"""
+    print("=" * 60)
+    print("GitHub共享连接池测试")
+    print("=" * 60)
+    print()
+
+    server = FakeGitHubServer()
+    for i in range(4):
+        server.add_synthetic_repo("octocat", f"hello-{i}", commits=250)
+    await server.start()
+    registry = GitHubClientRegistry(base_url=server.url)
+
+    try:
+        print("测试 1: 同一Token复用同一视图")
+        print("-" * 60)
+        registry.start()
+        default_client = registry.get_client()
+        assert registry.get_client() is default_client
+        token_client = registry.get_client("token-a")
+        assert token_client is not default_client
+        assert token_client.client is default_client.client is registry.http_client
+        print(f"[PASS] {registry.stats()['views']} 个视图共享同一连接池")
+        print()
+
+        print("测试 2: 视图关闭后共享连接池仍可用")
+        print("-" * 60)
+        async with registry.get_client("token-a") as client:
+            await client.get_user("octocat")
+        assert not registry.http_client.is_closed
+        user = await registry.get_client("token-a").get_user("octocat")
+        assert user["login"] == "octocat"
+        print("[PASS] 视图关闭不影响共享连接池")
+        print()
+
+        print("测试 3: 并发请求复用keep-alive连接")
+        print("-" * 60)
+        for _ in range(5):
+            await asyncio.gather(*[
+                registry.get_client("token-a").get_repo_commits("octocat", f"hello-{i}")
+                for i in range(4)
+            ])
+        stats = registry.stats()
+        connections = stats['connections']['total']
+        assert stats['requests']['responses'] >= 60
+        assert connections <= stats['limits']['max_connections']
+        assert connections < stats['requests']['responses'] / 4, "连接应被复用"
+        print(f"[PASS] {stats['requests']['responses']} 次请求使用 {connections} 个连接 "
+              f"({stats['requests']['http_versions']})")
+        print()
+
+        print("测试 4: 关闭注册表")
+        print("-" * 60)
+        http_client = registry.http_client
+        await registry.close()
+        assert http_client.is_closed and not registry.started
+        assert registry.stats() == {'started': False}
+        print("[PASS] 共享连接池已关闭")
+        print()
+
+        print("=" * 60)
+        print("[SUCCESS] 所有测试通过！")
+        print("=" * 60)
+    finally:
+        await registry.close()
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(test_client_registry())
@@ -0,0 +1,76 @@
+"""
+提交详情本地存储测试脚本
+验证按SHA存储、fork复用、垃圾回收，以及已存储的详情不再写入响应缓存
+（使用本地模拟GitHub服务器，无需网络）
+"""
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.services.github_client import GitHubClient
+from app.services.commit_store import CommitStore
+from app.services.response_cache import MemoryResponseCache
+from benchmarks.fake_github import FakeGitHubServer
+
+
+async def test_commit_store():
+    """测试提交详情本地存储"""
+    print("=" * 60)
+    print("提交详情本地存储测试")
+    print("=" * 60)
+    print()
+
+    server = FakeGitHubServer()
+    server.add_synthetic_repo("octocat", "hello-world", commits=5)
+    await server.start()
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = CommitStore(tmp)
+            cache = MemoryResponseCache()
+            shas = [c["sha"] for c in server.commits["octocat/hello-world"]]
+
+            print("测试 1: 首次获取写入存储，不在响应缓存中保留副本")
+            print("-" * 60)
+            async with GitHubClient(
+                token="fake-token", base_url=server.url, commit_store=store, cache=cache
+            ) as client:
+                details = await client.get_commit_details("octocat", "hello-world", shas)
+                assert client.cache_stats["stores"] == 0
+            assert store.stats()["entries"] == 5
+            assert server.request_count == 5
+            print(f"[PASS] 存储了 {store.stats()['entries']} 个提交详情，响应缓存写入 0 次")
+            print()
+
+            print("测试 2: 重建时（含fork仓库）不再请求API")
+            print("-" * 60)
+            server.reset_stats()
+            async with GitHubClient(token="fake-token", base_url=server.url, commit_store=store) as client:
+                again = await client.get_commit_details("someone-else", "hello-world-fork", shas)
+                assert client.store_stats["hits"] == 5
+            assert again == details, "存储中读取的数据应与原始响应一致"
+            assert server.request_count == 0, "命中存储时不应发起网络请求"
+            print("[PASS] 5个提交全部命中本地存储，API调用 0 次")
+            print()
+
+            print("测试 3: 垃圾回收")
+            print("-" * 60)
+            removed = store.gc(keep=shas[:2])
+            assert removed == 3 and store.stats()["entries"] == 2
+            assert store.get(shas[0]) is not None and store.get(shas[4]) is None
+            print(f"[PASS] 清理了 {removed} 个未被引用的条目")
+            print()
+
+        print("=" * 60)
+        print("[SUCCESS] 所有测试通过！")
+        print("=" * 60)
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(test_commit_store())
@@ -0,0 +1,225 @@
+"""
+事件流预检查测试脚本
+验证增量同步前通过用户事件流检测变化：没有新事件时一次304请求结束同步，
+有推送时只同步推送过的仓库，出现新仓库或事件流不完整（为空、不包含上次的事件）时回退到完整同步，
+以及最近的事件不作为下次检测的起点
+（使用本地模拟GitHub服务器和内存中的仓库记录，无需网络和数据库）
+"""
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.models import User, Repository
+from app.services.github_client import GitHubClient
+from app.services.data_sync_service import DataSyncService
+from app.services.response_cache import MemoryResponseCache
+from benchmarks.fake_github import FakeGitHubServer
+
+
+class MemoryResult:
+    """查询结果"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class MemorySession:
+    """返回固定仓库列表的会话（邮箱别名为空）"""
+
+    def __init__(self, repositories):
+        self.repositories = repositories
+        self.commits = 0
+
+    async def commit(self):
+        self.commits += 1
+
+    async def execute(self, statement):
+        if statement.column_descriptions[0]['entity'] is Repository:
+            return MemoryResult(self.repositories)
+        return MemoryResult([])
+
+
+class MemorySyncService(DataSyncService):
+    """用户和仓库保存在内存中的同步服务"""
+
+    def __init__(self, github_client, user, repositories):
+        super().__init__(MemorySession(repositories), github_client, events_precheck=True)
+        self.user = user
+
+    async def sync_user(self, username):
+        return self.user
+
+
+def make_repository(server, repo_id, full_name):
+    """按模拟服务器中的仓库创建已同步到最新的仓库记录"""
+    owner = full_name.split("/")[0]
+    github_repo = next(r for r in server.repos[owner] if r["full_name"] == full_name)
+    pushed_at = DataSyncService._parse_github_time(github_repo["pushed_at"])
+    return Repository(
+        id=repo_id, user_id=1, github_repo_id=github_repo["id"], repo_name=full_name,
+        pushed_at=pushed_at, synced_pushed_at=pushed_at
+    )
+
+
+def mark_synced(repositories):
+    for repository in repositories:
+        repository.synced_pushed_at = repository.pushed_at
+
+
+async def test_events_precheck():
+    """测试事件流预检查"""
+    print("=" * 60)
+    print("事件流预检查测试")
+    print("=" * 60)
+    print()
+
+    server = FakeGitHubServer()
+    server.add_synthetic_repo("octocat", "hello", commits=20)
+    server.add_synthetic_repo("octocat", "world", commits=5)
+    await server.start()
+
+    user = User(id=1, username="octocat", last_event_id=None, total_additions=0, total_deletions=0)
+    repositories = [
+        make_repository(server, 1, "octocat/hello"),
+        make_repository(server, 2, "octocat/world"),
+    ]
+
+    try:
+        async with GitHubClient(token="fake-token", base_url=server.url, cache=MemoryResponseCache()) as client:
+            client.commit_store = None
+            service = MemorySyncService(client, user, repositories)
+
+            print("测试 1: 没有记录事件ID时需要完整同步")
+            print("-" * 60)
+            newest_event_id, pushed = await service.detect_changes(user)
+            assert pushed is None
+            assert newest_event_id == server.events["octocat"][0]["id"]
+            user.last_event_id = newest_event_id
+            print(f"[PASS] 记录最新事件ID {newest_event_id}")
+            print()
+
+            print("测试 2: 事件流没有变化时一次304请求结束同步")
+            print("-" * 60)
+            server.reset_stats()
+            rate_remaining = server.rate_remaining
+            result = await service.sync_user_data("octocat")
+            assert result["change_detection"] == "unchanged", result
+            assert result["total_repos_synced"] == 0 and result["sync_run_id"] is None
+            assert server.request_count == 1 and server.not_modified_count == 1
+            assert server.rate_remaining == rate_remaining
+            assert user.last_sync_at is not None
+            print(f"[PASS] {server.request_count} 个请求（304），不消耗配额，不请求仓库列表")
+            print()
+
+            print("测试 3: 只同步推送过的仓库")
+            print("-" * 60)
+            server.push_commits("octocat", "hello", 3)
+            server.reset_stats()
+            newest_event_id, pushed = await service.detect_changes(user)
+            assert list(pushed) == ["octocat/hello"], pushed
+            changed = await service._load_changed_repositories(user, pushed)
+            assert [repository.repo_name for repository in changed] == ["octocat/hello"]
+            assert not DataSyncService.is_repository_unchanged(repositories[0])
+            assert DataSyncService.is_repository_unchanged(repositories[1])
+            assert server.request_count == 1
+            user.last_event_id = newest_event_id
+            mark_synced(repositories)
+            print(f"[PASS] 1 个事件流请求，检测到 {[r.repo_name for r in changed]}")
+            print()
+
+            print("测试 4: 其他贡献者的推送不触发同步")
+            print("-" * 60)
+            server.push_commits("octocat", "world", 2, author="hubot")
+            result = await service.sync_user_data("octocat")
+            assert result["change_detection"] == "unchanged", result
+            print("[PASS] 事件流只包含用户自己的推送，没有需要同步的仓库")
+            print()
+
+            print("测试 5: 上次同步失败的仓库仍然同步")
+            print("-" * 60)
+            server.push_commits("octocat", "world", 1)
+            newest_event_id, pushed = await service.detect_changes(user)
+            repositories[0].synced_pushed_at = None  # 上次同步失败
+            changed = await service._load_changed_repositories(user, pushed)
+            assert [repository.repo_name for repository in changed] == ["octocat/hello", "octocat/world"]
+            user.last_event_id = newest_event_id
+            mark_synced(repositories)
+            print("[PASS] 推送过的仓库和尚未同步到最新的仓库都被同步")
+            print()
+
+            print("测试 6: 新建仓库或推送到未记录的仓库时获取仓库列表")
+            print("-" * 60)
+            server.add_synthetic_repo("octocat", "new", commits=2)
+            newest_event_id, pushed = await service.detect_changes(user)
+            assert pushed is None
+            server.push_commits("octocat", "new", 1)
+            _, pushed = await service.detect_changes(User(id=1, username="octocat", last_event_id=newest_event_id))
+            assert list(pushed) == ["octocat/new"]
+            assert await service._load_changed_repositories(user, pushed) is None
+            print("[PASS] 回退到完整同步")
+            print()
+
+            print("测试 7: 事件流不包含上次的事件或为空时回退到完整同步")
+            print("-" * 60)
+            events = server.events["octocat"]
+            assert len(events) < 100
+            # 上次的事件已超出事件流的范围（90天）
+            older = str(int(events[-1]["id"]) - 1)
+            _, pushed = await service.detect_changes(User(id=1, username="octocat", last_event_id=older))
+            assert pushed is None
+            server.events["octocat"] = []
+            try:
+                newest_event_id, pushed = await service.detect_changes(user)
+                assert pushed is None and newest_event_id == user.last_event_id
+            finally:
+                server.events["octocat"] = events
+            print("[PASS] 无法确定期间的全部推送，获取仓库列表")
+            print()
+
+            print("测试 8: 最近的事件不作为下次检测的起点")
+            print("-" * 60)
+            user.last_event_id = events[0]["id"]
+            server.push_commits("octocat", "hello", 1)
+            recent = server.events["octocat"][0]
+            recent["created_at"] = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+            newest_event_id, pushed = await service.detect_changes(user)
+            assert list(pushed) == ["octocat/hello"]
+            # 之后出现的、创建时间更早的事件下次仍能读到
+            assert newest_event_id == user.last_event_id
+            recent["created_at"] = (datetime.utcnow() - timedelta(minutes=10)).strftime("%Y-%m-%dT%H:%M:%SZ")
+            newest_event_id, _ = await service.detect_changes(user)
+            assert newest_event_id == recent["id"]
+            print("[PASS] 事件流位置只推进到创建超过延迟上限的事件")
+            print()
+
+            print("测试 9: 新事件超过事件流上限时回退到完整同步")
+            print("-" * 60)
+            user.last_event_id = server.events["octocat"][0]["id"]
+            for _ in range(301):
+                server.push_commits("octocat", "hello", 1)
+            server.reset_stats()
+            _, pushed = await service.detect_changes(user)
+            assert pushed is None
+            assert server.request_count == 3
+            print(f"[PASS] 读取 {server.request_count} 页后未找到上次的事件ID")
+            print()
+
+        print("=" * 60)
+        print("[SUCCESS] 所有测试通过！")
+        print("=" * 60)
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(test_events_precheck())
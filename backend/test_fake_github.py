@@ -0,0 +1,185 @@
+"""
+模拟GitHub服务器测试脚本
+验证录制回放、合成用户、分页、ETag以及403速率限制模拟（无需网络）
+"""
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.models import User, Repository
+from app.services.github_client import GitHubClient, RateLimitError
+from app.services.data_sync_service import DataSyncService
+from benchmarks.cassette import Cassette
+from benchmarks.fake_github import FakeGitHubServer
+from benchmarks.record_cassette import record
+
+
+async def fetch_all(client: GitHubClient, username: str, max_commits: int):
+    """按同步流程获取用户、仓库、提交列表、提交详情和GraphQL历史"""
+    user = await client.get_user(username)
+    repos = await client.get_user_repos(username)
+    result = {"user": user, "repos": repos, "commits": {}, "history": {}}
+    for repo in repos[:2]:
+        owner, name = repo["full_name"].split("/")
+        commits = await client.get_repo_commits(owner, name, max_commits=max_commits)
+        result["commits"][repo["full_name"]] = await client.get_commit_details(
+            owner, name, [c["sha"] for c in commits]
+        )
+        result["history"][repo["full_name"]] = await client.get_commit_history(
+            owner, name, max_commits=max_commits
+        )
+    return result
+
+
+async def test_fake_github():
+    """测试模拟GitHub服务器"""
+    print("=" * 60)
+    print("模拟GitHub服务器测试")
+    print("=" * 60)
+    print()
+
+    source = FakeGitHubServer()
+    source.add_synthetic_user("alice", repos=3, commits_per_repo=250)
+    await source.start()
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            print("测试 1: 合成用户")
+            print("-" * 60)
+            assert len(source.repos["alice"]) == 3
+            assert all(len(source.commits[f"alice/repo-{i}"]) == 250 for i in range(3))
+            print("[PASS] 3个仓库 × 250个提交")
+            print()
+
+            print("测试 2: 录制响应")
+            print("-" * 60)
+            path = os.path.join(tmp, "alice.json.gz")
+            cassette = await record("alice", max_repos=2, max_commits=150, graphql=True,
+                                    output=path, base_url=source.url)
+            assert len(cassette) == source.request_count
+            print(f"[PASS] 录制 {len(cassette)} 个响应")
+            print()
+
+            print("测试 3: 回放与原始响应一致（不依赖合成数据）")
+            print("-" * 60)
+            replay = FakeGitHubServer(cassette=Cassette.load(path))
+            await replay.start()
+            try:
+                async with GitHubClient(token="fake-token", base_url=source.url) as client:
+                    client.commit_store = None
+                    expected = await fetch_all(client, "alice", max_commits=150)
+                async with GitHubClient(token="fake-token", base_url=replay.url) as client:
+                    client.commit_store = None
+                    actual = await fetch_all(client, "alice", max_commits=150)
+                assert actual == expected
+                assert replay.replayed_count == replay.request_count
+                assert not replay.users and not replay.commits
+                print(f"[PASS] 回放 {replay.replayed_count} 个响应，结果一致")
+            finally:
+                await replay.stop()
+            print()
+
+        print("测试 4: 403速率限制与配额窗口恢复")
+        print("-" * 60)
+        limited = FakeGitHubServer(rate_limit=3, rate_window=1)
+        limited.add_synthetic_user("bob", repos=1, commits_per_repo=5)
+        await limited.start()
+        try:
+            async with GitHubClient(token="fake-token", base_url=limited.url, auto_retry=False) as client:
+                client.cache = None  # 304响应不消耗配额，这里需要每次都消耗
+                for _ in range(3):
+                    await client.get_user("bob")
+                try:
+                    await client.get_user("bob")
+                    raise AssertionError("应返回403速率限制")
+                except RateLimitError:
+                    pass
+                assert limited.rate_limited_count == 1
+                await asyncio.sleep(1.1)
+                assert (await client.get_user("bob"))["login"] == "bob"
+            print("[PASS] 配额用尽返回403，窗口结束后恢复")
+        finally:
+            await limited.stop()
+        print()
+
+        print("测试 5: 推送新提交与仓库同步水位")
+        print("-" * 60)
+        async with GitHubClient(token="fake-token", base_url=source.url) as client:
+            github_repo = (await client.get_user_repos("alice"))[0]
+            owner, name = github_repo["full_name"].split("/")
+            row = DataSyncService._repository_row(User(id=1), github_repo)
+            latest = (await client.get_repo_commits(owner, name, max_commits=1))[0]
+            repository = Repository(
+                pushed_at=row["pushed_at"],
+                synced_pushed_at=row["pushed_at"],
+                last_synced_commit_at=DataSyncService._parse_github_time(latest["commit"]["committer"]["date"])
+            )
+            assert DataSyncService.is_repository_unchanged(repository)
+
+            source.push_commits(owner, name, 3)
+            github_repo = (await client.get_user_repos("alice"))[0]
+            repository.pushed_at = DataSyncService._repository_row(User(id=1), github_repo)["pushed_at"]
+            assert not DataSyncService.is_repository_unchanged(repository)
+
+            # 水位时间点上的提交会再次返回，由SHA去重
+            since = DataSyncService.repository_since(repository)
+            commits = await client.get_repo_commits(owner, name, since=since)
+            assert len(commits) == 4 and commits[-1]["sha"] == latest["sha"]
+        print("[PASS] 未推送的仓库判定为未变化，推送后只获取水位之后的提交")
+        print()
+
+        print("测试 6: 提前结束或请求失败时取消并等待未完成的请求")
+        print("-" * 60)
+        slow = FakeGitHubServer(latency=0.05)
+        slow.add_synthetic_repo("alice", "slow", commits=1000)
+        await slow.start()
+        try:
+            async with GitHubClient(token="fake-token", base_url=slow.url) as client:
+                client.commit_store = None
+
+                def client_tasks():
+                    # 客户端创建的请求任务（服务器处理请求的任务不计入）
+                    return [
+                        task for task in asyncio.all_tasks()
+                        if not task.done() and "GitHubClient" in task.get_coro().__qualname__
+                    ]
+
+                pages = client.iter_repo_commits("alice", "slow")
+                fetched = 0
+                async for _ in pages:
+                    fetched += 1
+                    if fetched == 2:
+                        # 第二页返回时后续页已在并发请求
+                        assert client_tasks()
+                        break
+                await pages.aclose()
+                assert client_tasks() == []
+
+                shas = [c["sha"] for c in slow.commits["alice/slow"][:20]] + ["0" * 40]
+                try:
+                    await client.get_commit_details("alice", "slow", shas, concurrency=4)
+                    raise AssertionError("不存在的提交应当报错")
+                except AssertionError:
+                    raise
+                except Exception:
+                    pass
+                assert client_tasks() == []
+        finally:
+            await slow.stop()
+        print("[PASS] 未完成的请求被取消并等待结束")
+        print()
+
+        print("=" * 60)
+        print("[SUCCESS] 所有测试通过！")
+        print("=" * 60)
+    finally:
+        await source.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(test_fake_github())
@@ -0,0 +1,220 @@
+"""
+本地Git镜像同步测试脚本
+验证裸仓库镜像的克隆和增量拉取、git log --numstat 的流式解析，以及git策略的提交同步
+（在临时目录中用git创建源仓库，无需网络和数据库）
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.models import User, Repository, SyncRunRepo
+from app.services.github_client import GitHubClient
+from app.services.commit_parser import CommitParser
+from app.services.commit_author_filter import CommitAuthorFilter
+from app.services.data_sync_service import DataSyncService
+from app.services.git_mirror import GitMirror
+
+OCTOCAT = ("Octocat", "1234+octocat@users.noreply.github.com")
+WORK = ("Octocat", "octocat@work.example.com")
+HUBOT = ("Hubot", "hubot@example.com")
+
+
+class SourceRepo:
+    """测试用的源仓库（镜像从这里克隆）"""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        os.makedirs(path)
+        self.git("init", "--quiet", "--initial-branch=main")
+
+    def git(self, *args, author=OCTOCAT):
+        name, email = author
+        env = dict(
+            os.environ,
+            GIT_AUTHOR_NAME=name, GIT_AUTHOR_EMAIL=email,
+            GIT_COMMITTER_NAME=name, GIT_COMMITTER_EMAIL=email,
+            GIT_AUTHOR_DATE=f"2024-03-{1 + self.count // 24:02d}T{self.count % 24:02d}:00:00+08:00",
+            GIT_COMMITTER_DATE=f"2024-03-{1 + self.count // 24:02d}T{self.count % 24:02d}:00:00+08:00",
+        )
+        return subprocess.run(
+            ["git", *args], cwd=self.path, env=env, check=True, capture_output=True, text=True
+        ).stdout
+
+    def write(self, filename, content):
+        path = os.path.join(self.path, filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        mode = "wb" if isinstance(content, bytes) else "w"
+        with open(path, mode) as f:
+            f.write(content)
+
+    def commit(self, message, author=OCTOCAT):
+        self.git("add", "-A")
+        self.git("commit", "--quiet", "-m", message, author=author)
+        self.count += 1
+
+    def add_commits(self, count, author=OCTOCAT):
+        for _ in range(count):
+            self.write(f"lib/module_{self.count}.go", "package lib\n" * 3)
+            self.commit(f"add module {self.count}", author=author)
+
+
+class MemorySession:
+    """不写数据库的会话（检查点游标保存在对象上）"""
+
+    async def commit(self):
+        pass
+
+
+class MemorySyncService(DataSyncService):
+    """把写入记录在内存中的同步服务"""
+
+    def __init__(self, github_client, **kwargs):
+        super().__init__(MemorySession(), github_client, sync_strategy='git', **kwargs)
+        self.saved = {}
+
+    async def _filter_new_shas(self, shas):
+        return [sha for sha in dict.fromkeys(shas) if sha not in self.saved]
+
+    async def _save_parsed_commits(self, user, repository, parsed_commits):
+        for parsed in parsed_commits:
+            self.saved[parsed['sha']] = parsed
+        return parsed_commits
+
+    async def finish_repository(self, user, repository, synced_commits, checkpoint=None):
+        pass
+
+
+async def test_git_mirror():
+    """测试本地Git镜像同步"""
+    print("=" * 60)
+    print("本地Git镜像同步测试")
+    print("=" * 60)
+    print()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = SourceRepo(os.path.join(tmp, "src", "acme", "platform"))
+        source.write("src/app.py", "import os\n\n" + "print(os.name)\n" * 8)
+        source.write("README.md", "# platform\n")
+        source.commit("initial commit")
+        source.write("src/app.py", "import os\n\n" + "print(os.name)\n" * 7 + "print(os.getcwd())\n")
+        source.git("mv", "src/app.py", "src/main.py")
+        source.write("assets/logo.png", bytes(range(256)))
+        source.commit("move app to main\n\nAlso add the logo.\nRefs #12")
+
+        mirror = GitMirror(
+            root=os.path.join(tmp, "mirrors"),
+            url_template=os.path.join(tmp, "src", "{owner}", "{repo}"),
+            batch_size=10
+        )
+
+        print("测试 1: 克隆裸仓库镜像并流式解析numstat")
+        print("-" * 60)
+        path = await mirror.update("acme", "platform")
+        assert os.path.isfile(os.path.join(path, "HEAD"))
+        records = [record async for batch in mirror.iter_commits("acme", "platform") for record in batch]
+        assert len(records) == 2
+        latest, initial = records
+        assert latest["message"] == "move app to main\n\nAlso add the logo.\nRefs #12"
+        assert latest["commit_date"] == "2024-03-01T01:00:00+08:00"
+        assert latest["author_email"] == OCTOCAT[1]
+        files = {f["filename"]: (f["additions"], f["deletions"]) for f in latest["files"]}
+        assert files == {"assets/logo.png": (0, 0), "src/main.py": (1, 1)}, files
+        assert initial["message"] == "initial commit" and len(initial["files"]) == 2
+        print("[PASS] 多行消息、重命名（取新路径）和二进制文件（按0行）解析正确")
+        print()
+
+        print("测试 2: 解析结果与API同步的结构一致，语言按扩展名识别")
+        print("-" * 60)
+        parsed = CommitParser.parse_git_commit(initial)
+        assert parsed["commit_date"] == "2024-02-29T16:00:00Z"
+        assert (parsed["additions"], parsed["deletions"], parsed["files_changed"]) == (11, 0, 2)
+        assert sorted(parsed["languages"]) == ["Markdown", "Python"], parsed["languages"]
+        assert set(parsed) == set(CommitParser.parse_commit({"sha": "x", "commit": {}}))
+        print(f"[PASS] {parsed['languages']}，{parsed['commit_date']}")
+        print()
+
+        print("测试 3: 增量拉取新提交，游标固定起点SHA")
+        print("-" * 60)
+        head = await mirror.resolve_head("acme", "platform")
+        source.add_commits(25)
+        source.add_commits(5, author=HUBOT)
+        source.add_commits(3, author=WORK)
+        await mirror.update("acme", "platform")
+        assert await mirror.resolve_head("acme", "platform") != head
+        batches = [batch async for batch in mirror.iter_commits("acme", "platform")]
+        assert [len(batch) for batch in batches] == [10, 10, 10, 5]
+        old = [batch async for batch in mirror.iter_commits("acme", "platform", rev=head)]
+        assert sum(len(batch) for batch in old) == 2
+        recent = [batch async for batch in mirror.iter_commits("acme", "platform", since="2024-03-02T00:00:00+08:00")]
+        assert sum(len(batch) for batch in recent) == 35 - 24
+        print(f"[PASS] 拉取后 {sum(len(b) for b in batches)} 个提交，分 {len(batches)} 批产出")
+        print()
+
+        print("测试 4: 按邮箱和noreply邮箱过滤作者")
+        print("-" * 60)
+        authors = CommitAuthorFilter("octocat", [WORK[1]])
+        assert authors.passes('git') == [authors.git_authors()]
+        mine = [
+            record async for batch in mirror.iter_commits("acme", "platform", authors=authors.git_authors())
+            for record in batch
+        ]
+        assert len(mine) == 30
+        assert {record["author_email"] for record in mine} == {OCTOCAT[1], WORK[1]}
+        print("[PASS] 其他贡献者的5个提交被排除")
+        print()
+
+        user = User(id=1, username="octocat")
+        repository = Repository(id=1, repo_name="acme/platform")
+        # git策略不请求GitHub API，客户端只用于提供Token
+        async with GitHubClient(token="fake-token", base_url="http://127.0.0.1:9") as client:
+            client.commit_store = None
+
+            print("测试 5: git策略顺序同步和流水线同步结果一致")
+            print("-" * 60)
+            results = {}
+            for use_pipeline in (False, True):
+                service = MemorySyncService(client, git_mirror=mirror, use_pipeline=use_pipeline)
+                service.commit_authors = authors
+                commits = await service.sync_commits(user, repository, max_commits=None)
+                assert len(commits) == 30
+                results[use_pipeline] = {sha: parsed["total_changes"] for sha, parsed in service.saved.items()}
+            assert results[False] == results[True]
+            assert "Go" in service.saved[mine[0]["sha"]]["languages"]
+            print("[PASS] 两种方式都同步30个提交，统计一致")
+            print()
+
+            print("测试 6: 检查点游标为 \"起点SHA:已读取数\"，继续同步不重复读取")
+            print("-" * 60)
+            checkpoint = SyncRunRepo(
+                id=1, run_id=1, repo_id=1, status='pending', since=None, cursor=None,
+                commits_listed=0, commits_synced=0, error=None
+            )
+            service = MemorySyncService(client, git_mirror=mirror, use_pipeline=False)
+            commits = await service.sync_commits(user, repository, max_commits=12, checkpoint=checkpoint)
+            head = await mirror.resolve_head("acme", "platform")
+            assert len(commits) == 12 and checkpoint.cursor == f"{head}:12", checkpoint.cursor
+
+            source.add_commits(4)
+            service = MemorySyncService(client, git_mirror=mirror, use_pipeline=False)
+            checkpoint.status = 'pending'
+            commits = await service.sync_commits(user, repository, max_commits=None, checkpoint=checkpoint)
+            # 新拉取的4个提交留给下一次增量同步
+            assert len(commits) == 35 - 12, len(commits)
+            assert checkpoint.cursor == f"{head}:35", checkpoint.cursor
+            print(f"[PASS] 从第12个提交继续，读取剩余 {len(commits)} 个")
+            print()
+
+    print("=" * 60)
+    print("[SUCCESS] 所有测试通过！")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(test_git_mirror())
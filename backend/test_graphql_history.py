@@ -0,0 +1,78 @@
+"""
+GraphQL提交历史测试脚本
+验证GraphQL批量获取的统计数据与REST逐个获取一致，并对比API调用次数
+（使用本地模拟GitHub服务器的GraphQL替身，无需网络）
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.services.github_client import GitHubClient
+from app.services.commit_parser import CommitParser
+from benchmarks.fake_github import FakeGitHubServer
+
+
+async def test_graphql_history():
+    """测试GraphQL提交历史"""
+    print("=" * 60)
+    print("GraphQL提交历史测试")
+    print("=" * 60)
+    print()
+
+    server = FakeGitHubServer()
+    server.add_synthetic_repo("octocat", "hello-world", commits=250)
+    await server.start()
+
+    try:
+        async with GitHubClient(token="fake-token", base_url=server.url) as client:
+            client.commit_store = None
+
+            print("测试 1: REST逐个获取提交详情")
+            print("-" * 60)
+            server.reset_stats()
+            listing = await client.get_repo_commits("octocat", "hello-world")
+            details = await client.get_commit_details("octocat", "hello-world", [c["sha"] for c in listing])
+            rest_parsed = [CommitParser.parse_commit(d) for d in details]
+            rest_calls = server.request_count
+            print(f"[PASS] {len(rest_parsed)} 个提交，API调用 {rest_calls} 次")
+            print()
+
+            print("测试 2: GraphQL批量获取提交历史")
+            print("-" * 60)
+            server.reset_stats()
+            nodes = await client.get_commit_history("octocat", "hello-world")
+            graphql_parsed = [CommitParser.parse_graphql_commit(n) for n in nodes]
+            graphql_calls = server.graphql_count
+            print(f"[PASS] {len(graphql_parsed)} 个提交，API调用 {graphql_calls} 次")
+            print()
+
+            print("测试 3: 统计数据一致性")
+            print("-" * 60)
+            fields = ("sha", "message", "commit_date", "additions", "deletions", "files_changed")
+            for rest, graphql in zip(rest_parsed, graphql_parsed):
+                for field in fields:
+                    assert rest[field] == graphql[field], f"{field} 不一致: {rest[field]} != {graphql[field]}"
+            assert len(rest_parsed) == len(graphql_parsed)
+            print(f"[PASS] 字段一致，API调用减少 {rest_calls / graphql_calls:.0f}x")
+            print()
+
+            print("测试 4: max_commits与不存在的仓库")
+            print("-" * 60)
+            assert len(await client.get_commit_history("octocat", "hello-world", max_commits=120)) == 120
+            assert await client.get_commit_history("octocat", "does-not-exist") == []
+            assert "graphql" in client.resource_rate_limits, "GraphQL配额应单独记录"
+            print("[PASS] 截断与404处理正确")
+            print()
+
+        print("=" * 60)
+        print("[SUCCESS] 所有测试通过！")
+        print("=" * 60)
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(test_graphql_history())
@@ -0,0 +1,224 @@
+"""
+历史回填测试脚本
+验证按时间窗口并行列出大仓库的历史、按提交密度切分窗口、按SHA去重写入、
+窗口失败时不推进水位，以及按可用的配额比例等待配额重置
+（使用本地模拟GitHub服务器和内存中的写入记录，无需网络和数据库）
+"""
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.models import User, Repository
+from app.services.github_client import GitHubClient
+from app.services.data_sync_service import DataSyncService
+from app.services.commit_author_filter import CommitAuthorFilter
+from app.services.history_backfill import HistoryBackfillService, BackfillWindow
+from benchmarks.fake_github import FakeGitHubServer
+
+
+class MemorySyncService(DataSyncService):
+    """把写入记录在内存中的同步服务，各会话共享同一份记录"""
+
+    def __init__(self, github_client, db=None, shared=None, fail_after=None, **kwargs):
+        super().__init__(db, github_client, **kwargs)
+        self.shared = shared if shared is not None else {
+            'saved': [], 'finished': [], 'sessions': set(), 'active': 0, 'max_active': 0
+        }
+        self.fail_after = fail_after
+
+    def for_session(self, db):
+        self.shared['sessions'].add(id(db))
+        return MemorySyncService(
+            self.github_client, db=db, shared=self.shared, fail_after=self.fail_after,
+            sync_strategy=self.sync_strategy, two_phase=self.two_phase,
+            session_factory=self.session_factory, commit_authors=self.commit_authors
+        )
+
+    def _iter_listing_pages(self, *args, **kwargs):
+        shared = self.shared
+        pages = super()._iter_listing_pages(*args, **kwargs)
+
+        async def tracked():
+            shared['active'] += 1
+            shared['max_active'] = max(shared['max_active'], shared['active'])
+            try:
+                async for page in pages:
+                    # 模拟写入耗时，使各窗口的列出交错进行
+                    await asyncio.sleep(0.001)
+                    yield page
+            finally:
+                shared['active'] -= 1
+        return tracked()
+
+    async def _filter_new_shas(self, shas):
+        return list(dict.fromkeys(sha for sha in shas if sha))
+
+    async def _save_parsed_commits(self, user, repository, parsed_commits):
+        if self.fail_after is not None and len(self.shared['saved']) >= self.fail_after:
+            raise RuntimeError("写入失败")
+        self.shared['saved'].extend(parsed['sha'] for parsed in parsed_commits)
+        return parsed_commits
+
+    async def finish_repository(self, user, repository, synced_commits, checkpoint=None):
+        self.shared['finished'].append((repository.repo_name, len(synced_commits)))
+
+
+def detached(obj):
+    """模拟从另一个会话加载并已提交的对象"""
+    make_transient_to_detached(obj)
+    return obj
+
+
+def check_saved(service, server, full_name):
+    """写入的SHA与仓库的全部提交一致且没有重复"""
+    saved = service.shared['saved']
+    expected = {commit["sha"] for commit in server.commits[full_name]}
+    assert len(saved) == len(set(saved)), f"重复写入 {len(saved) - len(set(saved))} 个提交"
+    assert set(saved) == expected, (len(saved), len(expected))
+
+
+async def test_history_backfill():
+    """测试历史回填"""
+    print("=" * 60)
+    print("历史回填测试")
+    print("=" * 60)
+    print()
+
+    server = FakeGitHubServer(latency=0.005)
+    # 每小时一个提交
+    server.add_synthetic_repo("octocat", "big", commits=3000)
+    await server.start()
+    user = detached(User(id=1, username="octocat"))
+    big = detached(Repository(id=1, user_id=1, repo_name="octocat/big"))
+    # 未绑定数据库的会话工厂：merge(load=False)不查询数据库
+    session_factory = async_sessionmaker()
+
+    try:
+        async with GitHubClient(token="fake-token", base_url=server.url) as client:
+            client.commit_store = None
+
+            print("测试 1: 按提交密度切分时间窗口")
+            print("-" * 60)
+            service = MemorySyncService(client, sync_strategy="graphql", session_factory=session_factory)
+            backfill = HistoryBackfillService(service, concurrency=4, window_commits=500, min_window_hours=1)
+            newest = datetime(2024, 6, 1)
+            page = [
+                {"oid": str(i), "committedDate": (newest - timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M:%SZ")}
+                for i in range(100)
+            ]
+            oldest = newest - timedelta(hours=99)
+            window = BackfillWindow(None, newest - timedelta(hours=1000), newest)
+            windows = backfill._split_window(window, page)
+            # 剩余901小时，每个窗口约500小时 → 切分为2个窗口，已列出的部分重新列出一次
+            assert len(windows) == 3, windows
+            assert (windows[0].since, windows[0].until, windows[0].splittable) == (oldest, newest, False)
+            assert windows[1].until == oldest - timedelta(seconds=1)
+            assert windows[2].until == windows[1].since - timedelta(seconds=1)
+            assert windows[2].since == window.since and windows[2].splittable
+            # 剩余范围不超过目标的1.5倍时继续逐页获取
+            assert backfill._split_window(BackfillWindow(None, newest - timedelta(hours=800), newest), page) == []
+            # 不限起始时间时向前切出concurrency个窗口，最早的窗口不设起始时间
+            windows = backfill._split_window(BackfillWindow(None, None, None), page)
+            assert len(windows) == 5 and windows[-1].since is None
+            assert windows[1].since == oldest - timedelta(hours=495)
+            print(f"[PASS] 剩余范围切分为 {len(windows) - 1} 个窗口，窗口之间首尾相接")
+            print()
+
+            print("测试 2: graphql策略并行列出时间窗口")
+            print("-" * 60)
+            server.reset_stats()
+            start = time.perf_counter()
+            result = await backfill.backfill_repository(user, big)
+            elapsed = time.perf_counter() - start
+            assert result['error'] is None and result['commits'] == 3000, result
+            check_saved(service, server, "octocat/big")
+            assert service.shared['finished'] == [("octocat/big", 3000)]
+            assert result['splits'] > 0 and result['windows'] == len(service.shared['sessions'])
+            assert 1 < service.shared['max_active'] <= 4, service.shared['max_active']
+            # 逐页列出需要30个请求：切分只多出重新列出的部分和空窗口的请求
+            assert server.graphql_count <= 30 * 2, server.graphql_count
+            print(f"[PASS] {result['windows']} 个窗口（切分 {result['splits']} 次），"
+                  f"同时列出 {service.shared['max_active']} 个，"
+                  f"{server.graphql_count} 个GraphQL请求，耗时 {elapsed:.2f} 秒")
+            print()
+
+            print("测试 3: rest两阶段同步，多个作者身份列出的提交只写入一次")
+            print("-" * 60)
+            authors = CommitAuthorFilter("octocat", emails=["octocat@example.com"])
+            service = MemorySyncService(
+                client, sync_strategy="rest", two_phase=True,
+                session_factory=session_factory, commit_authors=authors
+            )
+            backfill = HistoryBackfillService(service, concurrency=4, window_commits=500)
+            server.reset_stats()
+            result = await backfill.backfill_repository(user, big, since="2024-02-01T00:00:00Z")
+            assert result['error'] is None, result
+            expected = [c for c in server.commits["octocat/big"] if c["commit"]["author"]["date"] >= "2024-02-01"]
+            saved = service.shared['saved']
+            assert len(saved) == len(set(saved)) == len(expected), (len(saved), len(expected))
+            assert server.request_count < 2 * 2 * len(expected) / 100, server.request_count
+            print(f"[PASS] 两个作者身份共 {result['windows']} 个窗口，写入 {len(saved)} 个提交，"
+                  f"{server.request_count} 个列表请求")
+            print()
+
+            print("测试 4: 窗口失败时不推进水位")
+            print("-" * 60)
+            service = MemorySyncService(
+                client, sync_strategy="graphql", session_factory=session_factory, fail_after=1000
+            )
+            result = await HistoryBackfillService(service, window_commits=500).backfill_repository(user, big)
+            assert result['error'] == "写入失败", result
+            assert service.shared['finished'] == []
+            assert 0 < len(service.shared['saved']) < 3000
+            print(f"[PASS] 已写入 {len(service.shared['saved'])} 个提交，水位保持不变")
+            print()
+
+            print("测试 5: 剩余配额低于回填可用的比例时等待配额重置")
+            print("-" * 60)
+            service = MemorySyncService(client, sync_strategy="rest")
+            backfill = HistoryBackfillService(service, rate_share=0.5)
+            quota = client.token_pool.states[0].quota("core")
+            reset = int(datetime.now().timestamp()) + 100
+            quota.update(remaining=3000, limit=5000, reset=reset)
+            assert backfill._budget_wait() == 0
+            # 逐个获取详情：每页最多101个请求，列出下一页后会低于保留的2500个
+            quota.update(remaining=2600)
+            assert 100 <= backfill._budget_wait() <= 106
+            # 两阶段同步每页只需一个请求
+            assert HistoryBackfillService(
+                MemorySyncService(client, sync_strategy="rest", two_phase=True), rate_share=0.5
+            )._budget_wait() == 0
+            # graphql只检查graphql配额（尚无数据时不等待）
+            assert HistoryBackfillService(
+                MemorySyncService(client, sync_strategy="graphql"), rate_share=0.5
+            )._budget_wait() == 0
+            print("[PASS] 为交互式同步保留一半配额")
+            print()
+
+            print("测试 6: git策略不需要回填")
+            print("-" * 60)
+            try:
+                HistoryBackfillService(DataSyncService(None, client, sync_strategy="git"))
+                raise AssertionError("git策略应当拒绝回填")
+            except ValueError:
+                pass
+            print("[PASS] git策略直接读取本地镜像的完整历史")
+            print()
+
+        print("=" * 60)
+        print("[SUCCESS] 所有测试通过！")
+        print("=" * 60)
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(test_history_backfill())
@@ -0,0 +1,255 @@
+"""
+仅聚合统计同步测试脚本
+验证按仓库统计接口汇总每周的提交数和增删行数、202（统计计算中）时的轮询和超时，
+统计未变化时的条件请求，以及已有提交详情时跳过、写入提交详情前完整重算
+（使用本地模拟GitHub服务器和内存中的写入记录，无需网络和数据库）
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy.dialects import mysql
+
+from app.models import User, Repository
+from app.services.github_client import GitHubClient
+from app.services.data_sync_service import DataSyncService
+from app.services.repo_stats_sync_service import RepoStatsSyncService
+from app.services.response_cache import MemoryResponseCache
+from benchmarks.fake_github import FakeGitHubServer
+
+
+class MemoryResult:
+    """查询结果"""
+
+    def __init__(self, row=None):
+        self.row = row
+        self.rowcount = None
+
+    def first(self):
+        return self.row
+
+
+class MemorySession:
+    """记录写入的 daily_stats 和 commit_details 行的会话"""
+
+    def __init__(self):
+        self.dialect = mysql.dialect()
+        self.daily_stats = []
+        self.commit_details = []
+        self.commits = 0
+
+    def get_bind(self):
+        return self
+
+    async def commit(self):
+        self.commits += 1
+
+    async def execute(self, statement, params=None):
+        if statement.is_select:
+            # 只有 has_commit_details 的查询
+            return MemoryResult((1,) if self.commit_details else None)
+        if statement.is_delete:
+            self.daily_stats = []
+        elif statement.is_insert and statement.table.name == "commit_details":
+            rows = {}
+            for key, value in statement.compile(dialect=self.dialect).params.items():
+                column, index = key.rsplit("_m", 1)
+                rows.setdefault(int(index), {})[column] = value
+            self.commit_details.extend(rows.values())
+        elif statement.is_insert:
+            self.daily_stats.extend(params)
+        return MemoryResult()
+
+
+class RecordingStats:
+    """记录调用顺序的用户统计服务，重算时按内存中的提交详情计算累计值"""
+
+    def __init__(self, session):
+        self.session = session
+        self.calls = []
+
+    async def lock_user(self, user):
+        self.calls.append("lock_user")
+        return user.aggregate_synced_at
+
+    async def rebuild(self, user):
+        self.calls.append("rebuild")
+        user.total_commits = len(self.session.commit_details)
+        user.total_additions = sum(row["additions"] for row in self.session.commit_details)
+        user.total_deletions = sum(row["deletions"] for row in self.session.commit_details)
+        user.aggregate_synced_at = None
+
+    async def apply_commits(self, user, rows):
+        self.calls.append("apply_commits")
+        user.total_commits += len(rows)
+        user.total_additions += sum(row["additions"] for row in rows)
+        user.total_deletions += sum(row["deletions"] for row in rows)
+
+
+class MemorySyncService(DataSyncService):
+    """用户和仓库保存在内存中的同步服务"""
+
+    def __init__(self, github_client, user, repositories, events):
+        super().__init__(MemorySession(), github_client, progress_callback=lambda *args: events.append(args))
+        self.user = user
+        self.repositories = repositories
+
+    async def sync_user(self, username):
+        return self.user
+
+    async def sync_repositories(self, user):
+        return self.repositories
+
+    async def _lock_existing_shas(self, shas):
+        return set()
+
+
+def expected_totals(server, login):
+    """按提交详情计算用户关联账号的提交的合计"""
+    commits = [
+        commit for repo_commits in server.commits.values() for commit in repo_commits
+        if commit["author"] and commit["author"]["login"] == login
+    ]
+    return (
+        len(commits),
+        sum(commit["stats"]["additions"] for commit in commits),
+        sum(commit["stats"]["deletions"] for commit in commits),
+    )
+
+
+async def test_repo_stats_sync():
+    """测试仅聚合统计同步"""
+    print("=" * 60)
+    print("仅聚合统计同步测试")
+    print("=" * 60)
+    print()
+
+    server = FakeGitHubServer()
+    server.add_synthetic_repo("octocat", "hello", commits=300)
+    server.add_synthetic_repo("octocat", "world", commits=40)
+    server.add_synthetic_repo("octocat", "empty", commits=0)
+    server.push_commits("octocat", "world", 6, author="hubot")
+    server.push_commits("octocat", "world", 2, email="octocat@work.example.com", linked=False)
+    server.stats_compute_polls = 2
+    await server.start()
+
+    user = User(id=1, username="octocat", total_commits=0, total_additions=0, total_deletions=0)
+    repositories = [
+        Repository(id=i, user_id=1, repo_name=f"octocat/{name}")
+        for i, name in enumerate(["hello", "world", "empty"], 1)
+    ]
+    events = []
+
+    try:
+        async with GitHubClient(token="fake-token", base_url=server.url, cache=MemoryResponseCache()) as client:
+            service = MemorySyncService(client, user, repositories, events)
+            stats_sync = RepoStatsSyncService(service, poll_interval=0.01, poll_timeout=5)
+
+            print("测试 1: 统计计算中（202）时轮询，每个仓库得到一次完整统计")
+            print("-" * 60)
+            result = await stats_sync.sync_user_stats("octocat")
+            assert result["failed_repos"] == [], result["failed_repos"]
+            assert result["total_repos_synced"] == 3 and result["sync_mode"] == "aggregate"
+            # 有提交的仓库两次202后得到统计，空仓库直接返回204
+            assert server.request_count == 2 * 3 + 1, server.request_count
+            assert [event[1]["stage"] for event in events if event[0] == "stage"] == [
+                "user", "repositories", "statistics"
+            ]
+            assert sum(1 for event in events if event[0] == "repository") == 3
+            print(f"[PASS] {server.request_count} 个请求同步 {result['total_repos_synced']} 个仓库")
+            print()
+
+            print("测试 2: 累计值与提交详情一致，只统计关联账号的提交")
+            print("-" * 60)
+            totals = (result["total_commits"], result["total_additions"], result["total_deletions"])
+            assert totals == expected_totals(server, "octocat"), (totals, expected_totals(server, "octocat"))
+            assert (user.total_commits, user.total_additions, user.total_deletions) == totals
+            assert user.aggregate_synced_at is not None
+            print(f"[PASS] {totals[0]} 个提交，+{totals[1]} / -{totals[2]}（不含其他贡献者和未关联邮箱）")
+            print()
+
+            print("测试 3: 每周汇总写入该周第一天（周日）")
+            print("-" * 60)
+            rows = service.db.daily_stats
+            assert len(rows) == result["weeks"] > 1
+            assert all(row["stat_date"].weekday() == 6 for row in rows)
+            assert [row["stat_date"] for row in rows] == sorted(row["stat_date"] for row in rows)
+            assert sum(row["commits"] for row in rows) == totals[0]
+            assert max(row["active_repos"] for row in rows) == 2
+            assert rows[0]["work_hours"] == round(rows[0]["commits"] * 0.25, 2)
+            print(f"[PASS] {len(rows)} 周，{rows[0]['stat_date']} 至 {rows[-1]['stat_date']}")
+            print()
+
+            print("测试 4: 统计没有变化时使用条件请求，重写而不是累加")
+            print("-" * 60)
+            server.reset_stats()
+            rate_remaining = server.rate_remaining
+            again = await stats_sync.sync_user_stats("octocat")
+            # 空仓库的204响应没有ETag，仍消耗1个配额
+            assert server.not_modified_count == 2 and server.rate_remaining == rate_remaining - 1
+            assert again["total_commits"] == totals[0] and len(service.db.daily_stats) == len(rows)
+            print(f"[PASS] {server.not_modified_count} 个304响应不消耗配额")
+            print()
+
+            print("测试 5: 等待超时的仓库记为失败，下次同步重试")
+            print("-" * 60)
+            server.push_commits("octocat", "hello", 3)
+            server.stats_compute_polls = 100
+            stats_sync = RepoStatsSyncService(service, poll_interval=0.01, poll_timeout=0.05)
+            result = await stats_sync.sync_user_stats("octocat")
+            assert [failed["repo_name"] for failed in result["failed_repos"]] == ["octocat/hello"]
+            assert result["total_repos_synced"] == 2
+            print(f"[PASS] {result['failed_repos'][0]['error']}")
+            print()
+
+            print("测试 6: 写入提交详情前先完整重算，不在聚合累计值上累加")
+            print("-" * 60)
+            assert user.aggregate_synced_at is not None and user.total_commits > 2
+            stats = RecordingStats(service.db)
+            service.user_stats = stats
+            parsed = [
+                {
+                    "sha": f"{i:040x}", "message": "fix", "commit_date": "2024-05-01T12:00:00Z",
+                    "additions": 10, "deletions": 2, "files_changed": 1, "languages": ["Python"]
+                }
+                for i in range(2)
+            ]
+            saved = await service._save_parsed_commits(user, repositories[0], parsed)
+            assert len(saved) == 2
+            assert stats.calls == ["lock_user", "rebuild", "apply_commits"], stats.calls
+            assert (user.total_commits, user.total_additions, user.total_deletions) == (2, 20, 4)
+            assert user.aggregate_synced_at is None
+
+            # 标记已清除，之后的写入直接累加
+            stats.calls = []
+            parsed = [dict(parsed[0], sha="f" * 40)]
+            await service._save_parsed_commits(user, repositories[0], parsed)
+            assert stats.calls == ["lock_user", "apply_commits"], stats.calls
+            assert user.total_commits == 3
+            print(f"[PASS] 重算后累加: {user.total_commits} 个提交，+{user.total_additions} / -{user.total_deletions}")
+            print()
+
+            print("测试 7: 已有提交详情的用户不执行聚合统计同步")
+            print("-" * 60)
+            server.reset_stats()
+            daily_stats = list(service.db.daily_stats)
+            result = await stats_sync.sync_user_stats("octocat")
+            assert result["skipped_reason"] and result["weeks"] == 0 and result["total_repos_synced"] == 0
+            assert server.request_count == 0
+            assert service.db.daily_stats == daily_stats
+            assert user.total_commits == 3 and user.aggregate_synced_at is None
+            print(f"[PASS] {result['skipped_reason']}")
+            print()
+
+        print("=" * 60)
+        print("[SUCCESS] 所有测试通过！")
+        print("=" * 60)
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(test_repo_stats_sync())
@@ -0,0 +1,136 @@
+"""
+仓库并行同步测试脚本
+验证多个仓库同时同步、每个仓库使用独立会话、共享的GitHub并发上限以及单个仓库失败的隔离
+（使用本地模拟GitHub服务器和内存中的写入记录，无需网络和数据库）
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.models import User, Repository
+from app.services.github_client import GitHubClient
+from app.services.data_sync_service import DataSyncService
+from app.services.repo_sync_scheduler import RepoSyncScheduler
+from benchmarks.fake_github import FakeGitHubServer
+
+
+class MemorySyncService(DataSyncService):
+    """把写入记录在内存中的同步服务，各会话共享同一份记录"""
+
+    def __init__(self, github_client, db=None, shared=None, fail_repo=None, **kwargs):
+        super().__init__(db, github_client, **kwargs)
+        self.shared = shared if shared is not None else {
+            'saved': {}, 'finished': [], 'sessions': set(), 'active': 0, 'max_active': 0
+        }
+        self.fail_repo = fail_repo
+
+    def for_session(self, db):
+        self.shared['sessions'].add(id(db))
+        return MemorySyncService(
+            self.github_client, db=db, shared=self.shared, fail_repo=self.fail_repo,
+            use_pipeline=self.use_pipeline, detail_concurrency=self.detail_concurrency
+        )
+
+    def iter_commit_pages(self, owner, repo_name, since=None, max_commits=None, cursor=None):
+        shared = self.shared
+        pages = super().iter_commit_pages(owner, repo_name, since=since, max_commits=max_commits, cursor=cursor)
+
+        async def tracked():
+            shared['active'] += 1
+            shared['max_active'] = max(shared['max_active'], shared['active'])
+            try:
+                async for page in pages:
+                    yield page
+            finally:
+                shared['active'] -= 1
+        return tracked()
+
+    async def _filter_new_shas(self, shas):
+        existing = {sha for commits in self.shared['saved'].values() for sha in commits}
+        return [sha for sha in dict.fromkeys(shas) if sha not in existing]
+
+    async def _save_parsed_commits(self, user, repository, parsed_commits):
+        if repository.repo_name == self.fail_repo:
+            raise RuntimeError("写入失败")
+        self.shared['saved'].setdefault(repository.repo_name, []).extend(p['sha'] for p in parsed_commits)
+        return parsed_commits
+
+    async def finish_repository(self, user, repository, synced_commits, checkpoint=None):
+        self.shared['finished'].append(repository.repo_name)
+
+
+def detached(obj):
+    """模拟从另一个会话加载并已提交的对象"""
+    make_transient_to_detached(obj)
+    return obj
+
+
+def make_repos(owner, count):
+    return [
+        (detached(Repository(id=i, user_id=1, repo_name=f"{owner}/repo-{i}")), None)
+        for i in range(count)
+    ]
+
+
+async def test_repo_sync_scheduler():
+    """测试仓库并行同步"""
+    print("=" * 60)
+    print("仓库并行同步测试")
+    print("=" * 60)
+    print()
+
+    server = FakeGitHubServer(latency=0.02)
+    server.add_synthetic_user("octocat", repos=6, commits_per_repo=30)
+    await server.start()
+    user = detached(User(id=1, username="octocat"))
+    # 未绑定数据库的会话工厂：merge(load=False)不查询数据库
+    session_factory = async_sessionmaker()
+
+    try:
+        for use_pipeline in (True, False):
+            mode = "流水线" if use_pipeline else "顺序"
+            async with GitHubClient(
+                token="fake-token", base_url=server.url, request_limiter=asyncio.Semaphore(4)
+            ) as client:
+                client.commit_store = None
+
+                print(f"测试: 并行同步6个仓库（{mode}）")
+                print("-" * 60)
+                service = MemorySyncService(client, use_pipeline=use_pipeline)
+                scheduler = RepoSyncScheduler(service, session_factory, concurrency=3)
+                server.reset_stats()
+                result = await scheduler.run(user, make_repos("octocat", 6))
+
+                assert result['total_commits'] == 180 and result['failed_repos'] == []
+                assert len(service.shared['sessions']) == 6
+                assert 1 < service.shared['max_active'] <= 3, service.shared['max_active']
+                assert server.max_in_flight <= 4, server.max_in_flight
+                print(f"[PASS] 6个仓库使用6个独立会话，同时同步 {service.shared['max_active']} 个仓库，"
+                      f"GitHub并发请求峰值 {server.max_in_flight}")
+
+                service = MemorySyncService(client, use_pipeline=use_pipeline, fail_repo="octocat/repo-2")
+                result = await RepoSyncScheduler(service, session_factory, concurrency=3).run(
+                    user, make_repos("octocat", 6)
+                )
+                assert result['synced_repos'] == 5 and result['total_commits'] == 150
+                assert [f['repo_name'] for f in result['failed_repos']] == ["octocat/repo-2"]
+                assert "写入失败" in result['failed_repos'][0]['error']
+                assert "octocat/repo-2" not in service.shared['finished']
+                print("[PASS] 单个仓库失败被记录在结果中，其余仓库正常完成，失败仓库未推进水位")
+                print()
+
+        print("=" * 60)
+        print("[SUCCESS] 所有测试通过！")
+        print("=" * 60)
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(test_repo_sync_scheduler())
@@ -0,0 +1,127 @@
+"""
+条件请求缓存测试脚本
+验证ETag缓存的内存/持久化后端、304响应处理，以及不同Token的缓存互相隔离
+（使用本地模拟GitHub服务器，无需网络）
+"""
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.services.github_client import GitHubClient
+from app.services.response_cache import ResponseCache, MemoryResponseCache, SQLiteResponseCache, CachedResponse
+from benchmarks.fake_github import FakeGitHubServer
+
+
+async def test_memory_lru():
+    """测试内存LRU淘汰"""
+    print("测试 1: 内存LRU后端")
+    print("-" * 60)
+    cache = MemoryResponseCache(max_entries=2)
+    await cache.set("a", CachedResponse(b"1", etag='"a"'))
+    await cache.set("b", CachedResponse(b"2", etag='"b"'))
+    await cache.get("a")  # a成为最近使用
+    await cache.set("c", CachedResponse(b"3", etag='"c"'))
+
+    assert await cache.get("b") is None, "最久未使用的条目应被淘汰"
+    assert (await cache.get("a")).json() == 1
+    print("[PASS] LRU淘汰正确")
+
+    class IncompleteCache(ResponseCache):
+        async def get(self, key):
+            return None
+
+    try:
+        IncompleteCache()
+        raise AssertionError("未实现全部方法的后端应无法实例化")
+    except TypeError:
+        pass
+    print("[PASS] 未实现全部方法的后端在创建时报错")
+    print()
+
+
+async def test_conditional_requests(server: FakeGitHubServer, cache):
+    """测试304响应返回缓存内容且不消耗配额"""
+    async with GitHubClient(token="fake-token", base_url=server.url, cache=cache) as client:
+        first = await client.get_user_repos("octocat")
+        remaining_after_first = server.rate_remaining
+
+        second = await client.get_user_repos("octocat")
+
+        assert first == second, "304响应应返回与首次一致的数据"
+        assert server.not_modified_count >= 1, "第二次请求应得到304"
+        assert server.rate_remaining == remaining_after_first, "304响应不应消耗配额"
+        assert client.cache_stats['hits'] >= 1
+        print(f"[PASS] 缓存命中 {client.cache_stats['hits']} 次，配额保持 {server.rate_remaining}")
+
+
+async def test_response_cache():
+    """测试条件请求缓存"""
+    print("=" * 60)
+    print("条件请求缓存测试")
+    print("=" * 60)
+    print()
+
+    await test_memory_lru()
+
+    server = FakeGitHubServer()
+    server.add_synthetic_repo("octocat", "hello-world", commits=3)
+    await server.start()
+
+    try:
+        print("测试 2: 内存后端条件请求")
+        print("-" * 60)
+        await test_conditional_requests(server, MemoryResponseCache())
+        print()
+
+        print("测试 3: 持久化后端跨实例复用")
+        print("-" * 60)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "cache.sqlite3")
+
+            # 第一个缓存实例写入
+            writer = SQLiteResponseCache(path)
+            async with GitHubClient(token="fake-token", base_url=server.url, cache=writer) as client:
+                await client.get_user_repos("octocat")
+            writer.close()
+
+            # 模拟进程重启：新实例读取同一文件
+            server.reset_stats()
+            reader = SQLiteResponseCache(path)
+            async with GitHubClient(token="fake-token", base_url=server.url, cache=reader) as client:
+                repos = await client.get_user_repos("octocat")
+                assert repos and repos[0]["full_name"] == "octocat/hello-world"
+                assert server.not_modified_count == 1, "重启后的首次请求应直接得到304"
+            reader.close()
+            print("[PASS] 重启后缓存仍然有效")
+        print()
+
+        print("测试 4: 不同Token的缓存互相隔离")
+        print("-" * 60)
+        cache = MemoryResponseCache()
+        async with GitHubClient(token="user-token", base_url=server.url, cache=cache) as client:
+            await client.get_user_repos("octocat")
+        server.reset_stats()
+        async with GitHubClient(tokens=["pool-a", "pool-b"], base_url=server.url, cache=cache) as client:
+            await client.get_user_repos("octocat")
+            assert client.cache_stats["hits"] == 0 and client.cache_stats["misses"] >= 1
+        assert server.not_modified_count == 0, "其他Token缓存的响应不应被复用"
+        # 相同的Token组合（与顺序无关）复用缓存
+        async with GitHubClient(tokens=["pool-b", "pool-a"], base_url=server.url, cache=cache) as client:
+            await client.get_user_repos("octocat")
+            assert client.cache_stats["hits"] >= 1
+        print("[PASS] 用户Token缓存的响应不会返回给使用其他Token的调用方")
+        print()
+
+        print("=" * 60)
+        print("[SUCCESS] 所有测试通过！")
+        print("=" * 60)
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(test_response_cache())
@@ -0,0 +1,95 @@
+"""
+定时任务API测试脚本
+验证通过API创建每日同步和历史回填任务后任务被调度（触发时间、执行的任务和参数），
+以及无效的调度类型被拒绝（向本地应用发送请求，不执行任务，无需网络和数据库）
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+import httpx
+
+from app.core.config import settings
+from app.main import app
+from app.services.scheduler_service import scheduler_service
+
+
+def cron_fields(job):
+    """CronTrigger中的小时和分钟"""
+    fields = {field.name: str(field) for field in job.trigger.fields}
+    return fields["hour"], fields["minute"]
+
+
+async def test_scheduler_jobs():
+    """测试定时任务API"""
+    print("=" * 60)
+    print("定时任务API测试")
+    print("=" * 60)
+    print()
+
+    url = f"{settings.API_V1_STR}/scheduler/jobs"
+    scheduler_service.start()
+
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as api:
+            print("测试 1: 创建历史回填任务，每天在指定时间执行回填")
+            print("-" * 60)
+            response = await api.post(url, json={
+                "username": "octocat", "schedule_type": "backfill", "hour": 3, "minute": 30
+            })
+            assert response.status_code == 200, response.text
+            assert response.json()["schedule"] == "每天 03:30"
+            job = scheduler_service.scheduler.get_job("backfill_octocat")
+            assert job is not None
+            assert job.func == scheduler_service.backfill_history_job and job.args == ("octocat",)
+            assert cron_fields(job) == ("3", "30")
+            assert job.next_run_time is not None
+            jobs = (await api.get(url)).json()
+            assert [item["id"] for item in jobs] == ["backfill_octocat"]
+            print(f"[PASS] {job.name}，下次执行: {job.next_run_time}")
+            print()
+
+            print("测试 2: 回填任务与同步任务并存，重复创建时替换")
+            print("-" * 60)
+            response = await api.post(url, json={"username": "octocat", "schedule_type": "daily"})
+            assert response.status_code == 200, response.text
+            response = await api.post(url, json={
+                "username": "octocat", "schedule_type": "backfill", "hour": 4, "minute": 0
+            })
+            assert response.status_code == 200, response.text
+            jobs = {job.id: job for job in scheduler_service.scheduler.get_jobs()}
+            assert set(jobs) == {"backfill_octocat", "daily_sync_octocat"}
+            assert jobs["daily_sync_octocat"].func == scheduler_service.sync_user_data_job
+            assert cron_fields(jobs["backfill_octocat"]) == ("4", "0")
+            print(f"[PASS] {len(jobs)} 个任务: {sorted(jobs)}")
+            print()
+
+            print("测试 3: 无效的调度类型不创建任务")
+            print("-" * 60)
+            response = await api.post(url, json={"username": "octocat", "schedule_type": "weekly"})
+            assert response.status_code == 400, response.text
+            assert len(scheduler_service.scheduler.get_jobs()) == 2
+            print(f"[PASS] 返回 {response.status_code}")
+            print()
+
+            print("测试 4: 删除回填任务")
+            print("-" * 60)
+            response = await api.delete(f"{url}/backfill_octocat")
+            assert response.status_code == 200, response.text
+            assert scheduler_service.scheduler.get_job("backfill_octocat") is None
+            print("[PASS] 回填任务已删除")
+            print()
+
+        print("=" * 60)
+        print("[SUCCESS] 所有测试通过！")
+        print("=" * 60)
+    finally:
+        scheduler_service.scheduler.remove_all_jobs()
+        scheduler_service.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(test_scheduler_jobs())
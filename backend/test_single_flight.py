@@ -0,0 +1,131 @@
+"""
+请求合并测试脚本
+验证相同凭据下并发的相同GET请求只发起一次网络调用、不同凭据的请求不合并，以及取消与异常的传播
+（使用本地模拟GitHub服务器，无需网络）
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.services.client_registry import GitHubClientRegistry
+from app.services.github_client import GitHubAPIError
+from app.services.single_flight import SingleFlight
+from benchmarks.fake_github import FakeGitHubServer
+
+
+async def test_single_flight():
+    """测试请求合并"""
+    print("=" * 60)
+    print("请求合并测试")
+    print("=" * 60)
+    print()
+
+    server = FakeGitHubServer(latency=0.05)
+    server.add_synthetic_repo("octocat", "hello-world", commits=20)
+    await server.start()
+    registry = GitHubClientRegistry(base_url=server.url)
+
+    try:
+        print("测试 1: 定时任务与手动同步同时请求")
+        print("-" * 60)
+        # 模拟两个调用方（如定时任务和未提供Token的/sync/github）获取同一个视图
+        scheduler_client = registry.get_client()
+        manual_client = registry.get_client()
+        scheduler_client.commit_store = None
+        shas = [c["sha"] for c in server.commits["octocat/hello-world"]]
+
+        server.reset_stats()
+        repos_a, repos_b = await asyncio.gather(
+            scheduler_client.get_user_repos("octocat"),
+            manual_client.get_user_repos("octocat")
+        )
+        assert repos_a == repos_b and server.request_count == 1
+        details_a, details_b = await asyncio.gather(
+            scheduler_client.get_commit_details("octocat", "hello-world", shas),
+            manual_client.get_commit_details("octocat", "hello-world", shas)
+        )
+        assert details_a == details_b
+        assert server.request_count == 1 + len(shas), f"实际请求 {server.request_count} 次"
+        stats = registry.stats()['single_flight']
+        assert stats['coalesced'] == 1 + len(shas)
+        print(f"[PASS] {stats['calls']} 次调用，实际请求 {stats['executions']} 次，合并 {stats['coalesced']} 次")
+        print()
+
+        print("测试 2: 不同凭据的请求不合并")
+        print("-" * 60)
+        # 手动同步（/sync/github）使用用户提供的Token，不共享定时任务用配置Token池获取的结果
+        user_client = registry.get_client(token="user-token")
+        server.reset_stats()
+        await asyncio.gather(
+            scheduler_client.get_user_repos("octocat"),
+            user_client.get_user_repos("octocat")
+        )
+        assert server.request_count == 2 and server.token_requests.get("user-token") == 1
+        print("[PASS] 每个Token各自发起请求")
+        print()
+
+        print("测试 3: 请求结束后不再合并")
+        print("-" * 60)
+        server.reset_stats()
+        await scheduler_client.get_user("octocat")
+        await manual_client.get_user("octocat")
+        assert server.request_count == 2 and registry.single_flight.in_flight == 0
+        print("[PASS] 顺序请求各自发起")
+        print()
+
+        print("测试 4: 单个调用方取消不影响其他调用方")
+        print("-" * 60)
+        server.reset_stats()
+        first = asyncio.create_task(scheduler_client.get_user("octocat"))
+        second = asyncio.create_task(manual_client.get_user("octocat"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        user = await second
+        assert user["login"] == "octocat" and first.cancelled()
+        assert server.request_count == 1
+        print("[PASS] 剩余调用方正常获得结果")
+        print()
+
+        print("测试 5: 异常传播给所有调用方")
+        print("-" * 60)
+        results = await asyncio.gather(
+            scheduler_client.get_user("nobody"),
+            manual_client.get_user("nobody"),
+            return_exceptions=True
+        )
+        assert all(isinstance(r, GitHubAPIError) for r in results)
+        print("[PASS] 两个调用方都收到GitHubAPIError")
+        print()
+
+        print("测试 6: 所有调用方取消时取消底层调用")
+        print("-" * 60)
+        flight = SingleFlight()
+        started = asyncio.Event()
+        finished = []
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(1)
+            finished.append(True)
+
+        waiter = asyncio.create_task(flight.do("key", slow))
+        await started.wait()
+        waiter.cancel()
+        await asyncio.sleep(0.05)
+        assert flight.in_flight == 0 and not finished
+        print("[PASS] 底层调用已取消")
+        print()
+
+        print("=" * 60)
+        print("[SUCCESS] 所有测试通过！")
+        print("=" * 60)
+    finally:
+        await registry.close()
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(test_single_flight())
@@ -0,0 +1,164 @@
+"""
+后台同步任务测试脚本
+验证同步任务去重、并发限制、错误记录、进度事件（SSE）和过期清理
+（使用本地模拟GitHub服务器和内存中的写入记录，无需网络和数据库）
+"""
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.models import User, Repository
+from app.services.github_client import GitHubClient
+from app.services.data_sync_service import DataSyncService
+from app.services.repo_sync_scheduler import RepoSyncScheduler
+from app.services.sync_job_manager import SyncJobManager
+from benchmarks.fake_github import FakeGitHubServer
+
+
+class MemorySyncService(DataSyncService):
+    """把写入记录在内存中的同步服务，各会话共享同一份记录"""
+
+    def __init__(self, github_client, db=None, saved=None, **kwargs):
+        super().__init__(db, github_client, **kwargs)
+        self.saved = saved if saved is not None else {}
+
+    def for_session(self, db):
+        return MemorySyncService(
+            self.github_client, db=db, saved=self.saved,
+            use_pipeline=self.use_pipeline, progress_callback=self.progress_callback
+        )
+
+    async def _filter_new_shas(self, shas):
+        return [sha for sha in dict.fromkeys(shas) if sha not in self.saved]
+
+    async def _save_parsed_commits(self, user, repository, parsed_commits):
+        for parsed in parsed_commits:
+            self.saved[parsed['sha']] = repository.repo_name
+        self.report_progress('commits', repo_name=repository.repo_name, count=len(parsed_commits))
+        return parsed_commits
+
+    async def finish_repository(self, user, repository, synced_commits, checkpoint=None):
+        pass
+
+
+def detached(obj):
+    """模拟从另一个会话加载并已提交的对象"""
+    make_transient_to_detached(obj)
+    return obj
+
+
+async def test_sync_jobs():
+    """测试后台同步任务"""
+    print("=" * 60)
+    print("后台同步任务测试")
+    print("=" * 60)
+    print()
+
+    print("测试 1: 同一用户未结束的任务不重复提交")
+    print("-" * 60)
+    manager = SyncJobManager(max_concurrent=2, retention_seconds=3600)
+    release = asyncio.Event()
+
+    async def wait_for_release(job):
+        await release.wait()
+        return {'ok': True}
+
+    job1, created1 = manager.submit('octocat', {'username': 'octocat'}, wait_for_release)
+    job2, created2 = manager.submit('octocat', {'username': 'octocat'}, wait_for_release)
+    assert created1 and not created2 and job1 is job2
+    release.set()
+    await job1._task
+    assert job1.status == 'succeeded' and job1.result == {'ok': True}
+    job3, created3 = manager.submit('octocat', {'username': 'octocat'}, wait_for_release)
+    await job3._task
+    assert created3 and job3 is not job1
+    print("[PASS] 运行中的任务被复用，结束后可以再次提交")
+    print()
+
+    print("测试 2: 同时运行的任务数受限，其余排队")
+    print("-" * 60)
+    release = asyncio.Event()
+    jobs = [manager.submit(f"user{i}", {}, wait_for_release)[0] for i in range(3)]
+    await asyncio.sleep(0.01)
+    assert [job.status for job in jobs] == ['running', 'running', 'queued']
+    release.set()
+    await asyncio.gather(*(job._task for job in jobs))
+    assert all(job.status == 'succeeded' for job in jobs)
+    print("[PASS] 2个任务运行，第3个排队直到有空位")
+    print()
+
+    print("测试 3: 任务失败时记录错误")
+    print("-" * 60)
+
+    async def fail(job):
+        raise RuntimeError("API rate limit exceeded")
+
+    job, _ = manager.submit('failing', {}, fail)
+    await job._task
+    assert job.status == 'failed' and job.error == "API rate limit exceeded"
+    assert job.to_dict()['finished_at'] is not None
+    print(f"[PASS] 状态 {job.status}，错误: {job.error}")
+    print()
+
+    print("测试 4: 同步服务的进度写入任务并以SSE推送")
+    print("-" * 60)
+    server = FakeGitHubServer(latency=0.005)
+    for i in range(3):
+        server.add_synthetic_repo("octocat", f"repo{i}", commits=30)
+    await server.start()
+    try:
+        async with GitHubClient(token="fake-token", base_url=server.url) as client:
+            client.commit_store = None
+            user = detached(User(id=1, username="octocat"))
+            repositories = [
+                (detached(Repository(id=i, user_id=1, repo_name=f"octocat/repo{i}")), None)
+                for i in range(3)
+            ]
+
+            async def run_sync(job):
+                job.record('stage', {'stage': 'commits'})
+                service = MemorySyncService(client, progress_callback=job.record, use_pipeline=False)
+                # 未绑定数据库的会话工厂：merge(load=False)不查询数据库
+                await RepoSyncScheduler(service, async_sessionmaker(), concurrency=2).run(user, repositories)
+                return {'commits_synced': len(service.saved)}
+
+            job, _ = manager.submit('octocat', {'username': 'octocat'}, run_sync)
+            events = [message async for message in job.events(min_interval=0, heartbeat=5)]
+    finally:
+        await server.stop()
+
+    assert job.status == 'succeeded', job.error
+    assert job.commits_synced == 90 and job.completed_repos == 3 and not job.failed_repos
+    assert events[-1].startswith("event: done\n")
+    assert all(message.startswith("event: progress\n") for message in events[:-1])
+    final = json.loads(events[-1].split("data: ", 1)[1])
+    assert final['status'] == 'succeeded' and final['result'] == {'commits_synced': 90}
+    assert final['commits_per_second'] > 0
+    print(f"[PASS] {len(events)} 个事件，最终 {final['commits_synced']} 个提交，"
+          f"{final['commits_per_second']} 提交/秒")
+    print()
+
+    print("测试 5: 结束的任务超过保留期后清理")
+    print("-" * 60)
+    manager = SyncJobManager(max_concurrent=1, retention_seconds=0)
+    job, _ = manager.submit('octocat', {}, wait_for_release)
+    await job._task
+    await asyncio.sleep(0.01)
+    assert manager.get(job.id) is None and manager.list_jobs() == []
+    print("[PASS] 过期任务已清理")
+    print()
+
+    print("=" * 60)
+    print("[SUCCESS] 所有测试通过！")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(test_sync_jobs())
@@ -0,0 +1,131 @@
+"""
+流水线同步测试脚本
+验证各阶段并行处理、仓库完成后才推进水位、队列背压以及出错时取消所有阶段
+（使用本地模拟GitHub服务器和内存中的写入记录，无需网络和数据库）
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.models import User, Repository
+from app.services.github_client import GitHubClient
+from app.services.data_sync_service import DataSyncService
+from app.services.sync_pipeline import SyncPipeline
+from benchmarks.fake_github import FakeGitHubServer
+
+
+class MemorySyncService(DataSyncService):
+    """把写入记录在内存中的同步服务（替换数据库读写）"""
+
+    def __init__(self, github_client, write_delay=0.0, fail_repo=None, **kwargs):
+        super().__init__(None, github_client, **kwargs)
+        self.write_delay = write_delay
+        self.fail_repo = fail_repo
+        self.saved = {}
+        self.batches = []
+        self.finished = []
+
+    async def _filter_new_shas(self, shas):
+        existing = {sha for commits in self.saved.values() for sha in commits}
+        return [sha for sha in dict.fromkeys(shas) if sha not in existing]
+
+    async def _save_parsed_commits(self, user, repository, parsed_commits):
+        await asyncio.sleep(self.write_delay)
+        if repository.repo_name == self.fail_repo:
+            raise RuntimeError("写入失败")
+        self.batches.append(len(parsed_commits))
+        self.saved.setdefault(repository.repo_name, []).extend(p['sha'] for p in parsed_commits)
+        return parsed_commits
+
+    async def finish_repository(self, user, repository, synced_commits, checkpoint=None):
+        # 完成时该仓库的全部提交都应已写入
+        self.finished.append((repository.repo_name, len(self.saved.get(repository.repo_name, []))))
+
+
+def make_repos(owner, count):
+    return [(Repository(id=i, repo_name=f"{owner}/repo-{i}"), None) for i in range(count)]
+
+
+async def test_sync_pipeline():
+    """测试流水线同步"""
+    print("=" * 60)
+    print("流水线同步测试")
+    print("=" * 60)
+    print()
+
+    server = FakeGitHubServer(latency=0.01)
+    server.add_synthetic_user("octocat", repos=3, commits_per_repo=60)
+    server.add_synthetic_repo("octocat", "empty", commits=0)
+    await server.start()
+    user = User(id=1, username="octocat")
+
+    try:
+        async with GitHubClient(token="fake-token", base_url=server.url) as client:
+            client.commit_store = None
+
+            print("测试 1: REST策略完整同步")
+            print("-" * 60)
+            service = MemorySyncService(client, write_delay=0.01)
+            pipeline = SyncPipeline(service, detail_concurrency=8, flush_interval=0.05)
+            repos = make_repos("octocat", 3) + [(Repository(id=9, repo_name="octocat/empty"), None)]
+            commits = await pipeline.run(user, repos)
+
+            assert len(commits) == 180
+            assert sorted(service.finished) == [
+                ("octocat/empty", 0), ("octocat/repo-0", 60), ("octocat/repo-1", 60), ("octocat/repo-2", 60)
+            ], service.finished
+            stats = pipeline.stats()
+            assert all(stats['stages'][name]['items'] == 180 for name in ('list', 'detail', 'parse', 'write'))
+            assert len(service.batches) < 180
+            print(f"[PASS] 180 个提交分 {len(service.batches)} 批写入，每个仓库写完后才推进水位")
+            print(f"       阶段耗时: { {k: v['busy_seconds'] for k, v in stats['stages'].items()} }")
+            print()
+
+            print("测试 2: 再次同步时过滤已存在的提交")
+            print("-" * 60)
+            server.push_commits("octocat", "repo-1", 5)
+            service.finished.clear()
+            commits = await SyncPipeline(service, flush_interval=0.01).run(user, make_repos("octocat", 3))
+            assert len(commits) == 5 and len(service.finished) == 3
+            print("[PASS] 只同步新推送的 5 个提交")
+            print()
+
+            print("测试 3: 写入变慢时上游受队列容量限制（背压）")
+            print("-" * 60)
+            service = MemorySyncService(client, write_delay=0.05)
+            pipeline = SyncPipeline(service, detail_concurrency=4, batch_size=10, flush_interval=0, queue_size=5)
+            await pipeline.run(user, make_repos("octocat", 1))
+            stats = pipeline.stats()['stages']
+            assert stats['list']['blocked_seconds'] > 0
+            assert max(service.batches) <= 10
+            print(f"[PASS] 列表阶段等待下游 {stats['list']['blocked_seconds']:.2f} 秒，写入批次不超过10")
+            print()
+
+            print("测试 4: 写入出错时取消所有阶段")
+            print("-" * 60)
+            service = MemorySyncService(client, fail_repo="octocat/repo-1")
+            pipeline = SyncPipeline(service, flush_interval=0.01)
+            try:
+                await pipeline.run(user, make_repos("octocat", 3))
+                raise AssertionError("应抛出写入错误")
+            except RuntimeError:
+                pass
+            await asyncio.sleep(0.05)
+            leftover = [t for t in asyncio.all_tasks() if "SyncPipeline" in repr(t.get_coro())]
+            assert not leftover, leftover
+            assert "octocat/repo-1" not in [name for name, _ in service.finished]
+            print("[PASS] 异常向上抛出，没有遗留的任务，失败的仓库未推进水位")
+            print()
+
+        print("=" * 60)
+        print("[SUCCESS] 所有测试通过！")
+        print("=" * 60)
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(test_sync_pipeline())
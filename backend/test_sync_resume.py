@@ -0,0 +1,225 @@
+"""
+同步检查点测试脚本
+验证仓库同步中断后从检查点的分页游标继续，已处理的页不再请求，
+以及开始同步时删除结束超过保留期的运行
+（使用本地模拟GitHub服务器和内存中的写入记录，无需网络和数据库）
+"""
+import asyncio
+import logging
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.config import settings
+from app.models import User, Repository, SyncRun, SyncRunRepo
+from app.services.github_client import GitHubClient
+from app.services.data_sync_service import DataSyncService
+from app.services.sync_pipeline import SyncPipeline
+from app.services.sync_run_service import SyncRunService
+from benchmarks.fake_github import FakeGitHubServer
+
+
+class EmptyResult:
+    """没有任何行的查询结果"""
+
+    def one_or_none(self):
+        return None
+
+
+class MemorySession:
+    """只记录提交次数的会话"""
+
+    def __init__(self):
+        self.commits = 0
+
+    async def commit(self):
+        self.commits += 1
+
+    async def execute(self, statement):
+        return EmptyResult()
+
+
+class RunsResult:
+    """同步运行查询或删除的结果"""
+
+    def __init__(self, runs=(), rowcount=0):
+        self.runs = list(runs)
+        self.rowcount = rowcount
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.runs
+
+
+class RunsSession:
+    """记录删除语句的会话，查询未完成的运行时返回给定的运行"""
+
+    def __init__(self, unfinished):
+        self.unfinished = unfinished
+        self.deletes = []
+        self.added = []
+
+    async def execute(self, statement):
+        if statement.is_delete:
+            self.deletes.append(statement)
+            return RunsResult(rowcount=1)
+        return RunsResult(self.unfinished)
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def flush(self):
+        pass
+
+
+class MemorySyncService(DataSyncService):
+    """把写入记录在内存中的同步服务，写入达到fail_after个提交后模拟被限流"""
+
+    def __init__(self, github_client, saved, fail_after=None, **kwargs):
+        super().__init__(MemorySession(), github_client, **kwargs)
+        self.saved = saved
+        self.fail_after = fail_after
+
+    async def _filter_new_shas(self, shas):
+        return [sha for sha in dict.fromkeys(shas) if sha not in self.saved]
+
+    async def _save_parsed_commits(self, user, repository, parsed_commits):
+        if self.fail_after is not None and len(self.saved) >= self.fail_after:
+            raise RuntimeError("API rate limit exceeded")
+        for parsed in parsed_commits:
+            assert parsed['sha'] not in self.saved, "提交被重复写入"
+            self.saved[parsed['sha']] = repository.repo_name
+        return parsed_commits
+
+
+def make_checkpoint():
+    return SyncRunRepo(
+        id=1, run_id=1, repo_id=1, status='pending', since=None, cursor=None,
+        commits_listed=0, commits_synced=0, error=None
+    )
+
+
+async def test_sync_resume():
+    """测试从检查点继续同步"""
+    print("=" * 60)
+    print("同步检查点测试")
+    print("=" * 60)
+    print()
+
+    # 中断时被取消的预取请求会在模拟服务器端记录连接断开的错误
+    logging.getLogger('aiohttp.server').setLevel(logging.CRITICAL)
+    server = FakeGitHubServer(latency=0.005)
+    server.add_synthetic_repo("octocat", "big", commits=450)
+    await server.start()
+    user = User(id=1, username="octocat")
+    repository = Repository(id=1, repo_name="octocat/big")
+
+    try:
+        async with GitHubClient(token="fake-token", base_url=server.url) as client:
+            client.commit_store = None
+
+            print("测试 1: REST顺序同步中断后从页码继续")
+            print("-" * 60)
+            saved = {}
+            checkpoint = make_checkpoint()
+            service = MemorySyncService(client, saved, fail_after=200, use_pipeline=False)
+            try:
+                await service.sync_commits(user, repository, max_commits=None, checkpoint=checkpoint)
+                raise AssertionError("应抛出限流错误")
+            except RuntimeError:
+                pass
+            assert checkpoint.cursor == '3' and checkpoint.commits_listed == 200
+            assert checkpoint.commits_synced == 200 and checkpoint.status == 'pending'
+
+            server.reset_stats()
+            service = MemorySyncService(client, saved, use_pipeline=False)
+            commits = await service.sync_commits(user, repository, max_commits=None, checkpoint=checkpoint)
+            assert len(commits) == 250 and len(saved) == 450
+            # 只请求第3~5页列表和这些页的250个提交详情
+            assert server.request_count == 3 + 250, server.request_count
+            assert checkpoint.status == 'completed' and checkpoint.commits_listed == 450
+            print(f"[PASS] 中断于第3页，继续同步只发起 {server.request_count} 个请求，没有重复写入")
+            print()
+
+            print("测试 2: GraphQL流水线同步中断后从endCursor继续")
+            print("-" * 60)
+            saved = {}
+            checkpoint = make_checkpoint()
+            service = MemorySyncService(client, saved, fail_after=200, sync_strategy='graphql')
+            try:
+                await SyncPipeline(service, batch_size=50, flush_interval=0).run(
+                    user, [(repository, None)], checkpoints={1: checkpoint}
+                )
+                raise AssertionError("应抛出限流错误")
+            except RuntimeError:
+                pass
+            # 检查点只越过全部写入的页
+            assert checkpoint.cursor is not None
+            assert 0 < checkpoint.commits_listed <= len(saved) == 200
+            listed_before = checkpoint.commits_listed
+
+            server.reset_stats()
+            service = MemorySyncService(client, saved, sync_strategy='graphql')
+            await SyncPipeline(service, flush_interval=0.01).run(
+                user, [(repository, None)], checkpoints={1: checkpoint}
+            )
+            assert len(saved) == 450 and checkpoint.status == 'completed'
+            assert server.graphql_count == -(-(450 - listed_before) // 100), server.graphql_count
+            print(f"[PASS] 检查点位于第 {listed_before} 个提交之后，继续同步只请求 {server.graphql_count} 页")
+            print()
+
+            print("测试 3: 中断前已列出足够提交时直接完成")
+            print("-" * 60)
+            checkpoint = make_checkpoint()
+            checkpoint.cursor, checkpoint.commits_listed = '3', 200
+            server.reset_stats()
+            service = MemorySyncService(client, {}, use_pipeline=False)
+            commits = await service.sync_commits(user, repository, max_commits=200, checkpoint=checkpoint)
+            assert commits == [] and server.request_count == 0
+            assert checkpoint.status == 'completed'
+            print("[PASS] 不发起请求，直接标记仓库完成")
+            print()
+
+            print("测试 4: 开始同步时删除过期的运行，先删除检查点")
+            print("-" * 60)
+            stale = SyncRun(
+                id=7, user_id=1, incremental=True, max_commits_per_repo=None, sync_strategy='rest',
+                author_filter=None, status='failed', started_at=datetime.utcnow() - timedelta(days=10)
+            )
+            session = RunsSession([stale])
+            run, checkpoints = await SyncRunService(session).resume_or_start(
+                user, incremental=True, max_commits=None, sync_strategy='rest'
+            )
+            # 超过继续期限的运行标记为abandoned，保留期之后再删除
+            assert stale.status == 'abandoned' and run is session.added[0] and checkpoints == {}
+            tables = [statement.table.name for statement in session.deletes]
+            assert tables == ['sync_run_repos', 'sync_runs'], tables
+            sql = str(session.deletes[1].compile())
+            assert 'finished_at <' in sql and 'status IN' in sql, sql
+            retention = settings.SYNC_RUN_RETENTION_DAYS
+            settings.SYNC_RUN_RETENTION_DAYS = 0
+            try:
+                session = RunsSession([])
+                await SyncRunService(session).resume_or_start(
+                    user, incremental=True, max_commits=None, sync_strategy='rest'
+                )
+                assert session.deletes == []
+            finally:
+                settings.SYNC_RUN_RETENTION_DAYS = retention
+            print(f"[PASS] 删除结束超过 {retention} 天的运行，保留期为0时不删除")
+            print()
+
+        print("=" * 60)
+        print("[SUCCESS] 所有测试通过！")
+        print("=" * 60)
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(test_sync_resume())
@@ -0,0 +1,98 @@
+"""
+多Token配额池测试脚本
+验证按剩余配额分配请求、配额耗尽时切换Token以及汇总配额状态
+（使用本地模拟GitHub服务器，无需网络）
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.services.github_client import GitHubClient, RateLimitError
+from benchmarks.fake_github import FakeGitHubServer
+
+
+async def test_token_pool():
+    """测试多Token配额池"""
+    print("=" * 60)
+    print("多Token配额池测试")
+    print("=" * 60)
+    print()
+
+    server = FakeGitHubServer()
+    server.add_synthetic_repo("octocat", "hello-world", commits=60)
+    await server.start()
+
+    try:
+        shas = [c["sha"] for c in server.commits["octocat/hello-world"]]
+
+        print("测试 1: 按剩余配额分配请求")
+        print("-" * 60)
+        server.set_token_quota("token-a", 100)
+        server.set_token_quota("token-b", 40)
+        async with GitHubClient(tokens=["token-a", "token-b"], base_url=server.url) as client:
+            client.commit_store = None
+            await client.get_commit_details("octocat", "hello-world", shas[:40], concurrency=1)
+            # token-a配额更多，应承担大部分请求，直到两者剩余配额接近
+            assert server.token_requests["token-a"] > server.token_requests["token-b"]
+            gap = abs(server.token_remaining["token-a"] - server.token_remaining["token-b"])
+            assert gap <= 60, f"剩余配额应逐渐接近，当前相差 {gap}"
+            print(f"[PASS] token-a {server.token_requests['token-a']} 次，"
+                  f"token-b {server.token_requests.get('token-b', 0)} 次")
+        print()
+
+        print("测试 2: 单个Token耗尽时切换，不等待")
+        print("-" * 60)
+        server.reset_stats()
+        server.set_token_quota("token-a", 0)
+        server.set_token_quota("token-b", 200)
+        async with GitHubClient(tokens=["token-a", "token-b"], base_url=server.url) as client:
+            client.commit_store = None
+            details = await asyncio.wait_for(
+                client.get_commit_details("octocat", "hello-world", shas, concurrency=8),
+                timeout=10
+            )
+            assert len(details) == len(shas)
+            # token-a最多被尝试一次（收到403后标记为耗尽）
+            assert server.token_requests.get("token-a", 0) <= 8
+            print(f"[PASS] {len(details)} 个提交全部获取，token-a被尝试 {server.token_requests.get('token-a', 0)} 次")
+        print()
+
+        print("测试 3: 汇总配额状态")
+        print("-" * 60)
+        server.set_token_quota("token-c", 300)
+        server.set_token_quota("token-d", 500)
+        async with GitHubClient(tokens=["token-c", "token-d"], base_url=server.url) as client:
+            client.commit_store = None
+            await client.get_commit_details("octocat", "hello-world", shas[:10], concurrency=1)
+            status = client.get_rate_limit_status()
+            assert status['remaining'] == server.token_remaining["token-c"] + server.token_remaining["token-d"]
+            assert status['limit'] == 2 * server.rate_limit
+            assert len(status['tokens']) == 2 and status['time_until_reset'] > 0
+            print(f"[PASS] 汇总剩余配额 {status['remaining']}/{status['limit']}")
+        print()
+
+        print("测试 4: 全部耗尽且未启用自动重试时抛出速率限制错误")
+        print("-" * 60)
+        server.set_token_quota("token-e", 0)
+        async with GitHubClient(token="token-e", base_url=server.url, auto_retry=False) as client:
+            try:
+                await client.get_user("octocat")
+                raise AssertionError("应抛出RateLimitError")
+            except RateLimitError:
+                pass
+            assert client.get_rate_limit_status()['remaining'] == 0
+        print("[PASS] 抛出RateLimitError")
+        print()
+
+        print("=" * 60)
+        print("[SUCCESS] 所有测试通过！")
+        print("=" * 60)
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(test_token_pool())
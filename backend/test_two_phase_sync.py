@@ -0,0 +1,289 @@
+"""
+两阶段同步测试脚本
+验证两阶段同步只请求提交列表、写入未补全的提交，后台补全按批获取详情并累加统计，
+以及补全在剩余配额降到保留值时暂停、获取失败的提交不阻塞其余提交、
+其他补全任务已写回的提交不重复累加
+（使用本地模拟GitHub服务器和内存中的写入记录，无需网络和数据库）
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy.dialects import mysql
+
+from app.models import User, Repository, CommitDetail
+from app.services.github_client import GitHubClient
+from app.services.data_sync_service import DataSyncService
+from app.services.commit_enricher import CommitEnricher
+from app.services.sync_pipeline import SyncPipeline
+from benchmarks.fake_github import FakeGitHubServer
+
+
+class MemoryResult:
+    """语句执行结果"""
+
+    def __init__(self, rowcount=0, values=()):
+        self.rowcount = rowcount
+        self.values = list(values)
+
+    def scalar_one_or_none(self):
+        return None
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.values
+
+
+class MemorySession:
+    """把 commit_details 的写入和补全保存在内存中的会话（其他语句只记录）"""
+
+    def __init__(self):
+        self.dialect = mysql.dialect()
+        self.commits = {}
+        self.statements = []
+
+    def get_bind(self):
+        return self
+
+    async def commit(self):
+        pass
+
+    async def execute(self, statement, params=None):
+        table = getattr(statement, "table", None)
+        if statement.is_insert and table.name == "commit_details":
+            compiled = statement.compile(dialect=self.dialect).params
+            rows = {}
+            for key, value in compiled.items():
+                column, index = key.rsplit("_m", 1)
+                rows.setdefault(int(index), {})[column] = value
+            for row in rows.values():
+                row["id"] = len(self.commits) + 1
+                self.commits[row["commit_sha"]] = row
+            return MemoryResult(len(rows))
+        if statement.is_update and table.name == "commit_details":
+            by_id = {row["id"]: row for row in self.commits.values()}
+            updated = 0
+            for param in params:
+                row = by_id[param["commit_id"]]
+                if row["enriched"]:
+                    continue
+                row.update(
+                    additions=param["new_additions"],
+                    deletions=param["new_deletions"],
+                    files_changed=param["new_files_changed"],
+                    primary_language=param["new_primary_language"],
+                    enriched=True
+                )
+                updated += 1
+            return MemoryResult(updated)
+        if statement.is_select and statement.column_descriptions[0]["entity"] is CommitDetail:
+            # 写入前加锁读取已存在的提交，补全写回前加锁读取仍未补全的行
+            assert "FOR UPDATE" in str(statement.compile(dialect=self.dialect))
+            values = next(value for value in statement.compile().params.values() if isinstance(value, list))
+            if statement.column_descriptions[0]["name"] == "commit_sha":
+                return MemoryResult(values=[sha for sha in values if sha in self.commits])
+            by_id = {row["id"]: row for row in self.commits.values()}
+            return MemoryResult(values=[i for i in values if not by_id[i]["enriched"]])
+        self.statements.append(statement)
+        return MemoryResult()
+
+
+class MemorySyncService(DataSyncService):
+    """提交写入内存会话的两阶段同步服务"""
+
+    def __init__(self, github_client, **kwargs):
+        super().__init__(MemorySession(), github_client, sync_strategy="rest", two_phase=True, **kwargs)
+
+    async def _filter_new_shas(self, shas):
+        return [sha for sha in dict.fromkeys(shas) if sha and sha not in self.db.commits]
+
+
+class MemoryEnricher(CommitEnricher):
+    """从内存会话中取出未补全提交的补全服务"""
+
+    def __init__(self, sync_service, repositories, **kwargs):
+        super().__init__(sync_service, **kwargs)
+        self.repositories = {repository.id: repository for repository in repositories}
+
+    async def count_pending(self, user):
+        return sum(1 for row in self.db.commits.values() if not row["enriched"])
+
+    async def _load_batch(self, user, limit, exclude):
+        rows = sorted(
+            (row for row in self.db.commits.values()
+             if not row["enriched"] and row["commit_sha"] not in exclude),
+            key=lambda row: row["commit_date"],
+            reverse=True
+        )[:limit]
+        return [
+            (row["id"], row["commit_sha"], row["commit_date"],
+             self.repositories[row["repo_id"]].repo_name, self.repositories[row["repo_id"]].language)
+            for row in rows
+        ]
+
+
+class ConcurrentEnricher(MemoryEnricher):
+    """获取详情后、写回前，模拟另一个补全任务先写回了本批的前concurrent个提交"""
+
+    def __init__(self, sync_service, repositories, user, concurrent, **kwargs):
+        super().__init__(sync_service, repositories, **kwargs)
+        self.user = user
+        self.concurrent = concurrent
+
+    async def _fetch_batch(self, batch):
+        rows, failed, rate_limited = await super()._fetch_batch(batch)
+        by_id = {row["id"]: row for row in self.db.commits.values()}
+        for row in rows[:self.concurrent]:
+            by_id[row["id"]].update(
+                additions=row["additions"], deletions=row["deletions"],
+                files_changed=row["files_changed"], primary_language=row["primary_language"], enriched=True
+            )
+            self.user.total_additions += row["additions"]
+            self.user.total_deletions += row["deletions"]
+        return rows, failed, rate_limited
+
+
+def language_upserts(session):
+    """记录的语句中 language_stats 的upsert数量"""
+    return sum(1 for statement in session.statements
+               if statement.is_insert and statement.table.name == "language_stats")
+
+
+async def test_two_phase_sync():
+    """测试两阶段同步"""
+    print("=" * 60)
+    print("两阶段同步测试")
+    print("=" * 60)
+    print()
+
+    server = FakeGitHubServer()
+    server.add_synthetic_repo("octocat", "hello", commits=250)
+    server.add_synthetic_repo("octocat", "world", commits=40)
+    await server.start()
+
+    user = User(id=1, username="octocat", total_commits=0, total_additions=0, total_deletions=0)
+    hello = Repository(id=1, user_id=1, repo_name="octocat/hello", language="Python")
+    world = Repository(id=2, user_id=1, repo_name="octocat/world", language="Python")
+    gone = Repository(id=3, user_id=1, repo_name="octocat/gone", language="Go")
+
+    try:
+        async with GitHubClient(token="fake-token", base_url=server.url) as client:
+            client.commit_store = None
+            events = []
+            service = MemorySyncService(client, progress_callback=lambda *args: events.append(args))
+            session = service.db
+
+            print("测试 1: 只对rest策略启用，创建新会话的服务时保留")
+            print("-" * 60)
+            assert DataSyncService(None, client, sync_strategy="graphql", two_phase=True).two_phase is False
+            assert service.for_session(session).two_phase is True
+            print("[PASS] graphql策略不使用两阶段同步")
+            print()
+
+            print("测试 2: 只请求提交列表，写入未补全的提交")
+            print("-" * 60)
+            server.reset_stats()
+            commits = await service.sync_commits(user, hello, max_commits=None)
+            assert len(commits) == 250 and len(session.commits) == 250
+            assert server.request_count == 3, server.request_count
+            rows = list(session.commits.values())
+            assert all(not row["enriched"] and row["additions"] == 0 for row in rows)
+            assert all(row["primary_language"] is None and row["commit_hour"] is not None for row in rows)
+            assert (user.total_commits, user.total_additions) == (250, 0)
+            assert language_upserts(session) == 0
+            print(f"[PASS] {server.request_count} 个列表请求写入 {len(commits)} 个提交，提交数立即可用")
+            print()
+
+            print("测试 3: 流水线同步跳过详情阶段的请求")
+            print("-" * 60)
+            server.reset_stats()
+            pipeline = SyncPipeline(service, flush_interval=0.01)
+            commits = await pipeline.run(user, [(world, None)])
+            assert len(commits) == 40 and server.request_count == 1, server.request_count
+            assert user.total_commits == 290
+            print(f"[PASS] {server.request_count} 个请求写入 {len(commits)} 个提交")
+            print()
+
+            print("测试 4: 剩余配额降到保留值时暂停")
+            print("-" * 60)
+            server.reset_stats()
+            events.clear()
+            reserve = client.rate_limit_info["remaining"] - 30
+            enricher = MemoryEnricher(service, [hello, world, gone], batch_size=20, min_remaining=reserve)
+            result = await enricher.enrich_user(user)
+            assert result == {"enriched": 30, "failed": 0, "pending": 260, "paused": True}, result
+            assert server.request_count == 30
+            assert events[0] == ("stage", {"stage": "enrich"})
+            # 最新的提交先补全
+            enriched = [row for row in session.commits.values() if row["enriched"]]
+            newest = sorted(session.commits.values(), key=lambda row: row["commit_date"], reverse=True)[:30]
+            assert {row["commit_sha"] for row in enriched} == {row["commit_sha"] for row in newest}
+            print(f"[PASS] 补全 {result['enriched']} 个最新的提交后暂停，保留 {reserve} 个配额")
+            print()
+
+            print("测试 5: 补全全部提交，累计值与提交详情一致")
+            print("-" * 60)
+            enricher = MemoryEnricher(service, [hello, world, gone], batch_size=100, min_remaining=0)
+            result = await enricher.enrich_user(user)
+            assert result == {"enriched": 260, "failed": 0, "pending": 0, "paused": False}, result
+            details = {c["sha"]: c for name in ("octocat/hello", "octocat/world") for c in server.commits[name]}
+            for row in session.commits.values():
+                stats = details[row["commit_sha"]]["stats"]
+                assert (row["additions"], row["deletions"]) == (stats["additions"], stats["deletions"])
+                assert row["files_changed"] == len(details[row["commit_sha"]]["files"])
+                assert row["primary_language"] in ("Python", "TypeScript")
+            expected_additions = sum(c["stats"]["additions"] for c in details.values())
+            expected_deletions = sum(c["stats"]["deletions"] for c in details.values())
+            assert (user.total_commits, user.total_additions, user.total_deletions) == (
+                290, expected_additions, expected_deletions
+            )
+            assert language_upserts(session) == 2 + 3
+            assert sum(event[1]["count"] for event in events if event[0] == "commits") == 290
+            print(f"[PASS] +{user.total_additions} / -{user.total_deletions}，提交数不重复累加")
+            print()
+
+            print("测试 6: 获取失败的提交本次不再重试")
+            print("-" * 60)
+            session.commits["f" * 40] = {
+                "id": len(session.commits) + 1, "repo_id": gone.id, "commit_sha": "f" * 40,
+                "commit_date": rows[0]["commit_date"], "enriched": False
+            }
+            server.reset_stats()
+            result = await enricher.enrich_user(user)
+            assert result == {"enriched": 0, "failed": 1, "pending": 1, "paused": False}, result
+            assert server.request_count == 1
+            print("[PASS] 失败的提交留到下次补全")
+            print()
+
+            print("测试 7: 其他补全任务已写回的提交不重复累加")
+            print("-" * 60)
+            del session.commits["f" * 40]
+            totals = (user.total_additions, user.total_deletions)
+            reset = [row for row in session.commits.values() if row["repo_id"] == world.id][:4]
+            for row in reset:
+                user.total_additions -= row["additions"]
+                user.total_deletions -= row["deletions"]
+                row.update(additions=0, deletions=0, files_changed=0, enriched=False)
+            result = await ConcurrentEnricher(
+                service, [hello, world], user, concurrent=2, min_remaining=0
+            ).enrich_user(user)
+            assert result == {"enriched": 2, "failed": 0, "pending": 0, "paused": False}, result
+            assert (user.total_additions, user.total_deletions) == totals
+            assert not any(statement.is_select and "sum(" in str(statement) for statement in session.statements)
+            print("[PASS] 只写回并累加本任务补全的 2 个提交，没有完整重算")
+            print()
+
+        print("=" * 60)
+        print("[SUCCESS] 所有测试通过！")
+        print("=" * 60)
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(test_two_phase_sync())
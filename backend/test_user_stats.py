@@ -0,0 +1,188 @@
+"""
+用户统计增量维护测试脚本
+验证写入一批提交时只执行两条语句（users累加 + language_stats多行upsert），
+写入前锁定用户行并加锁排除已存在的提交、与其他用户的同步任务写入冲突时只累加实际写入的行，以及各数据库方言下的累加/取最值SQL（不连接数据库）
+"""
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy.dialects import mysql, sqlite
+
+from app.core.database import upsert
+from app.models import User, Repository, LanguageStat
+from app.services.data_sync_service import DataSyncService
+from app.services.user_stats_service import UserStatsService
+
+
+class RecordingSession:
+    """记录执行的语句，按指定方言编译"""
+
+    def __init__(self, dialect):
+        self.dialect = dialect
+        self.statements = []
+
+    def get_bind(self):
+        return self
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+
+
+class ConflictSession(RecordingSession):
+    """
+    模拟已存在的提交，以及另一个用户的同步任务在本事务加锁读取之后写入了部分提交
+    （READ COMMITTED下不锁定索引间隙）：INSERT IGNORE跳过这些行
+    """
+
+    def __init__(self, dialect, existing, written_by_other):
+        super().__init__(dialect)
+        self.owners = dict(existing)
+        self.written_by_other = dict(written_by_other)
+
+    async def commit(self):
+        pass
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        params = statement.compile(dialect=self.dialect).params
+        if statement.is_insert and statement.table.name == "commit_details":
+            self.owners.update(self.written_by_other)
+            rows = {}
+            for key, value in params.items():
+                column, index = key.rsplit("_m", 1)
+                rows.setdefault(index, {})[column] = value
+            new = [row for row in rows.values() if row["commit_sha"] not in self.owners]
+            self.owners.update((row["commit_sha"], row["user_id"]) for row in new)
+            return ConflictResult(len(new))
+        shas = next((value for value in params.values() if isinstance(value, list)), [])
+        user_id = params.get("user_id_1")
+        return ConflictResult(0, [
+            sha for sha in shas if sha in self.owners and user_id in (None, self.owners[sha])
+        ])
+
+
+class ConflictResult:
+    """语句执行结果"""
+
+    def __init__(self, rowcount, shas=()):
+        self.rowcount = rowcount
+        self.shas = list(shas)
+
+    def scalar_one_or_none(self):
+        return None
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.shas
+
+
+def make_parsed(sha, additions):
+    return {
+        'sha': sha, 'message': 'msg', 'commit_date': '2024-01-05T10:00:00Z',
+        'files_changed': 1, 'additions': additions, 'deletions': 1, 'languages': ['Go']
+    }
+
+
+def make_row(language, day, additions):
+    return {
+        'primary_language': language,
+        'commit_date': datetime(2024, 1, day),
+        'additions': additions,
+        'deletions': 1,
+        'files_changed': 2
+    }
+
+
+async def test_user_stats():
+    """测试用户统计增量维护"""
+    print("=" * 60)
+    print("用户统计增量维护测试")
+    print("=" * 60)
+    print()
+
+    print("测试 1: 一批提交只执行两条语句")
+    print("-" * 60)
+    session = RecordingSession(mysql.dialect())
+    user = User(id=1, username="octocat", total_commits=10, total_additions=100, total_deletions=20)
+    rows = [make_row("Go", 5, 10), make_row("Python", 6, 1), make_row("Go", 2, 4), make_row(None, 7, 3)]
+    await UserStatsService(session).apply_commits(user, rows)
+
+    assert len(session.statements) == 2, session.statements
+    assert (user.total_commits, user.total_additions, user.total_deletions) == (14, 118, 24)
+    print(f"[PASS] 执行 {len(session.statements)} 条语句，内存中的用户累计值已更新")
+
+    params = session.statements[1].compile(dialect=mysql.dialect()).params
+    go = {key: value for key, value in params.items() if key.endswith("_m0")}
+    assert params["language_m0"] == "Go" and params["language_m1"] == "Python"
+    assert go["total_commits_m0"] == 2 and go["total_additions_m0"] == 14
+    assert go["first_used_at_m0"] == datetime(2024, 1, 2) and go["last_used_at_m0"] == datetime(2024, 1, 5)
+    print("[PASS] 语言计数按语言分组，忽略无语言的提交")
+    print()
+
+    print("测试 2: 空批次不执行语句")
+    print("-" * 60)
+    session = RecordingSession(mysql.dialect())
+    await UserStatsService(session).apply_commits(user, [])
+    assert not session.statements
+    print("[PASS] 未执行语句")
+    print()
+
+    print("测试 3: 写入前加锁排除已存在的提交，冲突时只累加本事务写入的行")
+    print("-" * 60)
+    session = ConflictSession(mysql.dialect(), existing={"d" * 40: 1}, written_by_other={"b" * 40: 2})
+    service = DataSyncService(session, None, sync_strategy="rest")
+    user = User(id=1, username="octocat", total_commits=0, total_additions=0, total_deletions=0)
+    repository = Repository(id=1, user_id=1, repo_name="octocat/hello", language="Go")
+    saved = await service._save_parsed_commits(user, repository, [
+        make_parsed("a" * 40, 5), make_parsed("b" * 40, 7), make_parsed("c" * 40, 9), make_parsed("d" * 40, 11)
+    ])
+    assert [commit.commit_sha for commit in saved] == ["a" * 40, "c" * 40]
+    assert (user.total_commits, user.total_additions, user.total_deletions) == (2, 14, 2)
+    # 先锁定用户行，再加锁读取已存在的提交
+    sql = [str(statement.compile(dialect=mysql.dialect())) for statement in session.statements]
+    assert sql[0].startswith("SELECT users.aggregate_synced_at") and sql[0].endswith("FOR UPDATE"), sql[0]
+    assert "commit_details" in sql[1] and sql[1].endswith("FOR UPDATE"), sql[1]
+    # 没有完整重算（不扫描 commit_details 聚合）
+    assert not any("sum(" in statement.lower() for statement in sql)
+    print("[PASS] 跳过已存在的提交，只累加本事务写入的2个提交，不完整重算")
+    print()
+
+    print("测试 4: 各方言的合并SQL")
+    print("-" * 60)
+    merge_columns = {'total_commits': 'add', 'first_used_at': 'min', 'last_used_at': 'max'}
+    row = {'user_id': 1, 'language': 'Go', 'total_commits': 1,
+           'first_used_at': datetime(2024, 1, 1), 'last_used_at': datetime(2024, 1, 1)}
+    for dialect, fragments in (
+        (mysql.dialect(), ("ON DUPLICATE KEY UPDATE", "VALUES(total_commits)", "least(", "greatest(")),
+        (sqlite.dialect(), ("ON CONFLICT (user_id, language)", "excluded.total_commits", "min(", "max(")),
+    ):
+        statement = upsert(LanguageStat, RecordingSession(dialect), [row], ['user_id', 'language'],
+                           merge_columns=merge_columns)
+        sql = str(statement.compile(dialect=dialect))
+        for fragment in fragments:
+            assert fragment in sql, (fragment, sql)
+        print(f"[PASS] {dialect.name}")
+
+    try:
+        upsert(LanguageStat, RecordingSession(mysql.dialect()), [row], ['user_id', 'language'],
+               merge_columns={'total_commits': 'avg'})
+    except ValueError:
+        print("[PASS] 不支持的合并方式抛出ValueError")
+    else:
+        raise AssertionError("应抛出ValueError")
+    print()
+
+    print("=" * 60)
+    print("[SUCCESS] 所有测试通过！")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(test_user_stats())
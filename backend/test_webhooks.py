@@ -0,0 +1,258 @@
+"""
+GitHub Webhook测试脚本
+验证签名校验、事件过滤，推送事件只获取推送中用户自己的提交并按推送连续性推进同步水位，
+以及同一仓库的推送事件依次处理
+（向本地应用发送推送事件有效载荷，使用本地模拟GitHub服务器和内存中的写入记录，无需网络和数据库）
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+import httpx
+
+from app.api.v1 import webhooks
+from app.core.config import settings
+from app.main import app
+from app.models import User, Repository
+from app.services.github_client import GitHubClient
+from app.services.data_sync_service import DataSyncService
+from app.services.push_event_service import PushEvent, PushEventService
+from benchmarks.fake_github import FakeGitHubServer
+
+SECRET = "webhook-secret"
+WORK_EMAIL = "octocat@work.example.com"
+
+
+class MemoryResult:
+    """查询结果：仓库和用户行，或邮箱别名"""
+
+    def __init__(self, rows, emails):
+        self.rows = rows
+        self.emails = emails
+
+    def all(self):
+        return self.rows
+
+    def scalars(self):
+        return MemoryResult(self.emails, self.emails)
+
+
+class MemorySession:
+    """返回固定仓库和邮箱别名的会话"""
+
+    def __init__(self, rows, emails=()):
+        self.rows = rows
+        self.emails = list(emails)
+
+    async def commit(self):
+        pass
+
+    async def execute(self, statement):
+        return MemoryResult(self.rows, self.emails)
+
+
+class MemorySyncService(DataSyncService):
+    """把写入记录在内存中的同步服务"""
+
+    def __init__(self, github_client, db, saved, **kwargs):
+        super().__init__(db, github_client, sync_strategy='rest', use_pipeline=False, **kwargs)
+        self.saved = saved
+
+    async def _filter_new_shas(self, shas):
+        return [sha for sha in dict.fromkeys(shas) if sha not in self.saved]
+
+    async def _save_parsed_commits(self, user, repository, parsed_commits):
+        for parsed in parsed_commits:
+            self.saved[parsed['sha']] = parsed['author_email']
+        self.report_progress('commits', repo_name=repository.repo_name, count=len(parsed_commits))
+        return parsed_commits
+
+    async def finish_repository(self, user, repository, synced_commits, checkpoint=None):
+        repository.synced_pushed_at = repository.pushed_at
+
+
+def sign(body):
+    """按GitHub的方式计算请求签名"""
+    return "sha256=" + hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()
+
+
+async def test_webhooks():
+    """测试GitHub Webhook"""
+    print("=" * 60)
+    print("GitHub Webhook测试")
+    print("=" * 60)
+    print()
+
+    server = FakeGitHubServer()
+    server.add_synthetic_repo("octocat", "hello", commits=20)
+    server.add_synthetic_repo("octocat", "untracked", commits=5)
+    await server.start()
+
+    github_repo = server.repos["octocat"][0]
+    user = User(id=1, username="octocat")
+    repository = Repository(
+        id=1, user_id=1, github_repo_id=github_repo["id"], repo_name="octocat/hello",
+        pushed_at=DataSyncService._parse_github_time(github_repo["pushed_at"]),
+        synced_pushed_at=DataSyncService._parse_github_time(github_repo["pushed_at"]),
+        push_head_sha=None
+    )
+    saved = {}
+    original_run_push_job = webhooks._run_push_job
+    original_secret = settings.GITHUB_WEBHOOK_SECRET
+
+    try:
+        async with GitHubClient(token="fake-token", base_url=server.url) as client, \
+                httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as api:
+            client.commit_store = None
+
+            async def run_push_job(job, event):
+                """与webhooks._run_push_job相同，使用内存中的会话"""
+                rows = [(repository, user)] if event.github_repo_id == repository.github_repo_id else []
+                sync_service = MemorySyncService(
+                    client, MemorySession(rows, [WORK_EMAIL]), saved, progress_callback=job.record
+                )
+                return await PushEventService(sync_service).ingest(event)
+
+            webhooks._run_push_job = run_push_job
+
+            async def post(event, payload, signature=None):
+                body = json.dumps(payload).encode()
+                return await api.post(
+                    f"{settings.API_V1_STR}/webhooks/github",
+                    content=body,
+                    headers={
+                        "X-GitHub-Event": event,
+                        "X-Hub-Signature-256": signature or sign(body),
+                        "Content-Type": "application/json",
+                    }
+                )
+
+            async def deliver(payload):
+                """投递推送事件并等待后台任务完成，返回任务状态"""
+                response = await post("push", payload)
+                assert response.status_code == 202, response.text
+                data = response.json()
+                assert data["accepted"], data
+                while True:
+                    status = (await api.get(data["status_url"])).json()
+                    if status["status"] in ("succeeded", "failed"):
+                        assert status["status"] == "succeeded", status["error"]
+                        return status
+                    await asyncio.sleep(0.01)
+
+            print("测试 1: 签名校验")
+            print("-" * 60)
+            settings.GITHUB_WEBHOOK_SECRET = ""
+            assert (await post("ping", {"zen": "hi"})).status_code == 503
+            settings.GITHUB_WEBHOOK_SECRET = SECRET
+            assert (await post("ping", {"zen": "hi"}, signature="sha256=" + "0" * 64)).status_code == 401
+            assert (await post("ping", {"zen": "hi"}, signature="sha1=abc")).status_code == 401
+            response = await post("ping", {"zen": "hi"})
+            assert response.status_code == 202 and response.json()["message"] == "pong"
+            print("[PASS] 未配置密钥返回503，签名无效返回401，ping返回pong")
+            print()
+
+            print("测试 2: 忽略其他事件、其他分支和无效的有效载荷")
+            print("-" * 60)
+            assert not (await post("issues", {"action": "opened"})).json()["accepted"]
+            payload = server.push_event("octocat", "hello", 2)
+            payload["ref"] = "refs/heads/feature"
+            assert not (await post("push", payload)).json()["accepted"]
+            assert (await post("push", {"ref": "refs/heads/main"})).status_code == 400
+            print("[PASS] 没有提交后台任务")
+            print()
+
+            print("测试 3: 推送事件只获取推送中用户自己的提交")
+            print("-" * 60)
+            server.push_commits("octocat", "hello", 1)  # 没有收到Webhook的推送
+            payload = server.push_event("octocat", "hello", 3)
+            payload["commits"] += server.push_event("octocat", "hello", 2, author="hubot")["commits"]
+            payload["commits"] += server.push_event(
+                "octocat", "hello", 1, author="octocat", email=WORK_EMAIL, linked=False
+            )["commits"]
+            payload["after"] = payload["commits"][-1]["id"]
+            server.reset_stats()
+            status = await deliver(payload)
+            result = status["result"]["repositories"][0]
+            assert result == {
+                "repo_id": 1, "user_id": 1, "commits_matched": 4, "commits_synced": 4, "advanced": False
+            }, result
+            # 只有4个提交详情请求，不列出提交
+            assert server.request_count == 4 and status["commits_synced"] == 4
+            assert repository.push_head_sha == payload["after"]
+            assert not DataSyncService.is_repository_unchanged(repository)
+            print(f"[PASS] {server.request_count} 个请求；首个推送事件不推进水位，定时同步会补齐遗漏的推送")
+            print()
+
+            print("测试 4: 连续的推送在仓库已同步时推进水位")
+            print("-" * 60)
+            repository.synced_pushed_at = repository.pushed_at  # 定时同步完成
+            payload = server.push_event("octocat", "hello", 3)
+            server.reset_stats()
+            status = await deliver(payload)
+            assert status["result"]["repositories"][0]["advanced"]
+            assert server.request_count == 3
+            assert DataSyncService.is_repository_unchanged(repository)
+            assert repository.pushed_at == PushEvent(payload).pushed_at
+            print("[PASS] 水位已推进，下次定时同步跳过该仓库")
+            print()
+
+            print("测试 5: 遗漏推送后不推进水位，重复投递不重复获取")
+            print("-" * 60)
+            server.push_commits("octocat", "hello", 2)  # 遗漏的推送
+            payload = server.push_event("octocat", "hello", 1)
+            status = await deliver(payload)
+            assert not status["result"]["repositories"][0]["advanced"]
+            assert not DataSyncService.is_repository_unchanged(repository)
+            server.reset_stats()
+            status = await deliver(payload)
+            assert status["result"]["repositories"][0]["commits_synced"] == 0
+            assert server.request_count == 0
+            print("[PASS] 推送不连续时交给定时同步，重复投递没有API请求")
+            print()
+
+            print("测试 6: 未跟踪的仓库")
+            print("-" * 60)
+            status = await deliver(server.push_event("octocat", "untracked", 2))
+            assert status["result"]["repositories"] == []
+            print("[PASS] 忽略未跟踪的仓库")
+            print()
+
+            print("测试 7: 同一仓库的推送事件依次处理，处理完后释放锁")
+            print("-" * 60)
+            assert PushEventService._locks == {}, PushEventService._locks
+            order = []
+
+            async def hold(github_repo_id, name):
+                async with PushEventService._repository_lock(github_repo_id):
+                    order.append(f"{name}+")
+                    await asyncio.sleep(0.01)
+                    order.append(f"{name}-")
+
+            await asyncio.gather(hold(1, "a"), hold(1, "b"), hold(2, "c"))
+            assert order.index("a-") < order.index("b+"), order
+            assert order.index("c+") < order.index("a-"), order
+            assert PushEventService._locks == {}, PushEventService._locks
+            print("[PASS] 不同仓库并行处理，没有事件的仓库不保留锁")
+            print()
+
+        assert len(saved) == 4 + 3 + 1
+        assert sorted(set(saved.values())) == ["octocat@example.com", WORK_EMAIL]
+
+        print("=" * 60)
+        print("[SUCCESS] 所有测试通过！")
+        print("=" * 60)
+    finally:
+        webhooks._run_push_job = original_run_push_job
+        settings.GITHUB_WEBHOOK_SECRET = original_secret
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(test_webhooks())
@@ -4,37 +4,80 @@
  */
 
 import apiClient from './api'
-import type { SyncRequest, SyncResponse } from './types'
+import type { SyncRequest, SyncResponse, SyncJob, SyncJobCreated } from './types'
+
+/**
+ * 轮询同步任务状态的间隔（毫秒）
+ */
+const POLL_INTERVAL = 1000
 
 /**
  * 同步服务类
  */
 class SyncService {
   /**
-   * 同步GitHub数据
+   * 提交GitHub数据同步任务，立即返回任务ID
    * @param userId 用户ID
    * @param username GitHub用户名
    * @param githubToken GitHub访问令牌（可选）
    * @param syncMode 同步模式（可选）: full / incremental / auto（默认）
-   * @returns 同步结果
+   * @returns 同步任务
    */
-  async syncGithubData(
+  async startSync(
     userId: number,
     username: string,
     githubToken?: string,
     syncMode?: 'full' | 'incremental' | 'auto'
-  ): Promise<SyncResponse> {
+  ): Promise<SyncJobCreated> {
     const request: SyncRequest = {
       user_id: userId,
       username,
       ...(githubToken && { github_token: githubToken }),
       ...(syncMode && { sync_mode: syncMode })
     }
-    // 同步操作可能耗时较长，设置120秒超时
-    // 注意：响应拦截器已经返回了response.data，所以这里直接得到SyncResponse
-    return (await apiClient.post('/api/v1/sync/github', request, {
-      timeout: 120000 // 120秒
-    })) as SyncResponse
+    // 注意：响应拦截器已经返回了response.data，所以这里直接得到SyncJobCreated
+    return (await apiClient.post('/api/v1/sync/github', request)) as SyncJobCreated
+  }
+
+  /**
+   * 查询同步任务状态
+   * @param jobId 任务ID
+   * @returns 任务状态和进度
+   */
+  async getSyncJob(jobId: string): Promise<SyncJob> {
+    return (await apiClient.get(`/api/v1/sync/jobs/${jobId}`)) as SyncJob
+  }
+
+  /**
+   * 同步GitHub数据：提交同步任务并轮询直到结束
+   * @param userId 用户ID
+   * @param username GitHub用户名
+   * @param githubToken GitHub访问令牌（可选）
+   * @param syncMode 同步模式（可选）: full / incremental / auto（默认）
+   * @param onProgress 每次轮询到任务进度时的回调（可选）
+   * @returns 同步结果
+   */
+  async syncGithubData(
+    userId: number,
+    username: string,
+    githubToken?: string,
+    syncMode?: 'full' | 'incremental' | 'auto',
+    onProgress?: (job: SyncJob) => void
+  ): Promise<SyncResponse> {
+    const { job_id } = await this.startSync(userId, username, githubToken, syncMode)
+
+    // 同步在后台执行，短请求轮询状态，不再长时间占用一个HTTP连接
+    for (;;) {
+      const job = await this.getSyncJob(job_id)
+      onProgress?.(job)
+      if (job.status === 'succeeded' && job.result) {
+        return job.result
+      }
+      if (job.status === 'failed' || job.status === 'cancelled') {
+        throw new Error(job.error || '同步任务失败')
+      }
+      await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL))
+    }
   }
 }
 
@@ -46,4 +89,4 @@ export const syncApi = new SyncService()
 /**
  * 默认导出
  */
-export default syncApi
\ No newline at end of file
+export default syncApi
@@ -269,4 +269,46 @@ export interface SyncResponse {
   total_deletions: number
   sync_mode: 'full' | 'incremental'
   since?: string
+  failed_repos?: Array<{ repo_name: string; error: string }>
+  sync_run_id?: number | null
+  resumed?: boolean
+}
+
+/**
+ * 同步任务提交响应
+ */
+export interface SyncJobCreated {
+  job_id: string
+  status: SyncJobStatus
+  created: boolean         // 该用户已有未结束的任务时为false，返回已有任务
+  status_url: string
+  events_url: string       // 服务器推送事件（SSE）地址
+}
+
+/**
+ * 同步任务状态
+ */
+export type SyncJobStatus = 'queued' | 'running' | 'succeeded' | 'failed' | 'cancelled'
+
+/**
+ * 同步任务进度
+ */
+export interface SyncJob {
+  job_id: string
+  status: SyncJobStatus
+  stage?: 'user' | 'repositories' | 'commits' | 'statistics' | null
+  params: Record<string, unknown>
+  created_at: string
+  started_at?: string | null
+  finished_at?: string | null
+  elapsed_seconds: number
+  total_repos: number
+  pending_repos: number
+  skipped_repos: number
+  completed_repos: number
+  failed_repos: Array<{ repo_name: string; error: string }>
+  commits_synced: number
+  commits_per_second: number
+  error?: string | null
+  result?: SyncResponse | null
 }
\ No newline at end of file